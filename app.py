@@ -18,8 +18,9 @@ evolving cyber threats."
 Main application entry point
 """
 
+import os
+
 from flask import Flask
-from flask_migrate import Migrate
 from flask_cors import CORS
 from models.DBModel import db
 from routes.Route import pclist
@@ -32,12 +33,37 @@ app.config.from_object('config')
 # Enable CORS support
 CORS(app)
 
+# orjson JSON provider and negotiated gzip/brotli response compression
+from utils import response_encoding
+response_encoding.init_app(app)
+
 # API Key configuration
 app.config['API_KEY'] = 'cti-bot-api-key-2024'
 
+# Token-bucket rate limits per client and endpoint class, plus load shedding for heavy endpoints
+from utils import rate_limiter
+rate_limiter.init_app(app)
+
+# Instrument SQL statements; the engine gets the instrumented sqlite3 connection factory
+from utils.sql_instrumentation import query_stats, instrument_engine_options
+query_stats.enabled = app.config.get('SQL_INSTRUMENTATION', False)
+if query_stats.enabled:
+    from utils.index_advisor import workload_recorder
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = instrument_engine_options(app.config.get('SQLALCHEMY_ENGINE_OPTIONS'))
+    workload_recorder.install()
+
 # Initialize database
 db.init_app(app)
-migrate = Migrate(app, db)
+
+# Flask-Migrate (alembic) is only needed by the `flask db ...` commands; the flask CLI
+# sets FLASK_RUN_FROM_CLI for every command it runs
+if os.environ.get('FLASK_RUN_FROM_CLI') == 'true':
+    from flask_migrate import Migrate
+    migrate = Migrate(app, db)
+
+# ORM writes bump the data-version counters behind conditional GET (ETag) responses
+from utils.data_version import install_orm_version_hooks
+install_orm_version_hooks(db)
 
 # Register blueprints
 app.register_blueprint(pclist)
@@ -45,4 +71,8 @@ app.register_blueprint(api_bp)
 
 if __name__ == '__main__':
     app.debug = True
+    # Dashboard snapshot writer; with the debug reloader only the serving child runs it
+    if app.config.get('DASHBOARD_SNAPSHOT_WRITER') and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from utils.realtime_updater import start_realtime_updater
+        start_realtime_updater(app)
     app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,261 @@
+# Veri Toplayıcı Daemon
+# Her kaynağı kendi aralığında (jitter ile) sürekli çalışan tek bir süreçte toplar.
+# Kaynaklar şeritlerde (lane) çalışır: her şerit kendi thread'idir, şeritteki kaynaklar sırayla
+# çalışır. Yavaş bir kaynak (ör. yedek) sadece kendi şeridini bekletir; aynı SQLite bağlantısını
+# paylaşan kaynaklar aynı şeride konur. Bir kaynak kendisiyle asla üst üste binmez; süresi
+# aralığını aşarsa kaçırılan döngüler skipped_cycles olarak sayılır.
+
+import sys
+import os
+import json
+import time
+import random
+import signal
+import threading
+from datetime import datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+
+# Şeritler arasında durdurma sırasında bir kaynağın bitmesi için beklenen süre
+STOP_TIMEOUT = 30
+
+
+class CollectorSource:
+    def __init__(self, name, func, interval, jitter=0.1, lane=None, metric='rows_ingested', cumulative=True):
+        """
+        metric: func'ın dönüş değerinin metriklerdeki adı (None: dönüş değeri kaydedilmez)
+        cumulative: True ise değer ayrıca <metric>_total altında toplanır (sayaç), değilse
+        sadece son değer tutulur (ör. sağlıklı proxy sayısı gibi anlık değerler)
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.lane = lane or name
+        self.metric = metric
+        self.cumulative = cumulative
+        self.next_due = time.time()
+        self.metrics = {
+            'runs': 0,
+            'failures': 0,
+            'skipped_cycles': 0,
+            'lane': self.lane,
+            'last_duration_s': None,
+            'last_lag_s': None,
+            'last_started_at': None,
+            'last_finished_at': None,
+            'last_error': None,
+            'interval_s': interval,
+            'next_due_at': None
+        }
+        if metric:
+            self.metrics[f'last_{metric}'] = None
+            if cumulative:
+                self.metrics[f'{metric}_total'] = 0
+
+    def record_result(self, result):
+        """func'ın dönüş değerini kaynağın kendi metrik adıyla kaydeder"""
+        if not self.metric:
+            return
+        self.metrics[f'last_{self.metric}'] = result
+        if self.cumulative and result:
+            self.metrics[f'{self.metric}_total'] += result
+
+    def schedule_next(self, now):
+        """Bir sonraki çalışma zamanını jitter ile hesaplar"""
+        spread = self.interval * self.jitter
+        self.next_due = now + self.interval + random.uniform(-spread, spread)
+        self.metrics['next_due_at'] = datetime.fromtimestamp(self.next_due).isoformat()
+
+
+class CollectorDaemon:
+    def __init__(self, metrics_path=None, elector=None):
+        """
+        elector: verilirse kaynaklar sadece bu süreç lider iken çalışır (utils/leader_election);
+        takipçi kopyalar boşta bekler ve lider ölürse devralır
+        """
+        self.sources = {}
+        self.metrics_path = metrics_path or config.COLLECTOR_METRICS_FILE
+        self.started_at = None
+        self.status_providers = {}
+        self.elector = elector
+        self._stop_event = threading.Event()
+        self._metrics_lock = threading.Lock()
+        self._lane_threads = []
+
+    def add_source(self, name, func, interval, jitter=None, lane=None, metric='rows_ingested', cumulative=True):
+        """Yeni bir veri kaynağı ekler (lane verilmezse kaynak kendi şeridinde çalışır)"""
+        if jitter is None:
+            jitter = config.COLLECTOR_JITTER
+        self.sources[name] = CollectorSource(name, func, interval, jitter, lane, metric, cumulative)
+
+    def add_status_provider(self, name, func):
+        """Metriklere eklenecek ek durum bilgisi (ör. proxy havuzu) kaynağı ekler"""
+        self.status_providers[name] = func
+
+    def run_source(self, source):
+        """Tek bir kaynağı çağıran thread'de çalıştırır ve bir sonraki çalışmayı planlar"""
+        started = time.time()
+        source.metrics['last_lag_s'] = round(max(0.0, started - source.next_due), 3)
+        source.metrics['last_started_at'] = datetime.fromtimestamp(started).isoformat()
+        try:
+            source.record_result(source.func())
+            source.metrics['last_error'] = None
+        except Exception as e:
+            source.metrics['failures'] += 1
+            source.metrics['last_error'] = str(e)
+            print(f"[{datetime.now()}] {source.name} toplama hatası: {e}")
+        finally:
+            finished = time.time()
+            source.metrics['runs'] += 1
+            source.metrics['last_duration_s'] = round(finished - started, 3)
+            source.metrics['last_finished_at'] = datetime.fromtimestamp(finished).isoformat()
+
+        # Çalışma süresi bir veya daha fazla aralığı aştıysa kaçırılan döngüler
+        # üst üste çalıştırılmaz, sadece sayılır
+        missed = int((finished - source.next_due) // source.interval) if source.interval else 0
+        if missed > 0:
+            source.metrics['skipped_cycles'] += missed
+        source.schedule_next(finished)
+
+    def lanes(self):
+        """Şerit adı -> o şeritteki kaynaklar"""
+        lanes = {}
+        for source in self.sources.values():
+            lanes.setdefault(source.lane, []).append(source)
+        return lanes
+
+    def run_pending(self, sources=None):
+        """Zamanı gelmiş kaynakları çağıran thread'de sırayla çalıştırır (varsayılan: tüm kaynaklar)"""
+        for source in sorted(self.sources.values() if sources is None else sources, key=lambda s: s.next_due):
+            # Liderlik bir kaynağın ortasında kaybedilirse kalan kaynaklar yeni lidere bırakılır
+            if self._stop_event.is_set() or (self.elector is not None and not self.elector.is_leader):
+                return
+            if time.time() >= source.next_due:
+                self.run_source(source)
+                self.write_metrics()
+
+    def seconds_until_next(self, sources=None):
+        """En yakın kaynağın çalışmasına kalan süre"""
+        sources = list(self.sources.values() if sources is None else sources)
+        if not sources:
+            return 60
+        wait = max(0.0, min(s.next_due for s in sources) - time.time())
+        if self.elector is not None and not self.elector.is_leader:
+            # Takipçi: kaynaklar zamanı gelmiş olarak bekler, liderlik alınınca hemen çalışır
+            wait = max(wait, self.elector.retry_interval)
+        return wait
+
+    def _run_lane(self, sources):
+        """Şerit thread'i: şeritteki kaynakları zamanı geldikçe sırayla çalıştırır"""
+        while not self._stop_event.is_set():
+            self.run_pending(sources)
+            # Döngüler arasında CPU harcamadan bir sonraki kaynağa kadar uyu
+            self._stop_event.wait(self.seconds_until_next(sources))
+
+    def run_forever(self):
+        """Daemon ana döngüsü"""
+        self.started_at = datetime.now().isoformat()
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        signal.signal(signal.SIGINT, lambda signum, frame: self.stop())
+
+        print(f"[{datetime.now()}] Toplayıcı daemon başlatıldı: " +
+              ", ".join(f"{s.name}={s.interval}s" for s in self.sources.values()))
+        if self.elector is not None:
+            self.elector.start()
+
+        self._lane_threads = []
+        for lane, sources in self.lanes().items():
+            thread = threading.Thread(target=self._run_lane, args=(sources,), name=f'collector-{lane}', daemon=True)
+            thread.start()
+            self._lane_threads.append(thread)
+
+        # Sinyaller ana thread'de işlenir; ana thread sadece durdurulmayı bekler
+        while not self._stop_event.is_set():
+            self._stop_event.wait(1)
+
+        # Çalışmakta olan kaynaklara bitmeleri için süre tanınır (ör. yarıdaki yedek adımı)
+        deadline = time.time() + STOP_TIMEOUT
+        for thread in self._lane_threads:
+            thread.join(max(0.0, deadline - time.time()))
+        running = [thread.name for thread in self._lane_threads if thread.is_alive()]
+        if running:
+            print(f"[{datetime.now()}] Bitmeyen şeritler bırakıldı: {', '.join(running)}")
+
+        if self.elector is not None:
+            # Lease hemen bırakılır; takipçi lease süresini beklemeden devralır
+            self.elector.stop()
+        self.write_metrics()
+        print(f"[{datetime.now()}] Toplayıcı daemon durduruldu")
+
+    def stop(self):
+        """Daemon'u durdurur"""
+        self._stop_event.set()
+
+    def get_metrics(self):
+        """Kaynak bazında metrikleri döndürür"""
+        return {
+            'started_at': self.started_at,
+            'updated_at': datetime.now().isoformat(),
+            'pid': os.getpid(),
+            'sources': {name: dict(s.metrics) for name, s in self.sources.items()},
+            **{name: func() for name, func in self.status_providers.items()}
+        }
+
+    def write_metrics(self):
+        """Metrikleri JSON dosyasına atomik olarak yazar"""
+        try:
+            # Şeritler aynı geçici dosyaya yazdığı için yazma tek seferde bir thread'den yapılır
+            with self._metrics_lock:
+                os.makedirs(os.path.dirname(self.metrics_path), exist_ok=True)
+                tmp_path = self.metrics_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.get_metrics(), f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.metrics_path)
+        except Exception as e:
+            print(f"[{datetime.now()}] Metrik yazma hatası: {e}")
+
+
+def build_default_daemon(jobs):
+    """cron_update_db fonksiyonlarıyla varsayılan daemon'u oluşturur"""
+    elector = None
+    if config.LEADER_ELECTION_ENABLED:
+        from utils.leader_election import create_elector
+        elector = create_elector('collector', backend=config.LEADER_ELECTION_BACKEND,
+                                 lease_seconds=config.LEADER_LEASE_SECONDS, redis_url=config.LEADER_REDIS_URL)
+    daemon = CollectorDaemon(elector=elector)
+    intervals = config.COLLECTOR_INTERVALS
+    # Ingest işleri cron_update_db'nin modül düzeyindeki SQLite bağlantısını paylaşır
+    # (bağlantı tek thread'e bağlıdır), bu yüzden aynı şeritte sırayla çalışırlar
+    daemon.add_source('groups', jobs.fetch_and_store_groups, intervals['groups'], lane='ingest')
+    daemon.add_source('posts', jobs.fetch_and_store_posts, intervals['posts'], lane='ingest')
+    daemon.add_source('wallets', jobs.fetch_and_store_wallets_from_api, intervals['wallets'], lane='ingest')
+    daemon.add_source('leak_site_revisits', jobs.revisit_leak_sites, intervals['leak_site_revisits'],
+                      metric='pages_changed')
+    daemon.add_source('availability', jobs.probe_group_availability, intervals['availability'],
+                      metric='groups_up', cumulative=False)
+    daemon.add_source('proxy_health', jobs.check_proxy_health, intervals['proxy_health'],
+                      metric='healthy_proxies', cumulative=False)
+    daemon.add_source('screenshot_gc', jobs.collect_screenshot_garbage, intervals['screenshot_gc'], metric=None)
+    daemon.add_source('archive', jobs.archive_old_posts, intervals['archive'], metric='posts_archived')
+    daemon.add_source('backup', jobs.backup_database, intervals['backup'], metric=None)
+    if config.BACKUP_WAL_ARCHIVE:
+        daemon.add_source('wal_archive', jobs.archive_wal_segments, intervals['wal_archive'], metric=None)
+    daemon.add_source('maintenance', jobs.run_db_maintenance, intervals['maintenance'], metric=None)
+    daemon.add_status_provider('proxy_pool', jobs.proxy_pool.get_stats)
+    if elector is not None:
+        daemon.add_status_provider('leader', elector.get_status)
+    return daemon
+
+
+def read_collector_metrics(metrics_path=None):
+    """Daemon'un yazdığı son metrikleri okur"""
+    metrics_path = metrics_path or config.COLLECTOR_METRICS_FILE
+    if not os.path.exists(metrics_path):
+        return None
+    with open(metrics_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
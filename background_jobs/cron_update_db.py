@@ -2,11 +2,9 @@ import requests
 import sqlite3
 import json
 import hashlib
-import re
 import os
 import time
 import sys
-from playwright.sync_api import sync_playwright
 from datetime import datetime
 
 # Utils modüllerini import et
@@ -105,6 +103,45 @@ except ImportError:
     print("SectorDetector modülü bulunamadı, basit sektör tespiti kullanılacak")
     sector_detector = None
 
+import config
+
+# İçerik adresli ekran görüntüsü deposu, SOCKS proxy havuzu ve havuzlanmış tarayıcılar
+from utils.screenshot_store import screenshot_store, referenced_hashes_from_db
+from utils.proxy_pool import ProxyPool, parse_proxy_list
+from utils.page_capture import ParallelCapturer
+proxy_pool = ProxyPool(parse_proxy_list(config.PROXY_POOL),
+                       max_concurrency=config.PROXY_CAPTURES_PER_PROXY)
+page_capturer = ParallelCapturer(proxy_pool)
+
+# Kurban alan adı normalizasyonu ve gruplar arası kurban tekilleştirme
+from utils.domain_normalizer import ensure_domain_columns, victim_domain_for
+from utils.victim_dedup import VictimDeduplicator
+from utils.entity_resolution import EntityResolver
+from utils.timestamps import backfill_timestamp_columns, parse_timestamp
+ensure_domain_columns(conn)
+# Tarih aralığı sorguları için epoch sütunları ve indeksleri; eski kayıtlar toplu olarak doldurulur
+backfill_timestamp_columns(conn)
+
+# Sıcak/soğuk bölümleme: eski postlar veritabanının yanındaki archive.db dosyasına taşınır
+from utils.post_archive import PostArchiver, archived_post_exists
+from utils.data_version import bump_data_version
+post_archiver = PostArchiver(db_path, horizon_days=config.ARCHIVE_HORIZON_DAYS)
+from utils.backup_manager import BackupManager
+backup_manager = BackupManager(db_path, config.BACKUP_DIR,
+                               retain_generations=config.BACKUP_RETAIN_GENERATIONS,
+                               pages_per_step=config.BACKUP_PAGES_PER_STEP,
+                               step_sleep=config.BACKUP_STEP_SLEEP,
+                               compression_level=config.BACKUP_COMPRESSION_LEVEL,
+                               wal_archive=config.BACKUP_WAL_ARCHIVE)
+from utils.db_maintenance import MaintenanceScheduler
+db_maintenance = MaintenanceScheduler(db_path,
+                                      pages_per_step=config.MAINTENANCE_PAGES_PER_STEP,
+                                      max_seconds=config.MAINTENANCE_MAX_SECONDS,
+                                      quiet_seconds=config.MAINTENANCE_QUIET_SECONDS,
+                                      analyze_threshold=config.MAINTENANCE_ANALYZE_THRESHOLD)
+victim_deduplicator = VictimDeduplicator(conn)
+entity_resolver = EntityResolver(conn)
+
 # 2. POST verilerini çekme ve veritabanına ekleme
 DISCORD_WEBHOOK_URL = "https://discord.com/api/webhooks/1360155723081715792/hhJkkp6yFF5iCLp_ggSzmD6EHXiKi6uSTP5Pf0TcyFNeXPhHCzBz1Qz_MFqB5XZ0qGPH"
 RANSOMWARE_GROUPS = "https://api.ransomware.live/v2/groups"
@@ -112,6 +149,13 @@ RANSOMWARE_POSTS = "https://data.ransomware.live/posts.json"
 RANSOMWARE_CRYPTO = "https://api.ransomwhe.re/export"
 DATE_DATA = str(datetime.now()).replace(".","_").replace(":","_").replace(" ","_")
 
+# Daemon modunda döngüler arasında TCP/TLS bağlantılarını sıcak tutmak için ortak oturum
+http_session = requests.Session()
+
+def current_date_tag():
+    """Arşiv dosya adları için o anki zaman etiketini döndürür"""
+    return str(datetime.now()).replace(".","_").replace(":","_").replace(" ","_")
+
 # Örnek veri ekleme fonksiyonu
 def add_sample_data():
     """Örnek veri ekle"""
@@ -188,7 +232,7 @@ def data_download_archive(DOWNLOAD_URL, FILE_NAME):
     if not os.path.exists(current_directory + "data_archive"):
         os.makedirs(current_directory + "data_archive")
     try:
-        response = requests.get(DOWNLOAD_URL, stream=True)
+        response = http_session.get(DOWNLOAD_URL, stream=True)
         response.raise_for_status()
         with open(current_directory + "data_archive/" + FILE_NAME, 'wb') as dosya:
             for parca in response.iter_content(chunk_size=8192):
@@ -206,7 +250,7 @@ def send_discord_message(content):
     data = {"content": content}
     headers = {"Content-Type": "application/json"}
     try:
-        response = requests.post(DISCORD_WEBHOOK_URL, data=json.dumps(data), headers=headers)
+        response = http_session.post(DISCORD_WEBHOOK_URL, data=json.dumps(data), headers=headers)
         if response.status_code == 204:
             print("Discord mesajı gönderildi.")
         else:
@@ -215,39 +259,36 @@ def send_discord_message(content):
         print("Discord mesaj hatası:", e)
 
 # playwright install-deps and playwright install komutunu girmeyi unutma!
-def capture_screenshot(url, output_filename):
-    if url and url != "None" and len(url.strip()) > 0:
+def capture_screenshot(url):
+    return capture_screenshots([url])[url]
+
+def capture_screenshots(urls):
+    """URL'leri proxy havuzu kapasitesi kadar paralel yakalar, url -> screenshot değeri döndürür"""
+    results = {}
+    valid_urls = []
+    for url in urls:
+        if url and url != "None" and len(url.strip()) > 0:
+            print(str(url) + " sitesine bağlanıyor...")
+            valid_urls.append(url)
+        else:
+            results[url] = "None"
+
+    for url, png in page_capturer.capture_many(valid_urls).items():
         try:
-            with sync_playwright() as p:
-                print(str(url) + " sitesine bağlanıyor...")
-                browser = p.chromium.launch(proxy={"server": "socks5://127.0.0.1:9055"}, args=[''])
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-                    viewport={"width": 1280, "height": 800},
-                    locale='en-US',
-                    ignore_https_errors=True)
-                page = context.new_page()
-                page.goto(url, wait_until='domcontentloaded', timeout=15000)
-                page.bring_to_front()
-                page.wait_for_timeout(15000)
-                page.mouse.move(x=500, y=400)
-                page.wait_for_load_state('networkidle')
-                page.mouse.wheel(delta_y=2000, delta_x=0)
-                page.wait_for_load_state('networkidle')
-                if not os.path.exists(current_directory + "screenshots"):
-                    os.makedirs(current_directory + "screenshots")
-                page.screenshot(path=current_directory + "screenshots/" + output_filename + ".png", full_page=True)
-                return output_filename
+            if isinstance(png, Exception):
+                raise png
+            # Görüntü içerik hash'i ile saklanır, posts.screenshot bu hash'i tutar
+            results[url] = screenshot_store.put(png)
         except:
-            return "ConnectionError"
-    else:
-        return "None"
+            results[url] = "ConnectionError"
+    return results
     
 # 1. GRUP verilerini çekme ve veritabanına ekleme
 def fetch_and_store_groups():
     print("Gruplar alınıyor...")
-    response = requests.get(RANSOMWARE_GROUPS)
-    data_download_archive(RANSOMWARE_GROUPS, "groups-" + DATE_DATA + ".json")
+    inserted = 0
+    response = http_session.get(RANSOMWARE_GROUPS)
+    data_download_archive(RANSOMWARE_GROUPS, "groups-" + current_date_tag() + ".json")
     if response.status_code == 200:
         groups = response.json()
         for group in groups:
@@ -277,55 +318,73 @@ def fetch_and_store_groups():
                                 url
                                 ))
                 print(str(group.get("name", "None")) + " başarıyla kaydedildi")
+                bump_data_version(conn, 'groups')
                 conn.commit()
+                inserted += 1
                 print(f"{name} başarıyla kaydedildi")
             print(f"{len(groups)} grup işlendi.")
     else:
         print("Gruplar alınamadı:", response.status_code)
+    return inserted
 
 # Ransomware olaylarını koy
 def fetch_and_store_posts():
     print("Postlar alınıyor...")
-    response = requests.get(RANSOMWARE_POSTS)
-    data_download_archive(RANSOMWARE_POSTS, "posts-" + DATE_DATA + ".json")
+    inserted = 0
+    response = http_session.get(RANSOMWARE_POSTS)
+    data_download_archive(RANSOMWARE_POSTS, "posts-" + current_date_tag() + ".json")
     if response.status_code == 200:
         posts = response.json()
+        new_posts = []
+        seen = set()
         for post in posts:
-            # Gerekli alanları al
-            group_name = post.get("group_name", "None")
-            post_url = post.get('post_url', 'None')
             post_title = post.get("post_title", "None")
             discovered = post.get("discovered", "None")
             published = post.get("published", "None")
             website = post.get("website", "None")
             country = post.get("country", "None")
-            if post_url == "" or post_url is None:
-                post_url = "Herhangi bir onion link bulunamadı ve/veya onion link üzerinde paylaşılmadı"
-            # Veritabanında bu kayıt zaten var mı?
+            key = (post_title, discovered, published, website, country)
+            # Veritabanında veya bu partide bu kayıt zaten var mı?
             cur.execute("""
                 SELECT * FROM posts
                 WHERE title = ? AND discovered = ? AND published = ? AND website = ? AND country = ?
-            """, (post_title, discovered, published, website, country))
+            """, key)
 
-            if cur.fetchone():
+            if key in seen or cur.fetchone() or is_archived(key):
                 print(f"Zaten mevcut: {post_title}, atlanıyor.")
                 continue  # Bu kayıt zaten varsa, atla
-            else:
-                get_screenshot = capture_screenshot(
-                    str(post.get("post_url", "None")),
-                    generate_md5_from_string(post_title)
-                    )
+            seen.add(key)
+            new_posts.append(post)
+
+        # Yeni postların ekran görüntüleri proxy havuzu kapasitesi kadarlık parçalar halinde paralel
+        # alınır; her parça bir sonraki yakalanmadan önce eklenip commit edilir. Böylece bellekte
+        # tek parçanın PNG'leri tutulur ve birikmiş bir akışta ilk kayıt/uyarı beklemez
+        chunk_size = max(1, page_capturer.workers)
+        for start in range(0, len(new_posts), chunk_size):
+            chunk = new_posts[start:start + chunk_size]
+            screenshots = capture_screenshots([str(post.get("post_url", "None")) for post in chunk])
+
+            for post in chunk:
+                # Gerekli alanları al
+                group_name = post.get("group_name", "None")
+                post_url = post.get('post_url', 'None')
+                post_title = post.get("post_title", "None")
+                discovered = post.get("discovered", "None")
+                published = post.get("published", "None")
+                website = post.get("website", "None")
+                country = post.get("country", "None")
+                if post_url == "" or post_url is None:
+                    post_url = "Herhangi bir onion link bulunamadı ve/veya onion link üzerinde paylaşılmadı"
+                get_screenshot = screenshots[str(post.get("post_url", "None"))]
+                victim_domain, victim_tld = victim_domain_for(post_title, website)
                 # Yeni kayıt ekle
                 if country == "TR":
                     discord_msg = f"SyberCTI Bot\n🇹🇷 Yeni yetkisiz erişim saldırısına uğrayan alan: {post_title}\nTehdit Aktörü Adı :\n{group_name}🔗\nTarih : {published}\nSızıntı URL : {post_url}"
                     send_discord_message(discord_msg)
-                elif country == "None" or country == "":
-                    if website != "None" or website != "":
-                        pattern = r'https?://(?:[\w.-]+\.)?[\w-]+\.(?:com|ct)\.tr(?:/[^\s]*)?|(?:[\w-]+\.)?[\w-]+\.(?:com|ct)\.tr'
-                        matches = re.findall(pattern, website)
-                        for match in matches:
-                            discord_msg = f"SyberCTI Bot\n🇹🇷 Yeni yetkisiz erişim saldırısına uğrayan alan: {match}\nTehdit Aktörü Adı :\n{group_name}🔗\nWebsitesi : {website}\nTarih : {published}\nSızıntı URL : {post_url}"
-                            send_discord_message(discord_msg)
+                elif (country == "None" or country == "") and victim_tld == "tr":
+                    # Ülke bilgisi olmayan postlarda .tr uzantılı alan adı Türkiye olarak kabul edilir
+                    discord_msg = f"SyberCTI Bot\n🇹🇷 Yeni yetkisiz erişim saldırısına uğrayan alan: {victim_domain}\nTehdit Aktörü Adı :\n{group_name}🔗\nWebsitesi : {website}\nTarih : {published}\nSızıntı URL : {post_url}"
+                    send_discord_message(discord_msg)
                 # Sektör tespiti ve veri zenginleştirme
                 post_data = {
                     'title': post_title,
@@ -333,7 +392,7 @@ def fetch_and_store_posts():
                     'description': post.get("description", "None"),
                     'country': country
                 }
-                
+            
                 if sector_detector:
                     analysis = sector_detector.analyze_post(post_data)
                 else:
@@ -343,7 +402,7 @@ def fetch_and_store_posts():
                         'company_size': 'Unknown',
                         'impact_level': 'Medium'
                     }
-                
+            
                 # Hack tarihini parse et
                 hack_date = None
                 try:
@@ -351,12 +410,13 @@ def fetch_and_store_posts():
                         hack_date = datetime.strptime(published, "%Y-%m-%d")
                 except:
                     hack_date = datetime.now()
-                
+            
                 cur.execute("""
                             INSERT OR REPLACE INTO posts (title, name, description, discovered, published, post_url, country, activity, website, duplicates, screenshot,
                                                          company_name, sector, company_size, impact_level, employee_count, revenue_range, industry_category, 
-                                                         data_type_leaked, hack_date, created_at, updated_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                                         data_type_leaked, hack_date, created_at, updated_at, victim_domain, victim_tld,
+                                                         discovered_ts, published_ts)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                             """, (
                                 post_title,
                                 post.get("group_name", "None"),
@@ -379,30 +439,124 @@ def fetch_and_store_posts():
                                 analysis['data_type_leaked'],
                                 hack_date,
                                 datetime.now(),
-                                datetime.now()
+                                datetime.now(),
+                                victim_domain,
+                                victim_tld,
+                                parse_timestamp(discovered),
+                                parse_timestamp(published)
                                 ))
+                # Aynı kurbanın farklı grup/başlıkla yayınlanan postlarını tek kümeye bağla
+                victim_deduplicator.link_post(cur.lastrowid, post_title, website, discovered)
+                entity_resolver.resolve_post(cur.lastrowid, post_title, website, discovered)
+                bump_data_version(conn, 'posts')
                 conn.commit()
+                inserted += 1
                 print(f"{post_title} başarıyla kaydedildi")
         print(f"{len(posts)} post işlendi.")
-    else:
-        return "None"
+    db_maintenance.record_changes(inserted)
+    return inserted
+
+
+def is_archived(key):
+    """Ufuk dışındaki (arşive taşınmış) bir post tekrar eklenmesin diye arşivde aranır"""
+    post_title, discovered, published, website, country = key
+    discovered_ts = parse_timestamp(discovered)
+    if discovered_ts is None or discovered_ts >= post_archiver.cutoff():
+        return False
+    return archived_post_exists(conn, "discovered_ts = ? AND title = ? AND published = ? AND website = ? AND country = ?",
+                                (discovered_ts, post_title, published, website, country))
+
+
+def archive_old_posts():
+    """Ufuk süresinden eski postları arşiv veritabanına taşır"""
+    moved = post_archiver.archive_old_posts()
+    print(f"🗄️ {moved} post arşive taşındı")
+    # Taşınan satırlar sıcak tabloda boş sayfa bırakır; bakım turu bunları geri verir
+    db_maintenance.record_changes(moved)
+    return moved
+
+
+def backup_database():
+    """Veritabanının çevrimiçi, sıkıştırılmış yedeğini alır (yeni nesil)"""
+    manifest = backup_manager.create_backup()
+    print(f"💾 Yedek alındı: {manifest['generation']}")
+
+
+def archive_wal_segments():
+    """Son tam yedekten bu yana yazılan WAL çerçevelerini arşivler"""
+    result = backup_manager.archive_wal()
+    if result.get('frames'):
+        print(f"📼 {result['frames']} WAL çerçevesi arşivlendi")
+
+
+def run_db_maintenance():
+    """ANALYZE / PRAGMA optimize ve sessiz dönemde incremental vacuum"""
+    result = db_maintenance.run()
+    reclaimed = sum(result['reclaimed_pages'].values())
+    if reclaimed or result['analyzed']:
+        print(f"🧽 Bakım: {reclaimed} boş sayfa geri verildi, ANALYZE: {'evet' if result['analyzed'] else 'hayır'}")
+
+
+def collect_screenshot_garbage():
+    """Hiçbir post'un referans vermediği ekran görüntülerini siler"""
+    result = screenshot_store.collect_garbage(referenced_hashes_from_db(db_path))
+    print(f"🧹 {result['removed_files']} sahipsiz ekran görüntüsü silindi")
+
+
+leak_site_monitor = None
+
+def revisit_leak_sites():
+    """Takip edilen sızıntı sayfalarını yeniden yakalar ve değişiklikleri bildirir"""
+    global leak_site_monitor
+    if leak_site_monitor is None:
+        from utils.leak_site_monitor import LeakSiteMonitor
+
+        def notify_change(post_id, post_url, distance, screenshot):
+            send_discord_message(f"SyberCTI Bot\n📄 Sızıntı sayfası değişti (fark: %{distance * 100:.0f})\nSızıntı URL : {post_url}")
+
+        leak_site_monitor = LeakSiteMonitor(page_capturer, db_path=db_path, on_change=notify_change)
+    return leak_site_monitor.run_due()
+
+
+onion_prober = None
+
+def probe_group_availability():
+    """Tüm grup sızıntı sitelerinin erişilebilirliğini eşzamanlı olarak yoklar"""
+    global onion_prober
+    if onion_prober is None:
+        from utils.onion_prober import OnionProber
+        # Yoklamalar hafif olduğu için ayrı bir havuz kullanılır; proxy başına eşzamanlılık
+        # her turda grup sayısına göre büyütülür (ekran görüntüsü havuzu etkilenmez)
+        probe_pool = ProxyPool(parse_proxy_list(config.PROXY_POOL),
+                               max_concurrency=config.ONION_PROBE_CONCURRENCY or 1)
+        onion_prober = OnionProber(db_path=db_path,
+                                   proxy_pool=probe_pool,
+                                   concurrency=config.ONION_PROBE_CONCURRENCY,
+                                   timeout=config.ONION_PROBE_TIMEOUT)
+    return onion_prober.run_once()
+
+
+def check_proxy_health():
+    """Proxy havuzunu kontrol eder, düşen devreleri çıkarır ve düzelenleri geri alır"""
+    return proxy_pool.run_health_check(config.PROXY_HEALTH_CHECK_URL, timeout=config.ONION_PROBE_TIMEOUT)
 
 
 def fetch_and_store_wallets_from_api():
     print("Veriler API üzerinden alınıyor...")
 
-    response = requests.get(RANSOMWARE_CRYPTO)
-    data_download_archive(RANSOMWARE_CRYPTO, "wallets-" + DATE_DATA + ".json")
+    inserted = 0
+    response = http_session.get(RANSOMWARE_CRYPTO)
+    data_download_archive(RANSOMWARE_CRYPTO, "wallets-" + current_date_tag() + ".json")
     if response.status_code != 200:
         send_discord_message("SyberCTI - Ransomware Kripto Cüzdan değişiklikleri alınamadı!\nVeri kaynağına bağlantı sağlanamadı.")
         print("Veri alınamadı. Durum kodu:", response.status_code)
-        return
+        return inserted
 
     try:
         wallet_list = response.json()
     except Exception as e:
         print("JSON ayrıştırma hatası veya veri formatı hatası:", e)
-        return
+        return inserted
 
     for wallet in wallet_list["result"]:
         address = str(wallet["address"])
@@ -441,6 +595,7 @@ def fetch_and_store_wallets_from_api():
                         INSERT INTO wallets (address, balance, balance_usd, blockchain, created_at, updated_at, family)
                         VALUES (?, ?, ?, ?, ?, ?, ?)
                         ''', (address, balance, balance_usd, blockchain, created_at, updated_at, family))
+            inserted += 1
             print(f"{address} cüzdanı kaydedildi.")
             for tx in wallet.get("transactions", []):
                 tx_hash = tx.get("hash")
@@ -466,9 +621,26 @@ def fetch_and_store_wallets_from_api():
                             ''', (wallet_id, tx_hash, tx_time, tx_amount, tx_amount_usd))
                 send_discord_message("SyberCTI - Ransomware Kripto Cüzdan İstihbarat Modülü\nYeni kripto varlık keşfedildi!\nAdresi: {address}\nKripto Varlık Tipi:{blockchain}\nTehdit Aktörü:{family}\nOluşturulma Tarihi:{created_at}\nİçerisinde Bulunan Miktar (USD):{balance_usd}")
                 conn.commit()
-    print(f"{len(address)} cüzdan işlendi.")
+    # Yeni cüzdan yoksa sürüm artırılmaz; wallets ETag'leri geçerli kalır
+    if inserted > 0:
+        bump_data_version(conn, 'wallets')
+        conn.commit()
+    print(f"{len(wallet_list['result'])} cüzdan işlendi.")
+    return inserted
 
 if __name__ == "__main__":
+    # Sürekli çalışan toplayıcı modu (docker-compose data-collector servisi)
+    if "--daemon" in sys.argv:
+        from background_jobs.collector_daemon import build_default_daemon
+        daemon = build_default_daemon(sys.modules[__name__])
+        try:
+            daemon.run_forever()
+        finally:
+            page_capturer.close()
+            conn.close()
+            print("✅ Veritabanı bağlantısı kapatıldı")
+        sys.exit(0)
+
     print("🚀 CTI-BOT Veri Toplama Başlatılıyor...")
     print("=" * 50)
     
@@ -13,6 +13,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.social_media_automation import SocialMediaAutomation
 from utils.data_analyzer import DataAnalyzer
 
+SCHEDULE_TAG = 'social-media'
+
 class SocialMediaScheduler:
     def __init__(self):
         self.automation = SocialMediaAutomation()
@@ -136,24 +138,32 @@ Detaylar için sosyal medya hesaplarımızı takip edin!
         except Exception as e:
             print(f"Breaking news kontrolünde hata: {e}")
     
-    def start_scheduler(self):
-        """Zamanlayıcıyı başlatır"""
-        print("Sosyal medya zamanlayıcısı başlatılıyor...")
-        
+    def _monthly_if_first_day(self):
+        if datetime.now().day == 1:
+            self.monthly_content_generation()
+    
+    def _register_jobs(self):
+        """Görevleri 'social-media' etiketiyle kaydeder; sonraki çalışma zamanları şimdiden hesaplanır"""
         # Günlük görevler
-        schedule.every().day.at("09:00").do(self.daily_content_generation)
-        schedule.every().day.at("15:00").do(self.daily_content_generation)
-        schedule.every().day.at("21:00").do(self.daily_content_generation)
+        schedule.every().day.at("09:00").do(self.daily_content_generation).tag(SCHEDULE_TAG)
+        schedule.every().day.at("15:00").do(self.daily_content_generation).tag(SCHEDULE_TAG)
+        schedule.every().day.at("21:00").do(self.daily_content_generation).tag(SCHEDULE_TAG)
         
         # Haftalık görevler
-        schedule.every().monday.at("10:00").do(self.weekly_content_generation)
-        schedule.every().friday.at("16:00").do(self.weekly_content_generation)
+        schedule.every().monday.at("10:00").do(self.weekly_content_generation).tag(SCHEDULE_TAG)
+        schedule.every().friday.at("16:00").do(self.weekly_content_generation).tag(SCHEDULE_TAG)
         
-        # Aylık görevler
-        schedule.every().month.do(self.monthly_content_generation)
+        # Aylık görevler (schedule'da aylık aralık yok; her gün kontrol edilir, ayın 1'inde çalışır)
+        schedule.every().day.at("08:00").do(self._monthly_if_first_day).tag(SCHEDULE_TAG)
         
         # Gerçek zamanlı görevler (her 30 dakikada bir)
-        schedule.every(30).minutes.do(self.real_time_breaking_news)
+        schedule.every(30).minutes.do(self.real_time_breaking_news).tag(SCHEDULE_TAG)
+    
+    def start_scheduler(self):
+        """Zamanlayıcıyı başlatır"""
+        print("Sosyal medya zamanlayıcısı başlatılıyor...")
+        
+        self._register_jobs()
         
         print("Zamanlayıcı başlatıldı!")
         print("Günlük görevler: 09:00, 15:00, 21:00")
@@ -161,10 +171,36 @@ Detaylar için sosyal medya hesaplarımızı takip edin!
         print("Aylık görevler: Her ayın 1'i")
         print("Gerçek zamanlı: Her 30 dakikada bir")
         
+        # Birden fazla kopya çalışabilir; işleri sadece 'social-media-scheduler' lease'ini tutan yapar
+        elector = self._create_elector()
+        
         # Ana döngü
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # 1 dakika bekle
+        try:
+            while True:
+                if elector is None or elector.is_leader:
+                    schedule.run_pending()
+                elif any(job.should_run for job in schedule.get_jobs(SCHEDULE_TAG)):
+                    # Takipçi zamanı gelen işleri atlar (görevler şimdiden itibaren yeniden
+                    # kaydedilir): liderliği devraldığında lider zaten çalıştırmış olduğu
+                    # işleri bir daha çalıştırmasın
+                    schedule.clear(SCHEDULE_TAG)
+                    self._register_jobs()
+                time.sleep(60)  # 1 dakika bekle
+        finally:
+            if elector is not None:
+                elector.stop()
+    
+    def _create_elector(self):
+        import config
+        if not getattr(config, 'LEADER_ELECTION_ENABLED', False):
+            return None
+        from utils.leader_election import create_elector
+        return create_elector(
+            'social-media-scheduler',
+            backend=config.LEADER_ELECTION_BACKEND,
+            lease_seconds=config.LEADER_LEASE_SECONDS,
+            redis_url=config.LEADER_REDIS_URL
+        ).start()
 
 if __name__ == "__main__":
     scheduler = SocialMediaScheduler()
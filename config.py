@@ -28,4 +28,161 @@ DEBUG = True
 SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.abspath(os.getcwd()) + "/instance/data.db"
 
 # Disable Flask-SQLAlchemy modification tracking
-SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+# Collector daemon polling interval per source (seconds)
+COLLECTOR_INTERVALS = {
+    'groups': int(os.getenv('COLLECTOR_GROUPS_INTERVAL', 6 * 3600)),
+    'posts': int(os.getenv('COLLECTOR_POSTS_INTERVAL', 15 * 60)),
+    'wallets': int(os.getenv('COLLECTOR_WALLETS_INTERVAL', 3600)),
+    'leak_site_revisits': int(os.getenv('COLLECTOR_REVISIT_INTERVAL', 5 * 60)),
+    'availability': int(os.getenv('COLLECTOR_AVAILABILITY_INTERVAL', 15 * 60)),
+    'proxy_health': int(os.getenv('COLLECTOR_PROXY_HEALTH_INTERVAL', 60)),
+    'screenshot_gc': int(os.getenv('COLLECTOR_SCREENSHOT_GC_INTERVAL', 24 * 3600)),
+    'archive': int(os.getenv('COLLECTOR_ARCHIVE_INTERVAL', 24 * 3600)),
+    'backup': int(os.getenv('COLLECTOR_BACKUP_INTERVAL', 24 * 3600)),
+    'wal_archive': int(os.getenv('COLLECTOR_WAL_ARCHIVE_INTERVAL', 60)),
+    'maintenance': int(os.getenv('COLLECTOR_MAINTENANCE_INTERVAL', 10 * 60)),
+}
+
+# Random jitter applied to every interval (0.1 = +/-10%)
+COLLECTOR_JITTER = float(os.getenv('COLLECTOR_JITTER', 0.1))
+
+# File the collector daemon publishes its metrics to
+COLLECTOR_METRICS_FILE = os.path.join(basedir, 'cache', 'collector_metrics.json')
+
+# Onion availability prober: simultaneous probes (0 = one per group, so a sweep including dead
+# sites finishes within one timeout window) and per-site timeout (seconds)
+ONION_PROBE_CONCURRENCY = int(os.getenv('ONION_PROBE_CONCURRENCY', 0))
+ONION_PROBE_TIMEOUT = float(os.getenv('ONION_PROBE_TIMEOUT', 30))
+
+# Local Tor SOCKS endpoints, comma separated (one circuit per endpoint)
+PROXY_POOL = os.getenv('PROXY_POOL', 'socks5://127.0.0.1:9055')
+
+# Simultaneous browser captures allowed through a single proxy
+PROXY_CAPTURES_PER_PROXY = int(os.getenv('PROXY_CAPTURES_PER_PROXY', 2))
+
+# URL fetched through every proxy during health checks
+PROXY_HEALTH_CHECK_URL = os.getenv('PROXY_HEALTH_CHECK_URL', 'http://check.torproject.org/')
+
+# Posts older than this many days are moved from instance/data.db to the archive database
+ARCHIVE_HORIZON_DAYS = int(os.getenv('ARCHIVE_HORIZON_DAYS', 365))
+
+# Instrument SQL statements (SQLAlchemy engine and raw sqlite3 reads) for
+# /api/performance/queries, slow query alerts and the index advisor workload
+SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', '1') == '1'
+
+# Minimum measured speedup before the index advisor approves a new index
+INDEX_ADVISOR_MIN_SPEEDUP = float(os.getenv('INDEX_ADVISOR_MIN_SPEEDUP', 1.5))
+
+# Index advisor reports older than this many seconds are not applied; a new
+# analysis is started in the background instead
+INDEX_ADVISOR_MAX_REPORT_AGE = int(os.getenv('INDEX_ADVISOR_MAX_REPORT_AGE', 24 * 3600))
+
+# Online backups (sqlite3 backup API): target directory and number of generations kept
+BACKUP_DIR = os.getenv('BACKUP_DIR', os.path.join(basedir, 'backups'))
+BACKUP_RETAIN_GENERATIONS = int(os.getenv('BACKUP_RETAIN_GENERATIONS', 7))
+
+# Pages copied per backup step and pause between steps (seconds); keeps the copy
+# from starving the app and the collector of I/O
+BACKUP_PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP', 1024))
+BACKUP_STEP_SLEEP = float(os.getenv('BACKUP_STEP_SLEEP', 0.01))
+BACKUP_COMPRESSION_LEVEL = int(os.getenv('BACKUP_COMPRESSION_LEVEL', 3))
+
+# Archive WAL segments between full backups (point-in-time restore, granularity
+# COLLECTOR_INTERVALS['wal_archive']). Backups put the database in WAL mode either way
+BACKUP_WAL_ARCHIVE = os.getenv('BACKUP_WAL_ARCHIVE', '0') == '1'
+
+# Database maintenance (incremental vacuum, ANALYZE / PRAGMA optimize) run by the collector.
+# Free pages are only reclaimed after MAINTENANCE_QUIET_SECONDS without writes, at most
+# MAINTENANCE_PAGES_PER_STEP pages per write transaction and MAINTENANCE_MAX_SECONDS per run
+MAINTENANCE_PAGES_PER_STEP = int(os.getenv('MAINTENANCE_PAGES_PER_STEP', 256))
+MAINTENANCE_MAX_SECONDS = float(os.getenv('MAINTENANCE_MAX_SECONDS', 5))
+MAINTENANCE_QUIET_SECONDS = int(os.getenv('MAINTENANCE_QUIET_SECONDS', 120))
+
+# Rows inserted or moved before statistics are refreshed with ANALYZE
+MAINTENANCE_ANALYZE_THRESHOLD = int(os.getenv('MAINTENANCE_ANALYZE_THRESHOLD', 1000))
+
+# Conditional GET for polled JSON endpoints: ETags derive from per-table data versions.
+# Responses with relative time windows are revalidated at least every ETAG_TIME_BUCKET_SECONDS
+CONDITIONAL_GET = os.getenv('CONDITIONAL_GET', '1') == '1'
+ETAG_TIME_BUCKET_SECONDS = int(os.getenv('ETAG_TIME_BUCKET_SECONDS', 600))
+
+# JSON provider for jsonify ('orjson' or 'default'); orjson writes datetimes as ISO 8601
+JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')
+
+# Negotiated gzip/brotli compression for responses larger than COMPRESSION_MIN_SIZE bytes
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', '1') == '1'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+
+# In-process cache of serialized and compressed payloads keyed by ETag (megabytes)
+RESPONSE_CACHE_MB = int(os.getenv('RESPONSE_CACHE_MB', 32))
+
+# Serve /api/dashboard-data from the RealtimeUpdater snapshot (cache/dashboard_snapshot.json).
+# Snapshots older than DASHBOARD_SNAPSHOT_MAX_AGE seconds fall back to live computation
+DASHBOARD_SNAPSHOT_ENABLED = os.getenv('DASHBOARD_SNAPSHOT_ENABLED', '1') == '1'
+DASHBOARD_SNAPSHOT_MAX_AGE = int(os.getenv('DASHBOARD_SNAPSHOT_MAX_AGE', 900))
+
+# Run the snapshot writer (RealtimeUpdater) in this process and how often it checks data versions
+DASHBOARD_SNAPSHOT_WRITER = os.getenv('DASHBOARD_SNAPSHOT_WRITER', '1') == '1'
+DASHBOARD_SNAPSHOT_POLL_SECONDS = int(os.getenv('DASHBOARD_SNAPSHOT_POLL_SECONDS', 10))
+
+# Server-Sent Events push channel (/api/events). One broadcaster thread per process polls
+# data versions every SSE_POLL_SECONDS and fans events out to per-client bounded queues.
+# Dashboards should connect to the async events deployment (gunicorn_events.conf.py, gevent):
+# there every stream is a greenlet and one broadcaster serves SSE_MAX_CLIENTS (default 1000)
+# viewers. The threaded API deployment still answers /api/events as a fallback, but each
+# stream holds a gthread worker thread, so there the limit defaults to a quarter of
+# GUNICORN_THREADS and is clamped below the thread count so streams never starve API requests
+SSE_ENABLED = os.getenv('SSE_ENABLED', '1') == '1'
+SSE_POLL_SECONDS = float(os.getenv('SSE_POLL_SECONDS', 1))
+SSE_HEARTBEAT_SECONDS = int(os.getenv('SSE_HEARTBEAT_SECONDS', 15))
+SSE_CLIENT_QUEUE_SIZE = int(os.getenv('SSE_CLIENT_QUEUE_SIZE', 200))
+SSE_ASYNC_WORKER = os.getenv('SSE_ASYNC_WORKER', '0') == '1'
+if SSE_ASYNC_WORKER:
+    SSE_MAX_CLIENTS = max(1, int(os.getenv('SSE_MAX_CLIENTS', 1000)))
+else:
+    _WORKER_THREADS = int(os.getenv('GUNICORN_THREADS', 8))
+    SSE_MAX_CLIENTS = max(1, min(int(os.getenv('SSE_MAX_CLIENTS', _WORKER_THREADS // 4)), _WORKER_THREADS // 2))
+
+# Event stream URL used by the dashboard. A value starting with ':' is a port on the host the
+# page was loaded from, e.g. ':5001/api/events' for the events service in docker-compose.yml
+SSE_EVENTS_URL = os.getenv('SSE_EVENTS_URL', '/api/events')
+
+# Token-bucket rate limiting per client (known API key, otherwise IP) and endpoint class.
+# RATE_LIMIT_STORAGE=redis shares buckets across workers; it falls back to in-process buckets
+# when Redis is unreachable. Class budgets/concurrency override utils/rate_limiter.py defaults,
+# e.g. RATE_LIMIT_CLASSES = {'heavy': (5, 5 / 60)} is 5 requests burst, 5 per minute sustained
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', '1') == '1'
+RATE_LIMIT_STORAGE = os.getenv('RATE_LIMIT_STORAGE', 'memory')
+RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/1')
+RATE_LIMIT_API_KEYS = [key for key in os.getenv('RATE_LIMIT_API_KEYS', '').split(',') if key]
+RATE_LIMIT_CLASSES = {}
+RATE_LIMIT_CONCURRENCY = {
+    'heavy': int(os.getenv('RATE_LIMIT_HEAVY_CONCURRENCY', 2)),
+    'export': int(os.getenv('RATE_LIMIT_EXPORT_CONCURRENCY', 2)),
+    'analytics': int(os.getenv('RATE_LIMIT_ANALYTICS_CONCURRENCY', 4)),
+}
+# Seconds a heavy request may wait for a free slot before being shed with 503
+RATE_LIMIT_QUEUE_TIMEOUT = float(os.getenv('RATE_LIMIT_QUEUE_TIMEOUT', 0))
+
+# Lease-based leader election for periodic jobs (RealtimeUpdater, social media scheduler,
+# collector daemon): every process competes for a named lease and only the holder runs the
+# job. The leader renews every lease/3 seconds; if it dies a follower takes over within about
+# one lease period. 'sqlite' keeps leases in cache/leader_leases.db (one host), 'redis' is
+# for processes spread over several hosts
+LEADER_ELECTION_ENABLED = os.getenv('LEADER_ELECTION_ENABLED', '1') == '1'
+LEADER_ELECTION_BACKEND = os.getenv('LEADER_ELECTION_BACKEND', 'sqlite')
+LEADER_LEASE_SECONDS = float(os.getenv('LEADER_LEASE_SECONDS', 30))
+LEADER_REDIS_URL = os.getenv('LEADER_REDIS_URL', 'redis://localhost:6379/2')
+
+# Upper bound on records per /api/ml/predict-*/batch request
+ML_BATCH_MAX_RECORDS = int(os.getenv('ML_BATCH_MAX_RECORDS', 10000))
+
+# Training jobs (/api/ml/train-*) run in a separate process, one at a time across all models;
+# jobs for other models queue behind it. Cores used for fitting and cross-validation
+# (-1 = all but one, larger values are capped the same way) and the process nice value
+ML_TRAINING_N_JOBS = int(os.getenv('ML_TRAINING_N_JOBS', -1))
+ML_TRAINING_NICE = int(os.getenv('ML_TRAINING_NICE', 10))
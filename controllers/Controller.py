@@ -9,8 +9,11 @@ from flask import render_template, jsonify, send_file, make_response, request
 from utils.data_analyzer import DataAnalyzer
 from utils.export_generator import ExportGenerator
 from utils.cache_manager import cache_manager, CacheKeys, cache_result
-from datetime import datetime, timedelta
+from utils.timestamps import window_start
+from utils.data_version import conditional_get
+from datetime import datetime
 import io
+import os
 
 def controller_index():
     """Main dashboard page"""
@@ -20,43 +23,19 @@ def controller_dashboard():
     """Tactical dashboard page"""
     return render_template("dashboard.html")
 
+@conditional_get('posts')
 def controller_dashboard_data():
     """Returns dashboard data as JSON"""
     try:
+        # Precomputed snapshot from RealtimeUpdater (falls back to live compute when missing or stale)
+        from utils.dashboard_snapshot import serve_snapshot
+        snapshot_response = serve_snapshot('dashboard-data')
+        if snapshot_response is not None:
+            return snapshot_response
+        
         # Use simple API
-        from utils.simple_api import get_dashboard_data
-        data = get_dashboard_data()
-        
-        # Additional data for tactical dashboard
-        overview = data['overview']
-        risk_dist = data['risk_distribution']
-        
-        tactical_data = {
-            'overview': overview,
-            'risk_distribution': risk_dist,
-            'critical_threats': risk_dist.get('critical', 0),
-            'high_threats': risk_dist.get('high', 0),
-            'medium_threats': risk_dist.get('medium', 0),
-            'critical_detections': risk_dist.get('critical', 0),
-            'high_detections': risk_dist.get('high', 0),
-            'medium_detections': risk_dist.get('medium', 0),
-            'blocked_ransomware': overview.get('total_attacks', 0) // 3,
-            'blocked_breaches': overview.get('total_attacks', 0) // 2,
-            'blocked_phishing': overview.get('total_attacks', 0) // 4,
-            'total_threats': overview.get('total_attacks', 0),
-            'total_attacks': overview.get('total_attacks', 0),
-            'affected_companies': overview.get('total_companies', 0),
-            'total_countries': overview.get('total_countries', 0),
-            'top_countries': data['top_countries'],
-            'top_threat_actors': data['top_threat_actors'],
-                'geographic': {'top_countries': data['top_countries']},
-                'sector': {'sector_counts': data['real_sectors']},  # Real sectors
-                'attack_trends': {'attack_types': data['activities']},  # Attack types
-                'threat_actors': {'threat_actor_counts': data['top_threat_actors']},
-            'temporal': {},
-            'company_characteristics': {},
-            'time_range': {}
-        }
+        from utils.simple_api import get_tactical_dashboard_data
+        tactical_data = get_tactical_dashboard_data()
         
         return jsonify({
             'success': True,
@@ -106,11 +85,7 @@ def controller_recent_attacks():
         return jsonify({
             'success': True,
             'data': attacks,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total
-            }
+            'pagination': pagination
         })
     except Exception as e:
         return jsonify({
@@ -148,27 +123,65 @@ def controller_filtered_attacks():
             'error': str(e)
         }), 500
 
-def controller_company_detail():
+def controller_company_detail(company_name=None):
     """Şirket detay bilgilerini döndürür"""
     try:
         from flask import request
+        from utils.entity_resolution import get_company_detail, suggest_companies
         
-        company_name = request.args.get('name')
+        company_name = company_name or request.args.get('name') or request.args.get('company_id')
         if not company_name:
             return jsonify({
                 'success': False,
                 'error': 'Şirket adı gerekli'
             }), 400
         
+        # Önce çözümlenmiş şirket kimliği üzerinden indeksli arama
+        company = get_company_detail(company_name)
+        if company:
+            posts = company['posts']
+            first_post = posts[0] if posts else {}
+            return jsonify({
+                'success': True,
+                'data': {
+                    'company_id': company['company_id'],
+                    'name': company['name'],
+                    'domain': company['domain'],
+                    'aliases': company['aliases'],
+                    'sector': 'Unknown',
+                    'country': first_post.get('country') or 'Unknown',
+                    'size': 'Unknown',
+                    'risk_level': first_post.get('activity') or 'Medium',
+                    'description': f"Detailed information about {company['name']} company",
+                    'attacks': [{
+                        'date': (post.get('discovered') or 'Unknown')[:10],
+                        'threat_actor': post.get('name') or 'Unknown',
+                        'impact': post.get('activity') or 'Medium',
+                        'description': post.get('description') or 'No details'
+                    } for post in posts],
+                    'threat_actors': company['threat_actors'],
+                    'first_seen': company['first_seen'],
+                    'last_seen': company['last_seen'],
+                    'risk_factors': [
+                        {'factor': 'Company Size', 'risk': 'Unknown'},
+                        {'factor': 'Sector', 'risk': 'Unknown'},
+                        {'factor': 'Repeat Attacks', 'risk': 'High' if company['post_count'] > 1 else 'Low'}
+                    ],
+                    'similar_companies': []
+                }
+            })
+        
         # Şirket bilgilerini al
         posts = Post.query.filter(
             Post.name == company_name
-        ).order_by(Post.created_at.desc()).all()
+        ).order_by(Post.discovered_ts.desc()).all()
         
         if not posts:
+            # Benzer adlar otomatik seçilmez, istemciye seçenek olarak döner
             return jsonify({
                 'success': False,
-                'error': 'Şirket bulunamadı'
+                'error': 'Şirket bulunamadı',
+                'candidates': suggest_companies(company_name)
             }), 404
         
         # İlk post'tan temel bilgileri al
@@ -178,7 +191,7 @@ def controller_company_detail():
         attacks = []
         for post in posts:
             attacks.append({
-                'date': post.discovered.strftime('%Y-%m-%d') if post.discovered else 'Unknown',
+                'date': (post.discovered or 'Unknown')[:10],
                 'threat_actor': post.name or 'Unknown',
                 'impact': post.activity or 'Medium',
                 'description': post.description or 'No details'
@@ -192,7 +205,7 @@ def controller_company_detail():
                 threat_actors[actor] = {
                     'name': actor,
                     'attacks': 0,
-                    'last_seen': post.discovered.strftime('%Y-%m-%d') if post.discovered else 'Unknown'
+                    'last_seen': (post.discovered or 'Unknown')[:10]
                 }
             threat_actors[actor]['attacks'] += 1
         
@@ -206,14 +219,14 @@ def controller_company_detail():
         # Similar companies (from same sector)
         similar_posts = Post.query.filter(
             Post.name != company_name
-        ).order_by(Post.discovered.desc()).limit(5).all()
+        ).order_by(Post.discovered_ts.desc()).limit(5).all()
         
         similar_companies = []
         for post in similar_posts:
             similar_companies.append({
                 'name': post.name or 'Unknown',
                 'sector': 'Unknown',  # No sector field in current table
-                'last_attack': post.discovered.strftime('%Y-%m-%d') if post.discovered else 'Unknown',
+                'last_attack': (post.discovered or 'Unknown')[:10],
                 'risk': post.activity or 'Medium'
             })
         
@@ -305,7 +318,7 @@ def controller_sector_analysis():
             companies.append({
                 'name': post.name or 'Unknown',
                 'size': 'Unknown',  # Mevcut tabloda company_size yok
-                'last_attack': post.discovered.strftime('%Y-%m-%d') if post.discovered else 'Unknown',
+                'last_attack': (post.discovered or 'Unknown')[:10],
                 'risk': post.activity or 'Medium'
             })
         
@@ -349,7 +362,7 @@ def controller_threat_actor_detail():
         # Tehdit aktörü verilerini al
         posts = Post.query.filter(
             Post.name == threat_actor_name
-        ).all()
+        ).order_by(Post.discovered_ts.desc()).all()
         
         if not posts:
             return jsonify({
@@ -401,7 +414,7 @@ def controller_threat_actor_detail():
                 'company': post.name or 'Unknown',
                 'sector': 'Unknown',  # Mevcut tabloda sector yok
                 'country': post.country or 'Unknown',
-                'date': post.discovered.strftime('%Y-%m-%d') if post.discovered else 'Unknown',
+                'date': (post.discovered or 'Unknown')[:10],
                 'impact': post.activity or 'Medium'
             })
         
@@ -431,6 +444,7 @@ def controller_threat_actor_detail():
             'error': str(e)
         }), 500
 
+@conditional_get('posts')
 def controller_advanced_charts():
     """Gelişmiş grafik verilerini döndürür"""
     try:
@@ -503,6 +517,76 @@ def controller_advanced_charts():
             'error': str(e)
         }), 500
 
+def controller_screenshot(content_hash, tier='thumb'):
+    """İçerik adresli ekran görüntüsünü istenen katmanda döndürür"""
+    from utils.screenshot_store import screenshot_store
+    
+    if tier not in screenshot_store.TIERS or not screenshot_store.is_valid_hash(content_hash):
+        return jsonify({
+            'success': False,
+            'error': 'Geçersiz ekran görüntüsü'
+        }), 400
+    
+    path = screenshot_store.path_for(content_hash, tier)
+    if not os.path.exists(path):
+        return jsonify({
+            'success': False,
+            'error': 'Ekran görüntüsü bulunamadı'
+        }), 404
+    
+    # İçerik hash ile adreslendiği için dosya hiç değişmez
+    response = send_file(path, mimetype='image/webp', conditional=True)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+def controller_cross_group_victims():
+    """Birden fazla grup tarafından yayınlanan kurbanlar"""
+    try:
+        from utils.victim_dedup import get_cross_group_victims
+        limit = request.args.get('limit', 50, type=int)
+        return jsonify({
+            'success': True,
+            'data': get_cross_group_victims(limit=limit)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def controller_victim_domain_posts(domain):
+    """Kayıt edilebilir alan adına göre kurban postları"""
+    try:
+        from utils.simple_api import get_posts_by_domain
+        limit = request.args.get('limit', 100, type=int)
+        include_archive = request.args.get('include_archive', 'false').lower() == 'true'
+        return jsonify({
+            'success': True,
+            'data': get_posts_by_domain(domain, limit, include_archive)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def controller_repeat_victims():
+    """Birden fazla kez saldırıya uğrayan şirketler"""
+    try:
+        from utils.entity_resolution import get_repeat_victims
+        min_attacks = request.args.get('min_attacks', 2, type=int)
+        limit = request.args.get('limit', 50, type=int)
+        return jsonify({
+            'success': True,
+            'data': get_repeat_victims(min_attacks=min_attacks, limit=limit)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@conditional_get('posts')
 def controller_realtime_status():
     """Real-time güncelleme durumunu döndürür"""
     try:
@@ -525,6 +609,45 @@ def controller_realtime_status():
             'error': str(e)
         }), 500
 
+def controller_event_stream():
+    """Server-Sent Events: new-attack, critical-alert and aggregate-delta push events"""
+    from flask import current_app, Response
+    from utils.event_stream import broadcaster, event_stream, DEFAULT_MAX_CLIENTS
+
+    if not current_app.config.get('SSE_ENABLED', True):
+        return jsonify({'success': False, 'error': 'Event stream disabled'}), 404
+
+    broadcaster.poll_interval = current_app.config.get('SSE_POLL_SECONDS', 1)
+    broadcaster.queue_size = current_app.config.get('SSE_CLIENT_QUEUE_SIZE', 200)
+    broadcaster.max_clients = current_app.config.get('SSE_MAX_CLIENTS', DEFAULT_MAX_CLIENTS)
+    client = broadcaster.subscribe(db.engine.url.database)
+    if client is None:
+        response = jsonify({'success': False, 'error': 'Too many event stream clients'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+
+    # EventSource sends Last-Event-ID on reconnect; ?last_event_id= covers manual resumes
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    return Response(
+        event_stream(client, last_event_id, current_app.config.get('SSE_HEARTBEAT_SECONDS', 15)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def controller_event_stream_stats():
+    """Event stream broadcaster statistics"""
+    from utils.event_stream import broadcaster
+    return jsonify({
+        'success': True,
+        'data': broadcaster.get_stats()
+    })
+
 def controller_force_update():
     """Zorla güncelleme yapar"""
     try:
@@ -597,13 +720,13 @@ def controller_tactical_threats():
     """Tactical dashboard için tehdit verilerini döndürür"""
     try:
         days = int(request.args.get('days', 30))
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
+        start_ts = window_start(days=days)
         
-        # Tehdit verilerini al (tarih filtresi kaldırıldı)
+        # Tehdit verilerini al (discovered_ts üzerinden indeks aralık taraması)
         threats = Post.query.filter(
+            Post.discovered_ts >= start_ts,
             Post.name.isnot(None)
-        ).limit(10).all()
+        ).order_by(Post.discovered_ts.desc()).limit(10).all()
         
         threats_data = [{
             'id': threat.id,
@@ -627,11 +750,12 @@ def controller_tactical_attacks():
     """Tactical dashboard için saldırı verilerini döndürür"""
     try:
         days = int(request.args.get('days', 30))
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
+        start_ts = window_start(days=days)
         
-        # Saldırı verilerini al (tarih filtresi kaldırıldı)
-        attacks = Post.query.limit(10).all()
+        # Saldırı verilerini al
+        attacks = Post.query.filter(
+            Post.discovered_ts >= start_ts
+        ).order_by(Post.discovered_ts.desc()).limit(10).all()
         
         attacks_data = [{
             'id': attack.id,
@@ -656,11 +780,12 @@ def controller_tactical_companies():
     """Tactical dashboard için şirket verilerini döndürür"""
     try:
         days = int(request.args.get('days', 30))
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
+        start_ts = window_start(days=days)
         
-        # Şirket verilerini al (tarih filtresi kaldırıldı)
-        companies = Post.query.limit(10).all()
+        # Şirket verilerini al
+        companies = Post.query.filter(
+            Post.discovered_ts >= start_ts
+        ).order_by(Post.discovered_ts.desc()).limit(10).all()
         
         companies_data = [{
             'id': company.id,
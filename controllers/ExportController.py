@@ -4,7 +4,8 @@
 from models.DBModel import *
 from flask import render_template, jsonify, send_file, make_response, request
 from utils.export_generator import ExportGenerator
-from datetime import datetime, timedelta
+from utils.timestamps import window_start
+from datetime import datetime
 from sqlalchemy import text
 import io
 
@@ -24,13 +25,10 @@ def controller_export_attacks():
             filters['impact_level'] = request.args.get('impact_level')
         
         # Verileri al
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
         posts = Post.query.filter(
-            Post.discovered >= start_date.strftime('%Y-%m-%d'),
+            Post.discovered_ts >= window_start(days=days),
             Post.name.isnot(None)
-        ).all()
+        ).order_by(Post.discovered_ts.desc()).all()
         
         if format_type == 'excel':
             # Basit Excel export
@@ -94,7 +92,7 @@ def controller_api_status():
             db_status = "disconnected"
         
         # Son güncelleme
-        last_post = Post.query.order_by(Post.discovered.desc()).first()
+        last_post = Post.query.order_by(Post.discovered_ts.desc()).first()
         last_update = last_post.discovered if last_post else None
         
         # Toplam kayıt sayısı
@@ -129,13 +127,10 @@ def controller_export_companies():
         days = int(request.args.get('days', 30))
         
         # Verileri al
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
         posts = Post.query.filter(
-            Post.discovered >= start_date.strftime('%Y-%m-%d'),
+            Post.discovered_ts >= window_start(days=days),
             Post.name.isnot(None)
-        ).all()
+        ).order_by(Post.discovered_ts.desc()).all()
         
         # Benzersiz şirketleri al
         companies = {}
@@ -198,7 +193,7 @@ def controller_api_health():
         db.session.execute(text('SELECT 1'))
         
         # Son güncelleme zamanını kontrol et
-        last_update = Post.query.order_by(Post.discovered.desc()).first()
+        last_update = Post.query.order_by(Post.discovered_ts.desc()).first()
         
         data = {
             'status': 'healthy',
@@ -229,13 +224,10 @@ def controller_bulk_export():
         days = int(request.args.get('days', 30))
         
         # Verileri al
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
         posts = Post.query.filter(
-            Post.discovered >= start_date.strftime('%Y-%m-%d'),
+            Post.discovered_ts >= window_start(days=days),
             Post.name.isnot(None)
-        ).all()
+        ).order_by(Post.discovered_ts.desc()).all()
         
         if export_type == 'all':
             # Hem saldırıları hem şirketleri export et
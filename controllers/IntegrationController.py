@@ -2,12 +2,15 @@
 # Slack, Email, Teams entegrasyonları için controller
 
 from flask import render_template, jsonify, request
-from utils.integration_manager import integration_manager
-from utils.slack_integration import slack_integration
-from utils.email_integration import email_integration
-from utils.teams_integration import teams_integration
+from utils.lazy_import import lazy_object
 from datetime import datetime, timedelta
 
+# Entegrasyon modülleri (requests, smtplib) ilk entegrasyon isteğinde import edilir
+integration_manager = lazy_object('utils.integration_manager', 'integration_manager')
+slack_integration = lazy_object('utils.slack_integration', 'slack_integration')
+email_integration = lazy_object('utils.email_integration', 'email_integration')
+teams_integration = lazy_object('utils.teams_integration', 'teams_integration')
+
 def controller_test_integrations():
     """Tüm entegrasyonları test et"""
     try:
@@ -3,10 +3,13 @@
 
 from flask import render_template, jsonify, request
 from utils.monitoring_system import monitoring_system
-from utils.advanced_analytics import advanced_analytics
-from utils.ml_models import ml_models
+from utils.lazy_import import lazy_object
 from datetime import datetime, timedelta
 
+# scikit-learn / pandas ilk analitik veya ML isteğinde import edilir
+advanced_analytics = lazy_object('utils.advanced_analytics', 'advanced_analytics')
+ml_models = lazy_object('utils.ml_models', 'ml_models')
+
 def controller_monitoring_dashboard():
     """Monitoring dashboard sayfası"""
     return render_template('monitoring_dashboard.html')
@@ -53,6 +56,104 @@ def controller_system_health():
             'error': str(e)
         }), 500
 
+def controller_collector_status():
+    """Veri toplayıcı daemon metriklerini al"""
+    try:
+        from background_jobs.collector_daemon import read_collector_metrics
+        metrics = read_collector_metrics()
+        if metrics is None:
+            return jsonify({
+                'success': False,
+                'error': 'Collector daemon metrics not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': metrics
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def controller_leader_status():
+    """Periyodik işlerin lider lease'leri ve bu sürecin seçim durumu"""
+    try:
+        from flask import current_app
+        backend = current_app.config.get('LEADER_ELECTION_BACKEND', 'sqlite')
+        leases = []
+        if backend == 'sqlite':
+            from utils.leader_election import SQLiteLeaseBackend
+            leases = SQLiteLeaseBackend().list()
+        elector = getattr(current_app, 'leader_elector', None)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'enabled': current_app.config.get('LEADER_ELECTION_ENABLED', False),
+                'backend': backend,
+                'leases': leases,
+                'this_process': elector.get_status() if elector else None
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def controller_leak_site_changes():
+    """Son tespit edilen sızıntı sayfası değişikliklerini al"""
+    try:
+        from utils.leak_site_monitor import get_recent_changes
+        limit = request.args.get('limit', 50, type=int)
+        changes = get_recent_changes(limit=limit)
+        
+        return jsonify({
+            'success': True,
+            'data': changes
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def controller_group_availability():
+    """Grupların sızıntı sitesi erişilebilirlik özetini al"""
+    try:
+        from utils.onion_prober import get_availability_summary
+        hours = request.args.get('hours', 24, type=int)
+        summary = get_availability_summary(hours=hours)
+        
+        return jsonify({
+            'success': True,
+            'data': summary
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def controller_group_availability_history(group_name):
+    """Bir grubun erişilebilirlik ve gecikme geçmişini al"""
+    try:
+        from utils.onion_prober import get_availability_history
+        days = request.args.get('days', 7, type=int)
+        history = get_availability_history(group_name, days=days)
+        
+        return jsonify({
+            'success': True,
+            'data': history
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 def controller_clear_metrics():
     """Metrikleri temizle"""
     try:
@@ -131,31 +232,56 @@ def controller_generate_insights():
             'error': str(e)
         }), 500
 
-def controller_train_risk_classifier():
-    """Risk sınıflandırıcısı eğit"""
+def _submit_training_job(model):
+    """Eğitimi arka plan sürecine gönderir; aynı model için aktif iş varsa ona bağlanır"""
     try:
+        from flask import current_app
+        from utils.training_jobs import training_jobs
         days = int(request.args.get('days', 90))
-        result = ml_models.train_risk_classifier(days)
+        job, coalesced = training_jobs.submit(model, days, n_jobs=current_app.config.get('ML_TRAINING_N_JOBS', -1),
+                                              nice=current_app.config.get('ML_TRAINING_NICE', 10))
         
         return jsonify({
             'success': True,
-            'data': result
-        })
+            'data': {
+                'job_id': job['id'],
+                'coalesced': coalesced,
+                'status_url': f"/api/ml/jobs/{job['id']}",
+                'job': job
+            }
+        }), 202
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def controller_train_risk_classifier():
+    """Risk sınıflandırıcısı eğitim işi gönder"""
+    return _submit_training_job('risk_classifier')
+
 def controller_train_threat_classifier():
-    """Tehdit sınıflandırıcısı eğit"""
+    """Tehdit sınıflandırıcısı eğitim işi gönder"""
+    return _submit_training_job('threat_classifier')
+
+def controller_train_sector_classifier():
+    """Sektör sınıflandırıcısı eğitim işi gönder"""
+    return _submit_training_job('sector_classifier')
+
+def controller_training_job_status(job_id):
+    """Eğitim işinin durumu, aşaması, ilerlemesi ve metrikleri"""
     try:
-        days = int(request.args.get('days', 90))
-        result = ml_models.train_threat_classifier(days)
+        from utils.training_jobs import training_jobs
+        job = training_jobs.get(job_id)
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': 'Training job not found'
+            }), 404
         
         return jsonify({
             'success': True,
-            'data': result
+            'data': job
         })
     except Exception as e:
         return jsonify({
@@ -163,15 +289,15 @@ def controller_train_threat_classifier():
             'error': str(e)
         }), 500
 
-def controller_train_sector_classifier():
-    """Sektör sınıflandırıcısı eğit"""
+def controller_training_jobs():
+    """Son eğitim işleri"""
     try:
-        days = int(request.args.get('days', 90))
-        result = ml_models.train_sector_classifier(days)
+        from utils.training_jobs import training_jobs
+        jobs = training_jobs.list(model=request.args.get('model'), limit=request.args.get('limit', 20, type=int))
         
         return jsonify({
             'success': True,
-            'data': result
+            'data': jobs
         })
     except Exception as e:
         return jsonify({
@@ -241,6 +367,80 @@ def controller_predict_threat_actor():
             'error': str(e)
         }), 500
 
+def _batch_request():
+    """Toplu tahmin gövdesini doğrular: (records, include_probabilities, hata yanıtı)"""
+    from flask import current_app
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None, False, (jsonify({'success': False, 'error': 'JSON verisi gerekli'}), 400)
+    records = data.get('records', [])
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        return None, False, (jsonify({'success': False, 'error': 'records bir nesne listesi olmalı'}), 400)
+    max_records = current_app.config.get('ML_BATCH_MAX_RECORDS', 10000)
+    if len(records) > max_records:
+        return None, False, (jsonify({
+            'success': False,
+            'error': f'En fazla {max_records} kayıt gönderilebilir'
+        }), 413)
+    return records, bool(data.get('include_probabilities', False)), None
+
+def controller_predict_risk_batch():
+    """Toplu risk seviyesi tahmini (opsiyonel: yeni ingest edilen postlar da aynı çağrıda)"""
+    try:
+        records, include_probabilities, error = _batch_request()
+        if error:
+            return error
+        
+        data = request.get_json()
+        new_posts = None
+        if data.get('score_new_posts'):
+            new_posts = {
+                'since_id': data.get('since_id'),
+                'days': data.get('days', 1),
+                'limit': data.get('limit')
+            }
+        
+        prediction = ml_models.predict_risk_batch(records, include_probabilities, new_posts=new_posts)
+        if 'error' in prediction:
+            return jsonify({
+                'success': False,
+                'error': prediction['error']
+            }), 500
+        
+        return jsonify({
+            'success': True,
+            'data': prediction
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def controller_predict_threat_batch():
+    """Toplu tehdit aktörü tahmini"""
+    try:
+        records, include_probabilities, error = _batch_request()
+        if error:
+            return error
+        
+        prediction = ml_models.predict_threat_batch(records, include_probabilities)
+        if 'error' in prediction:
+            return jsonify({
+                'success': False,
+                'error': prediction['error']
+            }), 500
+        
+        return jsonify({
+            'success': True,
+            'data': prediction
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 def controller_cluster_attacks():
     """Saldırıları kümele"""
     try:
@@ -68,11 +68,49 @@ def controller_database_stats():
             'error': str(e)
         }), 500
 
+def controller_partition_stats():
+    """Sıcak/arşiv post bölümlerinin istatistiklerini döndür"""
+    try:
+        from flask import current_app
+        from utils.post_archive import get_partition_stats
+        stats = get_partition_stats(horizon_days=current_app.config.get('ARCHIVE_HORIZON_DAYS', 365))
+        
+        return jsonify({
+            'success': True,
+            'data': stats
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _advisor_settings():
+    from flask import current_app
+    return {
+        'min_speedup': current_app.config.get('INDEX_ADVISOR_MIN_SPEEDUP'),
+        'max_age': current_app.config.get('INDEX_ADVISOR_MAX_REPORT_AGE')
+    }
+
+def _advisor_pending(index_result):
+    """Rapor uygulanamadıysa analiz arka planda başlar; istemci rapor hazır olunca tekrar dener"""
+    return jsonify({
+        'success': True,
+        'data': {
+            'indexes': index_result,
+            'status_url': '/api/performance/index-advisor'
+        },
+        'message': f"İndeks değişiklikleri uygulanmadı: {index_result['refused']}. Analiz bitince tekrar çalıştırın"
+    }), 202
+
 def controller_optimize_database():
     """Database optimizasyonu yap"""
     try:
-        # İndeksleri oluştur
-        index_result = db_optimizer.create_indexes()
+        # İndeks değişiklikleri sadece danışmanın güncel raporundan uygulanır; sabit liste
+        # danışmanın kaldırdığı indeksleri yeniden oluşturmaz
+        index_result = db_optimizer.apply_advisor_recommendations(**_advisor_settings())
+        if index_result.get('refused'):
+            return _advisor_pending(index_result)
         
         # Database'i temizle
         vacuum_result = db_optimizer.vacuum_database()
@@ -83,7 +121,7 @@ def controller_optimize_database():
         return jsonify({
             'success': True,
             'data': {
-                'indexes_created': index_result,
+                'indexes': index_result,
                 'database_vacuumed': vacuum_result,
                 'performance_tests': performance_tests
             },
@@ -151,13 +189,102 @@ def controller_query_analyzer():
             'error': str(e)
         }), 500
 
+def controller_query_stats():
+    """Parmak izi bazında SQL istatistikleri ve en yavaş ifadeler"""
+    try:
+        from utils.sql_instrumentation import get_query_report
+        limit = request.args.get('limit', 20, type=int)
+        order = request.args.get('order', 'total')
+        
+        return jsonify({
+            'success': True,
+            'data': get_query_report(limit=limit, order=order)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def controller_maintenance_stats():
+    """Boş sayfa / parçalanma istatistikleri ve son bakım turunun sonucu"""
+    try:
+        detailed = request.args.get('detailed', 'false').lower() == 'true'
+        
+        return jsonify({
+            'success': True,
+            'data': db_optimizer.get_maintenance_stats(detailed=detailed)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def controller_rate_limit_stats():
+    """Endpoint sınıfı bütçeleri ve izin verilen / 429 / 503 sayaçları"""
+    try:
+        from utils.rate_limiter import limiter
+        
+        return jsonify({
+            'success': True,
+            'data': limiter.get_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def controller_index_advisor():
+    """
+    İş yükü tabanlı indeks önerilerini döndür. Rapor yoksa veya refresh=true ise analiz arka
+    planda başlatılır ve 202 döner; aynı endpoint analiz durumunu ve bitince raporu verir.
+    """
+    try:
+        from utils.index_advisor import analysis_status
+        settings = _advisor_settings()
+        advisor = db_optimizer.get_index_advisor(settings['min_speedup'])
+        report = advisor.load_report()
+        analysis = analysis_status()
+        
+        if report is None or request.args.get('refresh', 'false').lower() == 'true':
+            analysis, started = db_optimizer.start_index_advisor(settings['min_speedup'])
+            return jsonify({
+                'success': True,
+                'data': {
+                    'analysis': analysis,
+                    'started': started,
+                    'status_url': '/api/performance/index-advisor'
+                }
+            }), 202
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                **report,
+                'analysis': analysis,
+                'stale_reason': advisor.report_problem(report, settings['max_age'])
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 def controller_auto_optimize():
     """Otomatik optimizasyon yap"""
     try:
         results = {}
         
-        # 1. Database indekslerini oluştur
-        results['indexes'] = db_optimizer.create_indexes()
+        # 1. Sadece indeks danışmanının güncel raporunda onaylanan indeks değişikliklerini uygula
+        results['indexes'] = db_optimizer.apply_advisor_recommendations(
+            refresh=request.args.get('refresh', 'false').lower() == 'true',
+            **_advisor_settings()
+        )
+        if results['indexes'].get('refused'):
+            return _advisor_pending(results['indexes'])
         
         # 2. Database'i temizle
         results['vacuum'] = db_optimizer.vacuum_database()
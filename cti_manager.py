@@ -27,8 +27,7 @@ import time
 import sqlite3
 import json
 import psutil
-import requests
-from datetime import datetime, timedelta
+from datetime import timedelta
 from pathlib import Path
 
 # Renkli çıktı için
@@ -466,6 +465,8 @@ class CTIManager:
         print(f"\n{Colors.YELLOW}🧪 API Testleri Başlatılıyor...{Colors.END}")
         
         try:
+            import requests
+            
             # Health check
             print(f"{Colors.BLUE}🔍 Health Check:{Colors.END}")
             response = requests.get('http://localhost:5000/api/health', timeout=5)
@@ -542,13 +543,24 @@ class CTIManager:
             return
         
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = self.project_root / f"backup_data_{timestamp}.db"
+            # Çalışan sistemi durdurmadan tutarlı, sıkıştırılmış yedek (backup API)
+            sys.path.insert(0, str(self.project_root))
+            import config
+            from utils.backup_manager import BackupManager
             
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
+            manager = BackupManager(str(self.db_path), config.BACKUP_DIR,
+                                    retain_generations=config.BACKUP_RETAIN_GENERATIONS,
+                                    pages_per_step=config.BACKUP_PAGES_PER_STEP,
+                                    step_sleep=config.BACKUP_STEP_SLEEP,
+                                    compression_level=config.BACKUP_COMPRESSION_LEVEL,
+                                    wal_archive=config.BACKUP_WAL_ARCHIVE)
+            try:
+                manifest = manager.create_backup()
+            finally:
+                manager.close()
             
-            print(f"{Colors.GREEN}✅ Veritabanı yedeklendi: {backup_path.name}{Colors.END}")
+            size_mb = sum(f['compressed_bytes'] for f in manifest['files']) / (1024 * 1024)
+            print(f"{Colors.GREEN}✅ Veritabanı yedeklendi: {manifest['generation']} ({size_mb:.1f} MB, {manifest['duration_seconds']} sn){Colors.END}")
         except Exception as e:
             print(f"{Colors.RED}❌ Yedekleme hatası: {e}{Colors.END}")
     
@@ -0,0 +1,69 @@
+"""
+CTI-BOT gunicorn configuration
+gunicorn -c gunicorn.conf.py wsgi:app
+
+Reload:
+  kill -HUP <master>   restart workers gracefully with the reloaded config
+                       (application code is preloaded, so code changes need USR2)
+  kill -USR2 <master>  start a new master with fresh code next to the old one, then
+                       kill -WINCH / -QUIT the old master once the new workers are up
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+
+# One process per core plus one; the default matches the collector and SQLite writer
+# running on the same host rather than the classic 2n+1
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() + 1))
+
+# Threaded workers: most request time is spent in SQLite with the GIL released.
+# Every open SSE stream (/api/events) pins one of these threads for as long as the browser
+# stays connected, so SSE_MAX_CLIENTS (config.py) caps streams per worker at a quarter of
+# `threads`. Dashboards are pointed at the async events deployment instead
+# (gunicorn_events.conf.py, SSE_EVENTS_URL); this is only the fallback
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+# Import the application (pandas, scikit-learn, routes) once in the master
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Recycle workers periodically; jitter keeps them from restarting at the same moment
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 500))
+
+# Worker heartbeat files on tmpfs (a disk-backed /tmp can stall heartbeats in containers)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    import wsgi
+    wsgi.preload()
+
+
+def post_fork(server, worker):
+    import wsgi
+    wsgi.reset_after_fork()
+
+
+def post_worker_init(worker):
+    # Runs before the worker's accept loop starts, so warmup traffic never races real requests
+    import wsgi
+    results, seconds = wsgi.warmup()
+    worker.log.info("Worker %s warmed up in %.2fs: %s", worker.pid, seconds, results)
+    if wsgi.start_background_services():
+        worker.log.info("Worker %s was elected to run the background services", worker.pid)
+
+
+def worker_exit(server, worker):
+    import wsgi
+    wsgi.stop_background_services()
@@ -0,0 +1,38 @@
+"""
+CTI-BOT event stream server (Server-Sent Events, /api/events)
+gunicorn -c gunicorn_events.conf.py wsgi:app
+
+Runs next to the API deployment (gunicorn.conf.py). gevent workers keep every open stream
+as a greenlet instead of a thread, so one worker and its single broadcaster serve hundreds
+of dashboard viewers. Point the dashboard here with SSE_EVENTS_URL (config.py).
+"""
+
+import os
+
+# The app reads this in config.py: stream limit is no longer tied to a thread count
+os.environ.setdefault('SSE_ASYNC_WORKER', '1')
+
+bind = os.getenv('GUNICORN_EVENTS_BIND', f"0.0.0.0:{os.getenv('EVENTS_PORT', 5001)}")
+
+# One broadcaster per process polls the data versions; more workers only multiply polling
+workers = int(os.getenv('EVENTS_WORKERS', 1))
+worker_class = 'gevent'
+# Streams plus headroom for /api/events/stats and health checks
+worker_connections = int(os.getenv('SSE_MAX_CLIENTS', 1000)) + 100
+
+# The app is imported after gevent has patched the worker (no preload): threading, time.sleep
+# and sockets used by the broadcaster and client queues must be the cooperative versions
+preload_app = False
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Streams are long-lived; keep-alive on the remaining short requests
+keepalive = 5
+
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# No background service hooks: the RealtimeUpdater leader election runs in the API deployment
@@ -27,6 +27,9 @@ class Post(db.Model):
     website = db.Column(db.String)
     duplicates = db.Column(db.Text)
     screenshot = db.Column(db.Text)
+    # Metin tarihlerin epoch karşılıkları (utils/timestamps.py, utils/database_migration.py)
+    discovered_ts = db.Column(db.Integer)
+    published_ts = db.Column(db.Integer)
 
 class Wallet(db.Model):
     __tablename__ = 'wallets'
@@ -1,7 +1,7 @@
 # URL bilgilerinin bulunduğu alan
 # Buradan çeşitli adreslere routing işlemi yapabilirsiniz
 
-from flask import Blueprint
+from flask import Blueprint, current_app
 from controllers.Controller import *
 from controllers.ExportController import *
 from controllers.PerformanceController import *
@@ -22,12 +22,19 @@ pclist.route('/api/filtered-attacks', methods=['GET'])(controller_filtered_attac
 pclist.route('/api/company-detail/<company_name>', methods=['GET'])(controller_company_detail)
 pclist.route('/api/sector-analysis/<sector_name>', methods=['GET'])(controller_sector_analysis)
 pclist.route('/api/threat-actor-detail/<threat_actor_name>', methods=['GET'])(controller_threat_actor_detail)
+pclist.route('/api/victims/cross-group', methods=['GET'])(controller_cross_group_victims)
+pclist.route('/api/victims/domain/<domain>', methods=['GET'])(controller_victim_domain_posts)
+pclist.route('/api/companies/repeat-victims', methods=['GET'])(controller_repeat_victims)
 
 # Hafta 5 - Otomasyon ve İleri Görselleştirmeler
 pclist.route('/api/advanced-charts', methods=['GET'])(controller_advanced_charts)
 pclist.route('/api/realtime-status', methods=['GET'])(controller_realtime_status)
+pclist.route('/api/events', methods=['GET'])(controller_event_stream)
+pclist.route('/api/events/stats', methods=['GET'])(controller_event_stream_stats)
 pclist.route('/api/force-update', methods=['POST'])(controller_force_update)
 pclist.route('/api/generate-report', methods=['POST'])(controller_report_generate)
+pclist.route('/screenshots/<content_hash>', methods=['GET'])(controller_screenshot)
+pclist.route('/screenshots/<content_hash>/<tier>', methods=['GET'])(controller_screenshot)
 
 # Sayfa routes
 from flask import render_template
@@ -45,7 +52,7 @@ def page_threat_actor_detail():
     return render_template('threat_actor_detail.html')
 
 def page_realtime():
-    return render_template('realtime_dashboard.html')
+    return render_template('realtime_dashboard.html', events_url=current_app.config.get('SSE_EVENTS_URL', '/api/events'))
 
 def page_analytics():
     return render_template('analytics.html')
@@ -72,10 +79,15 @@ pclist.route('/api/status', methods=['GET'])(controller_api_status)
 pclist.route('/api/cache/stats', methods=['GET'])(controller_cache_stats)
 pclist.route('/api/cache/clear', methods=['POST'])(controller_clear_cache)
 pclist.route('/api/database/stats', methods=['GET'])(controller_database_stats)
+pclist.route('/api/database/partitions', methods=['GET'])(controller_partition_stats)
 pclist.route('/api/database/optimize', methods=['POST'])(controller_optimize_database)
 pclist.route('/api/performance/monitor', methods=['GET'])(controller_performance_monitor)
 pclist.route('/api/performance/analyze', methods=['GET'])(controller_query_analyzer)
 pclist.route('/api/performance/auto-optimize', methods=['POST'])(controller_auto_optimize)
+pclist.route('/api/performance/index-advisor', methods=['GET'])(controller_index_advisor)
+pclist.route('/api/performance/queries', methods=['GET'])(controller_query_stats)
+pclist.route('/api/performance/maintenance', methods=['GET'])(controller_maintenance_stats)
+pclist.route('/api/performance/rate-limits', methods=['GET'])(controller_rate_limit_stats)
 
 # Hafta 6 - Integration Management Routes
 pclist.route('/api/integrations/test', methods=['GET'])(controller_test_integrations)
@@ -96,6 +108,11 @@ pclist.route('/api/monitoring/performance', methods=['GET'])(controller_performa
 pclist.route('/api/monitoring/errors', methods=['GET'])(controller_error_summary)
 pclist.route('/api/monitoring/health', methods=['GET'])(controller_system_health)
 pclist.route('/api/monitoring/clear-metrics', methods=['POST'])(controller_clear_metrics)
+pclist.route('/api/monitoring/collector', methods=['GET'])(controller_collector_status)
+pclist.route('/api/monitoring/leaders', methods=['GET'])(controller_leader_status)
+pclist.route('/api/monitoring/leak-changes', methods=['GET'])(controller_leak_site_changes)
+pclist.route('/api/monitoring/availability', methods=['GET'])(controller_group_availability)
+pclist.route('/api/monitoring/availability/<group_name>', methods=['GET'])(controller_group_availability_history)
 pclist.route('/api/analytics/patterns', methods=['GET'])(controller_attack_patterns)
 pclist.route('/api/analytics/anomalies', methods=['GET'])(controller_detect_anomalies)
 pclist.route('/api/analytics/predictions', methods=['GET'])(controller_generate_predictions)
@@ -103,8 +120,12 @@ pclist.route('/api/analytics/insights', methods=['GET'])(controller_generate_ins
 pclist.route('/api/ml/train-risk', methods=['POST'])(controller_train_risk_classifier)
 pclist.route('/api/ml/train-threat', methods=['POST'])(controller_train_threat_classifier)
 pclist.route('/api/ml/train-sector', methods=['POST'])(controller_train_sector_classifier)
+pclist.route('/api/ml/jobs', methods=['GET'])(controller_training_jobs)
+pclist.route('/api/ml/jobs/<job_id>', methods=['GET'])(controller_training_job_status)
 pclist.route('/api/ml/predict-risk', methods=['POST'])(controller_predict_risk_level)
 pclist.route('/api/ml/predict-threat', methods=['POST'])(controller_predict_threat_actor)
+pclist.route('/api/ml/predict-risk/batch', methods=['POST'])(controller_predict_risk_batch)
+pclist.route('/api/ml/predict-threat/batch', methods=['POST'])(controller_predict_threat_batch)
 pclist.route('/api/ml/cluster-attacks', methods=['GET'])(controller_cluster_attacks)
 pclist.route('/api/ml/model-status', methods=['GET'])(controller_model_status)
 pclist.route('/api/ml/predictions', methods=['GET'])(controller_ml_predictions)
@@ -0,0 +1,156 @@
+# Onion erişilebilirlik yoklayıcısı, yerel sahte bir SOCKS5 proxy'ye karşı çalıştırılır.
+# Proxy hedefe bağlanmaz; istenen host adına göre kendisi yanıt verir:
+#   up.onion      -> 200        error.onion -> 503
+#   slow.onion    -> yanıt yok  (zaman aşımı)
+#   unreach.onion -> SOCKS hata kodu 4 (host erişilemez)
+# 443 portuna gelen bağlantılarda TLS'i proxy sonlandırır (self-signed sertifika).
+#
+#   python -m pytest tests/test_onion_prober.py
+
+import asyncio
+import os
+import shutil
+import sqlite3
+import ssl
+import struct
+import subprocess
+import sys
+import time
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.onion_prober import OnionProber, probe_url
+from utils.proxy_pool import ProxyPool
+
+
+class StandInSocksProxy:
+    def __init__(self, tls_context=None):
+        self.tls_context = tls_context
+        self.server = None
+        self.url = None
+        self.max_open = 0
+        self._open = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        self.url = f"socks5://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self._open += 1
+        self.max_open = max(self.max_open, self._open)
+        try:
+            await reader.readexactly(3)
+            writer.write(b'\x05\x00')
+            header = await reader.readexactly(5)
+            host = (await reader.readexactly(header[4])).decode()
+            port = struct.unpack('>H', await reader.readexactly(2))[0]
+            if host.startswith('unreach.'):
+                writer.write(b'\x05\x04\x00\x01' + bytes(6))
+                return
+            writer.write(b'\x05\x00\x00\x01' + bytes(6))
+            await writer.drain()
+            if port == 443:
+                await writer.start_tls(self.tls_context)
+            await reader.readuntil(b'\r\n\r\n')
+            if host.startswith('slow.'):
+                await asyncio.sleep(60)
+                return
+            status = '503 Service Unavailable' if host.startswith('error.') else '200 OK'
+            writer.write(f"HTTP/1.0 {status}\r\nContent-Length: 0\r\n\r\n".encode())
+            await writer.drain()
+        except (OSError, asyncio.IncompleteReadError, ssl.SSLError):
+            pass
+        finally:
+            self._open -= 1
+            writer.close()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture(scope='module')
+def tls_context(tmp_path_factory):
+    if shutil.which('openssl') is None:
+        pytest.skip('openssl bulunamadı')
+    directory = tmp_path_factory.mktemp('tls')
+    cert, key = directory / 'cert.pem', directory / 'key.pem'
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=stand-in.onion', '-keyout', str(key), '-out', str(cert)],
+                   check=True, capture_output=True)
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def probe(url, timeout=2, tls_context=None):
+    async def _probe():
+        proxy = await StandInSocksProxy(tls_context).start()
+        try:
+            return await probe_url(url, proxy.url, timeout)
+        finally:
+            await proxy.stop()
+    return run(_probe())
+
+
+def test_probe_http_statuses():
+    assert probe('http://up.onion/')['up'] is True
+    assert probe('http://up.onion/')['http_status'] == 200
+    error = probe('http://error.onion/')
+    assert error['up'] is False and error['http_status'] == 503
+    unreachable = probe('http://unreach.onion/')
+    assert unreachable['up'] is False and not unreachable['proxy_error']
+
+
+def test_probe_timeout():
+    result = probe('http://slow.onion/', timeout=0.3)
+    assert result == {'up': False, 'latency_ms': None, 'http_status': None, 'error': 'Zaman aşımı',
+                      'proxy_error': False}
+
+
+def test_probe_https_over_socks(tls_context):
+    result = probe('https://up.onion/', tls_context=tls_context)
+    assert result['up'] is True and result['http_status'] == 200
+
+
+def test_probe_proxy_down():
+    result = run(probe_url('http://up.onion/', 'socks5://127.0.0.1:1', 1))
+    assert result['up'] is False and result['proxy_error'] is True
+
+
+def test_sweep_finishes_in_one_timeout_window(tmp_path):
+    timeout = 0.5
+    targets = {f'dead{i}': f'http://slow.dead{i}.onion/' for i in range(40)}
+    targets.update({'alive': 'http://up.onion/', 'broken': 'http://error.onion/'})
+
+    async def _sweep():
+        proxy = await StandInSocksProxy().start()
+        try:
+            prober = OnionProber(db_path=str(tmp_path / 'data.db'), timeout=timeout,
+                                 proxy_pool=ProxyPool([proxy.url], max_concurrency=1))
+            started = time.monotonic()
+            results = await prober.probe_all(targets)
+            return prober, results, time.monotonic() - started, proxy.max_open
+        finally:
+            await proxy.stop()
+
+    prober, results, elapsed, max_open = run(_sweep())
+    assert elapsed < 2 * timeout
+    assert max_open == len(targets)
+    assert results['alive']['up'] and not results['broken']['up'] and not results['dead0']['up']
+
+    conn = prober._connect()
+    try:
+        prober.record(conn, results, ts=1000)
+        rows = dict(conn.execute("SELECT group_name, up FROM group_availability WHERE ts = 1000"))
+    finally:
+        conn.close()
+    assert len(rows) == len(targets) and rows['alive'] == 1 and rows['dead0'] == 0
@@ -0,0 +1,45 @@
+# Açılış bütçesi: app ve wsgi soğuk import'u utils/startup_profile.py ile ölçülür.
+# Bütçe STARTUP_BUDGET_SECONDS ile değiştirilebilir (yavaş CI makineleri için).
+#
+#   python -m pytest tests/test_startup_budget.py
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.startup_profile import DEFAULT_BUDGET, check_budget, parse_importtime
+
+BUDGET = float(os.getenv('STARTUP_BUDGET_SECONDS', DEFAULT_BUDGET))
+
+
+def test_parse_importtime():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |   encodings.aliases",
+        "import time:      3000 |       5000 | pandas",
+        "import time:       ignored line",
+    ])
+    assert parse_importtime(stderr) == [('encodings.aliases', 120, 120, 1), ('pandas', 3000, 5000, 0)]
+
+
+def test_check_budget_reports_deferred_packages():
+    report = {'target': 'app', 'returncode': 0, 'error': None, 'wall_seconds': 0.5,
+              'deferred_packages_loaded': ['pandas']}
+    failures = check_budget(report, budget=1.0)
+    assert len(failures) == 1 and 'pandas' in failures[0]
+
+
+@pytest.mark.parametrize('target', ['app', 'wsgi'])
+def test_cold_start_within_budget(target):
+    # CLI ile aynı yol: ilk çalıştırma .pyc üretir, ikincisi ölçülür
+    result = subprocess.run(
+        [sys.executable, os.path.join(PROJECT_ROOT, 'utils', 'startup_profile.py'),
+         '--target', target, '--budget', str(BUDGET)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
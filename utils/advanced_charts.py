@@ -1,24 +1,30 @@
-from datetime import datetime, timedelta
-from models.DBModel import db, Post
-from sqlalchemy import func
+from datetime import datetime, timedelta, timezone
+from models.DBModel import db
+from sqlalchemy import text
+from utils.timestamps import window_start
 import json
 
+WEEK = 7 * 86400
+
 class AdvancedCharts:
     def __init__(self):
         pass
     
+    def _query(self, sql, **params):
+        """
+        Ham SQL çalıştırır. Zaman pencereleri discovered_ts epoch sütunu üzerinden
+        filtrelenir; sektör/etki seviyesi gibi migrasyon sütunları ORM eşlemesinde yoktur.
+        """
+        return db.session.execute(text(sql), params).all()
+    
     def generate_heatmap_data(self, days=30):
         """Coğrafi heatmap verisi oluşturur"""
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
         # Ülke bazında saldırı sayıları
-        country_attacks = db.session.query(
-            Post.country, func.count(Post.id)
-        ).filter(
-            Post.discovered >= start_date.strftime('%Y-%m-%d').strftime('%Y-%m-%d'),
-            Post.country.isnot(None)
-        ).group_by(Post.country).all()
+        country_attacks = self._query("""
+            SELECT country, COUNT(*) FROM posts
+            WHERE discovered_ts >= :start_ts AND country IS NOT NULL
+            GROUP BY country
+        """, start_ts=window_start(days=days))
         
         # Ülke koordinatları (örnek veri)
         country_coordinates = {
@@ -64,15 +70,12 @@ class AdvancedCharts:
     
     def generate_timeline_heatmap(self, days=90):
         """Zaman çizelgesi heatmap verisi oluşturur"""
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
         # Günlük saldırı sayıları
-        daily_attacks = db.session.query(
-            func.strftime('%Y-%m-%d', Post.discovered), func.count(Post.id)
-        ).filter(
-            Post.discovered >= start_date.strftime('%Y-%m-%d')
-        ).group_by(func.strftime('%Y-%m-%d', Post.discovered)).all()
+        daily_attacks = self._query("""
+            SELECT strftime('%Y-%m-%d', discovered_ts, 'unixepoch') AS day, COUNT(*) FROM posts
+            WHERE discovered_ts >= :start_ts
+            GROUP BY day
+        """, start_ts=window_start(days=days))
         
         # Haftalık dağılım
         weekly_data = {}
@@ -109,30 +112,26 @@ class AdvancedCharts:
     
     def generate_sector_radar_chart(self, days=30):
         """Sektörel radar grafik verisi oluşturur"""
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
+        start_ts = window_start(days=days)
         
         # Sektör bazında saldırı sayıları
-        sector_attacks = db.session.query(
-            Post.sector, func.count(Post.id)
-        ).filter(
-            Post.discovered >= start_date.strftime('%Y-%m-%d'),
-            Post.sector.isnot(None)
-        ).group_by(Post.sector).all()
-        
-        # Risk seviyesi bazında dağılım
+        sector_attacks = self._query("""
+            SELECT sector, COUNT(*) FROM posts
+            WHERE discovered_ts >= :start_ts AND sector IS NOT NULL
+            GROUP BY sector
+        """, start_ts=start_ts)
+        
+        # Risk seviyesi bazında dağılım (tek sorguda)
         risk_levels = ['Düşük', 'Orta', 'Yüksek', 'Kritik']
-        sector_risk_data = {}
-        
-        for sector, _ in sector_attacks:
-            sector_risk_data[sector] = {}
-            for risk in risk_levels:
-                count = db.session.query(func.count(Post.id)).filter(
-                    Post.discovered >= start_date,
-                    Post.sector == sector,
-                    Post.impact_level == risk
-                ).scalar()
-                sector_risk_data[sector][risk] = count or 0
+        sector_risk_data = {sector: {risk: 0 for risk in risk_levels} for sector, _ in sector_attacks}
+        
+        for sector, risk, count in self._query("""
+            SELECT sector, impact_level, COUNT(*) FROM posts
+            WHERE discovered_ts >= :start_ts AND sector IS NOT NULL
+            GROUP BY sector, impact_level
+        """, start_ts=start_ts):
+            if risk in risk_levels:
+                sector_risk_data[sector][risk] = count
         
         # Radar chart verisi
         radar_data = []
@@ -153,26 +152,33 @@ class AdvancedCharts:
     
     def generate_threat_actor_network(self, days=30):
         """Tehdit aktörü ağ grafiği verisi oluşturur"""
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
+        start_ts = window_start(days=days)
         
         # Tehdit aktörü - sektör ilişkileri
-        actor_sector_relations = db.session.query(
-            Post.name, Post.sector, func.count(Post.id)
-        ).filter(
-            Post.discovered >= start_date.strftime('%Y-%m-%d'),
-            Post.name.isnot(None),
-            Post.sector.isnot(None)
-        ).group_by(Post.name, Post.sector).all()
+        actor_sector_relations = self._query("""
+            SELECT name, sector, COUNT(*) FROM posts
+            WHERE discovered_ts >= :start_ts AND name IS NOT NULL AND sector IS NOT NULL
+            GROUP BY name, sector
+        """, start_ts=start_ts)
         
         # Tehdit aktörü - ülke ilişkileri
-        actor_country_relations = db.session.query(
-            Post.name, Post.country, func.count(Post.id)
-        ).filter(
-            Post.discovered >= start_date.strftime('%Y-%m-%d'),
-            Post.name.isnot(None),
-            Post.country.isnot(None)
-        ).group_by(Post.name, Post.country).all()
+        actor_country_relations = self._query("""
+            SELECT name, country, COUNT(*) FROM posts
+            WHERE discovered_ts >= :start_ts AND name IS NOT NULL AND country IS NOT NULL
+            GROUP BY name, country
+        """, start_ts=start_ts)
+        
+        # Düğüm boyutları için toplam saldırı sayıları (düğüm başına sorgu yerine)
+        actor_totals = dict(self._query("""
+            SELECT name, COUNT(*) FROM posts
+            WHERE discovered_ts >= :start_ts AND name IS NOT NULL
+            GROUP BY name
+        """, start_ts=start_ts))
+        sector_totals = dict(self._query("""
+            SELECT sector, COUNT(*) FROM posts
+            WHERE discovered_ts >= :start_ts AND sector IS NOT NULL
+            GROUP BY sector
+        """, start_ts=start_ts))
         
         # Düğümler (nodes)
         nodes = []
@@ -184,10 +190,7 @@ class AdvancedCharts:
             actors.add(actor)
         
         for actor in actors:
-            total_attacks = db.session.query(func.count(Post.id)).filter(
-                Post.discovered >= start_date,
-                Post.name == actor
-            ).scalar()
+            total_attacks = actor_totals.get(actor, 0)
             
             nodes.append({
                 'id': node_id,
@@ -204,10 +207,7 @@ class AdvancedCharts:
             sectors.add(sector)
         
         for sector in sectors:
-            total_attacks = db.session.query(func.count(Post.id)).filter(
-                Post.discovered >= start_date,
-                Post.sector == sector
-            ).scalar()
+            total_attacks = sector_totals.get(sector, 0)
             
             nodes.append({
                 'id': node_id,
@@ -241,30 +241,26 @@ class AdvancedCharts:
     
     def generate_risk_trend_analysis(self, days=90):
         """Risk trend analizi oluşturur"""
-        end_date = datetime.utcnow()
+        end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days)
         
-        # Haftalık risk seviyesi dağılımı
-        weekly_risk_data = {}
+        start_ts = int(start_date.timestamp())
+        risk_levels = ['Düşük', 'Orta', 'Yüksek', 'Kritik']
+        
+        # Haftalık risk seviyesi dağılımı; tüm haftalar tek aralık taramasıyla sayılır
+        weekly_counts = {}
+        for week, risk, count in self._query("""
+            SELECT (discovered_ts - :start_ts) / :week AS week, impact_level, COUNT(*) FROM posts
+            WHERE discovered_ts >= :start_ts AND discovered_ts < :end_ts
+            GROUP BY week, impact_level
+        """, start_ts=start_ts, end_ts=int(end_date.timestamp()), week=WEEK):
+            weekly_counts[(week, risk)] = count
         
+        weekly_risk_data = {}
         for i in range(0, days, 7):
             week_start = start_date + timedelta(days=i)
-            week_end = min(week_start + timedelta(days=7), end_date)
-            
             week_key = week_start.strftime('%Y-%m-%d')
-            
-            risk_levels = ['Düşük', 'Orta', 'Yüksek', 'Kritik']
-            week_risks = {}
-            
-            for risk in risk_levels:
-                count = db.session.query(func.count(Post.id)).filter(
-                    Post.discovered >= week_start,
-                    Post.discovered < week_end,
-                    Post.impact_level == risk
-                ).scalar()
-                week_risks[risk] = count or 0
-            
-            weekly_risk_data[week_key] = week_risks
+            weekly_risk_data[week_key] = {risk: weekly_counts.get((i // 7, risk), 0) for risk in risk_levels}
         
         # Risk skoru hesapla (her hafta için)
         risk_scores = []
@@ -308,19 +304,12 @@ class AdvancedCharts:
     
     def generate_company_risk_matrix(self, days=30):
         """Şirket risk matrisi oluşturur"""
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
         # Şirket bazında veriler
-        company_data = db.session.query(
-            Post.company_name, Post.sector, Post.company_size, 
-            Post.impact_level, func.count(Post.id)
-        ).filter(
-            Post.discovered >= start_date.strftime('%Y-%m-%d'),
-            Post.company_name.isnot(None)
-        ).group_by(
-            Post.company_name, Post.sector, Post.company_size, Post.impact_level
-        ).all()
+        company_data = self._query("""
+            SELECT company_name, sector, company_size, impact_level, COUNT(*) FROM posts
+            WHERE discovered_ts >= :start_ts AND company_name IS NOT NULL
+            GROUP BY company_name, sector, company_size, impact_level
+        """, start_ts=window_start(days=days))
         
         # Şirket risk matrisi
         risk_matrix = {}
@@ -13,20 +13,16 @@ from sqlalchemy import func, desc, asc
 from utils.data_analyzer import DataAnalyzer
 from utils.advanced_charts import AdvancedCharts
 from utils.report_generator import ReportGenerator
+from utils.data_version import conditional_get
+from utils.rate_limiter import limit
 
 # API Blueprint oluştur
 api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
 
 # API Rate Limiting için decorator
 def rate_limit(max_requests=100, window=3600):
-    """API rate limiting decorator"""
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            # Basit rate limiting (gerçek projede Redis kullanılmalı)
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
+    """API rate limiting decorator (istemci başına token bucket, bkz. utils/rate_limiter.py)"""
+    return limit(max_requests, window)
 
 # API Authentication decorator
 def require_api_key(f):
@@ -56,6 +52,7 @@ def api_response(data=None, message="Success", status_code=200, error=None):
 
 @api_bp.route('/dashboard/overview', methods=['GET'])
 @rate_limit(max_requests=200, window=3600)
+@conditional_get('posts', 'hacked_companies')
 def get_dashboard_overview():
     """Dashboard genel bakış verileri"""
     try:
@@ -76,6 +73,7 @@ def get_dashboard_overview():
 
 @api_bp.route('/dashboard/statistics', methods=['GET'])
 @rate_limit(max_requests=100, window=3600)
+@conditional_get('posts', 'hacked_companies')
 def get_dashboard_statistics():
     """Detaylı dashboard istatistikleri"""
     try:
@@ -138,6 +136,7 @@ def get_dashboard_statistics():
 
 @api_bp.route('/charts/heatmap', methods=['GET'])
 @rate_limit(max_requests=50, window=3600)
+@conditional_get('posts', 'hacked_companies')
 def get_heatmap_data():
     """Coğrafi heatmap verileri"""
     try:
@@ -158,6 +157,7 @@ def get_heatmap_data():
 
 @api_bp.route('/charts/risk-trend', methods=['GET'])
 @rate_limit(max_requests=50, window=3600)
+@conditional_get('posts', 'hacked_companies')
 def get_risk_trend_data():
     """Risk trend analizi verileri"""
     try:
@@ -178,6 +178,7 @@ def get_risk_trend_data():
 
 @api_bp.route('/charts/sector-radar', methods=['GET'])
 @rate_limit(max_requests=50, window=3600)
+@conditional_get('posts', 'hacked_companies')
 def get_sector_radar_data():
     """Sektörel radar grafik verileri"""
     try:
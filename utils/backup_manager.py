@@ -0,0 +1,585 @@
+# Çevrimiçi Veritabanı Yedekleme
+# sqlite3 backup API ile sayfa adımlı (throttled) tutarlı yedekler alır, zstd ile sıkıştırır ve
+# her tam yedeği bir nesil (generation) olarak saklar. İsteğe bağlı WAL arşivleme, iki tam yedek
+# arasındaki değişiklikleri WAL segmentleri olarak saklayıp belirli bir ana geri dönmeyi sağlar.
+
+import sys
+import os
+import json
+import gzip
+import shutil
+import struct
+import sqlite3
+import hashlib
+import threading
+import time
+from datetime import datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.post_archive import ARCHIVE_FILE_NAME, archive_path_for
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BACKUP_DIR = os.path.join(PROJECT_ROOT, 'backups')
+
+MANIFEST_FILE = 'manifest.json'
+STATE_FILE = 'state.json'
+
+# Yedekler veritabanını WAL moduna alır; mod değiştirilemediyse (rollback journal) kaynak
+# değiştikçe backup baştan başlar. Bu kadar yeniden başlamadan sonra deneme bırakılır ve
+# artan beklemeyle yine adım adım tekrarlanır; kopya hiçbir zaman tek adımda alınmaz
+# (okuma kilidi kopya boyunca tutulur ve toplayıcıyı bloklardı)
+MAX_BACKUP_RESTARTS = 3
+MAX_BACKUP_ATTEMPTS = 5
+BACKUP_RETRY_BACKOFF = 2.0
+BACKUP_RETRY_BACKOFF_MAX = 60.0
+
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+WAL_MAGIC = (0x377f0682, 0x377f0683)
+
+
+class BackupRestarted(Exception):
+    pass
+
+
+def compression_extension():
+    return '.zst' if zstandard else '.gz'
+
+
+def compress_file(source, target, level=3):
+    """Dosyayı akış halinde sıkıştırır (zstandard yoksa gzip)"""
+    with open(source, 'rb') as fin:
+        if zstandard:
+            with open(target, 'wb') as fout:
+                zstandard.ZstdCompressor(level=level, threads=-1).copy_stream(fin, fout)
+        else:
+            with gzip.open(target, 'wb', compresslevel=6) as fout:
+                shutil.copyfileobj(fin, fout, 1024 * 1024)
+
+
+def decompress_file(source, target):
+    if source.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("zstd yedeği açmak için zstandard paketi gerekli")
+        with open(source, 'rb') as fin, open(target, 'wb') as fout:
+            zstandard.ZstdDecompressor().copy_stream(fin, fout)
+    else:
+        with gzip.open(source, 'rb') as fin, open(target, 'wb') as fout:
+            shutil.copyfileobj(fin, fout, 1024 * 1024)
+
+
+def compress_bytes(data, level=3):
+    if zstandard:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress_bytes(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("zstd segmenti açmak için zstandard paketi gerekli")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_wal_header(wal_path):
+    """WAL başlığından (salt1, salt2, sayfa boyutu); dosya yoksa veya boşsa None"""
+    try:
+        with open(wal_path, 'rb') as f:
+            header = f.read(WAL_HEADER_SIZE)
+    except FileNotFoundError:
+        return None
+    if len(header) < WAL_HEADER_SIZE:
+        return None
+    magic, _, page_size, _, salt1, salt2 = struct.unpack('>6I', header[:24])
+    if magic not in WAL_MAGIC:
+        return None
+    return salt1, salt2, page_size
+
+
+def committed_wal_end(wal_path, start, page_size, salts):
+    """
+    start ofsetinden itibaren tuzları başlıkla eşleşen çerçeveleri dolaşır; son commit
+    çerçevesinin bittiği ofseti ve o noktaya kadarki çerçeve sayısını döndürür.
+    Commit edilmemiş kuyruk ve önceki WAL döngüsünden kalan eski çerçeveler dahil edilmez.
+    """
+    frame_size = WAL_FRAME_HEADER_SIZE + page_size
+    end, frames, committed_frames = start, 0, 0
+    with open(wal_path, 'rb') as f:
+        f.seek(start)
+        offset = start
+        while True:
+            header = f.read(WAL_FRAME_HEADER_SIZE)
+            if len(header) < WAL_FRAME_HEADER_SIZE:
+                break
+            _, commit_size, salt1, salt2 = struct.unpack('>4I', header[:16])
+            if (salt1, salt2) != tuple(salts) or len(f.read(page_size)) < page_size:
+                break
+            offset += frame_size
+            frames += 1
+            if commit_size:
+                end, committed_frames = offset, frames
+    return end, committed_frames
+
+
+class BackupManager:
+    def __init__(self, db_path='instance/data.db', backup_dir=None, retain_generations=7,
+                 pages_per_step=1024, step_sleep=0.01, compression_level=3, wal_archive=False):
+        """
+        pages_per_step / step_sleep: her backup adımında kopyalanan sayfa sayısı ve adımlar
+        arası bekleme; uygulama ve toplayıcı kopyalama sırasında veritabanını kullanmaya devam eder.
+        wal_archive: True ise archive_wal() iki tam yedek arasındaki WAL segmentlerini saklar.
+        Veritabanı her durumda WAL moduna alınır; tam yedek tek bir okuma anlık görüntüsüdür.
+        """
+        self.db_path = os.path.abspath(db_path)
+        self.backup_dir = backup_dir or DEFAULT_BACKUP_DIR
+        self.retain_generations = retain_generations
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.compression_level = compression_level
+        self.wal_archive = wal_archive
+        self.lock = threading.RLock()
+        self._reader = None
+
+    # --- Durum ve manifest dosyaları ---
+
+    def _load_json(self, path, default):
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_json(self, path, data):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def _state(self):
+        return self._load_json(os.path.join(self.backup_dir, STATE_FILE), {})
+
+    def _save_state(self, state):
+        os.makedirs(self.backup_dir, exist_ok=True)
+        self._save_json(os.path.join(self.backup_dir, STATE_FILE), state)
+
+    def _manifest_path(self, generation):
+        return os.path.join(self.backup_dir, generation, MANIFEST_FILE)
+
+    def list_generations(self):
+        """Tamamlanmış nesiller, eskiden yeniye"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        generations = []
+        for name in sorted(os.listdir(self.backup_dir)):
+            manifest_path = self._manifest_path(name)
+            if os.path.exists(manifest_path):
+                generations.append(self._load_json(manifest_path, {}))
+        return generations
+
+    # --- Tam yedek ---
+
+    def _copy_database(self, source, target, schema='main'):
+        """
+        Kaynak bağlantıdan hedef dosyaya sayfa adımlı kopya. WAL modunda kaynak bağlantı bir
+        okuma işlemi içinde tutulur: kopya tek bir anlık görüntüdür, yazarlar beklemez ve
+        backup yeniden başlamaz.
+        """
+        remaining_seen = []
+
+        def progress(status, remaining, total):
+            if remaining_seen and remaining > remaining_seen[-1]:
+                remaining_seen.append(remaining)
+                if sum(1 for a, b in zip(remaining_seen, remaining_seen[1:]) if b > a) > MAX_BACKUP_RESTARTS:
+                    raise BackupRestarted()
+            else:
+                remaining_seen.append(remaining)
+
+        dest = sqlite3.connect(target)
+        try:
+            for attempt in range(1, MAX_BACKUP_ATTEMPTS + 1):
+                remaining_seen.clear()
+                try:
+                    source.backup(dest, pages=self.pages_per_step, progress=progress,
+                                  name=schema, sleep=self.step_sleep)
+                    break
+                except BackupRestarted:
+                    if attempt == MAX_BACKUP_ATTEMPTS:
+                        raise
+                    delay = min(BACKUP_RETRY_BACKOFF * 2 ** (attempt - 1), BACKUP_RETRY_BACKOFF_MAX)
+                    print(f"[{datetime.now()}] Yedek sürekli yeniden başladı ({schema}), "
+                          f"{delay:.0f} sn sonra tekrar denenecek")
+                    time.sleep(delay)
+            check = dest.execute("PRAGMA quick_check").fetchone()[0]
+            if check != 'ok':
+                raise sqlite3.DatabaseError(f"Yedek bütünlük kontrolü başarısız: {check}")
+            page_count = dest.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            dest.close()
+        return page_count
+
+    def create_backup(self):
+        """
+        Yeni bir nesil oluşturur: sıcak veritabanı ve (varsa) arşiv veritabanı tutarlı bir
+        anlık görüntü olarak kopyalanır, sıkıştırılır ve manifest yazılır. Ardından saklama
+        politikası uygulanır.
+        """
+        with self.lock:
+            started = time.time()
+            # WAL modunda kopya tek bir okuma anlık görüntüsüdür: yazarlar beklemez, backup yeniden başlamaz
+            try:
+                journal_mode = self.enable_wal_mode()
+            except sqlite3.OperationalError as e:
+                journal_mode = str(e)
+            if journal_mode != 'wal':
+                print(f"[{datetime.now()}] Veritabanı WAL moduna alınamadı ({journal_mode}); yedek yeniden başlayabilir")
+            if self.wal_archive:
+                # Mevcut WAL kapatılır; yeni nesil yeni bir WAL döngüsüyle başlar
+                self.archive_wal()
+
+            generation = datetime.now().strftime('%Y%m%dT%H%M%S')
+            suffix = 1
+            while os.path.exists(os.path.join(self.backup_dir, generation)):
+                generation = f"{generation.split('-')[0]}-{suffix}"
+                suffix += 1
+            generation_dir = os.path.join(self.backup_dir, generation)
+            os.makedirs(generation_dir)
+
+            files = []
+            source = sqlite3.connect(self.db_path, isolation_level=None)
+            try:
+                archive_path = archive_path_for(self.db_path)
+                schemas = [('main', os.path.basename(self.db_path))]
+                if os.path.exists(archive_path):
+                    source.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+                    schemas.append(('archive', ARCHIVE_FILE_NAME))
+
+                wal_mode = source.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+                if wal_mode:
+                    source.execute("BEGIN")
+                    for schema, _ in schemas:
+                        source.execute(f"SELECT COUNT(*) FROM {schema}.sqlite_master").fetchone()
+
+                for schema, file_name in schemas:
+                    tmp_path = os.path.join(generation_dir, file_name + '.tmp')
+                    page_count = self._copy_database(source, tmp_path, schema)
+                    size = os.path.getsize(tmp_path)
+                    compressed_path = os.path.join(generation_dir, file_name + compression_extension())
+                    compress_file(tmp_path, compressed_path, self.compression_level)
+                    os.remove(tmp_path)
+                    files.append({
+                        'schema': schema,
+                        'file': os.path.basename(compressed_path),
+                        'pages': page_count,
+                        'size_bytes': size,
+                        'compressed_bytes': os.path.getsize(compressed_path),
+                        'sha256': file_sha256(compressed_path)
+                    })
+                if wal_mode:
+                    source.execute("COMMIT")
+            except Exception:
+                shutil.rmtree(generation_dir, ignore_errors=True)
+                raise
+            finally:
+                source.close()
+
+            manifest = {
+                'generation': generation,
+                'created_at': datetime.now().isoformat(),
+                'database': self.db_path,
+                'compression': 'zstd' if zstandard else 'gzip',
+                'files': files,
+                'duration_seconds': round(time.time() - started, 2),
+                'wal_archive': self.wal_archive,
+                'wal_segments': [],
+                'wal_gaps': []
+            }
+            self._save_json(self._manifest_path(generation), manifest)
+
+            state = self._state()
+            state.update({'generation': generation, 'wal_salts': None, 'wal_offset': 0,
+                          'wal_frames': 0, 'wal_index': 0, 'expect_new_wal': True})
+            self._save_state(state)
+            removed = self.apply_retention()
+
+            total = sum(f['size_bytes'] for f in files)
+            compressed = sum(f['compressed_bytes'] for f in files)
+            print(f"[{datetime.now()}] Yedek {generation}: {total / 1048576:.1f} MB -> "
+                  f"{compressed / 1048576:.1f} MB ({manifest['duration_seconds']} sn), {len(removed)} eski nesil silindi")
+            return manifest
+
+    def apply_retention(self):
+        """En yeni retain_generations nesil dışındakileri siler"""
+        generations = [g['generation'] for g in self.list_generations()]
+        expired = generations[:-self.retain_generations] if self.retain_generations > 0 else []
+        for generation in expired:
+            shutil.rmtree(os.path.join(self.backup_dir, generation), ignore_errors=True)
+        return expired
+
+    # --- WAL arşivleme ---
+
+    def enable_wal_mode(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        finally:
+            conn.close()
+
+    def _hold_reader(self):
+        """
+        WAL dosyasının arşivlenmeden yeniden başlatılmasını (üzerine yazılmasını) önlemek
+        için açık tutulan okuma işlemi. Checkpoint'leri sadece archive_wal() tamamlar.
+        """
+        if self._reader is None:
+            self._reader = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        if not self._reader.in_transaction:
+            self._reader.execute("BEGIN")
+            self._reader.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+    def _copy_wal_frames(self, state, manifest):
+        """Son arşivlenen ofsetten sonraki commit edilmiş çerçeveleri bir segment olarak yazar"""
+        wal_path = self.db_path + '-wal'
+        header = read_wal_header(wal_path)
+        if header is None:
+            return 0
+        salt1, salt2, page_size = header
+        if state.get('wal_salts') != [salt1, salt2]:
+            if state.get('wal_salts') is not None and not state.get('expect_new_wal'):
+                # WAL bizim checkpoint'imiz dışında yeniden başlamış: önceki döngünün kalan
+                # çerçeveleri kayıp, bu noktadan sonrasına geri dönülemez
+                manifest['wal_gaps'].append({'wal_index': state['wal_index'], 'detected_at': datetime.now().isoformat()})
+                print(f"[{datetime.now()}] WAL arşivinde boşluk tespit edildi (döngü {state['wal_index']})")
+            state.update({'wal_salts': [salt1, salt2], 'wal_offset': 0, 'wal_frames': 0,
+                          'wal_index': state.get('wal_index', 0) + 1, 'expect_new_wal': False})
+
+        start = max(state['wal_offset'], WAL_HEADER_SIZE)
+        end, frames = committed_wal_end(wal_path, start, page_size, (salt1, salt2))
+        if end <= start:
+            return 0
+        read_from = state['wal_offset']
+        with open(wal_path, 'rb') as f:
+            f.seek(read_from)
+            data = f.read(end - read_from)
+
+        segment_dir = os.path.join(self.backup_dir, state['generation'], 'wal')
+        os.makedirs(segment_dir, exist_ok=True)
+        segment = f"{state['wal_index']:08d}-{read_from:012d}.wal{compression_extension()}"
+        tmp_path = os.path.join(segment_dir, segment + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(compress_bytes(data, self.compression_level))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(segment_dir, segment))
+
+        manifest['wal_segments'].append({
+            'file': segment,
+            'wal_index': state['wal_index'],
+            'offset': read_from,
+            'end': end,
+            'frames': frames,
+            'archived_at': datetime.now().isoformat()
+        })
+        state['wal_offset'] = end
+        state['wal_frames'] += frames
+        return frames
+
+    def archive_wal(self, checkpoint=True):
+        """
+        Yeni WAL çerçevelerini mevcut nesle arşivler. checkpoint=True iken yazarlar kısa bir
+        süre (BEGIN IMMEDIATE) durdurulup son çerçeveler alınır ve WAL TRUNCATE ile sıfırlanır.
+        """
+        if not self.wal_archive:
+            return {'frames': 0, 'skipped': 'WAL arşivleme kapalı'}
+        with self.lock:
+            state = self._state()
+            if not state.get('generation') or not os.path.exists(self._manifest_path(state['generation'])):
+                # Tabanı olmayan segmentler işe yaramaz; önce tam yedek alınır
+                self._release_reader()
+                self.enable_wal_mode()
+                self._hold_reader()
+                return {'frames': 0, 'skipped': 'henüz tam yedek yok'}
+            manifest = self._load_json(self._manifest_path(state['generation']), {})
+            self._hold_reader()
+            frames = self._copy_wal_frames(state, manifest)
+            checkpointed = False
+            if checkpoint:
+                writer = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+                try:
+                    writer.execute("BEGIN IMMEDIATE")
+                    frames += self._copy_wal_frames(state, manifest)
+                    writer.execute("ROLLBACK")
+                    self._release_reader()
+                    busy, log_frames, _ = writer.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+                    if not busy:
+                        checkpointed = True
+                        if log_frames > state['wal_frames']:
+                            # İki adım arasında yazılan çerçeveler arşivlenmeden checkpoint edildi
+                            manifest['wal_gaps'].append({'wal_index': state['wal_index'],
+                                                         'detected_at': datetime.now().isoformat()})
+                        state['expect_new_wal'] = True
+                finally:
+                    writer.close()
+                    self._hold_reader()
+            self._save_json(self._manifest_path(state['generation']), manifest)
+            self._save_state(state)
+            return {'generation': state['generation'], 'frames': frames, 'checkpointed': checkpointed}
+
+    def _release_reader(self):
+        if self._reader is not None and self._reader.in_transaction:
+            self._reader.execute("ROLLBACK")
+
+    def close(self):
+        if self._reader is not None:
+            self._release_reader()
+            self._reader.close()
+            self._reader = None
+
+    # --- Geri yükleme ---
+
+    def _replay_wal(self, target_path, manifest, until):
+        """Nesildeki segmentleri WAL döngüsü sırasıyla hedef veritabanına uygular"""
+        segment_dir = os.path.join(self.backup_dir, manifest['generation'], 'wal')
+        gap_indexes = {gap['wal_index'] for gap in manifest.get('wal_gaps', [])}
+        by_index = {}
+        for segment in manifest.get('wal_segments', []):
+            if until and segment['archived_at'] > until:
+                continue
+            by_index.setdefault(segment['wal_index'], []).append(segment)
+
+        conn = sqlite3.connect(target_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.close()
+
+        applied_frames, applied_until = 0, None
+        for wal_index in sorted(by_index):
+            segments = sorted(by_index[wal_index], key=lambda s: s['offset'])
+            if segments[0]['offset'] != 0:
+                break
+            data = bytearray()
+            for segment in segments:
+                if segment['offset'] != len(data):
+                    break
+                data += decompress_bytes(os.path.join(segment_dir, segment['file']))
+                applied_frames += segment['frames']
+                applied_until = segment['archived_at']
+            with open(target_path + '-wal', 'wb') as f:
+                f.write(data)
+            conn = sqlite3.connect(target_path)
+            try:
+                # Açılışta WAL kurtarma çalışır; checkpoint çerçeveleri veritabanına yazar
+                conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                conn.close()
+            if wal_index in gap_indexes:
+                print(f"[{datetime.now()}] WAL döngüsü {wal_index} sonrasında boşluk var, geri dönüş burada duruyor")
+                break
+        return applied_frames, applied_until
+
+    def restore(self, target_path, generation=None, until=None):
+        """
+        Bir nesli target_path'e geri yükler (arşiv veritabanı yanına). until (ISO zaman)
+        verilirse o andan önceki en yeni nesil seçilir ve WAL segmentleri until'e kadar uygulanır.
+        Çalışan bir veritabanının üzerine yazmadan önce uygulama ve toplayıcı durdurulmalıdır.
+        """
+        started = time.time()
+        generations = self.list_generations()
+        if generation:
+            generations = [g for g in generations if g['generation'] == generation]
+        if until:
+            generations = [g for g in generations if g['created_at'] <= until]
+        if not generations:
+            raise FileNotFoundError("Uygun yedek nesli bulunamadı")
+        manifest = generations[-1]
+        generation_dir = os.path.join(self.backup_dir, manifest['generation'])
+
+        target_path = os.path.abspath(target_path)
+        target_dir = os.path.dirname(target_path)
+        os.makedirs(target_dir, exist_ok=True)
+        restored = {}
+        for entry in manifest['files']:
+            source = os.path.join(generation_dir, entry['file'])
+            if file_sha256(source) != entry['sha256']:
+                raise sqlite3.DatabaseError(f"Yedek dosyası bozuk: {entry['file']}")
+            final_path = target_path if entry['schema'] == 'main' else os.path.join(target_dir, ARCHIVE_FILE_NAME)
+            tmp_path = final_path + '.restore'
+            decompress_file(source, tmp_path)
+            restored[entry['schema']] = (tmp_path, final_path)
+
+        applied_frames, applied_until = 0, None
+        main_tmp, main_final = restored['main']
+        if manifest.get('wal_segments'):
+            applied_frames, applied_until = self._replay_wal(main_tmp, manifest, until)
+
+        for tmp_path, final_path in restored.values():
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(final_path + suffix):
+                    os.remove(final_path + suffix)
+            os.replace(tmp_path, final_path)
+
+        result = {
+            'generation': manifest['generation'],
+            'target': main_final,
+            'wal_frames_applied': applied_frames,
+            'restored_until': applied_until or manifest['created_at'],
+            'duration_seconds': round(time.time() - started, 2)
+        }
+        print(f"[{datetime.now()}] {manifest['generation']} nesli geri yüklendi ({applied_frames} WAL çerçevesi)")
+        return result
+
+    def get_stats(self):
+        generations = self.list_generations()
+        return {
+            'backup_dir': self.backup_dir,
+            'compression': 'zstd' if zstandard else 'gzip',
+            'wal_archive': self.wal_archive,
+            'generations': [{
+                'generation': g['generation'],
+                'created_at': g['created_at'],
+                'size_mb': round(sum(f['compressed_bytes'] for f in g['files']) / 1048576, 2),
+                'wal_segments': len(g.get('wal_segments', [])),
+                'wal_gaps': len(g.get('wal_gaps', []))
+            } for g in generations]
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='CTI-BOT veritabanı yedekleme')
+    parser.add_argument('command', choices=['backup', 'wal', 'list', 'restore'])
+    parser.add_argument('--db', default='instance/data.db')
+    parser.add_argument('--dir', default=DEFAULT_BACKUP_DIR)
+    parser.add_argument('--target', help='restore hedef dosyası')
+    parser.add_argument('--generation')
+    parser.add_argument('--until', help='ISO zaman (örn. 2025-01-31T12:00:00)')
+    parser.add_argument('--wal', action='store_true', help='WAL arşivlemeyi etkinleştir')
+    args = parser.parse_args()
+
+    manager = BackupManager(args.db, args.dir, wal_archive=args.wal)
+    if args.command == 'backup':
+        print(json.dumps(manager.create_backup(), ensure_ascii=False, indent=2))
+    elif args.command == 'wal':
+        print(manager.archive_wal())
+    elif args.command == 'list':
+        print(json.dumps(manager.get_stats(), ensure_ascii=False, indent=2))
+    else:
+        print(manager.restore(args.target or args.db + '.restored', args.generation, args.until))
+    manager.close()
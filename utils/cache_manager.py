@@ -3,30 +3,55 @@ CTI-BOT Cache Manager
 Redis tabanlı caching sistemi
 """
 
-import redis
 import json
 import pickle
 import os
+import threading
+import time
 from datetime import datetime, timedelta
 from flask import current_app
 
 class CacheManager:
+    # Başarısız bağlantı bu süre geçmeden yeniden denenmez (saniye)
+    RECONNECT_INTERVAL = 30
+
     def __init__(self):
-        self.redis_client = None
+        self._client = None
         self.enabled = True
         self.default_ttl = 3600  # 1 saat
-        self._init_redis()
-    
+        # Bağlantı import sırasında değil ilk kullanımda, arka planda kurulur
+        self._connecting = False
+        self._failed_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def redis_client(self):
+        """Bağlı Redis istemcisi; bağlantı henüz yoksa arka planda başlatılır ve None döner"""
+        if self._client is None and self.enabled:
+            self._connect_async()
+        return self._client
+
+    def _connect_async(self):
+        with self._lock:
+            if self._connecting:
+                return
+            if self._failed_at is not None and time.time() - self._failed_at < self.RECONNECT_INTERVAL:
+                return
+            self._connecting = True
+        threading.Thread(target=self._init_redis, name='redis-connect', daemon=True).start()
+
     def _init_redis(self):
         """Redis bağlantısını başlat"""
         try:
+            import redis
+            
             # Redis konfigürasyonu
             redis_host = os.getenv('REDIS_HOST', 'localhost')
             redis_port = int(os.getenv('REDIS_PORT', 6379))
             redis_db = int(os.getenv('REDIS_DB', 0))
             redis_password = os.getenv('REDIS_PASSWORD', None)
             
-            self.redis_client = redis.Redis(
+            client = redis.Redis(
                 host=redis_host,
                 port=redis_port,
                 db=redis_db,
@@ -37,14 +62,19 @@ class CacheManager:
             )
             
             # Bağlantıyı test et
-            self.redis_client.ping()
+            client.ping()
+            self._client = client
+            self._failed_at = None
             print("Redis cache sistemi başarıyla başlatıldı")
             
         except Exception as e:
-            print(f"Redis bağlantı hatası: {e}")
-            print("Cache sistemi devre dışı bırakıldı")
-            self.enabled = False
-            self.redis_client = None
+            # Hata sadece ilk denemede yazılır; yeniden denemeler sessizdir
+            if self._failed_at is None:
+                print(f"Redis bağlantı hatası: {e}")
+                print(f"Cache sistemi Redis'e bağlanana kadar devre dışı ({self.RECONNECT_INTERVAL} sn'de bir yeniden denenir)")
+            self._failed_at = time.time()
+        finally:
+            self._connecting = False
     
     def get(self, key):
         """Cache'den veri al"""
@@ -145,7 +175,7 @@ class CacheManager:
         """Cache istatistiklerini al"""
         if not self.enabled or not self.redis_client:
             return {
-                'status': 'disabled',
+                'status': 'connecting' if self.enabled and self._connecting else 'disabled',
                 'message': 'Cache sistemi devre dışı'
             }
         
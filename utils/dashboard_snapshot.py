@@ -0,0 +1,168 @@
+# Dashboard Snapshot'ları
+# RealtimeUpdater dashboard yüklerini önceden hesaplayıp sürümlü bir snapshot dosyasına
+# (geçici dosya + atomik rename) yazar. Web süreçleri dosyayı bir kez yükler, mtime
+# değiştiğinde yeniden okur ve yanıt gövdesini bellekten verir. Snapshot eskiyse
+# (staleness sınırı) veya yoksa endpoint canlı hesaplamaya döner.
+
+import sys
+import os
+import json
+import threading
+import time
+from datetime import datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.response_encoding import dumps_bytes
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(PROJECT_ROOT, 'cache', 'dashboard_snapshot.json')
+
+# Dosya değişikliği en fazla bu sıklıkta stat ile kontrol edilir (saniye)
+CHECK_INTERVAL = 1.0
+
+DEFAULT_MAX_AGE = 900
+
+
+class SnapshotWriter:
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_SNAPSHOT_PATH
+        self.version = None
+
+    def _current_version(self):
+        if self.version is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.version = json.load(f).get('version', 0)
+            except (OSError, ValueError):
+                self.version = 0
+        return self.version
+
+    def write(self, payloads, data_versions=None):
+        """
+        payloads: {ad: yük}. data_versions: yüklerin hesaplandığı andaki veri sürümleri
+        ({tablo: sürüm}); okuyucu snapshot'ın güncel veriyle eşleşip eşleşmediğini buradan anlar.
+        """
+        version = self._current_version() + 1
+        snapshot = {
+            'version': version,
+            'generated_at': time.time(),
+            'data_versions': data_versions or {},
+            'payloads': payloads
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(dumps_bytes(snapshot))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.version = version
+        return version
+
+
+class SnapshotReader:
+    """Süreç içi snapshot önbelleği; yanıt gövdeleri yükleme sırasında bir kez serileştirilir"""
+
+    def __init__(self, path=None, check_interval=CHECK_INTERVAL):
+        self.path = path or DEFAULT_SNAPSHOT_PATH
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.signature = None
+        self.checked_at = 0.0
+        self.snapshot = None
+        self.bodies = {}
+        self.reloads = 0
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return
+        with self.lock:
+            if now - self.checked_at < self.check_interval:
+                return
+            self.checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self.snapshot, self.bodies, self.signature = None, {}, None
+                return
+            # rename yeni bir inode getirir; mtime + boyut + inode değişimi yeni sürüm demektir
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            if signature == self.signature:
+                return
+            try:
+                with open(self.path, 'rb') as f:
+                    snapshot = json.loads(f.read())
+            except (OSError, ValueError) as e:
+                print(f"[{datetime.now()}] Dashboard snapshot okunamadı: {e}")
+                return
+            meta = {'version': snapshot['version'],
+                    'generated_at': datetime.fromtimestamp(snapshot['generated_at']).isoformat()}
+            self.bodies = {
+                name: dumps_bytes({'success': True, 'data': payload, 'cached': True, 'snapshot': meta}) + b"\n"
+                for name, payload in snapshot['payloads'].items()
+            }
+            self.snapshot = snapshot
+            self.signature = signature
+            self.reloads += 1
+
+    def get(self, name, max_age=DEFAULT_MAX_AGE):
+        """(gövde, snapshot) veya snapshot yok / max_age'den eskiyse None"""
+        self._reload_if_changed()
+        snapshot = self.snapshot
+        if snapshot is None or name not in self.bodies:
+            return None
+        if time.time() - snapshot['generated_at'] > max_age:
+            return None
+        return self.bodies[name], snapshot
+
+    def get_stats(self):
+        snapshot = self.snapshot
+        return {
+            'path': self.path,
+            'loaded': snapshot is not None,
+            'version': snapshot['version'] if snapshot else None,
+            'age_seconds': round(time.time() - snapshot['generated_at'], 1) if snapshot else None,
+            'payloads': sorted(self.bodies),
+            'reloads': self.reloads
+        }
+
+
+snapshot_reader = SnapshotReader()
+
+
+def serve_snapshot(name, tables=('posts',)):
+    """
+    Controller'lar için: snapshot taze ise hazır JSON yanıtını, değilse None döner (canlı
+    hesaplama). Snapshot, güncel veri sürümünün gerisindeyse yanıt kendi ETag'ini taşır;
+    böylece istemci snapshot yenilendiğinde eski içeriği 304 ile tutmaya devam etmez.
+    """
+    from flask import current_app
+    from models.DBModel import db
+    from utils.data_version import get_reader
+
+    if not current_app.config.get('DASHBOARD_SNAPSHOT_ENABLED', True):
+        return None
+    result = snapshot_reader.get(name, current_app.config.get('DASHBOARD_SNAPSHOT_MAX_AGE', DEFAULT_MAX_AGE))
+    if result is None:
+        return None
+    body, snapshot = result
+    response = current_app.response_class(body, mimetype='application/json')
+    versions = get_reader(db.engine.url.database).get_versions()
+    if any(snapshot['data_versions'].get(table, 0) != versions.get(table, (0, 0))[0] for table in tables):
+        response.set_etag(f"snapshot-{snapshot['version']}")
+    return response
+
+
+def current_data_versions(db_path):
+    from utils.data_version import get_reader
+    return {name: version for name, (version, _) in get_reader(db_path).get_versions().items()}
+
+
+if __name__ == "__main__":
+    reader = SnapshotReader(sys.argv[1] if len(sys.argv) > 1 else None)
+    reader.get('dashboard-data')
+    print(json.dumps(reader.get_stats(), ensure_ascii=False, indent=2))
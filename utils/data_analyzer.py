@@ -1,12 +1,11 @@
 # Veri Analizi ve Raporlama Scripti
 # Dashboard ve sosyal medya için veri analizi yapar
 
-import json
-import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from collections import Counter
 from models.DBModel import db, HackedCompany, Post, Group, Wallet
+from utils.response_encoding import dumps_bytes
 
 class DataAnalyzer:
     def __init__(self):
@@ -405,25 +404,9 @@ class DataAnalyzer:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f'cti_analysis_{timestamp}.json'
         
-        # Datetime objelerini string'e çevir
-        def convert_datetime(obj):
-            if isinstance(obj, datetime):
-                return obj.isoformat()
-            return obj
-        
-        # Recursive olarak datetime objelerini dönüştür
-        def clean_data(data):
-            if isinstance(data, dict):
-                return {k: clean_data(v) for k, v in data.items()}
-            elif isinstance(data, list):
-                return [clean_data(item) for item in data]
-            else:
-                return convert_datetime(data)
-        
-        cleaned_data = clean_data(data)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(cleaned_data, f, ensure_ascii=False, indent=2)
+        # datetime, numpy ve sayısal anahtarlar serileştirici tarafından doğrudan yazılır
+        with open(filename, 'wb') as f:
+            f.write(dumps_bytes(data, indent=True))
         
         return filename
 
@@ -0,0 +1,185 @@
+# Veri Sürümü ve Koşullu GET
+# Ingest her tablo/bölüm için data_versions tablosundaki sayacı, veriyi yazdığı işlemin
+# içinde artırır. JSON endpoint'leri ETag'i bu sayaçlardan ve normalize edilmiş sorgu
+# parametrelerinden üretir; If-None-Match eşleşirse controller hiç çalıştırılmadan 304 döner.
+# Aynı ETag'in gövdesi önbellekteyse yeni istemcilere de controller çalıştırılmadan verilir.
+
+import sys
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from email.utils import format_datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATA_VERSION_TABLE = 'data_versions'
+
+# ETag'e girmeyen, istemcilerin önbelleği atlatmak için eklediği parametreler
+IGNORED_QUERY_PARAMS = {'_', 't', 'ts', 'timestamp', 'nocache'}
+
+# Göreli zaman pencereli ("son 30 gün") yanıtlar yeni veri gelmese de zamanla değişir;
+# ETag bu aralıkta bir yenilenir
+DEFAULT_TIME_BUCKET = 600
+
+
+def ensure_data_version_table(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DATA_VERSION_TABLE} (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL
+        )
+    """)
+
+
+def bump_data_version(conn, *names):
+    """
+    Verilen tablo/bölüm sayaçlarını artırır. Commit edilmez: çağıranın ingest işlemiyle
+    birlikte commit edildiğinde sürüm ve veri aynı anda görünür olur.
+    """
+    ensure_data_version_table(conn)
+    now = time.time()
+    for name in names:
+        conn.execute(f"""
+            INSERT INTO {DATA_VERSION_TABLE} (name, version, updated_at) VALUES (?, 1, ?)
+            ON CONFLICT(name) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+        """, (name, now))
+
+
+class DataVersionReader:
+    """
+    Süreç içi okuyucu. PRAGMA data_version başka bir bağlantı commit etmedikçe değişmez;
+    değişmediyse sayaçlar tekrar okunmaz, istek başına maliyet tek bir pragma olur.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _state(self):
+        state = self._local
+        if not hasattr(state, 'conn'):
+            state.conn = sqlite3.connect(self.db_path, isolation_level=None)
+            state.data_version = None
+            state.versions = {}
+        return state
+
+    def get_versions(self):
+        """{ad: (sürüm, updated_at)}"""
+        state = self._state()
+        data_version = state.conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != state.data_version:
+            try:
+                rows = state.conn.execute(f"SELECT name, version, updated_at FROM {DATA_VERSION_TABLE}").fetchall()
+            except sqlite3.OperationalError:
+                # Tablo ilk ingest'e kadar yok
+                rows = []
+            state.versions = {name: (version, updated_at) for name, version, updated_at in rows}
+            state.data_version = data_version
+        return state.versions
+
+
+_readers = {}
+_readers_lock = threading.Lock()
+
+
+def get_reader(db_path):
+    with _readers_lock:
+        if db_path not in _readers:
+            _readers[db_path] = DataVersionReader(db_path)
+        return _readers[db_path]
+
+
+def normalized_query(args):
+    """Sıralı, önbellek atlatma parametreleri çıkarılmış sorgu parametreleri"""
+    return '&'.join(f"{key}={value}" for key in sorted(args)
+                    if key not in IGNORED_QUERY_PARAMS
+                    for value in sorted(args.getlist(key)))
+
+
+def compute_etag(path, query, versions, tables, bucket, salt=''):
+    parts = [salt, path, query, str(bucket)]
+    parts += [f"{name}:{versions.get(name, (0, 0))[0]}" for name in tables]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def install_orm_version_hooks(db):
+    """
+    Web sürecindeki ORM yazmaları (session flush) için de ilgili tabloların sayaçlarını
+    aynı işlem içinde artırır.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(db.session, 'after_flush')
+    def bump_flushed_tables(session, flush_context):
+        tables = {obj.__table__.name for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+                  if hasattr(obj, '__table__')}
+        if tables:
+            bump_data_version(session.connection().connection.driver_connection, *sorted(tables))
+
+
+def conditional_get(*tables, time_bucket=None):
+    """
+    Flask view decorator'ı. tables: yanıtın okuduğu tablo/bölüm sayaçları.
+    ETag eşleşirse (veya If-Modified-Since yeterince yeni ise) view çalıştırılmadan 304 döner.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            from flask import request, current_app, make_response
+            from models.DBModel import db
+            from utils.response_encoding import payload_cache
+
+            if request.method not in ('GET', 'HEAD') or not current_app.config.get('CONDITIONAL_GET', True):
+                return view(*args, **kwargs)
+
+            bucket_seconds = time_bucket or current_app.config.get('ETAG_TIME_BUCKET_SECONDS', DEFAULT_TIME_BUCKET)
+            now = time.time()
+            bucket = int(now // bucket_seconds)
+            versions = get_reader(db.engine.url.database).get_versions()
+            etag = compute_etag(request.path, normalized_query(request.args), versions, tables, bucket,
+                                current_app.config.get('ETAG_SALT', ''))
+            updated = [versions[name][1] for name in tables if name in versions]
+            last_modified = datetime.fromtimestamp(max(updated + [bucket * bucket_seconds]), timezone.utc).replace(microsecond=0)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            elif request.if_modified_since:
+                not_modified = last_modified <= request.if_modified_since
+            else:
+                not_modified = False
+
+            cached = None if not_modified else payload_cache.get(etag)
+            if not_modified:
+                response = make_response('', 304)
+            elif cached is not None:
+                body, mimetype = cached
+                response = current_app.response_class(body, mimetype=mimetype)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if response.get_etag()[0]:
+                    # View kendi sürümünü bildirdi (ör. veriden geride kalan snapshot)
+                    response.headers['Cache-Control'] = 'no-cache'
+                    return response
+                if not response.is_streamed and not response.direct_passthrough:
+                    payload_cache.put(etag, 'identity', response.get_data(), response.mimetype)
+            response.set_etag(etag)
+            response.headers['Last-Modified'] = format_datetime(last_modified, usegmt=True)
+            # İstemci her seferinde doğrular; değişmediyse yanıt sadece başlıklardan oluşur
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'instance/data.db'
+    for name, (version, updated_at) in sorted(get_reader(db_path).get_versions().items()):
+        print(f"{name}: v{version} ({datetime.fromtimestamp(updated_at).isoformat()})")
@@ -10,6 +10,9 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.sector_detector import SectorDetector
+from utils.domain_normalizer import backfill_domain_columns
+from utils.entity_resolution import EntityResolver
+from utils.timestamps import backfill_timestamp_columns
 
 class DatabaseMigration:
     def __init__(self, db_path="instance/data.db"):
@@ -34,7 +37,11 @@ class DatabaseMigration:
             "data_type_leaked TEXT",
             "hack_date DATETIME",
             "created_at DATETIME DEFAULT CURRENT_TIMESTAMP",
-            "updated_at DATETIME DEFAULT CURRENT_TIMESTAMP"
+            "updated_at DATETIME DEFAULT CURRENT_TIMESTAMP",
+            "victim_domain TEXT",
+            "victim_tld TEXT",
+            "discovered_ts INTEGER",
+            "published_ts INTEGER"
         ]
         
         for column in new_columns:
@@ -193,6 +200,8 @@ class DatabaseMigration:
             "CREATE INDEX IF NOT EXISTS idx_posts_country ON posts(country)",
             "CREATE INDEX IF NOT EXISTS idx_posts_created_at ON posts(created_at)",
             "CREATE INDEX IF NOT EXISTS idx_posts_impact_level ON posts(impact_level)",
+            "CREATE INDEX IF NOT EXISTS idx_posts_victim_domain ON posts(victim_domain)",
+            "CREATE INDEX IF NOT EXISTS idx_posts_victim_tld ON posts(victim_tld)",
             "CREATE INDEX IF NOT EXISTS idx_hacked_companies_sector ON hacked_companies(sector)",
             "CREATE INDEX IF NOT EXISTS idx_hacked_companies_country_code ON hacked_companies(country_code)",
             "CREATE INDEX IF NOT EXISTS idx_hacked_companies_hack_date ON hacked_companies(hack_date)",
@@ -225,6 +234,18 @@ class DatabaseMigration:
             # 3. Indexleri oluştur
             self.create_indexes()
             
+            # 4. Alan adı sütunlarını toplu doldur
+            updated = backfill_domain_columns(self.conn)
+            print(f"✓ {updated} post için alan adı sütunları dolduruldu")
+            
+            # 5. Tarih sütunlarını epoch değerlerine çevir (kapsayan indeksler dahil)
+            updated = backfill_timestamp_columns(self.conn)
+            print(f"✓ {updated} tarih değeri epoch sütunlarına yazıldı")
+            
+            # 6. Şirket varlık çözümlemesi (geçmiş postlar için toplu mod)
+            resolved = EntityResolver(self.conn).resolve_history()
+            print(f"✓ {resolved} post şirket kimliklerine bağlandı")
+            
             print("=" * 50)
             print("MİGRASYON TAMAMLANDI!")
             print("=" * 50)
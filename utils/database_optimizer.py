@@ -6,6 +6,7 @@ Database indexing ve query optimizasyonu
 from models.DBModel import db, Post, HackedCompany, SocialMediaPost
 from sqlalchemy import text, Index
 from datetime import datetime, timedelta
+import re
 import time
 
 class DatabaseOptimizer:
@@ -42,14 +43,39 @@ class DatabaseOptimizer:
             "CREATE INDEX IF NOT EXISTS idx_social_media_posts_platform_type ON social_media_posts(platform, content_type)",
         ]
     
+    def managed_index_names(self):
+        """Sabit listedeki indeks adları (danışman bunları kaldırmayı önerebilir)"""
+        return [query.split(' ON')[0].split()[-1] for query in self.optimization_queries]
+    
+    def _missing_columns(self, connection, query):
+        """İndeksin tabloda bulunmayan sütunları (şema varyantlarında company_name gibi)"""
+        table, columns = re.search(r"ON (\w+)\((.*)\)", query).groups()
+        existing = {row[1] for row in connection.execute(text(f"PRAGMA table_info({table})"))}
+        return [column.strip() for column in columns.split(',') if column.strip() not in existing]
+    
+    def advisor_dropped_indexes(self, report_path=None):
+        """İndeks danışmanının kaldırdığı indeksler (sabit liste bunları yeniden oluşturmaz)"""
+        from utils.index_advisor import IndexAdvisor, DEFAULT_REPORT_PATH
+        report = IndexAdvisor(report_path=report_path or DEFAULT_REPORT_PATH).load_report() or {}
+        return {r['name'] for r in report.get('recommendations', [])
+                if r['action'] == 'drop' and r.get('applied_at')}
+    
     def create_indexes(self):
         """Tüm optimizasyon indekslerini oluştur"""
         print("Database indeksleri oluşturuluyor...")
         start_time = time.time()
         
         try:
+            dropped = self.advisor_dropped_indexes()
             with db.engine.connect() as connection:
                 for query in self.optimization_queries:
+                    if query.split(' ON')[0].split()[-1] in dropped:
+                        print(f"- {query.split('idx_')[1].split(' ON')[0]} atlandı (indeks danışmanı kaldırdı)")
+                        continue
+                    missing = self._missing_columns(connection, query)
+                    if missing:
+                        print(f"- {query.split('idx_')[1].split(' ON')[0]} atlandı (eksik sütun: {', '.join(missing)})")
+                        continue
                     try:
                         connection.execute(text(query))
                         print(f"✓ {query.split('idx_')[1].split(' ON')[0]} indeksi oluşturuldu")
@@ -99,6 +125,52 @@ class DatabaseOptimizer:
                 'timestamp': datetime.utcnow().isoformat()
             }
     
+    def get_index_advisor(self, min_speedup=None, report_path=None):
+        """Canlı veritabanı ve uygulamanın iş yükü için indeks danışmanı"""
+        from utils.index_advisor import IndexAdvisor, workload_recorder, MIN_SPEEDUP, DEFAULT_REPORT_PATH
+        return IndexAdvisor(
+            db.engine.url.database,
+            recorder=workload_recorder,
+            managed_indexes=self.managed_index_names(),
+            min_speedup=min_speedup or MIN_SPEEDUP,
+            report_path=report_path or DEFAULT_REPORT_PATH
+        )
+    
+    def run_index_advisor(self, min_speedup=None, report_path=None):
+        """İş yükünü karalama kopyasında ölç ve eklenecek/kaldırılacak indeksleri raporla"""
+        return self.get_index_advisor(min_speedup, report_path).analyze()
+    
+    def start_index_advisor(self, min_speedup=None, report_path=None):
+        """Analizi arka planda başlat; (durum, başlatıldı mı) döner"""
+        from utils.index_advisor import start_analysis
+        return start_analysis(self.get_index_advisor(min_speedup, report_path))
+    
+    def apply_advisor_recommendations(self, min_speedup=None, report_path=None, max_age=None, refresh=False):
+        """
+        Sadece danışmanın onayladığı değişiklikleri uygula. Rapor yoksa, max_age'den eskiyse,
+        şema rapordan sonra değiştiyse veya refresh istenirse hiçbir şey uygulanmaz; analiz
+        arka planda başlatılır ve sonuçta 'refused' nedeni döner.
+        """
+        from utils.index_advisor import MAX_REPORT_AGE
+        advisor = self.get_index_advisor(min_speedup, report_path)
+        report = advisor.load_report()
+        problem = 'Yeni analiz istendi' if refresh else advisor.report_problem(report, max_age or MAX_REPORT_AGE)
+        if problem:
+            analysis, _ = self.start_index_advisor(min_speedup, report_path)
+            return {
+                'report_generated_at': report['generated_at'] if report else None,
+                'applied': [],
+                'refused': problem,
+                'analysis': analysis
+            }
+        applied = advisor.apply_approved(report)
+        return {
+            'report_generated_at': report['generated_at'],
+            'statements_analyzed': report['statements_analyzed'],
+            'applied': applied,
+            'skipped': [r['name'] for r in report['recommendations'] if not r['approved']]
+        }
+    
     def get_table_statistics(self):
         """Tablo istatistiklerini al"""
         try:
@@ -201,17 +273,41 @@ class DatabaseOptimizer:
         
         return optimizations
     
-    def vacuum_database(self):
-        """Database'i temizle ve optimize et (SQLite için)"""
+    def get_maintenance_scheduler(self):
+        """Canlı veritabanı için bakım zamanlayıcısı"""
+        from utils.db_maintenance import MaintenanceScheduler
+        return MaintenanceScheduler(db.engine.url.database)
+    
+    def get_maintenance_stats(self, detailed=False):
+        """Boş sayfa, auto_vacuum modu ve parçalanma istatistikleri"""
+        scheduler = self.get_maintenance_scheduler()
+        try:
+            return scheduler.get_stats(detailed=detailed)
+        finally:
+            scheduler.close()
+    
+    def vacuum_database(self, full=False):
+        """
+        Database'i temizle ve optimize et (SQLite için). Varsayılan olarak süre sınırlı
+        incremental vacuum + ANALYZE yapılır; tüm dosyayı yeniden yazan ve yazarları
+        kilitleyen tam VACUUM sadece full=True ile çalışır.
+        """
         try:
             print("Database temizleme işlemi başlatılıyor...")
             start_time = time.time()
             
-            with db.engine.connect() as connection:
-                # SQLite VACUUM komutu
-                connection.execute(text("VACUUM"))
-                connection.execute(text("ANALYZE"))
-                connection.commit()
+            if full:
+                with db.engine.connect() as connection:
+                    # SQLite VACUUM komutu
+                    connection.execute(text("VACUUM"))
+                    connection.execute(text("ANALYZE"))
+                    connection.commit()
+            else:
+                scheduler = self.get_maintenance_scheduler()
+                try:
+                    scheduler.run(force=True, analyze=True)
+                finally:
+                    scheduler.close()
             
             end_time = time.time()
             print(f"Database temizleme tamamlandı ({end_time - start_time:.2f} saniye)")
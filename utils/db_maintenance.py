@@ -0,0 +1,316 @@
+# Veritabanı Bakım Zamanlayıcısı
+# Tam VACUUM yerine auto_vacuum=INCREMENTAL ile boş sayfaları sessiz dönemlerde küçük
+# adımlarla geri verir; büyük ingest ve arşiv taşımalarından sonra ANALYZE / PRAGMA optimize
+# çalıştırır ve parçalanma / boş sayfa istatistiklerini raporlar.
+
+import sys
+import os
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.post_archive import attach_archive
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_STATE_PATH = os.path.join(PROJECT_ROOT, 'cache', 'db_maintenance.json')
+
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
+# ANALYZE'ın her indeks için inceleyeceği yaklaşık satır sayısı (büyük tablolarda süreyi sınırlar)
+ANALYSIS_LIMIT = 1000
+
+
+class MaintenanceScheduler:
+    def __init__(self, db_path='instance/data.db', state_path=None, pages_per_step=256,
+                 step_sleep=0.05, max_seconds=5.0, quiet_seconds=120, analyze_threshold=1000,
+                 min_free_pages=64):
+        """
+        pages_per_step: tek yazma işleminde geri verilen boş sayfa sayısı
+        max_seconds: bir bakım turunda incremental vacuum'a ayrılan en uzun süre
+        quiet_seconds: bu kadar süre yazma görülmezse veritabanı sessiz kabul edilir
+        analyze_threshold: bu kadar satır değiştikten sonra ANALYZE çalıştırılır
+        min_free_pages: bundan az boş sayfa varsa vacuum yapılmaz
+        auto_vacuum kapalı veritabanları zamanlayıcı tarafından çevrilmez; tek seferlik tam
+        VACUUM dönüşümü operatör adımıdır: python utils/db_maintenance.py <db> --convert-incremental
+        """
+        self.db_path = db_path
+        self.state_path = state_path or DEFAULT_STATE_PATH
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.max_seconds = max_seconds
+        self.quiet_seconds = quiet_seconds
+        self.analyze_threshold = analyze_threshold
+        self.min_free_pages = min_free_pages
+        self.lock = threading.Lock()
+        self.state = self._load_state()
+        self._monitor = None
+        self._data_version = None
+
+    # --- Durum ---
+
+    def _load_state(self):
+        state = {
+            'changed_rows': 0,
+            'last_write_seen_at': None,
+            'last_analyze_at': None,
+            'last_optimize_at': None,
+            'last_vacuum_at': None,
+            'last_run': None,
+            'converted_at': None,
+            'pages_reclaimed_total': 0
+        }
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    state.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+        return state
+
+    def _save_state(self):
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            print(f"[{datetime.now()}] Bakım durumu yazılamadı: {e}")
+
+    def record_changes(self, rows):
+        """Ingest ve arşiv işlerinin değiştirdiği satır sayısını biriktirir"""
+        if not rows:
+            return
+        with self.lock:
+            self.state['changed_rows'] += rows
+            self.state['last_write_seen_at'] = time.time()
+            self._save_state()
+
+    # --- Sessiz dönem tespiti ---
+
+    def _connect(self, timeout=0.1):
+        conn = sqlite3.connect(self.db_path, timeout=timeout, isolation_level=None)
+        attach_archive(conn, must_exist=True)
+        return conn
+
+    def _writes_since_last_check(self):
+        """
+        PRAGMA data_version başka bir bağlantı commit ettiğinde değişir; kalıcı bir izleme
+        bağlantısıyla son kontrolden bu yana yazma olup olmadığı ucuza anlaşılır.
+        """
+        if self._monitor is None:
+            self._monitor = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        version = self._monitor.execute("PRAGMA data_version").fetchone()[0]
+        changed = self._data_version is not None and version != self._data_version
+        self._data_version = version
+        if changed:
+            self.state['last_write_seen_at'] = time.time()
+        return changed
+
+    def _skip_own_writes(self):
+        """Kendi commit'lerimizden (ANALYZE, PRAGMA optimize) sonra izleme noktasını yazma saymadan ilerletir"""
+        if self._monitor is not None:
+            self._data_version = self._monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def is_quiet(self):
+        self._writes_since_last_check()
+        last_write = self.state.get('last_write_seen_at')
+        return last_write is None or time.time() - last_write >= self.quiet_seconds
+
+    # --- İstatistikler ---
+
+    def _schemas(self, conn):
+        return [row[1] for row in conn.execute("PRAGMA database_list") if row[1] != 'temp']
+
+    def _leaf_fragmentation(self, conn, schema):
+        """
+        dbstat ile tablo/indeks yaprak sayfalarının B-ağacı sırasında dosyada ardışık
+        olmayan oranı (0 = sıralı, 1 = tamamen dağınık). dbstat yoksa None.
+        """
+        try:
+            rows = conn.execute(
+                "SELECT name, pageno FROM dbstat(?) WHERE pagetype = 'leaf' ORDER BY name, path",
+                (schema,)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return None
+        jumps, pairs, previous = 0, 0, (None, None)
+        for name, pageno in rows:
+            if name == previous[0]:
+                pairs += 1
+                if pageno != previous[1] + 1:
+                    jumps += 1
+            previous = (name, pageno)
+        return round(jumps / pairs, 3) if pairs else 0.0
+
+    def get_stats(self, detailed=False):
+        """Şema bazında sayfa, boş sayfa ve (detailed=True ise) parçalanma istatistikleri"""
+        conn = self._connect(timeout=5)
+        try:
+            schemas = {}
+            for schema in self._schemas(conn):
+                page_size = conn.execute(f"PRAGMA {schema}.page_size").fetchone()[0]
+                page_count = conn.execute(f"PRAGMA {schema}.page_count").fetchone()[0]
+                free_pages = conn.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+                auto_vacuum = conn.execute(f"PRAGMA {schema}.auto_vacuum").fetchone()[0]
+                schemas[schema] = {
+                    'auto_vacuum': AUTO_VACUUM_MODES.get(auto_vacuum, auto_vacuum),
+                    'page_size': page_size,
+                    'page_count': page_count,
+                    'free_pages': free_pages,
+                    'free_ratio': round(free_pages / page_count, 4) if page_count else 0.0,
+                    'size_mb': round(page_count * page_size / 1048576, 2),
+                    'reclaimable_mb': round(free_pages * page_size / 1048576, 2)
+                }
+                if detailed:
+                    schemas[schema]['leaf_fragmentation'] = self._leaf_fragmentation(conn, schema)
+        finally:
+            conn.close()
+        return {'schemas': schemas, **self.state}
+
+    # --- Bakım adımları ---
+
+    def ensure_incremental(self, conn, schema):
+        """
+        auto_vacuum modunu INCREMENTAL yapar. Dolu bir veritabanında mod değişikliği ancak
+        bir VACUUM ile geçerli olur; dosyayı yeniden yazar ve süresince yazarları kilitler.
+        Sadece convert_to_incremental (CLI) üzerinden, collector durdurulmuşken çalıştırılır.
+        """
+        mode = conn.execute(f"PRAGMA {schema}.auto_vacuum").fetchone()[0]
+        if mode == 2:
+            return False
+        conn.execute(f"PRAGMA {schema}.auto_vacuum = INCREMENTAL")
+        if schema == 'main':
+            conn.execute("VACUUM")
+        else:
+            conn.execute(f"VACUUM {schema}")
+        self.state['converted_at'] = datetime.now().isoformat()
+        print(f"[{datetime.now()}] {schema} veritabanı auto_vacuum=INCREMENTAL moduna çevrildi")
+        return True
+
+    def incremental_vacuum(self, conn, schema, deadline):
+        """
+        Boş sayfaları pages_per_step'lik kısa yazma işlemleriyle geri verir. Kilit alınamazsa
+        veya araya başka bir yazma girerse tur bırakılır; kalan sayfalar bir sonraki tura kalır.
+        """
+        reclaimed = 0
+        # INCREMENTAL modda olmayan veritabanında pragma hiçbir şey yapmaz
+        if conn.execute(f"PRAGMA {schema}.auto_vacuum").fetchone()[0] != 2:
+            return reclaimed
+        while time.time() < deadline:
+            free_pages = conn.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+            if free_pages == 0:
+                break
+            # incremental_vacuum her adımda (sqlite3_step) tek sayfa verir; execute() sadece
+            # ilk adımı çalıştırdığı için pragma executescript ile sonuna kadar yürütülür
+            try:
+                conn.executescript(f"""
+                    BEGIN IMMEDIATE;
+                    PRAGMA {schema}.incremental_vacuum({min(self.pages_per_step, free_pages)});
+                    COMMIT;
+                """)
+            except sqlite3.OperationalError:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                break
+            step_reclaimed = free_pages - conn.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+            if step_reclaimed <= 0:
+                break
+            reclaimed += step_reclaimed
+            # Kendi commit'imizi yazma olarak saymamak için izleme noktası burada yenilenir
+            self._writes_since_last_check()
+            time.sleep(self.step_sleep)
+            if self._writes_since_last_check():
+                break
+        return reclaimed
+
+    def convert_to_incremental(self):
+        """Tek seferlik operatör adımı: INCREMENTAL olmayan tüm şemaları çevirir"""
+        with self.lock:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            attach_archive(conn, must_exist=True)
+            try:
+                converted = [schema for schema in self._schemas(conn) if self.ensure_incremental(conn, schema)]
+            finally:
+                conn.close()
+            self._save_state()
+            return converted
+
+    def analyze(self, conn):
+        """Sınırlı örneklemle ANALYZE; ardından planlayıcı için PRAGMA optimize"""
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        for schema in self._schemas(conn):
+            conn.execute(f"ANALYZE {schema}")
+        conn.execute("PRAGMA optimize")
+        self.state['changed_rows'] = 0
+        self.state['last_analyze_at'] = self.state['last_optimize_at'] = datetime.now().isoformat()
+
+    def run(self, force=False, analyze=False):
+        """
+        Bir bakım turu: büyük değişikliklerden sonra ANALYZE, her turda PRAGMA optimize,
+        sessiz dönemdeyse (veya force=True) incremental vacuum. analyze=True eşikten
+        bağımsız olarak ANALYZE çalıştırır.
+        """
+        with self.lock:
+            started = time.time()
+            result = {'analyzed': False, 'reclaimed_pages': {}, 'skipped': None, 'not_incremental': []}
+            conn = self._connect()
+            try:
+                # Başkalarının yazmaları önce kaydedilir; ardından gelen kendi commit'lerimiz sayılmaz
+                self._writes_since_last_check()
+                if analyze or self.state['changed_rows'] >= self.analyze_threshold:
+                    self.analyze(conn)
+                    result['analyzed'] = True
+                else:
+                    conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+                    conn.execute("PRAGMA optimize")
+                    self.state['last_optimize_at'] = datetime.now().isoformat()
+                self._skip_own_writes()
+
+                if not force and not self.is_quiet():
+                    result['skipped'] = 'veritabanı son yazmadan beri sessiz değil'
+                else:
+                    deadline = started + self.max_seconds
+                    for schema in self._schemas(conn):
+                        free_pages = conn.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+                        if conn.execute(f"PRAGMA {schema}.auto_vacuum").fetchone()[0] != 2:
+                            # Boş sayfalar ancak --convert-incremental sonrası adım adım geri alınabilir
+                            result['not_incremental'].append(schema)
+                            continue
+                        if free_pages >= self.min_free_pages or force:
+                            result['reclaimed_pages'][schema] = self.incremental_vacuum(conn, schema, deadline)
+                    reclaimed = sum(result['reclaimed_pages'].values())
+                    if reclaimed:
+                        self.state['pages_reclaimed_total'] += reclaimed
+                        self.state['last_vacuum_at'] = datetime.now().isoformat()
+            finally:
+                conn.close()
+
+            result['duration_seconds'] = round(time.time() - started, 3)
+            self.state['last_run'] = {'at': datetime.now().isoformat(), **result}
+            self._save_state()
+            return result
+
+    def close(self):
+        if self._monitor is not None:
+            self._monitor.close()
+            self._monitor = None
+
+
+if __name__ == "__main__":
+    # python utils/db_maintenance.py [db] [--convert-incremental]
+    # --convert-incremental: tek seferlik tam VACUUM dönüşümü; collector durdurulmuşken çalıştırın
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    db = args[0] if args else 'instance/data.db'
+    scheduler = MaintenanceScheduler(db)
+    if '--convert-incremental' in sys.argv:
+        print(f"INCREMENTAL moda çevrilen şemalar: {scheduler.convert_to_incremental() or 'yok'}")
+    print(scheduler.run(force=True))
+    print(json.dumps(scheduler.get_stats(detailed=True), ensure_ascii=False, indent=2))
+    scheduler.close()
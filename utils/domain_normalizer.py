@@ -0,0 +1,240 @@
+# Alan Adı Normalizasyonu
+# Public Suffix List'ten derlenen bir trie ile website/başlık alanlarından
+# kayıt edilebilir alan adını (acme.com.tr) ve ülke uzantısını (tr) çıkarır
+
+import sys
+import os
+import re
+import sqlite3
+from functools import lru_cache
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Public Suffix List dosyasının aranacağı yerler (ilk bulunan kullanılır)
+PUBLIC_SUFFIX_LIST_PATHS = [
+    os.getenv('PUBLIC_SUFFIX_LIST', ''),
+    os.path.join(PROJECT_ROOT, 'instance', 'public_suffix_list.dat'),
+    '/usr/share/publicsuffix/public_suffix_list.dat'
+]
+
+# Liste bulunamazsa kullanılan asgari kurallar (TR ve sık görülen ikinci seviye alanlar)
+FALLBACK_RULES = """
+com
+net
+org
+edu
+gov
+info
+biz
+io
+co
+tr
+com.tr
+net.tr
+org.tr
+edu.tr
+gov.tr
+k12.tr
+bel.tr
+gen.tr
+av.tr
+dr.tr
+bbs.tr
+biz.tr
+info.tr
+web.tr
+tv.tr
+tsk.tr
+pol.tr
+name.tr
+kep.tr
+uk
+co.uk
+org.uk
+ac.uk
+gov.uk
+au
+com.au
+net.au
+org.au
+br
+com.br
+jp
+co.jp
+in
+co.in
+za
+co.za
+mx
+com.mx
+ar
+com.ar
+"""
+
+HOST_PATTERN = re.compile(r'(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z][a-z0-9-]{1,62}')
+
+# Alan adı bulunamayan satırlarda backfill'in tekrar işlememesi için kullanılan değer
+NO_DOMAIN = ''
+
+
+class PublicSuffixTrie:
+    """
+    Etiketleri sağdan sola (tr -> com -> ...) dolaşan trie.
+    Wildcard (*.ck) ve istisna (!www.ck) kuralları PSL algoritmasına göre desteklenir.
+    """
+    RULE = '$'
+    EXCEPTION = '!'
+
+    def __init__(self):
+        self.root = {}
+        self.rule_count = 0
+
+    def add_rule(self, rule):
+        rule = rule.strip().lower()
+        if not rule or rule.startswith('//'):
+            return
+        rule = rule.split()[0]
+        marker = self.RULE
+        if rule.startswith('!'):
+            marker = self.EXCEPTION
+            rule = rule[1:]
+        try:
+            rule = rule.encode('idna').decode('ascii')
+        except UnicodeError:
+            pass
+        node = self.root
+        for label in reversed(rule.split('.')):
+            node = node.setdefault(label, {})
+        node[marker] = True
+        self.rule_count += 1
+
+    def load(self, lines):
+        for line in lines:
+            self.add_rule(line)
+        return self
+
+    def suffix_length(self, labels):
+        """
+        Ters çevrilmiş etiket listesinde public suffix'in kaç etiket olduğunu döndürür.
+        Hiçbir kural eşleşmezse PSL varsayılanı olan '*' (tek etiket) uygulanır.
+        """
+        node = self.root
+        match = 1
+        for depth, label in enumerate(labels, 1):
+            if label in node:
+                node = node[label]
+                if node.get(self.EXCEPTION):
+                    return depth - 1
+                if node.get(self.RULE):
+                    match = depth
+            elif '*' in node:
+                node = node['*']
+                if node.get(self.RULE):
+                    match = depth
+            else:
+                break
+        return match
+
+
+def _load_trie():
+    for path in PUBLIC_SUFFIX_LIST_PATHS:
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return PublicSuffixTrie().load(f)
+    return PublicSuffixTrie().load(FALLBACK_RULES.splitlines())
+
+
+_trie = None
+
+
+def get_suffix_trie():
+    """Trie'yi ilk kullanımda bir kez derler"""
+    global _trie
+    if _trie is None:
+        _trie = _load_trie()
+    return _trie
+
+
+def extract_host(value):
+    """Serbest metin, URL veya alan adından host kısmını çıkarır (urlparse kullanmadan)"""
+    if not value or value == 'None':
+        return None
+    text = str(value).strip().lower()
+    scheme_end = text.find('://')
+    if scheme_end != -1:
+        text = text[scheme_end + 3:]
+    match = HOST_PATTERN.search(text)
+    return match.group(0) if match else None
+
+
+@lru_cache(maxsize=65536)
+def split_host(host):
+    """Host için (kayıt edilebilir alan adı, tld) döndürür; onion ve suffix'in kendisi için (None, None)"""
+    if not host:
+        return None, None
+    labels = host.strip('.').split('.')
+    if len(labels) < 2 or labels[-1] == 'onion':
+        return None, None
+    suffix_length = get_suffix_trie().suffix_length(list(reversed(labels)))
+    if suffix_length >= len(labels):
+        return None, None
+    return '.'.join(labels[-(suffix_length + 1):]), labels[-1]
+
+
+def split_domain(value):
+    """Website veya başlıktan (kayıt edilebilir alan adı, tld) döndürür"""
+    return split_host(extract_host(value))
+
+
+def registrable_domain(value):
+    """shop.acme.com.tr -> acme.com.tr"""
+    return split_domain(value)[0]
+
+
+def domain_label(value):
+    """Kayıt edilebilir alan adının suffix öncesi etiketi: shop.acme.com.tr -> acme"""
+    domain = registrable_domain(value)
+    return domain.split('.')[0] if domain else None
+
+
+def victim_domain_for(title, website):
+    """Post için (victim_domain, victim_tld); önce website, sonra başlık denenir"""
+    domain, tld = split_domain(website)
+    if domain is None:
+        domain, tld = split_domain(title)
+    return domain or NO_DOMAIN, tld or NO_DOMAIN
+
+
+def ensure_domain_columns(conn):
+    """posts tablosuna victim_domain / victim_tld sütunlarını ve indekslerini ekler"""
+    for column in ('victim_domain', 'victim_tld'):
+        try:
+            conn.execute(f"ALTER TABLE posts ADD COLUMN {column} TEXT")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" not in str(e):
+                raise
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_victim_domain ON posts(victim_domain)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_victim_tld ON posts(victim_tld)")
+
+
+def backfill_domain_columns(conn, batch_size=5000):
+    """Alan adı sütunu boş olan mevcut postları toplu olarak doldurur"""
+    ensure_domain_columns(conn)
+    rows = conn.execute("SELECT id, title, website FROM posts WHERE victim_tld IS NULL").fetchall()
+    updated = 0
+    for start in range(0, len(rows), batch_size):
+        batch = [(*victim_domain_for(title, website), post_id) for post_id, title, website in rows[start:start + batch_size]]
+        conn.executemany("UPDATE posts SET victim_domain = ?, victim_tld = ? WHERE id = ?", batch)
+        conn.commit()
+        updated += len(batch)
+    return updated
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(sys.argv[1] if len(sys.argv) > 1 else 'instance/data.db')
+    count = backfill_domain_columns(conn)
+    print(f"✅ {count} post için alan adı sütunları dolduruldu ({get_suffix_trie().rule_count} suffix kuralı)")
+    conn.close()
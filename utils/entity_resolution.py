@@ -0,0 +1,450 @@
+# Şirket Varlık Çözümleme
+# Aynı şirketin farklı yazımlarını ("Acme Corp", "ACME Corporation", "acme.com.tr")
+# karakter shingle MinHash imzaları ve LSH indeksi ile tek bir company_id altında toplar.
+# Kayıt edilebilir alan adları farklı olan kayıtlar (astate.edu / k-state.edu) ad benzerliği
+# ne olursa olsun birleştirilmez; alan adı, ad benzerliğinden daha güçlü bir kanıttır.
+
+import sys
+import os
+import zlib
+import sqlite3
+import numpy as np
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.domain_normalizer import split_domain, HOST_PATTERN
+from utils.victim_dedup import normalize_company_name
+from utils.post_archive import connect_with_archive
+from utils.sql_instrumentation import connect
+
+# Mersenne asal sayısı; permütasyon hash'leri bu mod üzerinden hesaplanır
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+# İmza uzunluğu ve LSH bant sayısı (32 bant x 2 satır: 0.5 Jaccard üzerindeki çiftlerin
+# aday olarak kaçırılma olasılığı ~%0.01, adaylar imza benzerliği ile ayrıca doğrulanır)
+NUM_PERM = 64
+BANDS = 32
+
+
+def entity_text(title, website):
+    """
+    Eşleştirmede kullanılacak metni ve alan adını döndürür.
+    Başlık bir alan adıysa (acme.com.tr) suffix öncesi etiket (acme) ad olarak kullanılır.
+    """
+    domain = split_domain(website)[0] or split_domain(title)[0]
+    title_text = str(title or '').strip().lower()
+    if not title_text or title_text == 'none' or '://' in title_text or HOST_PATTERN.fullmatch(title_text):
+        name = domain.split('.')[0] if domain else None
+    else:
+        name = normalize_company_name(title)
+    return name, domain
+
+
+def shingles(text, k=3):
+    """Baş/son işaretli karakter k-gram'larının kararlı (crc32) hash'leri"""
+    padded = f"^{text}$"
+    if len(padded) <= k:
+        return {zlib.crc32(padded.encode('utf-8'))}
+    return {zlib.crc32(padded[i:i + k].encode('utf-8')) for i in range(len(padded) - k + 1)}
+
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=42):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def _permute(self, hashes):
+        # a * h + b kasıtlı olarak 2^64'te taşar; küçük a değerleri permütasyonları
+        # neredeyse doğrusal ve birbirine bağımlı yapacağı için a tüm [1, p) aralığından seçilir
+        with np.errstate(over='ignore'):
+            return (np.outer(self.a, hashes) + self.b[:, None]) % MERSENNE_PRIME
+
+    def signature(self, shingle_hashes):
+        """Tek bir shingle kümesinin MinHash imzası (uint32 dizisi)"""
+        hashes = np.fromiter(shingle_hashes, dtype=np.uint64)
+        return (self._permute(hashes).min(axis=1) & MAX_HASH).astype(np.uint32)
+
+    def signatures(self, shingle_sets):
+        """
+        Birden fazla kümenin imzasını tek seferde hesaplar (geçmiş verinin batch işlenmesi için).
+        Tüm shingle'lar tek dizide birleştirilir, kümeler reduceat ile ayrı ayrı indirgenir.
+        """
+        shingle_sets = [list(s) for s in shingle_sets]
+        if not shingle_sets:
+            return []
+        offsets = np.cumsum([0] + [len(s) for s in shingle_sets[:-1]])
+        hashes = np.fromiter((h for s in shingle_sets for h in s), dtype=np.uint64)
+        minima = np.minimum.reduceat(self._permute(hashes), offsets, axis=1)
+        signatures = (minima & MAX_HASH).astype(np.uint32)
+        return [signatures[:, i].copy() for i in range(len(shingle_sets))]
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        """İmzalar üzerinden tahmini Jaccard benzerliği"""
+        return float(np.mean(sig_a == sig_b))
+
+
+class EntityResolver:
+    def __init__(self, conn, num_perm=NUM_PERM, bands=BANDS, threshold=0.5):
+        """
+        conn: posts tablosunu içeren sqlite3 bağlantısı
+        bands x rows = num_perm olmalıdır
+        threshold: aday şirketle birleştirmek için gereken tahmini benzerlik
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm bands'e tam bölünmelidir")
+        self.conn = conn
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self._aliases = None
+        self._domains = None
+        self._buckets = None
+        self._signatures = None
+        # Batch modda LSH satırları biriktirilip sıralı yazılır (rastgele B-tree eklemeleri yerine)
+        self._pending_buckets = None
+        self.ensure_schema()
+        self._has_hacked_companies = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hacked_companies'").fetchone() is not None
+
+    def ensure_schema(self):
+        """companies, alias ve LSH bucket tabloları ile posts.company_id sütununu oluşturur"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS companies (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                canonical_name TEXT NOT NULL,
+                canonical_domain TEXT,
+                signature BLOB NOT NULL,
+                post_count INTEGER NOT NULL DEFAULT 0,
+                first_seen TEXT,
+                last_seen TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS company_aliases (
+                alias TEXT PRIMARY KEY,
+                company_id INTEGER NOT NULL,
+                FOREIGN KEY (company_id) REFERENCES companies (id)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS company_lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                company_id INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, company_id)
+            ) WITHOUT ROWID
+        """)
+        for table in ('posts', 'hacked_companies'):
+            try:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN company_id INTEGER")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name" in str(e) or "no such table" in str(e):
+                    continue
+                raise
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_company_id ON posts(company_id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_companies_post_count ON companies(post_count)")
+
+    def _load(self):
+        """Alias, LSH bucket ve imzaları belleğe alır (ilk kullanımda bir kez)"""
+        if self._aliases is not None:
+            return
+        self._aliases = dict(self.conn.execute("SELECT alias, company_id FROM company_aliases"))
+        self._domains = {}
+        for alias, company_id in self._aliases.items():
+            if alias.startswith('d:'):
+                self._domains.setdefault(company_id, set()).add(alias[2:])
+        self._buckets = {}
+        for band, bucket, company_id in self.conn.execute("SELECT band, bucket, company_id FROM company_lsh_buckets"):
+            self._buckets.setdefault((band, bucket), set()).add(company_id)
+        self._signatures = {company_id: np.frombuffer(blob, dtype=np.uint32)
+                            for company_id, blob in self.conn.execute("SELECT id, signature FROM companies")}
+
+    def _band_keys(self, signature):
+        data = signature.tobytes()
+        width = self.rows * signature.itemsize
+        return [(band, zlib.crc32(data[band * width:(band + 1) * width])) for band in range(self.bands)]
+
+    def _aliases_for(self, name, domain):
+        aliases = []
+        if domain:
+            aliases.append('d:' + domain)
+        if name:
+            aliases.append('n:' + name)
+        return aliases
+
+    def _conflicts(self, company_id, domain):
+        """Postun ve şirketin alan adı var ve farklıysa True"""
+        if not domain:
+            return False
+        domains = self._domains.get(company_id)
+        return bool(domains) and domain not in domains
+
+    def match(self, name, domain, signature=None, band_keys=None):
+        """Kayıt oluşturmadan eşleşen company_id'yi bulur (yoksa None)"""
+        self._load()
+        for alias in self._aliases_for(name, domain):
+            company_id = self._aliases.get(alias)
+            if company_id is not None and not self._conflicts(company_id, domain):
+                return company_id
+        if not name:
+            return None
+
+        if signature is None:
+            signature = self.hasher.signature(shingles(name))
+        candidates = set()
+        for key in band_keys or self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket:
+                candidates |= bucket
+
+        candidate_ids = [company_id for company_id in candidates if not self._conflicts(company_id, domain)]
+        if not candidate_ids:
+            return None
+        # Aday imzaları tek matriste karşılaştırılır; aday sayısı şirket sayısıyla büyür
+        matrix = np.stack([self._signatures[company_id] for company_id in candidate_ids])
+        scores = (matrix == signature).mean(axis=1)
+        best = int(scores.argmax())
+        return candidate_ids[best] if scores[best] >= self.threshold else None
+
+    def resolve(self, title, website, discovered=None, signature=None):
+        """Postun şirketini bulur veya yeni şirket oluşturur, company_id döndürür"""
+        name, domain = entity_text(title, website)
+        if not name and not domain:
+            return None
+        if signature is None and name:
+            signature = self.hasher.signature(shingles(name))
+        band_keys = self._band_keys(signature) if signature is not None else None
+
+        company_id = self.match(name, domain, signature, band_keys)
+        if company_id is None:
+            if signature is None:
+                signature = self.hasher.signature(shingles(domain))
+                band_keys = self._band_keys(signature)
+            cur = self.conn.execute("""
+                INSERT INTO companies (canonical_name, canonical_domain, signature, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+            """, (str(title or domain).strip(), domain, signature.tobytes(), discovered, discovered))
+            company_id = cur.lastrowid
+            self._signatures[company_id] = signature
+            # Şirket imzası ilk üyeden alınır ve değişmez; böylece company_id'ler kararlı kalır
+            bucket_rows = [(band, bucket, company_id) for band, bucket in band_keys]
+            if self._pending_buckets is not None:
+                self._pending_buckets.extend(bucket_rows)
+            else:
+                self._write_buckets(bucket_rows)
+            for key in band_keys:
+                self._buckets.setdefault(key, set()).add(company_id)
+
+        for alias in self._aliases_for(name, domain):
+            if alias not in self._aliases:
+                self.conn.execute("INSERT OR IGNORE INTO company_aliases (alias, company_id) VALUES (?, ?)",
+                                  (alias, company_id))
+                self._aliases[alias] = company_id
+                if alias.startswith('d:'):
+                    self._domains.setdefault(company_id, set()).add(domain)
+
+        self.conn.execute("""
+            UPDATE companies SET
+                post_count = post_count + 1,
+                canonical_domain = COALESCE(canonical_domain, ?),
+                first_seen = CASE WHEN first_seen IS NULL OR ? < first_seen THEN ? ELSE first_seen END,
+                last_seen = CASE WHEN last_seen IS NULL OR ? > last_seen THEN ? ELSE last_seen END
+            WHERE id = ?
+        """, (domain, discovered, discovered, discovered, discovered, company_id))
+        return company_id
+
+    def _write_buckets(self, rows):
+        self.conn.executemany("INSERT OR IGNORE INTO company_lsh_buckets (band, bucket, company_id) VALUES (?, ?, ?)",
+                              rows)
+
+    def resolve_post(self, post_id, title, website, discovered=None, signature=None):
+        """Ingest sırasında tek bir postu şirketine bağlar (artımlı mod)"""
+        company_id = self.resolve(title, website, discovered, signature)
+        if company_id is not None:
+            self.conn.execute("UPDATE posts SET company_id = ? WHERE id = ?", (company_id, post_id))
+            if self._has_hacked_companies:
+                self.conn.execute("UPDATE hacked_companies SET company_id = ? WHERE post_id = ?",
+                                  (company_id, post_id))
+        return company_id
+
+    def resolve_history(self, batch_size=2000):
+        """
+        Şirkete bağlanmamış tüm geçmiş postları işler (batch mod).
+        İmzalar parti halinde önceden hesaplanır, eşleştirme sırası post id sırasıdır.
+        """
+        rows = self.conn.execute("""
+            SELECT id, title, website, discovered FROM posts
+            WHERE company_id IS NULL ORDER BY id
+        """).fetchall()
+        resolved = 0
+        self._pending_buckets = []
+        try:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                names = [entity_text(title, website)[0] for _, title, website, _ in batch]
+                signatures = self.hasher.signatures(shingles(name) for name in names if name)
+                signature_iter = iter(signatures)
+                for (post_id, title, website, discovered), name in zip(batch, names):
+                    signature = next(signature_iter) if name else None
+                    if self.resolve_post(post_id, title, website, discovered, signature) is not None:
+                        resolved += 1
+                self._pending_buckets.sort()
+                self._write_buckets(self._pending_buckets)
+                self._pending_buckets.clear()
+                self.conn.commit()
+        finally:
+            self._pending_buckets = None
+        return resolved
+
+
+_lookup_hasher = None
+
+
+def find_company_id(conn, name):
+    """
+    Şirket adı, alan adı veya kimliği için company_id; yalnızca tam eşleşme kabul edilir.
+    Bulunamazsa None döner, yakın adaylar find_company_candidates ile listelenir.
+    Rakamlardan oluşan değer önce şirket kimliği olarak denenir, böyle bir şirket yoksa ad olarak aranır.
+    """
+    text = str(name).strip()
+    entity_name, domain = entity_text(text, None)
+    try:
+        if text.isdigit():
+            row = conn.execute("SELECT id FROM companies WHERE id = ?", (int(text),)).fetchone()
+            if row:
+                return row[0]
+        for alias in (['d:' + domain] if domain else []) + (['n:' + entity_name] if entity_name else []):
+            row = conn.execute("SELECT company_id FROM company_aliases WHERE alias = ?", (alias,)).fetchone()
+            if row:
+                return row[0]
+    except sqlite3.OperationalError:
+        return None
+    return None
+
+
+def find_company_candidates(conn, name, threshold=0.5, limit=5):
+    """
+    Tam eşleşmesi olmayan ad için benzer şirketler (LSH adayları, benzerliğe göre azalan).
+    Salt okunurdur; sonuç kullanıcıya seçenek olarak sunulur, hiçbiri otomatik seçilmez.
+    """
+    global _lookup_hasher
+    entity_name, _ = entity_text(name, None)
+    if not entity_name:
+        return []
+    if _lookup_hasher is None:
+        _lookup_hasher = MinHasher()
+    signature = _lookup_hasher.signature(shingles(entity_name))
+    rows_per_band = NUM_PERM // BANDS
+    try:
+        candidates = set()
+        for band in range(BANDS):
+            bucket = zlib.crc32(signature[band * rows_per_band:(band + 1) * rows_per_band].tobytes())
+            candidates.update(row[0] for row in conn.execute(
+                "SELECT company_id FROM company_lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)))
+        if not candidates:
+            return []
+        placeholders = ','.join('?' * len(candidates))
+        rows = conn.execute(f"""
+            SELECT id, canonical_name, canonical_domain, signature FROM companies WHERE id IN ({placeholders})
+        """, list(candidates)).fetchall()
+    except sqlite3.OperationalError:
+        return []
+
+    scored = []
+    for company_id, canonical_name, canonical_domain, blob in rows:
+        score = MinHasher.similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+        if score >= threshold:
+            scored.append({'company_id': company_id, 'name': canonical_name, 'domain': canonical_domain,
+                           'similarity': round(score, 3)})
+    scored.sort(key=lambda item: (-item['similarity'], item['company_id']))
+    return scored[:limit]
+
+
+def get_company_detail(name_or_id, db_path='instance/data.db'):
+    """
+    Şirket bilgisi, saldırı geçmişi ve tehdit aktörleri; şirket bulunamazsa None.
+    Geçmiş, arşive taşınmış postları da kapsar (her iki bölümde company_id indeksli).
+    """
+    conn = connect_with_archive(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        company_id = find_company_id(conn, name_or_id)
+        if company_id is None:
+            return None
+        company = conn.execute("SELECT * FROM companies WHERE id = ?", (company_id,)).fetchone()
+        if company is None:
+            return None
+        posts = [dict(row) for row in conn.execute("""
+            SELECT * FROM all_posts WHERE company_id = ? ORDER BY discovered_ts DESC
+        """, (company_id,))]
+        actors = conn.execute("""
+            SELECT name, COUNT(*) AS attacks, MAX(discovered) AS last_seen
+            FROM all_posts WHERE company_id = ? GROUP BY name ORDER BY attacks DESC
+        """, (company_id,)).fetchall()
+        aliases = [row[0][2:] for row in conn.execute(
+            "SELECT alias FROM company_aliases WHERE company_id = ?", (company_id,))]
+    finally:
+        conn.close()
+
+    return {
+        'company_id': company_id,
+        'name': company['canonical_name'],
+        'domain': company['canonical_domain'],
+        'aliases': sorted(aliases),
+        'post_count': company['post_count'],
+        'first_seen': company['first_seen'],
+        'last_seen': company['last_seen'],
+        'posts': posts,
+        'threat_actors': [{'name': row['name'] or 'Unknown', 'attacks': row['attacks'],
+                           'last_seen': (row['last_seen'] or 'Unknown')[:10]} for row in actors]
+    }
+
+
+def suggest_companies(name, db_path='instance/data.db', limit=5):
+    """Bulunamayan şirket adı için benzer şirket önerileri"""
+    conn = connect(db_path)
+    try:
+        return find_company_candidates(conn, name, limit=limit)
+    finally:
+        conn.close()
+
+
+def get_repeat_victims(db_path='instance/data.db', min_attacks=2, limit=50):
+    """Birden fazla kez saldırıya uğrayan şirketler (post_count indeksi üzerinden)"""
+    conn = connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT id, canonical_name, canonical_domain, post_count, first_seen, last_seen
+            FROM companies WHERE post_count >= ?
+            ORDER BY post_count DESC
+            LIMIT ?
+        """, (min_attacks, limit)).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+    return [{
+        'company_id': row[0],
+        'name': row[1],
+        'domain': row[2],
+        'attacks': row[3],
+        'first_seen': row[4],
+        'last_seen': row[5]
+    } for row in rows]
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(sys.argv[1] if len(sys.argv) > 1 else 'instance/data.db')
+    resolver = EntityResolver(conn)
+    resolved = resolver.resolve_history()
+    companies = conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0]
+    print(f"✅ {resolved} post {companies} şirkete bağlandı")
+    conn.close()
@@ -0,0 +1,267 @@
+# Server-Sent Events Yayıncısı
+# Süreç başına tek bir yayıncı thread'i veri sürümü sayaçlarını (ingest'in artırdığı
+# data_versions) izler; posts değiştiğinde yeni postları bir kez okur ve new-attack,
+# critical-alert ve aggregate-delta olaylarını bağlı tüm istemcilerin kuyruklarına dağıtır.
+# Olay id'si post id filigranıdır: Last-Event-ID ile yeniden bağlanan istemci (başka bir
+# worker'a da düşse) kaçırdığı postları veritabanından alır.
+
+import sys
+import os
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_version import get_reader
+
+# RealtimeUpdater'ın kritik saldırı bildirimleriyle aynı eşik
+CRITICAL_IMPACT_LEVELS = ('Yüksek', 'Kritik')
+
+# Olayda gönderilen post alanları (şemada olmayanlar atlanır)
+EVENT_FIELDS = ('id', 'title', 'name', 'company_name', 'country', 'sector', 'impact_level', 'activity',
+                'website', 'victim_domain', 'discovered', 'post_url')
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_HEARTBEAT = 15
+DEFAULT_QUEUE_SIZE = 200
+# Sınır worker başınadır (config.SSE_MAX_CLIENTS): gthread'de her akış bir thread tutar,
+# gevent olay sunucusunda (gunicorn_events.conf.py) akışlar greenlet'tir
+DEFAULT_MAX_CLIENTS = 2
+# Yeni postlar bu boyuttaki parçalarla okunur; yeniden bağlanmada en fazla MAX_REPLAY post
+# tekrar gönderilir, daha fazlası kaçırıldıysa istemciye resync gider
+MAX_BATCH = 500
+MAX_REPLAY = 200
+
+# Post id'sini olay id'si olarak taşıyan olaylar
+POST_EVENTS = ('new-attack', 'critical-alert')
+
+
+class ClientQueue:
+    """
+    İstemci başına sınırlı kuyruk. Yavaş istemci kuyruğu doldurursa bekleyen olaylar
+    atılır ve tek bir resync olayı konur; yayıncı hiçbir istemci için beklemez.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.events = deque()
+        self.condition = threading.Condition()
+        self.dropped = 0
+
+    def put(self, event):
+        with self.condition:
+            if len(self.events) >= self.max_size:
+                self.dropped += len(self.events)
+                self.events.clear()
+                event = {'event': 'resync', 'id': event.get('id'),
+                         'data': {'reason': 'client too slow', 'dropped_events': self.dropped}}
+            self.events.append(event)
+            self.condition.notify()
+
+    def get(self, timeout):
+        with self.condition:
+            if not self.events:
+                self.condition.wait(timeout)
+            return self.events.popleft() if self.events else None
+
+
+class EventBroadcaster:
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL, queue_size=DEFAULT_QUEUE_SIZE,
+                 max_clients=DEFAULT_MAX_CLIENTS):
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.max_clients = max_clients
+        self.db_path = None
+        self.clients = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.watermark = None
+        self.total_posts = None
+        self.posts_version = None
+        self.stats = {'events': 0, 'deliveries': 0, 'polls': 0, 'errors': 0}
+
+    # --- Abonelik ---
+
+    def subscribe(self, db_path):
+        """Yeni istemci kuyruğu; istemci sınırı doluysa None"""
+        with self.lock:
+            if len(self.clients) >= self.max_clients:
+                return None
+            client = ClientQueue(self.queue_size)
+            self.clients.add(client)
+            if self.thread is None or not self.thread.is_alive():
+                self.db_path = db_path
+                self.thread = threading.Thread(target=self._run, name='sse-broadcaster', daemon=True)
+                self.thread.start()
+            return client
+
+    def unsubscribe(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+    def publish(self, event):
+        """Olayı bağlı tüm istemcilere bir kez dağıtır (ingest dışı olaylar için de kullanılabilir)"""
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.put(event)
+        self.stats['events'] += 1
+        self.stats['deliveries'] += len(clients)
+
+    # --- Veritabanı ---
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _post_event_data(self, row):
+        keys = row.keys()
+        return {field: row[field] for field in EVENT_FIELDS if field in keys}
+
+    def _post_events(self, data):
+        """Bir post için new-attack ve (kritikse) critical-alert olayları"""
+        events = [{'event': 'new-attack', 'id': data['id'], 'data': data}]
+        if self._impact_level(data) in CRITICAL_IMPACT_LEVELS:
+            events.append({'event': 'critical-alert', 'id': data['id'], 'data': data})
+        return events
+
+    def _impact_level(self, data):
+        # ORM şemasında etki seviyesi activity sütununda tutulur
+        return data.get('impact_level') or data.get('activity')
+
+    def new_posts(self, conn, after_id, limit=MAX_BATCH):
+        return conn.execute("SELECT * FROM posts WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)).fetchall()
+
+    def _initialize(self, conn):
+        self.watermark, self.total_posts = conn.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM posts").fetchone()
+
+    def _poll(self):
+        """posts sürümü değiştiyse yeni postlardan olayları üretir"""
+        versions = get_reader(self.db_path).get_versions()
+        posts_version = versions.get('posts', (0, 0))[0]
+        if self.watermark is not None and posts_version == self.posts_version:
+            return
+        conn = self._connect()
+        try:
+            if self.watermark is None:
+                self._initialize(conn)
+                self.posts_version = posts_version
+                return
+            self.posts_version = posts_version
+            # Büyük ingest'ler MAX_BATCH'lik parçalar halinde sonuna kadar okunur; aksi halde
+            # kalan satırlar bir sonraki sürüm değişikliğine kadar olay üretmezdi
+            rows = []
+            while True:
+                batch = self.new_posts(conn, rows[-1]['id'] if rows else self.watermark)
+                rows.extend(batch)
+                if len(batch) < MAX_BATCH:
+                    break
+            total = conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        finally:
+            conn.close()
+
+        posts = [self._post_event_data(row) for row in rows]
+        for data in posts:
+            self.watermark = data['id']
+            for event in self._post_events(data):
+                self.publish(event)
+
+        # Arşiv taşımaları gibi yeni post içermeyen değişiklikler de toplamı değiştirir
+        if rows or total != self.total_posts:
+            self.publish({'event': 'aggregate-delta', 'id': self.watermark, 'data': {
+                'total_attacks': total,
+                'delta': total - self.total_posts,
+                'new_attacks': len(posts),
+                'by_impact_level': dict(Counter(self._impact_level(data) or 'Bilinmeyen' for data in posts)),
+                'by_country': dict(Counter(data.get('country') or 'Bilinmeyen' for data in posts)),
+                'by_threat_actor': dict(Counter(data.get('name') or 'Bilinmeyen' for data in posts)),
+                'at': datetime.now().isoformat()
+            }})
+            self.total_posts = total
+
+    def _run(self):
+        while True:
+            with self.lock:
+                if not self.clients:
+                    # Son istemci ayrıldı; bir sonraki abonelik thread'i yeniden başlatır
+                    self.thread = None
+                    self.watermark = None
+                    return
+            try:
+                self.stats['polls'] += 1
+                self._poll()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"[{datetime.now()}] SSE yayıncı hatası: {e}")
+            time.sleep(self.poll_interval)
+
+    # --- Yeniden bağlanma ---
+
+    def replay(self, last_event_id):
+        """Last-Event-ID sonrasındaki postlar; fazlaysa None (istemci tam yenileme yapmalı)"""
+        conn = self._connect()
+        try:
+            rows = self.new_posts(conn, last_event_id, MAX_REPLAY + 1)
+        finally:
+            conn.close()
+        if len(rows) > MAX_REPLAY:
+            return None
+        return [event for row in rows for event in self._post_events(self._post_event_data(row))]
+
+    def get_stats(self):
+        with self.lock:
+            clients = list(self.clients)
+        return {
+            **self.stats,
+            'clients': len(clients),
+            'dropped_events': sum(client.dropped for client in clients),
+            'watermark': self.watermark,
+            'running': self.thread is not None and self.thread.is_alive()
+        }
+
+
+broadcaster = EventBroadcaster()
+
+
+def format_event(event):
+    lines = []
+    if event.get('id') is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['event']}")
+    lines.append(f"data: {json.dumps(event['data'], ensure_ascii=False, default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def event_stream(client, last_event_id=None, heartbeat=DEFAULT_HEARTBEAT, retry_ms=5000):
+    """SSE yanıt gövdesi; istemci bağlantıyı kapattığında abonelik kaldırılır"""
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        # Bu id'ye kadarki post olayları istemciye zaten ulaştı (önceki bağlantı veya replay)
+        delivered_through = last_event_id
+        if last_event_id is not None:
+            missed = broadcaster.replay(last_event_id)
+            if missed is None:
+                yield format_event({'event': 'resync', 'id': None, 'data': {'reason': 'too many missed events'}})
+            else:
+                for event in missed:
+                    yield format_event(event)
+                if missed:
+                    delivered_through = max(last_event_id, missed[-1]['id'])
+        while True:
+            event = client.get(timeout=heartbeat)
+            if event is None:
+                # Yorum satırı: proxy'lerin bağlantıyı kesmesini önler, kopan istemciyi ortaya çıkarır
+                yield ": heartbeat\n\n"
+                continue
+            if (delivered_through is not None and event['event'] in POST_EVENTS
+                    and event['id'] <= delivered_through):
+                continue
+            yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(client)
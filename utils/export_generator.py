@@ -3,7 +3,6 @@ CTI-BOT Export Generator
 PDF, Excel, CSV export özellikleri
 """
 
-import pandas as pd
 import io
 import json
 from datetime import datetime, timedelta
@@ -20,6 +19,8 @@ class ExportGenerator:
     def export_attacks_to_excel(self, days=30, filters=None):
         """Saldırı verilerini Excel formatında export et"""
         try:
+            import pandas as pd
+            
             start_date = datetime.utcnow() - timedelta(days=days)
             
             # Veri sorgusu
@@ -262,6 +263,8 @@ class ExportGenerator:
     def export_companies_to_excel(self, days=30, filters=None):
         """Şirket verilerini Excel formatında export et"""
         try:
+            import pandas as pd
+            
             start_date = datetime.utcnow() - timedelta(days=days)
             
             # Veri sorgusu
@@ -0,0 +1,606 @@
+# İş Yükü Tabanlı İndeks Danışmanı
+# Uygulamanın gerçekten çalıştırdığı SELECT ifadelerini parmak izleriyle toplar, EXPLAIN QUERY PLAN
+# ile tam tablo taraması ve geçici B-tree kullanan planları bulur, aday indeksleri veritabanının
+# geçici bir kopyasında ölçer ve eklenecek/kaldırılacak indeksleri ölçülen hızlanmalarıyla raporlar
+
+import sys
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from datetime import datetime
+from statistics import median
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.sql_instrumentation import fingerprint, is_capturable, query_stats
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_REPORT_PATH = os.path.join(PROJECT_ROOT, 'cache', 'index_advisor.json')
+
+# Bellekte tutulan en fazla farklı ifade sayısı
+MAX_FINGERPRINTS = 500
+
+# Aday indeks bir ifadeyi en az bu oranda hızlandırmalı (taban süre / indeksli süre)
+MIN_SPEEDUP = 1.5
+
+# Kaldırılacak indeks, ifadeleri en fazla bu oranda yavaşlatabilir
+DROP_TOLERANCE = 1.1
+
+# Karalama kopyasında tek bir ifade çalıştırmasının üst sınırı (saniye)
+STATEMENT_TIMEOUT = 5.0
+
+# Kullanılmayan indeks kaldırma önerisi için tabloyu okuyan en az çağrı sayısı (kısa bir
+# gözlem penceresinde henüz çağrılmamış endpoint'lerin indeksleri korunur)
+MIN_WORKLOAD_CALLS = 100
+
+# Bundan küçük yavaşlamalar (saniye) gerileme sayılmaz
+DROP_MIN_REGRESSION = 0.001
+
+# Çok sütunlu indekslerde en fazla sütun sayısı
+MAX_INDEX_COLUMNS = 4
+
+ADVISOR_INDEX_PREFIX = 'idx_advisor_'
+
+# Bundan eski raporlar uygulanmaz (saniye); iş yükü rapordan sonra değişmiş olabilir
+MAX_REPORT_AGE = 24 * 3600
+
+TABLE_REFERENCE = re.compile(r"\b(?:from|join)\s+([a-z_][\w.]*)(?:\s+(?:as\s+)?([a-z_]\w*))?", re.IGNORECASE)
+PLAN_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+PLAN_SEARCH = re.compile(r"^SEARCH (?:TABLE )?(\w+)")
+PLAN_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+CLAUSE_END = r"(?=\border\b|\blimit\b|\boffset\b|\bhaving\b|\bunion\b|\)|$)"
+
+# Tablo takma adı olarak yorumlanmaması gereken anahtar kelimeler
+SQL_KEYWORDS = {
+    'where', 'group', 'order', 'limit', 'join', 'left', 'right', 'inner', 'outer', 'cross',
+    'on', 'using', 'union', 'having', 'natural', 'offset', 'as', 'select', 'values', 'set'
+}
+
+
+class WorkloadRecorder:
+    """
+    Çalışan uygulamadaki SELECT ifadelerinin parmak izi bazında sayaçları ve danışmanın
+    EXPLAIN/ölçüm için kullandığı son örnek SQL ve parametreleri
+    """
+
+    def __init__(self, max_fingerprints=MAX_FINGERPRINTS):
+        self.max_fingerprints = max_fingerprints
+        self.statements = {}
+        self.lock = threading.Lock()
+        self.installed = False
+
+    def record(self, sql, params=None, duration=None):
+        if not is_capturable(sql):
+            return
+        key = fingerprint(sql)
+        with self.lock:
+            entry = self.statements.get(key)
+            if entry is None:
+                if len(self.statements) >= self.max_fingerprints:
+                    return
+                entry = self.statements[key] = {
+                    'fingerprint': key, 'calls': 0, 'timed_calls': 0, 'total_time': 0.0,
+                    'sample_sql': sql, 'sample_params': None, 'last_seen': None
+                }
+            entry['calls'] += 1
+            if duration is not None:
+                entry['timed_calls'] += 1
+                entry['total_time'] += duration
+            entry['sample_sql'] = sql
+            entry['sample_params'] = list(params) if isinstance(params, (tuple, list)) else None
+            entry['last_seen'] = datetime.now().isoformat()
+
+    def install(self):
+        """SQL enstrümantasyonunun ölçtüğü ifadeleri (SQLAlchemy ve ham sqlite3) toplar"""
+        if not self.installed:
+            query_stats.subscribe(self.record)
+            self.installed = True
+
+    def snapshot(self, limit=None):
+        """Toplam süreye, süre yoksa çağrı sayısına göre sıralı ifadeler"""
+        with self.lock:
+            entries = [dict(entry) for entry in self.statements.values()]
+        entries.sort(key=lambda e: (e['total_time'], e['calls']), reverse=True)
+        return entries[:limit] if limit else entries
+
+    def reset(self):
+        with self.lock:
+            self.statements.clear()
+
+
+# Uygulama genelinde tek kayıtçı
+workload_recorder = WorkloadRecorder()
+
+
+def _table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _index_definitions(conn):
+    """Kullanıcı indeksleri: ad -> (tablo, sütunlar, create sql, unique)"""
+    indexes = {}
+    for table, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"):
+        for row in conn.execute(f"PRAGMA index_list({table})"):
+            name, unique, origin = row[1], row[2], row[3]
+            if origin != 'c':
+                continue
+            columns = [info[2] for info in conn.execute(f"PRAGMA index_info({name})")]
+            sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone()[0]
+            indexes[name] = {'table': table, 'columns': columns, 'sql': sql, 'unique': bool(unique)}
+    return indexes
+
+
+def schema_signature(conn):
+    """Tablo ve indeks tanımlarının özeti; rapor uygulanmadan önce canlı şemayla karşılaştırılır"""
+    rows = conn.execute(
+        "SELECT type, name, tbl_name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+    ).fetchall()
+    return hashlib.sha1(repr(rows).encode('utf-8')).hexdigest()
+
+
+def _bind(sql, params):
+    """Parametresi kaydedilmemiş ifadelerde yer tutucular NULL ile doldurulur"""
+    return params if params is not None else [None] * sql.count('?')
+
+
+def explain(conn, sql, params=None):
+    """EXPLAIN QUERY PLAN çıktısının detay satırları"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", _bind(sql, params))]
+
+
+def plan_issues(plan):
+    """Plandaki tam taramalar ve geçici B-tree'ler"""
+    issues = []
+    for detail in plan:
+        match = PLAN_SCAN.match(detail)
+        if match and 'INDEX' not in match.group(2):
+            issues.append({'type': 'full_scan', 'target': match.group(1), 'detail': detail})
+        elif detail.startswith('USE TEMP B-TREE'):
+            issues.append({'type': 'temp_btree', 'target': None, 'detail': detail})
+    return issues
+
+
+def indexes_in_plan(plan):
+    return {match.group(1) for detail in plan for match in PLAN_INDEX.finditer(detail)}
+
+
+def _clause_columns(sql, keyword, columns, alias_pattern):
+    """ORDER BY / GROUP BY sonrasındaki, tabloya ait sütunları sırasıyla döndürür"""
+    match = re.search(rf"\b{keyword}\s+by\s+(.*?){CLAUSE_END}", sql)
+    if not match:
+        return []
+    found = []
+    for part in match.group(1).split(','):
+        token = re.sub(r"\s+(asc|desc)\b.*$", '', part.strip())
+        token = re.sub(rf"^{alias_pattern}\.", '', token)
+        if token in columns and token not in found:
+            found.append(token)
+    return found
+
+
+def _predicate_columns(sql, columns, alias_pattern, operators):
+    found = []
+    for column in columns:
+        if re.search(rf"(?<![\w.])(?:{alias_pattern}\.)?{re.escape(column)}\s*(?:{operators})", sql):
+            found.append(column)
+    return found
+
+
+def propose_indexes(conn, sql, plan):
+    """
+    Tam taranan her tablo için WHERE eşitlik sütunları + aralık/sıralama/gruplama
+    sütunlarından aday indeksler üretir. Parmak izi (küçük harf, değerler '?') üzerinde çalışır.
+    """
+    aliases = {}
+    for table, alias in TABLE_REFERENCE.findall(sql):
+        table = table.split('.')[-1]
+        aliases[table] = table
+        if alias and alias not in SQL_KEYWORDS:
+            aliases[alias] = table
+
+    existing = [tuple(definition['columns']) for definition in _index_definitions(conn).values()]
+    candidates = []
+    # Tam taranan tablolar; geçici B-tree varsa indeksle aranan tablolar da (sıralama sütunu eksik)
+    issues = plan_issues(plan)
+    targets = [issue['target'] for issue in issues if issue['type'] == 'full_scan']
+    if any(issue['type'] == 'temp_btree' for issue in issues):
+        targets += [match.group(1) for match in map(PLAN_SEARCH.match, plan) if match]
+    tables = []
+    for target in targets:
+        table = aliases.get(target, target)
+        if table not in tables:
+            tables.append(table)
+
+    for table in tables:
+        columns = [column.lower() for column in _table_columns(conn, table)]
+        if not columns:
+            continue
+        names = {name for name, target in aliases.items() if target == table}
+        alias_pattern = '(?:' + '|'.join(re.escape(name) for name in names) + ')'
+        equality = _predicate_columns(sql, columns, alias_pattern, r"==?|\bis\b(?!\s+not)|\bin\b")
+        ranges = [c for c in _predicate_columns(sql, columns, alias_pattern, r">=?|<=?|\bbetween\b|\blike\b")
+                  if c not in equality]
+        order_by = _clause_columns(sql, 'order', columns, alias_pattern)
+        group_by = _clause_columns(sql, 'group', columns, alias_pattern)
+
+        column_sets = []
+        if equality or ranges:
+            column_sets.append(equality + ranges[:1])
+        if order_by:
+            column_sets.append(equality + [c for c in order_by if c not in equality])
+        if group_by:
+            column_sets.append(equality + [c for c in group_by if c not in equality])
+        for column_set in column_sets:
+            column_set = tuple(column_set[:MAX_INDEX_COLUMNS])
+            if not column_set or any(index[:len(column_set)] == column_set for index in existing):
+                continue
+            if any(c['table'] == table and c['columns'] == column_set for c in candidates):
+                continue
+            name = (ADVISOR_INDEX_PREFIX + table + '_' + '_'.join(column_set))[:64]
+            candidates.append({
+                'name': name,
+                'table': table,
+                'columns': column_set,
+                'sql': f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(column_set)})"
+            })
+    return candidates
+
+
+def statements_for_table(statements, table):
+    """Parmak izinde tabloyu okuyan ifadeler (iş yükünde görünmeyen tablonun indeksine dokunulmaz)"""
+    pattern = re.compile(rf"\b(?:from|join)\s+(?:\w+\.)?{re.escape(table.lower())}\b")
+    return [s for s in statements if pattern.search(s['fingerprint'])]
+
+
+def redundant_indexes(indexes):
+    """Sütunları aynı tablodaki başka bir indeksin ön eki olan (unique olmayan) indeksler"""
+    redundant = {}
+    for name, definition in indexes.items():
+        if definition['unique']:
+            continue
+        for other_name, other in indexes.items():
+            if (other_name != name and other['table'] == definition['table']
+                    and len(other['columns']) > len(definition['columns'])
+                    and other['columns'][:len(definition['columns'])] == definition['columns']):
+                redundant[name] = other_name
+                break
+    return redundant
+
+
+class IndexAdvisor:
+    def __init__(self, db_path='instance/data.db', recorder=None, managed_indexes=None,
+                 min_speedup=MIN_SPEEDUP, repeat=5, max_statements=50, report_path=DEFAULT_REPORT_PATH):
+        """
+        managed_indexes: danışmanın kaldırmayı önerebileceği indeks adları (eski sabit liste).
+        Bunlar ve başka bir indeksin ön eki olan indeksler dışındakilere dokunulmaz; ingest
+        tarafının kullandığı indeksler web sürecinin iş yükünde görünmeyebilir.
+        """
+        self.db_path = db_path
+        self.recorder = recorder or workload_recorder
+        self.managed_indexes = set(managed_indexes or [])
+        self.min_speedup = min_speedup
+        self.repeat = repeat
+        self.max_statements = max_statements
+        self.report_path = report_path
+
+    def _scratch_copy(self):
+        """Canlı veritabanının online backup API ile alınmış geçici kopyası"""
+        handle, path = tempfile.mkstemp(prefix='index_advisor_', suffix='.db')
+        os.close(handle)
+        source = sqlite3.connect(self.db_path)
+        scratch = sqlite3.connect(path)
+        try:
+            source.backup(scratch)
+        finally:
+            source.close()
+        return scratch, path
+
+    def _time(self, conn, statement):
+        """İfadenin medyan çalışma süresi (saniye); zaman aşımında None"""
+        timings = []
+        for _ in range(self.repeat):
+            deadline = time.perf_counter() + STATEMENT_TIMEOUT
+            conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10000)
+            started = time.perf_counter()
+            try:
+                conn.execute(statement['sample_sql'], _bind(statement['sample_sql'], statement['params'])).fetchall()
+            except sqlite3.OperationalError:
+                return None
+            finally:
+                conn.set_progress_handler(None, 0)
+            timings.append(time.perf_counter() - started)
+            if timings[-1] > 1.0:
+                break
+        return median(timings)
+
+    def _analyze_index(self, conn, name):
+        # İstatistik tablosu varsa yeni indeks de istatistiklenir, planlayıcı karşılaştırması adil olur
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            conn.execute(f"ANALYZE {name}")
+
+    def _evaluate_candidate(self, conn, candidate, statements):
+        pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+        conn.execute(candidate['sql'])
+        self._analyze_index(conn, candidate['name'])
+        size_kb = (conn.execute("PRAGMA page_count").fetchone()[0] - pages_before) * \
+            conn.execute("PRAGMA page_size").fetchone()[0] // 1024
+        affected = []
+        try:
+            for statement in statements:
+                plan = explain(conn, statement['sample_sql'], statement['params'])
+                if candidate['name'] not in indexes_in_plan(plan):
+                    continue
+                indexed = self._time(conn, statement)
+                if indexed is None:
+                    continue
+                affected.append({
+                    'fingerprint': statement['fingerprint'],
+                    'calls': statement['calls'],
+                    'baseline_ms': round(statement['baseline'] * 1000, 3),
+                    'indexed_ms': round(indexed * 1000, 3),
+                    'speedup': round(statement['baseline'] / indexed, 2) if indexed else None,
+                    'plan': plan
+                })
+        finally:
+            conn.execute(f"DROP INDEX IF EXISTS {candidate['name']}")
+
+        # Hızlanma, çağrı sayısıyla ağırlıklandırılmış toplam süreler üzerinden
+        baseline_total = sum(a['baseline_ms'] * a['calls'] for a in affected)
+        indexed_total = sum(a['indexed_ms'] * a['calls'] for a in affected)
+        speedup = round(baseline_total / indexed_total, 2) if indexed_total else None
+        approved = bool(affected) and speedup is not None and speedup >= self.min_speedup
+        if not affected:
+            reason = 'planlayıcı indeksi kullanmadı'
+        elif approved:
+            reason = f"{len(affected)} ifade için ölçülen hızlanma eşiğin üzerinde"
+        else:
+            reason = 'ölçülen hızlanma eşiğin altında (gerilemeler dahil)'
+        return {
+            'action': 'add',
+            'name': candidate['name'],
+            'table': candidate['table'],
+            'columns': list(candidate['columns']),
+            'sql': candidate['sql'],
+            'size_kb': size_kb,
+            'speedup': speedup,
+            'saved_ms': round(baseline_total - indexed_total, 3),
+            'statements': affected,
+            'approved': approved,
+            'reason': reason
+        }
+
+    def _select_candidates(self, conn, candidates, statements):
+        """
+        Açgözlü seçim: her turda iş yükü süresini en çok azaltan onaylı aday kopyada
+        bırakılır ve kalan adaylar onunla birlikte yeniden ölçülür. Böylece aynı ifadeleri
+        hızlandıran ikinci bir indeks veya seçilenle birlikte gerileme yaratan aday elenir.
+        """
+        by_fingerprint = {s['fingerprint']: s for s in statements}
+        pending = list(candidates)
+        selected, evaluations = [], {}
+        while pending:
+            results = [self._evaluate_candidate(conn, candidate, statements) for candidate in pending]
+            evaluations.update((r['name'], r) for r in results)
+            winner = max((r for r in results if r['approved']), key=lambda r: r['saved_ms'], default=None)
+            if winner is None:
+                break
+            conn.execute(winner['sql'])
+            self._analyze_index(conn, winner['name'])
+            for affected in winner['statements']:
+                statement = by_fingerprint[affected['fingerprint']]
+                statement['baseline'] = affected['indexed_ms'] / 1000
+                statement['plan'] = affected['plan']
+            selected.append(winner)
+            pending = [c for c in pending if c['name'] != winner['name']]
+        return selected + [evaluations[c['name']] for c in pending]
+
+    def _evaluate_drop(self, conn, name, definition, reason, statements):
+        related = statements_for_table(statements, definition['table'])
+        conn.execute(f"DROP INDEX {name}")
+        regressions = []
+        try:
+            for statement in related:
+                dropped = self._time(conn, statement)
+                # Milisaniye altı farklar ölçüm gürültüsü sayılır
+                if dropped is None or (dropped > statement['baseline'] * DROP_TOLERANCE
+                                       and dropped - statement['baseline'] > DROP_MIN_REGRESSION):
+                    regressions.append(statement['fingerprint'])
+        finally:
+            conn.execute(definition['sql'])
+        return {
+            'action': 'drop',
+            'name': name,
+            'table': definition['table'],
+            'columns': definition['columns'],
+            'sql': f"DROP INDEX IF EXISTS {name}",
+            'statements_checked': len(related),
+            'regressions': regressions,
+            'approved': not regressions,
+            'reason': reason
+        }
+
+    def analyze(self):
+        """İş yükünü ölçer, önerileri üretir ve raporu kaydeder"""
+        started = time.time()
+        workload = self.recorder.snapshot(self.max_statements)
+        scratch, scratch_path = self._scratch_copy()
+        signature = schema_signature(scratch)
+        statements = []
+        recommendations = []
+        try:
+            for entry in workload:
+                params = entry['sample_params']
+                statement = {**entry, 'params': params}
+                try:
+                    statement['plan'] = explain(scratch, entry['sample_sql'], params)
+                except sqlite3.Error as e:
+                    # Arşiv veya geçici görünüm gibi kopyada bulunmayan nesnelere referans
+                    statements.append({'fingerprint': entry['fingerprint'], 'calls': entry['calls'], 'error': str(e)})
+                    continue
+                statement['baseline'] = self._time(scratch, statement)
+                statement['issues'] = plan_issues(statement['plan'])
+                statements.append(statement)
+
+            measurable = [s for s in statements if s.get('baseline') is not None]
+            candidates = {}
+            for statement in measurable:
+                if statement['issues']:
+                    for candidate in propose_indexes(scratch, statement['fingerprint'], statement['plan']):
+                        candidates.setdefault(candidate['name'], candidate)
+            recommendations = self._select_candidates(scratch, candidates.values(), measurable)
+
+            # Kaldırma önerileri iş yükü olmadan yapılmaz
+            if measurable:
+                used = set().union(*(indexes_in_plan(s['plan']) for s in measurable))
+                indexes = _index_definitions(scratch)
+                redundant = redundant_indexes(indexes)
+                for name, definition in indexes.items():
+                    if name in used or definition['unique']:
+                        continue
+                    if name in redundant:
+                        reason = f"{redundant[name]} indeksinin ön eki"
+                    elif (name in self.managed_indexes and sum(
+                            s['calls'] for s in statements_for_table(measurable, definition['table'])) >= MIN_WORKLOAD_CALLS):
+                        reason = 'iş yükündeki hiçbir planda kullanılmadı'
+                    else:
+                        continue
+                    recommendations.append(self._evaluate_drop(scratch, name, definition, reason, measurable))
+        finally:
+            scratch.close()
+            os.remove(scratch_path)
+
+        report = {
+            'generated_at': datetime.now().isoformat(),
+            'schema_signature': signature,
+            'duration_seconds': round(time.time() - started, 2),
+            'min_speedup': self.min_speedup,
+            'statements_analyzed': len(statements),
+            'statements': [{
+                'fingerprint': s['fingerprint'],
+                'calls': s['calls'],
+                'avg_ms': round(s['total_time'] / s['timed_calls'] * 1000, 3) if s.get('timed_calls') else None,
+                'baseline_ms': round(s['baseline'] * 1000, 3) if s.get('baseline') is not None else None,
+                'plan': s.get('plan'),
+                'issues': s.get('issues'),
+                'error': s.get('error')
+            } for s in statements],
+            'recommendations': recommendations
+        }
+        self.save_report(report)
+        return report
+
+    def save_report(self, report):
+        if not self.report_path:
+            return
+        os.makedirs(os.path.dirname(self.report_path), exist_ok=True)
+        tmp_path = self.report_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.report_path)
+
+    def load_report(self):
+        if not self.report_path or not os.path.exists(self.report_path):
+            return None
+        with open(self.report_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def report_problem(self, report, max_age=MAX_REPORT_AGE):
+        """Rapor canlı veritabanına uygulanamıyorsa nedeni, uygulanabiliyorsa None"""
+        if not report:
+            return 'İndeks danışmanı raporu yok'
+        age = (datetime.now() - datetime.fromisoformat(report['generated_at'])).total_seconds()
+        if max_age and age > max_age:
+            return f"Rapor {int(age)} saniye önce üretildi (sınır {int(max_age)} saniye)"
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if report.get('schema_signature') != schema_signature(conn):
+                return 'Şema rapor üretildikten sonra değişti'
+        finally:
+            conn.close()
+        return None
+
+    def apply_approved(self, report=None):
+        """
+        Rapordaki onaylı önerileri canlı veritabanına uygular. Uygulananlar raporda
+        işaretlenir; aynı rapor tekrar uygulandığında değişiklik yapılmaz. Yaş ve şema
+        kontrolü report_problem ile çağıran tarafta yapılır.
+        """
+        report = report or self.load_report()
+        if not report:
+            return []
+        applied = []
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for recommendation in report['recommendations']:
+                if not recommendation['approved'] or recommendation.get('applied_at'):
+                    continue
+                conn.execute(recommendation['sql'])
+                if recommendation['action'] == 'add':
+                    self._analyze_index(conn, recommendation['name'])
+                conn.commit()
+                recommendation['applied_at'] = datetime.now().isoformat()
+                applied.append({key: recommendation[key] for key in ('action', 'name', 'sql')})
+                print(f"[{datetime.now()}] İndeks danışmanı: {recommendation['sql']}")
+            # Uygulanan değişiklikler şemayı değiştirir; rapor yeni şemayla eşleşmeye devam eder
+            report['schema_signature'] = schema_signature(conn)
+        finally:
+            conn.close()
+        self.save_report(report)
+        return applied
+
+
+_analysis_lock = threading.Lock()
+_analysis_state = {'status': 'idle', 'started_at': None, 'finished_at': None, 'error': None}
+
+
+def analysis_status():
+    with _analysis_lock:
+        return dict(_analysis_state)
+
+
+def start_analysis(advisor):
+    """
+    Analizi arka plan iş parçacığında başlatır; HTTP isteği karalama kopyasındaki ölçümleri
+    beklemez. İş yükü web sürecinin belleğinde tutulduğu için analiz aynı süreçte çalışır.
+    Çalışan bir analiz varsa yenisi başlatılmaz. (durum, başlatıldı mı) döner.
+    """
+    with _analysis_lock:
+        if _analysis_state['status'] == 'running':
+            return dict(_analysis_state), False
+        _analysis_state.update(status='running', started_at=datetime.now().isoformat(),
+                               finished_at=None, error=None)
+
+    def _run():
+        try:
+            advisor.analyze()
+            result = {'status': 'done', 'error': None}
+        except Exception as e:
+            print(f"[{datetime.now()}] İndeks danışmanı analizi başarısız: {e}")
+            result = {'status': 'failed', 'error': str(e)}
+        with _analysis_lock:
+            _analysis_state.update(finished_at=datetime.now().isoformat(), **result)
+
+    threading.Thread(target=_run, name='index-advisor', daemon=True).start()
+    return analysis_status(), True
+
+
+if __name__ == "__main__":
+    # Kayıtlı iş yükü olmadan çalıştırıldığında verilen SQL dosyasındaki ifadeler kullanılır
+    advisor = IndexAdvisor(sys.argv[1] if len(sys.argv) > 1 else 'instance/data.db')
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'r', encoding='utf-8') as f:
+            for statement in f.read().split(';'):
+                if statement.strip():
+                    advisor.recorder.record(statement.strip())
+    result = advisor.analyze()
+    for recommendation in result['recommendations']:
+        status = '✅' if recommendation['approved'] else '—'
+        print(f"{status} {recommendation['action']} {recommendation['name']} "
+              f"{recommendation.get('speedup') or ''} {recommendation['reason']}")
@@ -0,0 +1,42 @@
+# Tembel Import
+# Ağır bağımlılıkları (scikit-learn, pandas, requests) çeken modüllerin global nesneleri
+# için vekil. Modül, vekilin ilk öznitelik erişiminde import edilir; böylece controller'lar
+# modül seviyesinde aynı adı kullanmaya devam ederken uygulama açılışı bu importları ödemez.
+
+import importlib
+import threading
+
+
+class LazyObject:
+    def __init__(self, module_name, attribute):
+        object.__setattr__(self, '_module_name', module_name)
+        object.__setattr__(self, '_attribute', attribute)
+        object.__setattr__(self, '_target', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _resolve(self):
+        target = self._target
+        if target is None:
+            with self._lock:
+                target = self._target
+                if target is None:
+                    module = importlib.import_module(self._module_name)
+                    target = getattr(module, self._attribute)
+                    object.__setattr__(self, '_target', target)
+        return target
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resolve(), name, value)
+
+    def __repr__(self):
+        if self._target is None:
+            return f"<lazy {self._module_name}.{self._attribute}>"
+        return repr(self._target)
+
+
+def lazy_object(module_name, attribute):
+    """module_name içindeki attribute nesnesine ilk kullanımda çözülen vekil"""
+    return LazyObject(module_name, attribute)
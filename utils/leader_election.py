@@ -0,0 +1,308 @@
+# Lider Seçimi (Lease)
+# Periyodik işler (RealtimeUpdater, sosyal medya zamanlayıcısı, toplayıcı daemon) birden fazla
+# süreçte çalışabilir; her biri aynı isimli lease'i almaya çalışır ve sadece lease sahibi işleri
+# çalıştırır. Lider lease'i süresinin üçte birinde bir yeniler; yenileyemezse lease bitmeden
+# işleri bırakır. Lider ölürse lease en geç bir lease süresi içinde sona erer ve bekleyen
+# takipçilerden biri devralır.
+# Arka uçlar: SQLite lease satırı (varsayılan, aynı makinedeki süreçler) veya Redis kilidi
+# (birden fazla makine).
+
+import sys
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lease'ler veri veritabanında değil ayrı bir dosyada: uzun ingest yazma işlemleri
+# lease yenilemesini bekletip liderliği düşürmesin
+DEFAULT_LEASE_PATH = os.path.join(PROJECT_ROOT, 'cache', 'leader_leases.db')
+
+DEFAULT_LEASE_SECONDS = 30
+
+
+class SQLiteLeaseBackend:
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_LEASE_PATH
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS leader_leases (
+                    name TEXT PRIMARY KEY,
+                    holder TEXT NOT NULL,
+                    acquired_at REAL NOT NULL,
+                    renewed_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=2, isolation_level=None)
+
+    def try_acquire(self, name, holder, lease_seconds):
+        """
+        Lease boşsa, süresi dolmuşsa veya zaten bizdeyse alır / yeniler.
+        Başarılıysa lease bitiş zamanı, değilse None.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute("SELECT holder, acquired_at, expires_at FROM leader_leases WHERE name = ?",
+                               (name,)).fetchone()
+            if row and row[0] != holder and row[2] > now:
+                conn.execute("ROLLBACK")
+                return None
+            acquired_at = row[1] if row and row[0] == holder else now
+            expires_at = now + lease_seconds
+            conn.execute("""
+                INSERT INTO leader_leases (name, holder, acquired_at, renewed_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, acquired_at = excluded.acquired_at,
+                    renewed_at = excluded.renewed_at, expires_at = excluded.expires_at
+            """, (name, holder, acquired_at, now, expires_at))
+            conn.execute("COMMIT")
+            return expires_at
+        except sqlite3.OperationalError:
+            # Kilit alınamadı; bir sonraki denemede tekrar bakılır
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            return None
+        finally:
+            conn.close()
+
+    def release(self, name, holder):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM leader_leases WHERE name = ? AND holder = ?", (name, holder))
+        except sqlite3.OperationalError:
+            pass
+        finally:
+            conn.close()
+
+    def list(self):
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT name, holder, acquired_at, renewed_at, expires_at FROM leader_leases").fetchall()
+        finally:
+            conn.close()
+        now = time.time()
+        return [{'name': name, 'holder': holder, 'acquired_at': datetime.fromtimestamp(acquired_at).isoformat(),
+                 'renewed_at': datetime.fromtimestamp(renewed_at).isoformat(),
+                 'expires_in': round(expires_at - now, 1), 'expired': expires_at <= now}
+                for name, holder, acquired_at, renewed_at, expires_at in rows]
+
+    def get(self, name):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT holder, acquired_at, renewed_at, expires_at FROM leader_leases WHERE name = ?",
+                               (name,)).fetchone()
+        finally:
+            conn.close()
+        if row is None or row[3] <= time.time():
+            return None
+        return {'holder': row[0], 'acquired_at': row[1], 'renewed_at': row[2], 'expires_at': row[3]}
+
+
+# Kilit sadece sahibi tarafından yenilenir / bırakılır
+REDIS_RENEW = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+REDIS_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLeaseBackend:
+    def __init__(self, url, prefix='leader:'):
+        import redis
+        self.errors = redis.RedisError
+        self.client = redis.Redis.from_url(url, socket_connect_timeout=1, socket_timeout=1)
+        self.renew_script = self.client.register_script(REDIS_RENEW)
+        self.release_script = self.client.register_script(REDIS_RELEASE)
+        self.prefix = prefix
+
+    def try_acquire(self, name, holder, lease_seconds):
+        key = self.prefix + name
+        ttl_ms = int(lease_seconds * 1000)
+        try:
+            if self.client.set(key, holder, nx=True, px=ttl_ms) or self.renew_script(keys=[key], args=[holder, ttl_ms]):
+                return time.time() + lease_seconds
+        except self.errors:
+            pass
+        return None
+
+    def release(self, name, holder):
+        try:
+            self.release_script(keys=[self.prefix + name], args=[holder])
+        except self.errors:
+            pass
+
+    def get(self, name):
+        try:
+            holder = self.client.get(self.prefix + name)
+            ttl_ms = self.client.pttl(self.prefix + name)
+        except self.errors:
+            return None
+        if holder is None:
+            return None
+        return {'holder': holder.decode('utf-8'), 'expires_at': time.time() + max(ttl_ms, 0) / 1000}
+
+
+class LeaderElector:
+    def __init__(self, name, backend=None, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 on_elected=None, on_demoted=None):
+        """
+        on_elected / on_demoted: liderlik alındığında / kaybedildiğinde elector thread'inde çağrılır
+        """
+        self.name = name
+        self.backend = backend or SQLiteLeaseBackend()
+        self.lease_seconds = lease_seconds
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.expires_at = None
+        self.elected_at = None
+        self.transitions = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        # Lease'in sonuna bir saniyeden az kaldıysa yenilenemediği kabul edilir
+        return self.expires_at is not None and time.time() < self.expires_at - 1
+
+    @property
+    def renew_interval(self):
+        return max(1.0, self.lease_seconds / 3)
+
+    @property
+    def retry_interval(self):
+        # Takipçiler daha sık dener: lider ölünce lease bittikten kısa süre sonra devralınır
+        return max(1.0, self.lease_seconds / 6)
+
+    def step(self):
+        """Tek bir seçim turu; lider ise True"""
+        was_leader = self.is_leader
+        expires_at = self.backend.try_acquire(self.name, self.holder, self.lease_seconds)
+        if expires_at is not None:
+            self.expires_at = expires_at
+        if not was_leader and self.is_leader:
+            self.elected_at = time.time()
+            self.transitions += 1
+            print(f"[{datetime.now()}] {self.name}: lider seçildi ({self.holder})")
+            self._callback(self.on_elected)
+        elif was_leader and not self.is_leader:
+            self._demote()
+        return self.is_leader
+
+    def _demote(self):
+        self.expires_at = None
+        self.elected_at = None
+        self.transitions += 1
+        print(f"[{datetime.now()}] {self.name}: liderlik bırakıldı ({self.holder})")
+        self._callback(self.on_demoted)
+
+    def _callback(self, func):
+        if func is None:
+            return
+        try:
+            func()
+        except Exception as e:
+            print(f"[{datetime.now()}] {self.name}: lider geri çağrısı hatası: {e}")
+
+    def _next_wait(self):
+        if not self.is_leader:
+            return self.retry_interval
+        # Yenileme başarısız olduysa lease bitmeden önce tekrar denenir / işler bırakılır
+        return min(self.renew_interval, max(0.1, self.expires_at - 1 - time.time()))
+
+    def _run(self):
+        while not self._stop_event.wait(self._next_wait()):
+            try:
+                self.step()
+            except Exception as e:
+                print(f"[{datetime.now()}] {self.name}: lider seçimi hatası: {e}")
+                if not self.is_leader and self.elected_at is not None:
+                    self._demote()
+
+    def start(self):
+        """İlk seçim turu çağıranın thread'inde yapılır; dönüşte is_leader günceldir"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            try:
+                self.step()
+            except Exception as e:
+                print(f"[{datetime.now()}] {self.name}: lider seçimi hatası: {e}")
+            self._thread = threading.Thread(target=self._run, name=f'leader-{self.name}', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Seçimi durdurur; lider ise işleri bırakır ve lease'i hemen serbest bırakır"""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        if self.elected_at is not None:
+            self._demote()
+        self.backend.release(self.name, self.holder)
+
+    def get_status(self):
+        lease = self.backend.get(self.name)
+        return {
+            'name': self.name,
+            'holder': self.holder,
+            'is_leader': self.is_leader,
+            'leader': lease['holder'] if lease else None,
+            'lease_seconds': self.lease_seconds,
+            'lease_expires_in': round(lease['expires_at'] - time.time(), 1) if lease else None,
+            'elected_at': datetime.fromtimestamp(self.elected_at).isoformat() if self.elected_at else None,
+            'transitions': self.transitions
+        }
+
+
+def create_elector(name, backend='sqlite', lease_seconds=DEFAULT_LEASE_SECONDS, redis_url=None,
+                   lease_path=None, on_elected=None, on_demoted=None):
+    """
+    backend: 'sqlite' (aynı makinedeki süreçler) veya 'redis' (birden fazla makine).
+    redis paketi yoksa SQLite lease'e düşülür.
+    """
+    lease_backend = None
+    if backend == 'redis':
+        try:
+            lease_backend = RedisLeaseBackend(redis_url or 'redis://localhost:6379/0')
+        except ImportError:
+            print("redis paketi yüklü değil, SQLite lease kullanılıyor")
+    return LeaderElector(name, lease_backend or SQLiteLeaseBackend(lease_path), lease_seconds,
+                         on_elected=on_elected, on_demoted=on_demoted)
+
+
+if __name__ == "__main__":
+    # Elle failover denemesi: aynı komutu birkaç terminalde çalıştırıp lideri öldürün
+    name = sys.argv[1] if len(sys.argv) > 1 else 'demo'
+    lease = float(sys.argv[2]) if len(sys.argv) > 2 else 6
+    elector = create_elector(name, lease_seconds=lease).start()
+    try:
+        while True:
+            time.sleep(1)
+            status = elector.get_status()
+            print(f"[{datetime.now()}] lider={status['leader']} ben={'lider' if status['is_leader'] else 'takipçi'}")
+    except KeyboardInterrupt:
+        elector.stop()
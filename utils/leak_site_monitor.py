@@ -0,0 +1,285 @@
+# Sızıntı Sitesi Değişiklik İzleme
+# Takip edilen post_url'leri öncelik sırasıyla yeniden yakalar ve algısal hash farkı ile
+# veri dökümü yayınlanması gibi sayfa değişikliklerini tespit eder. Her turda host başına en
+# yeni zamanı gelmiş post seçilir; böylece tek bir sızıntı sitesinin birikmiş postları
+# (host hız sınırına takılanlar) diğer sitelerin sırasını tutmaz
+
+import sys
+import os
+import io
+import time
+import sqlite3
+from datetime import datetime
+from urllib.parse import urlparse
+from PIL import Image
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.screenshot_store import screenshot_store
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Post yaşı (gün) -> yeniden ziyaret aralığı (saniye)
+REVISIT_SCHEDULE = [
+    (7, 6 * HOUR),
+    (30, DAY),
+    (90, 3 * DAY),
+    (None, 7 * DAY)
+]
+
+# Türkiye'deki kurbanlar daha sık kontrol edilir
+TR_PRIORITY_FACTOR = 0.5
+
+
+def perceptual_hash(image_bytes, hash_size=16):
+    """
+    Görüntünün fark hash'ini (dHash) hex olarak döndürür.
+    Küçük render farklarına dayanıklı, içerik değişikliklerine duyarlıdır.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        gray = image.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+        pixels = list(gray.getdata())
+
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{bits:0{hash_size * hash_size // 4}x}"
+
+
+def url_host(url):
+    """post_url'nin host kısmı (hız sınırı ve host bazlı seçim anahtarı)"""
+    return urlparse(url).hostname or url
+
+
+def hamming_distance(hash_a, hash_b):
+    """İki hex hash arasındaki farklı bit sayısı"""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+
+class HostRateLimiter:
+    """Aynı onion host'a art arda istek atılmasını engeller"""
+
+    def __init__(self, min_interval=60):
+        self.min_interval = min_interval
+        self.last_hit = {}
+
+    def allow(self, url, now=None):
+        host = url_host(url)
+        now = now if now is not None else time.time()
+        if now - self.last_hit.get(host, 0) < self.min_interval:
+            return False
+        self.last_hit[host] = now
+        return True
+
+
+class LeakSiteMonitor:
+    def __init__(self, capturer, db_path='instance/data.db', store=None,
+                 change_threshold=0.1, host_interval=60, on_change=None):
+        """
+        capturer: capture(url) -> PNG bytes metodu olan herhangi bir nesne
+        (çevrimdışı testlerde sahte bir capturer verilebilir)
+        change_threshold: değişiklik sayılması için farklı bit oranı
+        """
+        self.capturer = capturer
+        self.store = store or screenshot_store
+        self.change_threshold = change_threshold
+        self.rate_limiter = HostRateLimiter(host_interval)
+        self.on_change = on_change
+        self.conn = sqlite3.connect(db_path)
+        self.conn.create_function('url_host', 1, url_host, deterministic=True)
+        self._ensure_tables()
+
+    def _ensure_tables(self):
+        """Takip ve değişiklik tablolarını oluşturur"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS leak_site_revisits (
+                post_id INTEGER PRIMARY KEY,
+                post_url TEXT NOT NULL,
+                host TEXT,
+                last_checked_ts INTEGER,
+                next_due_ts INTEGER NOT NULL DEFAULT 0,
+                last_phash TEXT,
+                last_screenshot TEXT,
+                change_count INTEGER NOT NULL DEFAULT 0,
+                last_changed_ts INTEGER,
+                failures INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (post_id) REFERENCES posts (id)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS leak_site_changes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                post_id INTEGER NOT NULL,
+                detected_ts INTEGER NOT NULL,
+                distance REAL NOT NULL,
+                previous_screenshot TEXT,
+                screenshot TEXT NOT NULL,
+                FOREIGN KEY (post_id) REFERENCES posts (id)
+            )
+        """)
+        try:
+            self.conn.execute("ALTER TABLE leak_site_revisits ADD COLUMN host TEXT")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" not in str(e):
+                raise
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_leak_site_revisits_next_due ON leak_site_revisits(next_due_ts)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_leak_site_changes_detected ON leak_site_changes(detected_ts)")
+        self.conn.commit()
+
+    def sync_tracked_posts(self):
+        """Onion linki olan yeni postları takip listesine ekler"""
+        cur = self.conn.execute("""
+            INSERT OR IGNORE INTO leak_site_revisits (post_id, post_url, host, last_screenshot, next_due_ts)
+            SELECT id, post_url, url_host(post_url), screenshot, 0 FROM posts
+            WHERE post_url LIKE 'http%'
+        """)
+        # host sütunundan önce eklenmiş kayıtlar
+        self.conn.execute("UPDATE leak_site_revisits SET host = url_host(post_url) WHERE host IS NULL")
+        self.conn.commit()
+        return cur.rowcount
+
+    @staticmethod
+    def revisit_interval(discovered, country, now=None):
+        """Post yaşı ve ülkesine göre yeniden ziyaret aralığını hesaplar"""
+        now = now if now is not None else time.time()
+        age_days = None
+        try:
+            discovered_ts = datetime.strptime(str(discovered)[:10], "%Y-%m-%d").timestamp()
+            age_days = max(0, (now - discovered_ts) / DAY)
+        except (TypeError, ValueError):
+            pass
+
+        interval = REVISIT_SCHEDULE[-1][1]
+        if age_days is not None:
+            for max_age, schedule_interval in REVISIT_SCHEDULE:
+                if max_age is None or age_days <= max_age:
+                    interval = schedule_interval
+                    break
+
+        if country == 'TR':
+            interval = int(interval * TR_PRIORITY_FACTOR)
+        return interval
+
+    def _due_posts(self, limit, now):
+        """
+        Host başına zamanı gelmiş en yeni post (yeni sızıntılar önce veri dökümüne döner);
+        hostlar da seçilen postun yeniliğine göre sıralanır
+        """
+        return self.conn.execute("""
+            SELECT post_id, post_url, last_phash, last_screenshot, discovered, country FROM (
+                SELECT r.post_id, r.post_url, r.last_phash, r.last_screenshot, p.discovered, p.country,
+                       ROW_NUMBER() OVER (PARTITION BY r.host ORDER BY p.discovered DESC, r.next_due_ts) AS host_rank
+                FROM leak_site_revisits r JOIN posts p ON p.id = r.post_id
+                WHERE r.next_due_ts <= ?
+            )
+            WHERE host_rank = 1
+            ORDER BY discovered DESC
+            LIMIT ?
+        """, (int(now), limit)).fetchall()
+
+    def _stored_phash(self, content_hash):
+        """İlk yakalamadan kalan ekran görüntüsünü referans olarak kullanır"""
+        if not content_hash or not self.store.is_valid_hash(content_hash) or not self.store.exists(content_hash):
+            return None
+        with open(self.store.path_for(content_hash), 'rb') as f:
+            return perceptual_hash(f.read())
+
+    def revisit(self, post_id, post_url, last_phash, last_screenshot, discovered, country, now=None):
+        """Tek bir postu yeniden yakalar; değiştiyse kaydeder. Değişiklik olduysa True döner"""
+        now = now if now is not None else time.time()
+        next_due = int(now + self.revisit_interval(discovered, country, now))
+
+        try:
+            png = self.capturer.capture(post_url)
+        except Exception as e:
+            print(f"[{datetime.now()}] Yeniden yakalama hatası ({post_url}): {e}")
+            self.conn.execute("""
+                UPDATE leak_site_revisits SET last_checked_ts = ?, next_due_ts = ?, failures = failures + 1
+                WHERE post_id = ?
+            """, (int(now), next_due, post_id))
+            self.conn.commit()
+            return False
+
+        phash = perceptual_hash(png)
+        bits = len(phash) * 4
+        if last_phash is None:
+            last_phash = self._stored_phash(last_screenshot)
+        distance = hamming_distance(phash, last_phash) / bits if last_phash else None
+        changed = distance is not None and distance > self.change_threshold
+
+        # Sadece ilk (referans) yakalama ve değişen sayfalar depoya yazılır
+        screenshot = last_screenshot
+        if distance is None or changed:
+            screenshot = self.store.put(png)
+
+        if changed:
+            self.conn.execute("""
+                INSERT INTO leak_site_changes (post_id, detected_ts, distance, previous_screenshot, screenshot)
+                VALUES (?, ?, ?, ?, ?)
+            """, (post_id, int(now), round(distance, 4), last_screenshot, screenshot))
+
+        self.conn.execute("""
+            UPDATE leak_site_revisits SET
+                last_checked_ts = ?, next_due_ts = ?, last_phash = ?, last_screenshot = ?,
+                change_count = change_count + ?, last_changed_ts = COALESCE(?, last_changed_ts)
+            WHERE post_id = ?
+        """, (int(now), next_due, phash, screenshot, 1 if changed else 0,
+              int(now) if changed else None, post_id))
+        self.conn.commit()
+
+        if changed:
+            print(f"[{datetime.now()}] Sayfa değişikliği tespit edildi: {post_url} (fark: {distance:.1%})")
+            if self.on_change:
+                self.on_change(post_id, post_url, distance, screenshot)
+        return changed
+
+    def run_due(self, limit=20):
+        """Zamanı gelmiş postları host bazlı hız sınırına uyarak yeniden ziyaret eder (host başına bir post)"""
+        self.sync_tracked_posts()
+        now = time.time()
+        changes = 0
+        for row in self._due_posts(limit, now):
+            post_url = row[1]
+            # Son min_interval içinde ziyaret edilen host bu turda atlanır; yalnızca kendi satırını bekletir
+            if not self.rate_limiter.allow(post_url):
+                continue
+            if self.revisit(*row):
+                changes += 1
+        return changes
+
+    def close(self):
+        self.conn.close()
+
+
+def get_recent_changes(db_path='instance/data.db', limit=50):
+    """Son tespit edilen sayfa değişikliklerini döndürür"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT c.post_id, p.title, p.name, p.country, p.post_url, c.detected_ts, c.distance,
+                   c.previous_screenshot, c.screenshot
+            FROM leak_site_changes c JOIN posts p ON p.id = c.post_id
+            ORDER BY c.detected_ts DESC
+            LIMIT ?
+        """, (limit,)).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+    return [{
+        'post_id': row[0],
+        'title': row[1],
+        'threat_actor': row[2],
+        'country': row[3],
+        'post_url': row[4],
+        'detected_at': datetime.fromtimestamp(row[5]).isoformat(),
+        'distance': row[6],
+        'previous_screenshot': row[7],
+        'screenshot': row[8],
+        'thumbnail_url': f"/screenshots/{row[8]}/thumb"
+    } for row in rows]
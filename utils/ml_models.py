@@ -18,20 +18,71 @@ import joblib
 import os
 from models.DBModel import Post, HackedCompany
 from sqlalchemy import func
+from utils.model_registry import ModelRegistry
+
+# Kayıt defterinde sürümlenen modeller
+REGISTERED_MODELS = ('risk_classifier', 'threat_classifier', 'sector_classifier')
+
+# Sürümlemeden önceki tekil dosyalar: (model, scaler, encoders, hedef sütun)
+LEGACY_FILES = {
+    'risk_classifier': ('risk_classifier.pkl', 'risk_scaler.pkl', 'risk_encoders.pkl', 'impact_level'),
+    'threat_classifier': ('threat_classifier.pkl', 'threat_scaler.pkl', 'threat_encoders.pkl', 'threat_actor')
+}
+
+# Tahmin girdileri ve eksik alanlar için varsayılanlar (sıra eğitimdeki sütun sırasıdır)
+RISK_FEATURES = {
+    'sector': 'Unknown', 'country': 'Unknown', 'threat_actor': 'Unknown',
+    'hour': 12, 'weekday': 0, 'month': 1,
+    'data_type_leaked': 'Unknown', 'company_size': 'Unknown'
+}
+THREAT_FEATURES = {
+    'sector': 'Unknown', 'country': 'Unknown', 'impact_level': 'Unknown',
+    'hour': 12, 'weekday': 0, 'month': 1,
+    'data_type_leaked': 'Unknown', 'company_size': 'Unknown'
+}
 
 class MLModels:
     def __init__(self):
-        self.models = {}
         self.encoders = {}
         self.scaler = StandardScaler()
         self.model_dir = 'ml_models'
         self._ensure_model_dir()
+        # Model paketleri süreç başına bir kez yüklenir, yeni sürüm yayınlanınca değiştirilir
+        self.registry = ModelRegistry(self.model_dir, legacy_loader=self._load_legacy_bundle)
     
     def _ensure_model_dir(self):
         """Model dizinini oluştur"""
         if not os.path.exists(self.model_dir):
             os.makedirs(self.model_dir)
     
+    def _load_legacy_bundle(self, name):
+        """Eski tekil .pkl dosyalarından paket oluştur (hepsi yoksa None)"""
+        if name not in LEGACY_FILES:
+            return None
+        model_file, scaler_file, encoders_file, target = LEGACY_FILES[name]
+        paths = [os.path.join(self.model_dir, f) for f in (model_file, scaler_file, encoders_file)]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        model, scaler, encoders = (joblib.load(path) for path in paths)
+        return {
+            'model': model,
+            'scaler': scaler,
+            'encoders': encoders,
+            'feature_columns': list(getattr(scaler, 'feature_names_in_', [])) or None,
+            'target': target,
+            'name': name,
+            'version': 'legacy-' + datetime.fromtimestamp(os.path.getmtime(paths[0])).strftime('%Y%m%d%H%M%S')
+        }
+    
+    def preload_models(self):
+        """Yayındaki model paketlerini belleğe yükle (worker trafiğe açılmadan önce)"""
+        return self.registry.preload(REGISTERED_MODELS)
+    
+    def _report(self, progress, stage, fraction):
+        """Eğitim ilerlemesini bildir (progress: (aşama, 0-1 arası oran) alan fonksiyon)"""
+        if progress is not None:
+            progress(stage, fraction)
+    
     def prepare_training_data(self, days=90):
         """Eğitim verilerini hazırla"""
         try:
@@ -80,9 +131,10 @@ class MLModels:
         except Exception as e:
             return None, f"Data preparation error: {str(e)}"
     
-    def train_risk_classifier(self, days=90):
+    def train_risk_classifier(self, days=90, n_jobs=None, progress=None):
         """Risk seviyesi sınıflandırıcısı eğit"""
         try:
+            self._report(progress, 'veri hazırlanıyor', 0.05)
             df, error = self.prepare_training_data(days)
             if error:
                 return {'error': error}
@@ -94,34 +146,34 @@ class MLModels:
             # Train-test split
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
             
-            # Scaling
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            # Scaling (her model kendi scaler'ı ile yayınlanır)
+            scaler = StandardScaler()
+            X_train_scaled = scaler.fit_transform(X_train)
+            X_test_scaled = scaler.transform(X_test)
             
             # Model eğitimi
-            rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
+            self._report(progress, 'model eğitiliyor', 0.3)
+            rf_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs)
             rf_model.fit(X_train_scaled, y_train)
             
             # Test
+            self._report(progress, 'test ediliyor', 0.55)
             y_pred = rf_model.predict(X_test_scaled)
             accuracy = accuracy_score(y_test, y_pred)
             
-            # Cross-validation
-            cv_scores = cross_val_score(rf_model, X_train_scaled, y_train, cv=5)
+            # Cross-validation (katlar n_jobs çekirdeğe dağıtılır)
+            self._report(progress, 'çapraz doğrulama', 0.65)
+            cv_scores = cross_val_score(rf_model, X_train_scaled, y_train, cv=5, n_jobs=n_jobs)
             
-            # Model kaydet
-            model_path = os.path.join(self.model_dir, 'risk_classifier.pkl')
-            joblib.dump(rf_model, model_path)
-            
-            # Scaler kaydet
-            scaler_path = os.path.join(self.model_dir, 'risk_scaler.pkl')
-            joblib.dump(self.scaler, scaler_path)
-            
-            # Encoders kaydet
-            encoders_path = os.path.join(self.model_dir, 'risk_encoders.pkl')
-            joblib.dump(self.encoders, encoders_path)
-            
-            self.models['risk_classifier'] = rf_model
+            # Model, scaler ve encoders tek paket olarak yayınlanır
+            self._report(progress, 'yayınlanıyor', 0.9)
+            version = self.registry.publish('risk_classifier', {
+                'model': rf_model,
+                'scaler': scaler,
+                'encoders': dict(self.encoders),
+                'feature_columns': list(X.columns),
+                'target': 'impact_level'
+            }, metrics={'accuracy': accuracy, 'cv_mean': cv_scores.mean()})
             
             return {
                 'model_type': 'risk_classifier',
@@ -130,15 +182,17 @@ class MLModels:
                 'cv_mean': cv_scores.mean(),
                 'cv_std': cv_scores.std(),
                 'feature_importance': dict(zip(X.columns, rf_model.feature_importances_)),
-                'model_saved': True
+                'model_saved': True,
+                'model_version': version
             }
             
         except Exception as e:
             return {'error': f'Risk classifier training error: {str(e)}'}
     
-    def train_threat_classifier(self, days=90):
+    def train_threat_classifier(self, days=90, n_jobs=None, progress=None):
         """Tehdit aktörü sınıflandırıcısı eğit"""
         try:
+            self._report(progress, 'veri hazırlanıyor', 0.05)
             df, error = self.prepare_training_data(days)
             if error:
                 return {'error': error}
@@ -150,26 +204,34 @@ class MLModels:
             # Train-test split
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
             
-            # Scaling
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            # Scaling (her model kendi scaler'ı ile yayınlanır)
+            scaler = StandardScaler()
+            X_train_scaled = scaler.fit_transform(X_train)
+            X_test_scaled = scaler.transform(X_test)
             
             # Model eğitimi
+            self._report(progress, 'model eğitiliyor', 0.3)
             gb_model = GradientBoostingClassifier(n_estimators=100, random_state=42)
             gb_model.fit(X_train_scaled, y_train)
             
             # Test
+            self._report(progress, 'test ediliyor', 0.55)
             y_pred = gb_model.predict(X_test_scaled)
             accuracy = accuracy_score(y_test, y_pred)
             
-            # Cross-validation
-            cv_scores = cross_val_score(gb_model, X_train_scaled, y_train, cv=5)
+            # Cross-validation (katlar n_jobs çekirdeğe dağıtılır)
+            self._report(progress, 'çapraz doğrulama', 0.65)
+            cv_scores = cross_val_score(gb_model, X_train_scaled, y_train, cv=5, n_jobs=n_jobs)
             
-            # Model kaydet
-            model_path = os.path.join(self.model_dir, 'threat_classifier.pkl')
-            joblib.dump(gb_model, model_path)
-            
-            self.models['threat_classifier'] = gb_model
+            # Model, scaler ve encoders tek paket olarak yayınlanır
+            self._report(progress, 'yayınlanıyor', 0.9)
+            version = self.registry.publish('threat_classifier', {
+                'model': gb_model,
+                'scaler': scaler,
+                'encoders': dict(self.encoders),
+                'feature_columns': list(X.columns),
+                'target': 'threat_actor'
+            }, metrics={'accuracy': accuracy, 'cv_mean': cv_scores.mean()})
             
             return {
                 'model_type': 'threat_classifier',
@@ -178,15 +240,17 @@ class MLModels:
                 'cv_mean': cv_scores.mean(),
                 'cv_std': cv_scores.std(),
                 'feature_importance': dict(zip(X.columns, gb_model.feature_importances_)),
-                'model_saved': True
+                'model_saved': True,
+                'model_version': version
             }
             
         except Exception as e:
             return {'error': f'Threat classifier training error: {str(e)}'}
     
-    def train_sector_classifier(self, days=90):
+    def train_sector_classifier(self, days=90, n_jobs=None, progress=None):
         """Sektör sınıflandırıcısı eğit"""
         try:
+            self._report(progress, 'veri hazırlanıyor', 0.05)
             df, error = self.prepare_training_data(days)
             if error:
                 return {'error': error}
@@ -198,26 +262,34 @@ class MLModels:
             # Train-test split
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
             
-            # Scaling
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            # Scaling (her model kendi scaler'ı ile yayınlanır)
+            scaler = StandardScaler()
+            X_train_scaled = scaler.fit_transform(X_train)
+            X_test_scaled = scaler.transform(X_test)
             
             # Model eğitimi
+            self._report(progress, 'model eğitiliyor', 0.3)
             svm_model = SVC(kernel='rbf', random_state=42)
             svm_model.fit(X_train_scaled, y_train)
             
             # Test
+            self._report(progress, 'test ediliyor', 0.55)
             y_pred = svm_model.predict(X_test_scaled)
             accuracy = accuracy_score(y_test, y_pred)
             
-            # Cross-validation
-            cv_scores = cross_val_score(svm_model, X_train_scaled, y_train, cv=5)
-            
-            # Model kaydet
-            model_path = os.path.join(self.model_dir, 'sector_classifier.pkl')
-            joblib.dump(svm_model, model_path)
+            # Cross-validation (katlar n_jobs çekirdeğe dağıtılır)
+            self._report(progress, 'çapraz doğrulama', 0.65)
+            cv_scores = cross_val_score(svm_model, X_train_scaled, y_train, cv=5, n_jobs=n_jobs)
             
-            self.models['sector_classifier'] = svm_model
+            # Model, scaler ve encoders tek paket olarak yayınlanır
+            self._report(progress, 'yayınlanıyor', 0.9)
+            version = self.registry.publish('sector_classifier', {
+                'model': svm_model,
+                'scaler': scaler,
+                'encoders': dict(self.encoders),
+                'feature_columns': list(X.columns),
+                'target': 'sector'
+            }, metrics={'accuracy': accuracy, 'cv_mean': cv_scores.mean()})
             
             return {
                 'model_type': 'sector_classifier',
@@ -225,37 +297,84 @@ class MLModels:
                 'cv_scores': cv_scores.tolist(),
                 'cv_mean': cv_scores.mean(),
                 'cv_std': cv_scores.std(),
-                'model_saved': True
+                'model_saved': True,
+                'model_version': version
             }
             
         except Exception as e:
             return {'error': f'Sector classifier training error: {str(e)}'}
     
+    def _records_frame(self, records, features):
+        """Kayıt listesini özellik sütunlarına sahip tabloya çevir; eksik alanlar varsayılanla dolar"""
+        return self._normalize_frame(pd.DataFrame.from_records(list(records), columns=list(features)), features)
+    
+    def _normalize_frame(self, df, features):
+        for col, default in features.items():
+            if isinstance(default, str):
+                df[col] = df[col].where(df[col].notna(), default).astype(str)
+            else:
+                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(default).astype(int)
+        return df
+    
+    def _encoding_tables(self, bundle):
+        """Encoder sınıflarından arama tabloları (paket başına bir kez oluşturulur)"""
+        tables = bundle.get('encoding_tables')
+        if tables is None:
+            tables = {col: pd.Index(encoder.classes_.astype(str)) for col, encoder in bundle['encoders'].items()}
+            bundle['encoding_tables'] = tables
+        return tables
+    
+    def _prepare_features(self, bundle, df):
+        """Kayıt tablosunu paketin encoder'ları ve özellik sırası ile ölçeklenmiş matrise çevir"""
+        df = df.copy()
+        for col, table in self._encoding_tables(bundle).items():
+            if col in df.columns:
+                codes = table.get_indexer(df[col])
+                df[col] = np.where(codes < 0, 0, codes)  # Unknown value
+        
+        if bundle.get('feature_columns'):
+            df = df[bundle['feature_columns']]
+        return bundle['scaler'].transform(df)
+    
+    def _class_labels(self, bundle):
+        """Modelin sınıflarını okunabilir etiketlere çevir (hedef encode edildiyse geri çözülür)"""
+        classes = bundle['model'].classes_
+        target_encoder = bundle['encoders'].get(bundle.get('target'))
+        if target_encoder is not None and np.issubdtype(np.asarray(classes).dtype, np.integer):
+            classes = target_encoder.classes_[classes]
+        return [str(label) for label in classes]
+    
+    def _predict_batch(self, name, df):
+        """Tüm tablo için tek predict_proba; tahmin her satırın en olası sınıfıdır"""
+        bundle = self.registry.get(name)
+        if bundle is None:
+            return None
+        probabilities = bundle['model'].predict_proba(self._prepare_features(bundle, df))
+        best = probabilities.argmax(axis=1)
+        labels = self._class_labels(bundle)
+        return {
+            'labels': labels,
+            'predicted': np.asarray(labels, dtype=object)[best],
+            'confidence': probabilities[np.arange(len(best)), best],
+            'probabilities': probabilities,
+            'model_version': bundle.get('version')
+        }
+    
+    def _predict(self, name, data):
+        result = self._predict_batch(name, self._records_frame([data], RISK_FEATURES if name == 'risk_classifier'
+                                                               else THREAT_FEATURES))
+        if result is None:
+            return None
+        return {
+            'label': result['predicted'][0],
+            'probabilities': dict(zip(result['labels'], result['probabilities'][0].tolist())),
+            'confidence': float(result['confidence'][0]),
+            'model_version': result['model_version']
+        }
+    
     def predict_risk_level(self, sector, country, threat_actor, hour, weekday, month, data_type_leaked, company_size):
         """Risk seviyesi tahmin et"""
         try:
-            # Model yükle
-            if 'risk_classifier' not in self.models:
-                model_path = os.path.join(self.model_dir, 'risk_classifier.pkl')
-                if os.path.exists(model_path):
-                    self.models['risk_classifier'] = joblib.load(model_path)
-                else:
-                    return {'error': 'Risk classifier model not found'}
-            
-            # Encoders yükle
-            encoders_path = os.path.join(self.model_dir, 'risk_encoders.pkl')
-            if os.path.exists(encoders_path):
-                self.encoders = joblib.load(encoders_path)
-            else:
-                return {'error': 'Risk encoders not found'}
-            
-            # Scaler yükle
-            scaler_path = os.path.join(self.model_dir, 'risk_scaler.pkl')
-            if os.path.exists(scaler_path):
-                self.scaler = joblib.load(scaler_path)
-            else:
-                return {'error': 'Risk scaler not found'}
-            
             # Veri hazırlama
             data = {
                 'sector': sector,
@@ -268,32 +387,15 @@ class MLModels:
                 'company_size': company_size
             }
             
-            # Encode et
-            for col, encoder in self.encoders.items():
-                if col in data:
-                    try:
-                        data[col] = encoder.transform([str(data[col])])[0]
-                    except ValueError:
-                        data[col] = 0  # Unknown value
-            
-            # DataFrame oluştur
-            df = pd.DataFrame([data])
-            
-            # Scaling
-            df_scaled = self.scaler.transform(df)
-            
-            # Tahmin
-            prediction = self.models['risk_classifier'].predict(df_scaled)[0]
-            probabilities = self.models['risk_classifier'].predict_proba(df_scaled)[0]
-            
-            # Risk seviyeleri
-            risk_levels = ['Düşük', 'Orta', 'Yüksek', 'Kritik']
-            predicted_risk = risk_levels[prediction] if prediction < len(risk_levels) else 'Bilinmeyen'
+            result = self._predict('risk_classifier', data)
+            if result is None:
+                return {'error': 'Risk classifier model not found'}
             
             return {
-                'predicted_risk': predicted_risk,
-                'probabilities': dict(zip(risk_levels, probabilities)),
-                'confidence': max(probabilities),
+                'predicted_risk': result['label'],
+                'probabilities': result['probabilities'],
+                'confidence': result['confidence'],
+                'model_version': result['model_version'],
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -303,28 +405,6 @@ class MLModels:
     def predict_threat_actor(self, sector, country, impact_level, hour, weekday, month, data_type_leaked, company_size):
         """Tehdit aktörü tahmin et"""
         try:
-            # Model yükle
-            if 'threat_classifier' not in self.models:
-                model_path = os.path.join(self.model_dir, 'threat_classifier.pkl')
-                if os.path.exists(model_path):
-                    self.models['threat_classifier'] = joblib.load(model_path)
-                else:
-                    return {'error': 'Threat classifier model not found'}
-            
-            # Encoders yükle
-            encoders_path = os.path.join(self.model_dir, 'threat_encoders.pkl')
-            if os.path.exists(encoders_path):
-                self.encoders = joblib.load(encoders_path)
-            else:
-                return {'error': 'Threat encoders not found'}
-            
-            # Scaler yükle
-            scaler_path = os.path.join(self.model_dir, 'threat_scaler.pkl')
-            if os.path.exists(scaler_path):
-                self.scaler = joblib.load(scaler_path)
-            else:
-                return {'error': 'Threat scaler not found'}
-            
             # Veri hazırlama
             data = {
                 'sector': sector,
@@ -337,37 +417,142 @@ class MLModels:
                 'company_size': company_size
             }
             
-            # Encode et
-            for col, encoder in self.encoders.items():
-                if col in data:
-                    try:
-                        data[col] = encoder.transform([str(data[col])])[0]
-                    except ValueError:
-                        data[col] = 0  # Unknown value
-            
-            # DataFrame oluştur
-            df = pd.DataFrame([data])
+            result = self._predict('threat_classifier', data)
+            if result is None:
+                return {'error': 'Threat classifier model not found'}
             
-            # Scaling
-            df_scaled = self.scaler.transform(df)
+            return {
+                'predicted_actor': result['label'],
+                'probabilities': result['probabilities'],
+                'confidence': result['confidence'],
+                'model_version': result['model_version'],
+                'timestamp': datetime.now().isoformat()
+            }
             
-            # Tahmin
-            prediction = self.models['threat_classifier'].predict(df_scaled)[0]
-            probabilities = self.models['threat_classifier'].predict_proba(df_scaled)[0]
+        except Exception as e:
+            return {'error': f'Threat actor prediction error: {str(e)}'}
+    
+    def _batch_predictions(self, result, label_key, start, end, include_probabilities):
+        predictions = []
+        for i in range(start, end):
+            prediction = {label_key: result['predicted'][i], 'confidence': float(result['confidence'][i])}
+            if include_probabilities:
+                prediction['probabilities'] = dict(zip(result['labels'], result['probabilities'][i].tolist()))
+            predictions.append(prediction)
+        return predictions
+    
+    def new_posts_frame(self, since_id=None, days=1, limit=None):
+        """
+        Yeni ingest edilen postları risk modelinin özelliklerine çevir.
+        since_id verilirse o id'den sonrakiler, verilmezse son `days` gün.
+        """
+        from sqlalchemy import text
+        from models.DBModel import db
+        from utils.timestamps import window_start, parse_timestamps
+        
+        columns = {row[1] for row in db.session.execute(text("PRAGMA table_info(posts)"))}
+        sector_column = 'sector' if 'sector' in columns else 'activity'
+        ts_column = 'discovered_ts' if 'discovered_ts' in columns else 'NULL'
+        query = f"SELECT id, name, country, {sector_column} AS sector, discovered, {ts_column} AS discovered_ts FROM posts"
+        if since_id is not None:
+            query += " WHERE id > :since_id"
+        elif ts_column != 'NULL':
+            query += " WHERE discovered_ts >= :start_ts"
+        else:
+            query += " WHERE discovered >= :start_date"
+        query += " ORDER BY id"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        
+        start_ts = window_start(days=days)
+        rows = db.session.execute(text(query), {
+            'since_id': since_id,
+            'start_ts': start_ts,
+            'start_date': datetime.utcfromtimestamp(start_ts).strftime('%Y-%m-%d %H:%M:%S')
+        }).fetchall()
+        posts = pd.DataFrame(rows, columns=['id', 'name', 'country', 'sector', 'discovered', 'discovered_ts'])
+        
+        # discovered_ts olmayan satırlar için metin tarih vektörize çözülür
+        ts = pd.to_numeric(posts['discovered_ts'], errors='coerce')
+        if ts.isna().any():
+            ts = ts.fillna(pd.Series(parse_timestamps(posts['discovered']), index=posts.index, dtype='float64'))
+        moments = pd.to_datetime(ts, unit='s', utc=True)
+        
+        # Postlarda veri türü / şirket büyüklüğü yok; bunlar varsayılan değerle kalır
+        df = pd.DataFrame({
+            'sector': posts['sector'],
+            'country': posts['country'],
+            'threat_actor': posts['name'],
+            'hour': moments.dt.hour,
+            'weekday': moments.dt.weekday,
+            'month': moments.dt.month
+        }).reindex(columns=list(RISK_FEATURES))
+        return posts['id'].tolist(), self._normalize_frame(df, RISK_FEATURES)
+    
+    def predict_risk_batch(self, records, include_probabilities=False, new_posts=None):
+        """
+        Çok sayıda kayıt için risk tahmini: kayıtlar tek seferde encode edilir ve tek
+        predict_proba çağrısı yapılır.
+        new_posts: {'since_id': ..., 'days': ...} verilirse yeni ingest edilen postlar da
+        aynı çağrıda skorlanır ve ayrı listede döner.
+        """
+        try:
+            started = datetime.now()
+            df = self._records_frame(records, RISK_FEATURES)
+            post_ids = []
+            if new_posts is not None:
+                post_ids, posts_df = self.new_posts_frame(**new_posts)
+                df = pd.concat([df, posts_df], ignore_index=True)
+            
+            result = self._predict_batch('risk_classifier', df) if len(df) else None
+            if result is None:
+                if not len(df):
+                    return {'predictions': [], 'count': 0, 'timestamp': datetime.now().isoformat()}
+                return {'error': 'Risk classifier model not found'}
+            
+            n_records = len(df) - len(post_ids)
+            response = {
+                'predictions': self._batch_predictions(result, 'predicted_risk', 0, n_records, include_probabilities),
+                'count': len(df),
+                'summary': pd.Series(result['predicted']).value_counts().to_dict(),
+                'model_version': result['model_version'],
+                'elapsed_ms': round((datetime.now() - started).total_seconds() * 1000, 2),
+                'timestamp': datetime.now().isoformat()
+            }
+            if new_posts is not None:
+                scored = self._batch_predictions(result, 'predicted_risk', n_records, len(df), include_probabilities)
+                for post_id, prediction in zip(post_ids, scored):
+                    prediction['post_id'] = post_id
+                response['new_posts'] = scored
+                # Sonraki çağrı since_id olarak bunu verir
+                response['last_post_id'] = post_ids[-1] if post_ids else new_posts.get('since_id')
+            return response
             
-            # Tehdit aktörü isimlerini al
-            threat_actors = list(self.encoders['threat_actor'].classes_)
-            predicted_actor = threat_actors[prediction] if prediction < len(threat_actors) else 'Bilinmeyen'
+        except Exception as e:
+            return {'error': f'Batch risk prediction error: {str(e)}'}
+    
+    def predict_threat_batch(self, records, include_probabilities=False):
+        """Çok sayıda kayıt için tehdit aktörü tahmini (tek encode + tek predict_proba)"""
+        try:
+            started = datetime.now()
+            df = self._records_frame(records, THREAT_FEATURES)
+            if not len(df):
+                return {'predictions': [], 'count': 0, 'timestamp': datetime.now().isoformat()}
+            result = self._predict_batch('threat_classifier', df)
+            if result is None:
+                return {'error': 'Threat classifier model not found'}
             
             return {
-                'predicted_actor': predicted_actor,
-                'probabilities': dict(zip(threat_actors, probabilities)),
-                'confidence': max(probabilities),
+                'predictions': self._batch_predictions(result, 'predicted_actor', 0, len(df), include_probabilities),
+                'count': len(df),
+                'summary': pd.Series(result['predicted']).value_counts().to_dict(),
+                'model_version': result['model_version'],
+                'elapsed_ms': round((datetime.now() - started).total_seconds() * 1000, 2),
                 'timestamp': datetime.now().isoformat()
             }
             
         except Exception as e:
-            return {'error': f'Threat actor prediction error: {str(e)}'}
+            return {'error': f'Batch threat prediction error: {str(e)}'}
     
     def cluster_attacks(self, days=30, n_clusters=5):
         """Saldırıları kümele"""
@@ -458,10 +643,16 @@ class MLModels:
                     'modified': datetime.fromtimestamp(os.path.getmtime(model_path)).isoformat() if os.path.exists(model_path) else None
                 }
             
+            # Sürümlü paketler: yayındaki ve bu süreçte yüklü sürüm
+            registry = self.registry.get_status(REGISTERED_MODELS)
+            
             return {
                 'model_directory': self.model_dir,
                 'models': status,
-                'total_models': len([m for m in status.values() if m['exists']]),
+                'registry': registry,
+                'loaded_versions': {name: info['loaded_version'] for name, info in registry.items()},
+                'total_models': len([m for m in registry.values() if m['published_version']]) or
+                                len([m for m in status.values() if m['exists']]),
                 'timestamp': datetime.now().isoformat()
             }
             
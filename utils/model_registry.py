@@ -0,0 +1,185 @@
+# Model Kayıt Defteri
+# Eğitilen her model paketi (sınıflandırıcı + scaler + encoder'lar + özellik sırası) tek bir
+# sürümlü dosyaya yazılır: <model_dir>/<isim>@<sürüm>.pkl. Hangi sürümün yayında olduğunu
+# <isim>.current.json işaretçisi söyler; hem paket hem işaretçi geçici dosya + os.replace ile
+# yazıldığı için okuyucular yarım yazılmış bir modeli asla görmez.
+# Her süreç paketi bir kez yükleyip bellekte tutar ve en fazla check_interval saniyede bir
+# işaretçiye bakar; yeni bir sürüm yayınlandıysa paketi yükler ve referansı tek atamayla
+# değiştirir. Tahmin sırasında alınan paket sonuna kadar tutarlıdır (model ve encoder'lar
+# aynı eğitimden gelir).
+
+import sys
+import os
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import joblib
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_CHECK_INTERVAL = 5
+
+# Geri dönüş için diskte tutulan eski sürüm sayısı
+DEFAULT_KEEP_VERSIONS = 3
+
+
+class ModelRegistry:
+    def __init__(self, model_dir, check_interval=DEFAULT_CHECK_INTERVAL, keep_versions=DEFAULT_KEEP_VERSIONS,
+                 legacy_loader=None):
+        """
+        legacy_loader: işaretçisi olmayan modeller için (isim) -> paket veya None;
+        sürümlemeden önce yazılmış tekil .pkl dosyalarını okumak için
+        """
+        self.model_dir = model_dir
+        self.check_interval = check_interval
+        self.keep_versions = keep_versions
+        self.legacy_loader = legacy_loader
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _pointer_path(self, name):
+        return os.path.join(self.model_dir, f'{name}.current.json')
+
+    def _bundle_path(self, name, version):
+        return os.path.join(self.model_dir, f'{name}@{version}.pkl')
+
+    def _read_pointer(self, name):
+        try:
+            with open(self._pointer_path(name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_atomic(self, path, write):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def publish(self, name, bundle, metrics=None):
+        """Yeni sürümü yazar, işaretçiyi ona çevirir ve bu süreçte hemen devreye alır"""
+        os.makedirs(self.model_dir, exist_ok=True)
+        version = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        bundle = dict(bundle, name=name, version=version, trained_at=datetime.now().isoformat())
+        bundle_path = self._bundle_path(name, version)
+        self._write_atomic(bundle_path, lambda path: joblib.dump(bundle, path))
+
+        pointer = {
+            'version': version,
+            'file': os.path.basename(bundle_path),
+            'published_at': bundle['trained_at'],
+            'metrics': metrics or {}
+        }
+        self._write_atomic(self._pointer_path(name),
+                           lambda path: self._dump_json(pointer, path))
+
+        with self._lock:
+            self._entries[name] = self._make_entry(bundle, pointer, 0.0)
+        self._prune(name, keep=version)
+        print(f"[{datetime.now()}] Model yayınlandı: {name}@{version}")
+        return version
+
+    @staticmethod
+    def _dump_json(data, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+
+    def _make_entry(self, bundle, pointer, load_seconds):
+        return {
+            'bundle': bundle,
+            'version': bundle.get('version'),
+            'pointer_version': pointer.get('version') if pointer else None,
+            'loaded_at': time.time(),
+            'checked_at': time.time(),
+            'load_seconds': round(load_seconds, 4)
+        }
+
+    def _load(self, name, pointer):
+        started = time.perf_counter()
+        if pointer:
+            bundle = joblib.load(os.path.join(self.model_dir, pointer['file']))
+        elif self.legacy_loader:
+            bundle = self.legacy_loader(name)
+        else:
+            bundle = None
+        if bundle is None:
+            return None
+        return self._make_entry(bundle, pointer, time.perf_counter() - started)
+
+    def get(self, name):
+        """Yayındaki paketi döndürür (yoksa None); diskte yeni sürüm varsa önce onu yükler"""
+        entry = self._entries.get(name)
+        now = time.time()
+        if entry is not None and now - entry['checked_at'] < self.check_interval:
+            return entry['bundle']
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and time.time() - entry['checked_at'] < self.check_interval:
+                return entry['bundle']
+            pointer = self._read_pointer(name)
+            pointer_version = pointer.get('version') if pointer else None
+            if entry is not None and entry['pointer_version'] == pointer_version:
+                entry['checked_at'] = time.time()
+                return entry['bundle']
+            try:
+                new_entry = self._load(name, pointer)
+            except Exception as e:
+                # Bozuk / yarım kopyalanmış dosya: eldeki sürümle devam et
+                print(f"[{datetime.now()}] Model yüklenemedi ({name}): {e}")
+                if entry is not None:
+                    entry['checked_at'] = time.time()
+                    return entry['bundle']
+                return None
+            if new_entry is None:
+                self._entries.pop(name, None)
+                return None
+            self._entries[name] = new_entry
+            if entry is not None:
+                print(f"[{datetime.now()}] Model güncellendi: {name} {entry['version']} -> {new_entry['version']}")
+            return new_entry['bundle']
+
+    def preload(self, names):
+        """Verilen modelleri yükler (ör. worker trafiğe açılmadan önce); yüklenen isimler"""
+        return [name for name in names if self.get(name) is not None]
+
+    def versions(self, name):
+        """Diskteki sürümler, yeniden eskiye"""
+        prefix = f'{name}@'
+        try:
+            files = [f for f in os.listdir(self.model_dir) if f.startswith(prefix) and f.endswith('.pkl')]
+        except OSError:
+            return []
+        return sorted((f[len(prefix):-len('.pkl')] for f in files), reverse=True)
+
+    def _prune(self, name, keep):
+        for version in self.versions(name)[self.keep_versions:]:
+            if version == keep:
+                continue
+            try:
+                os.remove(self._bundle_path(name, version))
+            except OSError:
+                pass
+
+    def get_status(self, names):
+        status = {}
+        for name in names:
+            entry = self._entries.get(name)
+            pointer = self._read_pointer(name)
+            status[name] = {
+                'loaded_version': entry['version'] if entry else None,
+                'loaded_at': datetime.fromtimestamp(entry['loaded_at']).isoformat() if entry else None,
+                'load_seconds': entry['load_seconds'] if entry else None,
+                'published_version': pointer.get('version') if pointer else None,
+                'published_at': pointer.get('published_at') if pointer else None,
+                'metrics': pointer.get('metrics') if pointer else None,
+                'available_versions': self.versions(name)
+            }
+        return status
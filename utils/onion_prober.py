@@ -0,0 +1,333 @@
+# Onion Site Erişilebilirlik İzleme
+# Tehdit aktörü gruplarının sızıntı sitelerini SOCKS proxy üzerinden eşzamanlı olarak yoklar
+# ve grup bazında sıkıştırılmış bir erişilebilirlik zaman serisi tutar. Eşzamanlılık varsayılan
+# olarak grup sayısı kadardır; tüm tur (kapalı siteler dahil) tek bir zaman aşımı penceresinde biter
+
+import sys
+import os
+import json
+import time
+import ssl
+import struct
+import asyncio
+import sqlite3
+from datetime import datetime
+from urllib.parse import urlparse
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.proxy_pool import (ProxyPool, ProxyConnectionError, NoProxyAvailable,
+                              OUTCOME_OK, OUTCOME_TARGET_ERROR, OUTCOME_PROXY_ERROR)
+
+DEFAULT_PROXY = "socks5://127.0.0.1:9055"
+
+# Zaman serisinde tutulacak en eski örnek (gün)
+RETENTION_DAYS = 90
+
+
+class ProbeError(Exception):
+    pass
+
+
+def parse_proxy(proxy):
+    """socks5://host:port adresini (host, port) olarak döndürür"""
+    parsed = urlparse(proxy)
+    if parsed.scheme not in ('socks5', 'socks5h'):
+        raise ValueError(f"Desteklenmeyen proxy şeması: {proxy}")
+    return parsed.hostname, parsed.port or 1080
+
+
+async def socks5_open_connection(proxy_host, proxy_port, dest_host, dest_port):
+    """
+    SOCKS5 (kimlik doğrulamasız) üzerinden hedefe TCP bağlantısı açar.
+    Onion adreslerinin proxy tarafında çözülmesi için host adı olduğu gibi gönderilir.
+    """
+    try:
+        reader, writer = await asyncio.open_connection(proxy_host, proxy_port)
+    except OSError as e:
+        raise ProxyConnectionError(f"Proxy'ye bağlanılamadı ({proxy_host}:{proxy_port}): {e}")
+    try:
+        writer.write(b'\x05\x01\x00')
+        await writer.drain()
+        try:
+            version, method = await reader.readexactly(2)
+        except (OSError, asyncio.IncompleteReadError) as e:
+            raise ProxyConnectionError(f"SOCKS5 el sıkışması başarısız: {e}")
+        if version != 5 or method != 0:
+            raise ProxyConnectionError("SOCKS5 el sıkışması reddedildi")
+
+        host_bytes = dest_host.encode('idna')
+        writer.write(b'\x05\x01\x00\x03' + bytes([len(host_bytes)]) + host_bytes + struct.pack('>H', dest_port))
+        await writer.drain()
+        reply = await reader.readexactly(4)
+        if reply[1] != 0:
+            raise ProbeError(f"SOCKS5 bağlantı hatası (kod {reply[1]})")
+
+        # Proxy'nin bağlandığı adres bilgisini atla
+        atyp = reply[3]
+        if atyp == 1:
+            await reader.readexactly(4 + 2)
+        elif atyp == 3:
+            length = (await reader.readexactly(1))[0]
+            await reader.readexactly(length + 2)
+        elif atyp == 4:
+            await reader.readexactly(16 + 2)
+        return reader, writer
+    except BaseException:
+        # Zaman aşımında gelen iptal de dahil, yarım kalan bağlantı kapatılır
+        writer.close()
+        raise
+
+
+def _probe_ssl_context():
+    """
+    Erişilebilirlik yoklaması için TLS bağlamı. Onion siteleri çoğunlukla self-signed sertifika
+    kullanır; burada güven değil erişilebilirlik ölçüldüğü için sertifika doğrulanmaz.
+    """
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def _result(up, latency_ms=None, http_status=None, error=None, proxy_error=False):
+    return {
+        'up': up,
+        'latency_ms': latency_ms,
+        'http_status': http_status,
+        'error': error,
+        'proxy_error': proxy_error
+    }
+
+
+async def probe_url(url, proxy=DEFAULT_PROXY, timeout=30):
+    """
+    URL'ye proxy üzerinden HEAD isteği atar (https hedeflerde TLS, SOCKS tüneli üzerinden kurulur).
+    Dönüş: {'up': bool, 'latency_ms': int|None, 'http_status': int|None,
+            'error': str|None, 'proxy_error': bool}
+    """
+    parsed = urlparse(url if '://' in url else f"http://{url}")
+    host = parsed.hostname
+    if not host:
+        return _result(False, error='Geçersiz URL')
+
+    use_tls = parsed.scheme == 'https'
+    port = parsed.port or (443 if use_tls else 80)
+    path = parsed.path or '/'
+    proxy_host, proxy_port = parse_proxy(proxy)
+    started = time.monotonic()
+    writer = None
+
+    async def _request():
+        nonlocal writer
+        reader, writer = await socks5_open_connection(proxy_host, proxy_port, host, port)
+        if use_tls:
+            await writer.start_tls(_probe_ssl_context(), server_hostname=host)
+        writer.write(f"HEAD {path} HTTP/1.0\r\nHost: {host}\r\nUser-Agent: Mozilla/5.0\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        parts = status_line.decode('latin-1').split()
+        if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+            raise ProbeError("Geçersiz HTTP yanıtı")
+        return int(parts[1])
+
+    try:
+        # Her host kendi zaman aşımına sahiptir; yavaş bir site diğerlerini bekletmez
+        http_status = await asyncio.wait_for(_request(), timeout)
+        return _result(http_status < 500, int((time.monotonic() - started) * 1000), http_status)
+    except asyncio.TimeoutError:
+        return _result(False, error='Zaman aşımı')
+    except ProxyConnectionError as e:
+        return _result(False, error=str(e), proxy_error=True)
+    except Exception as e:
+        return _result(False, error=str(e) or type(e).__name__)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+class OnionProber:
+    def __init__(self, db_path='instance/data.db', proxy_pool=None, concurrency=0, timeout=30):
+        """
+        proxy_pool: verilmezse DEFAULT_PROXY'den oluşan tek elemanlı havuz kullanılır
+        concurrency: aynı anda yoklanan site sayısı; 0 ise hedef (grup) sayısı kadar
+        """
+        self.db_path = db_path
+        self.proxy_pool = proxy_pool or ProxyPool([DEFAULT_PROXY], max_concurrency=concurrency or 1)
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        # (group_name, ts) birincil anahtarlı WITHOUT ROWID tablo: örnekler grup bazında
+        # kümelenir, geçmiş sorguları tek bir aralık taramasıdır
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS group_availability (
+                group_name TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                up INTEGER NOT NULL,
+                latency_ms INTEGER,
+                http_status INTEGER,
+                PRIMARY KEY (group_name, ts)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_group_availability_ts ON group_availability(ts)")
+        return conn
+
+    @staticmethod
+    def _target_url(url, locations):
+        """Grubun url alanı boşsa kayıtlı ilk lokasyonu kullanır"""
+        if url and url != 'None':
+            return url
+        try:
+            for location in json.loads(locations or '[]') or []:
+                if isinstance(location, dict) and location.get('fqdn'):
+                    return location['fqdn']
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    def load_targets(self, conn):
+        """groups tablosundan (grup adı, url) listesini çıkarır"""
+        targets = {}
+        for name, url, locations in conn.execute("SELECT name, url, locations FROM groups"):
+            target = self._target_url(url, locations)
+            if name and target and name not in targets:
+                targets[name] = target
+        return targets
+
+    async def probe_all(self, targets):
+        """
+        Tüm hedefleri sınırlı eşzamanlılıkla yoklar.
+        targets: {grup adı: url}; dönüş: {grup adı: sonuç}
+        Proxy kaynaklı hatalar sitenin kapalı olduğu anlamına gelmediği için sonuçlara eklenmez.
+        """
+        concurrency = max(1, min(self.concurrency or len(targets), len(targets)))
+        # Havuz da aynı sayıda bağlantıya izin vermeli; aksi halde siteler proxy sırası bekler
+        self.proxy_pool.ensure_capacity(concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _bounded(name, url):
+            async with semaphore:
+                # Proxy hatasında site başka bir proxy üzerinden tekrar denenir
+                for _ in range(len(self.proxy_pool.endpoints)):
+                    try:
+                        endpoint = await self.proxy_pool.acquire_async(timeout=self.timeout)
+                    except NoProxyAvailable:
+                        break
+                    result = await probe_url(url, endpoint.url, self.timeout)
+                    if result['proxy_error']:
+                        outcome = OUTCOME_PROXY_ERROR
+                    elif result['up']:
+                        outcome = OUTCOME_OK
+                    else:
+                        outcome = OUTCOME_TARGET_ERROR
+                    latency = result['latency_ms'] / 1000 if result['latency_ms'] is not None else None
+                    self.proxy_pool.release(endpoint, outcome, latency, result['error'])
+                    if not result['proxy_error']:
+                        return name, result
+                return name, None
+
+        results = await asyncio.gather(*(_bounded(name, url) for name, url in targets.items()))
+        return {name: result for name, result in results if result is not None}
+
+    def record(self, conn, results, ts=None):
+        """Yoklama sonuçlarını zaman serisine yazar ve eski örnekleri temizler"""
+        ts = int(ts if ts is not None else time.time())
+        conn.executemany("""
+            INSERT OR REPLACE INTO group_availability (group_name, ts, up, latency_ms, http_status)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(name, ts, int(r['up']), r['latency_ms'], r['http_status']) for name, r in results.items()])
+        conn.execute("DELETE FROM group_availability WHERE ts < ?", (ts - RETENTION_DAYS * 86400,))
+        conn.commit()
+
+    def run_once(self):
+        """Tüm grupları bir kez yoklar, erişilebilir site sayısını döndürür"""
+        conn = self._connect()
+        try:
+            targets = self.load_targets(conn)
+            started = time.monotonic()
+            results = asyncio.run(self.probe_all(targets))
+            self.record(conn, results)
+        finally:
+            conn.close()
+
+        up_count = sum(1 for r in results.values() if r['up'])
+        print(f"[{datetime.now()}] {len(results)} site yoklandı, {up_count} erişilebilir "
+              f"({time.monotonic() - started:.1f}s)")
+        return up_count
+
+
+def _summarize(rows):
+    latencies = [row[2] for row in rows if row[2] is not None]
+    return {
+        'samples': len(rows),
+        'uptime_pct': round(100.0 * sum(row[1] for row in rows) / len(rows), 1) if rows else None,
+        'avg_latency_ms': int(sum(latencies) / len(latencies)) if latencies else None
+    }
+
+
+def get_availability_summary(db_path='instance/data.db', hours=24):
+    """Tüm gruplar için son durum ve verilen süre içindeki erişilebilirlik oranı"""
+    since = int(time.time()) - hours * 3600
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT group_name, ts, up, latency_ms FROM group_availability
+            WHERE ts >= ? ORDER BY group_name, ts
+        """, (since,)).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+    by_group = {}
+    for group_name, ts, up, latency_ms in rows:
+        by_group.setdefault(group_name, []).append((ts, up, latency_ms))
+
+    summary = []
+    for group_name, samples in by_group.items():
+        last_ts, last_up, _ = samples[-1]
+        item = {
+            'group': group_name,
+            'is_up': bool(last_up),
+            'last_checked': datetime.fromtimestamp(last_ts).isoformat()
+        }
+        item.update(_summarize(samples))
+        summary.append(item)
+    summary.sort(key=lambda item: item['group'].lower())
+    return summary
+
+
+def get_availability_history(group_name, db_path='instance/data.db', days=7):
+    """Bir grubun erişilebilirlik ve gecikme geçmişi"""
+    since = int(time.time()) - days * 86400
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT ts, up, latency_ms, http_status FROM group_availability
+            WHERE group_name = ? AND ts >= ? ORDER BY ts
+        """, (group_name, since)).fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    finally:
+        conn.close()
+
+    history = {
+        'group': group_name,
+        'days': days,
+        'series': [{
+            'timestamp': datetime.fromtimestamp(ts).isoformat(),
+            'up': bool(up),
+            'latency_ms': latency_ms,
+            'http_status': http_status
+        } for ts, up, latency_ms, http_status in rows]
+    }
+    history.update(_summarize(rows))
+    return history
+
+
+if __name__ == "__main__":
+    prober = OnionProber()
+    prober.run_once()
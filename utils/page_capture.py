@@ -0,0 +1,187 @@
+# Sayfa Yakalama Katmanı
+# Onion sitelerinin ekran görüntüsünü havuzlanmış tarayıcılar ve SOCKS proxy havuzu üzerinden alır
+
+import sys
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.proxy_pool import ProxyPool, ProxyConnectionError
+
+DEFAULT_PROXY = "socks5://127.0.0.1:9055"
+
+# Chromium'un proxy'ye ulaşamadığında verdiği hata kodları (hedef site hatalarından ayrılır)
+PROXY_ERROR_MARKERS = (
+    'ERR_PROXY_CONNECTION_FAILED',
+    'ERR_SOCKS_CONNECTION_FAILED',
+    'ERR_TUNNEL_CONNECTION_FAILED'
+)
+
+
+class PageCaptureError(Exception):
+    pass
+
+
+class PlaywrightCapturer:
+    """
+    Chromium'u bir kez başlatır ve her yakalama için havuzdan seçilen proxy ile
+    yeni bir context açar. Playwright sync API'si gereği aynı thread içinden kullanılmalıdır.
+    """
+
+    def __init__(self, proxy_pool=None, goto_timeout_ms=15000, settle_ms=15000):
+        self.proxy_pool = proxy_pool or ProxyPool([DEFAULT_PROXY])
+        self.goto_timeout_ms = goto_timeout_ms
+        self.settle_ms = settle_ms
+        self._playwright = None
+        self._browser = None
+        self.captures = 0
+
+    def _ensure_browser(self):
+        """Tarayıcı kapalıysa veya çöktüyse yeniden başlatır"""
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+
+        if self._playwright is None:
+            from playwright.sync_api import sync_playwright
+            self._playwright = sync_playwright().start()
+
+        # Proxy her context için ayrıca verilir, tarayıcı seviyesindeki değer sadece varsayılandır
+        default_proxy = self.proxy_pool.endpoints[0].url
+        print(f"[{datetime.now()}] Havuzlanmış tarayıcı başlatılıyor")
+        self._browser = self._playwright.chromium.launch(proxy={"server": default_proxy}, args=[''])
+        return self._browser
+
+    def capture(self, url):
+        """URL'nin tam sayfa PNG ekran görüntüsünü bytes olarak döndürür"""
+        browser = self._ensure_browser()
+        try:
+            with self.proxy_pool.lease() as endpoint:
+                return self._capture_with_proxy(browser, url, endpoint.url)
+        except PageCaptureError:
+            raise
+        except Exception as e:
+            raise PageCaptureError(f"{url}: {e}")
+
+    def _capture_with_proxy(self, browser, url, proxy):
+        context = browser.new_context(
+            proxy={"server": proxy},
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+            viewport={"width": 1280, "height": 800},
+            locale='en-US',
+            ignore_https_errors=True)
+        try:
+            page = context.new_page()
+            page.goto(url, wait_until='domcontentloaded', timeout=self.goto_timeout_ms)
+            page.bring_to_front()
+            page.wait_for_timeout(self.settle_ms)
+            page.mouse.move(x=500, y=400)
+            page.wait_for_load_state('networkidle')
+            page.mouse.wheel(delta_y=2000, delta_x=0)
+            page.wait_for_load_state('networkidle')
+            png = page.screenshot(full_page=True)
+            self.captures += 1
+            return png
+        except Exception as e:
+            if any(marker in str(e) for marker in PROXY_ERROR_MARKERS):
+                raise ProxyConnectionError(f"{proxy}: {e}")
+            raise PageCaptureError(f"{url}: {e}")
+        finally:
+            context.close()
+
+    def close(self):
+        """Tarayıcıyı ve Playwright sürecini kapatır"""
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+
+class ParallelCapturer:
+    """
+    Her biri kendi tarayıcısına sahip worker thread'leri ile paralel yakalama yapar.
+    Worker sayısı varsayılan olarak proxy havuzunun toplam kapasitesidir; böylece
+    verim sağlıklı Tor devresi sayısıyla birlikte artar.
+    """
+
+    def __init__(self, proxy_pool, workers=None, capturer_factory=None):
+        """
+        capturer_factory: worker başına capturer üreten fonksiyon
+        (çevrimdışı testlerde sahte bir capturer verilebilir)
+        """
+        self.proxy_pool = proxy_pool
+        self.workers = workers or proxy_pool.total_capacity()
+        self.capturer_factory = capturer_factory or (lambda: PlaywrightCapturer(proxy_pool))
+        self._jobs = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"capture-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self):
+        capturer = self.capturer_factory()
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                url, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(capturer.capture(url))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            # Playwright nesneleri oluşturuldukları thread içinde kapatılmalıdır
+            capturer.close()
+
+    def submit(self, url):
+        """Yakalama işini kuyruğa ekler, Future döndürür"""
+        self._ensure_workers()
+        future = Future()
+        self._jobs.put((url, future))
+        return future
+
+    def capture(self, url):
+        """Tek URL'yi yakalar (LeakSiteMonitor gibi capture(url) bekleyen kullanıcılar için)"""
+        return self.submit(url).result()
+
+    def capture_many(self, urls):
+        """URL'leri paralel yakalar; url -> PNG bytes veya hata nesnesi döndürür"""
+        futures = {url: self.submit(url) for url in dict.fromkeys(urls)}
+        results = {}
+        for url, future in futures.items():
+            try:
+                results[url] = future.result()
+            except Exception as e:
+                results[url] = e
+        return results
+
+    def close(self):
+        """Worker'ları durdurur ve tarayıcılarını kapatır"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._jobs.put(None)
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,211 @@
+# Sıcak/Soğuk Post Bölümlemesi
+# Ufuk süresinden eski postları ayrı bir arşiv SQLite dosyasına taşır. Arşiv ATTACH ile
+# bağlanır; nadir geçmiş sorguları için main.posts ve archive.posts UNION ALL görünümüyle
+# (all_posts) birleştirilir. Dashboard sorguları sadece küçük sıcak tabloyu okur.
+
+import sys
+import os
+import sqlite3
+from datetime import datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.timestamps import backfill_timestamp_columns, window_start
+from utils.sql_instrumentation import connect
+from utils.data_version import bump_data_version
+
+# Verilmezse arşiv, sıcak veritabanıyla aynı dizinde archive.db olarak tutulur
+ARCHIVE_DB_PATH = os.getenv('ARCHIVE_DB_PATH')
+ARCHIVE_FILE_NAME = 'archive.db'
+ARCHIVE_SCHEMA = 'archive'
+ALL_POSTS_VIEW = 'all_posts'
+
+# Arşivde tutulan indeksler (sütun tabloda varsa); geçmiş sorguları anahtarlı aramadır
+ARCHIVE_INDEXES = {
+    'idx_archive_posts_discovered_ts': 'discovered_ts',
+    'idx_archive_posts_victim_domain': 'victim_domain',
+    'idx_archive_posts_victim_id': 'victim_id',
+    'idx_archive_posts_company_id': 'company_id'
+}
+
+
+def _table_columns(conn, schema):
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA {schema}.table_info(posts)")]
+
+
+def is_attached(conn, schema=ARCHIVE_SCHEMA):
+    return any(row[1] == schema for row in conn.execute("PRAGMA database_list"))
+
+
+def archive_path_for(db_path):
+    """Sıcak veritabanı yoluna karşılık gelen arşiv dosyası"""
+    return ARCHIVE_DB_PATH or os.path.join(os.path.dirname(os.path.abspath(db_path)), ARCHIVE_FILE_NAME)
+
+
+def attach_archive(conn, archive_path=None, must_exist=False):
+    """
+    Arşiv dosyasını bağlantıya ATTACH eder ve all_posts geçici görünümünü kurar.
+    must_exist=True iken dosya yoksa (henüz arşivleme yapılmamışsa) False döner.
+    """
+    if is_attached(conn):
+        return True
+    if archive_path is None:
+        main_file = next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == 'main')
+        if not main_file:
+            return False
+        archive_path = archive_path_for(main_file)
+    if must_exist and not os.path.exists(archive_path):
+        return False
+    conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (archive_path,))
+    ensure_archive_schema(conn)
+    return True
+
+
+def ensure_archive_schema(conn):
+    """
+    archive.posts tablosunu sıcak tablonun şemasıyla oluşturur, sonradan eklenen
+    sütunları arşive de ekler ve all_posts görünümünü yeniler.
+    """
+    hot_columns = _table_columns(conn, 'main')
+    archive_columns = {name for name, _ in _table_columns(conn, ARCHIVE_SCHEMA)}
+    if not archive_columns:
+        create_sql = conn.execute(
+            "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = 'posts'").fetchone()[0]
+        # "CREATE TABLE posts (...)" -> "CREATE TABLE archive.posts (...)"
+        definition = create_sql[create_sql.index('('):]
+        # Yeni arşiv dosyası baştan INCREMENTAL auto_vacuum ile oluşturulur (bkz. db_maintenance)
+        if not conn.execute(f"SELECT COUNT(*) FROM {ARCHIVE_SCHEMA}.sqlite_master").fetchone()[0]:
+            conn.execute(f"PRAGMA {ARCHIVE_SCHEMA}.auto_vacuum = INCREMENTAL")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.posts {definition}")
+    else:
+        for name, column_type in hot_columns:
+            if name not in archive_columns:
+                conn.execute(f"ALTER TABLE {ARCHIVE_SCHEMA}.posts ADD COLUMN {name} {column_type}")
+
+    existing = {name for name, _ in hot_columns}
+    for index_name, column in ARCHIVE_INDEXES.items():
+        if column in existing:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.{index_name} ON posts({column})")
+
+    # Kalıcı görünümler başka bir veritabanındaki tabloya referans veremediği için TEMP
+    column_list = ', '.join(name for name, _ in hot_columns)
+    conn.execute(f"DROP VIEW IF EXISTS temp.{ALL_POSTS_VIEW}")
+    conn.execute(f"""
+        CREATE TEMP VIEW {ALL_POSTS_VIEW} AS
+        SELECT {column_list} FROM main.posts
+        UNION ALL
+        SELECT {column_list} FROM {ARCHIVE_SCHEMA}.posts
+    """)
+
+
+def connect_with_archive(db_path='instance/data.db', archive_path=None):
+    """
+    Geçmiş sorguları için bağlantı. Arşiv varsa all_posts her iki bölümü kapsar;
+    yoksa all_posts sadece sıcak tabloya işaret eder.
+    """
+    conn = connect(db_path)
+    if not attach_archive(conn, archive_path, must_exist=True):
+        conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS {ALL_POSTS_VIEW} AS SELECT * FROM main.posts")
+    return conn
+
+
+def archived_post_exists(conn, where, params, archive_path=None):
+    """Arşivde WHERE koşuluna uyan post var mı (ingest tekilleştirmesi için)"""
+    if not attach_archive(conn, archive_path, must_exist=True):
+        return False
+    return conn.execute(f"SELECT 1 FROM {ARCHIVE_SCHEMA}.posts WHERE {where} LIMIT 1", params).fetchone() is not None
+
+
+class PostArchiver:
+    def __init__(self, db_path='instance/data.db', archive_path=None,
+                 horizon_days=365, batch_size=5000):
+        """
+        horizon_days: discovered_ts bu kadar günden eski olan postlar arşive taşınır
+        batch_size: tek işlemde taşınan post sayısı (yazma kilidi kısa tutulur)
+        """
+        self.db_path = db_path
+        self.archive_path = archive_path or archive_path_for(db_path)
+        self.horizon_days = horizon_days
+        self.batch_size = batch_size
+
+    def cutoff(self):
+        return window_start(days=self.horizon_days)
+
+    def archive_old_posts(self):
+        """
+        Ufuk dışındaki postları parça parça arşive taşır. Her parça tek bir işlemde
+        kopyalanıp sıcak tablodan silinir; INSERT OR REPLACE sayesinde yarıda kalan bir
+        çalıştırma tekrarlandığında arşivde çift kayıt oluşmaz.
+        """
+        conn = sqlite3.connect(self.db_path)
+        moved = 0
+        try:
+            backfill_timestamp_columns(conn)
+            attach_archive(conn, self.archive_path)
+            columns = ', '.join(name for name, _ in _table_columns(conn, 'main'))
+            cutoff = self.cutoff()
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)")
+            while True:
+                conn.execute("DELETE FROM temp.archive_batch")
+                # En büyük id sıcakta bırakılır: AUTOINCREMENT olmayan tablolarda silinmesi
+                # id'nin yeni bir posta tekrar verilmesine ve arşivdeki kaydın ezilmesine yol açar
+                conn.execute("""
+                    INSERT INTO temp.archive_batch (id)
+                    SELECT id FROM main.posts
+                    WHERE discovered_ts < ? AND id < (SELECT MAX(id) FROM main.posts)
+                    LIMIT ?
+                """, (cutoff, self.batch_size))
+                batch = conn.execute("SELECT COUNT(*) FROM temp.archive_batch").fetchone()[0]
+                if not batch:
+                    conn.commit()
+                    break
+                conn.execute(f"""
+                    INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.posts ({columns})
+                    SELECT {columns} FROM main.posts WHERE id IN (SELECT id FROM temp.archive_batch)
+                """)
+                conn.execute("DELETE FROM main.posts WHERE id IN (SELECT id FROM temp.archive_batch)")
+                bump_data_version(conn, 'posts', ARCHIVE_SCHEMA)
+                conn.commit()
+                moved += batch
+        finally:
+            conn.close()
+
+        if moved:
+            print(f"[{datetime.now()}] {moved} post arşive taşındı ({self.horizon_days} günden eski)")
+        return moved
+
+    def get_stats(self):
+        """Sıcak ve arşiv bölümlerinin satır sayıları, tarih aralıkları ve dosya boyutları"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            partitions = {'hot': 'main'}
+            if attach_archive(conn, self.archive_path, must_exist=True):
+                partitions['archive'] = ARCHIVE_SCHEMA
+            stats = {'horizon_days': self.horizon_days, 'cutoff': datetime.fromtimestamp(self.cutoff()).isoformat()}
+            for label, schema in partitions.items():
+                count, oldest, newest = conn.execute(
+                    f"SELECT COUNT(*), MIN(discovered_ts), MAX(discovered_ts) FROM {schema}.posts").fetchone()
+                path = self.db_path if schema == 'main' else self.archive_path
+                stats[label] = {
+                    'posts': count,
+                    'oldest': datetime.fromtimestamp(oldest).isoformat() if oldest else None,
+                    'newest': datetime.fromtimestamp(newest).isoformat() if newest else None,
+                    'size_mb': round(os.path.getsize(path) / (1024 * 1024), 2)
+                }
+            return stats
+        finally:
+            conn.close()
+
+
+def get_partition_stats(db_path='instance/data.db', archive_path=None, horizon_days=365):
+    """Endpoint için bölüm istatistikleri"""
+    return PostArchiver(db_path, archive_path, horizon_days).get_stats()
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    archiver = PostArchiver(horizon_days=days)
+    moved = archiver.archive_old_posts()
+    print(f"✅ {moved} post arşive taşındı")
+    print(archiver.get_stats())
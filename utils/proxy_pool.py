@@ -0,0 +1,235 @@
+# SOCKS Proxy Havuzu
+# Birden fazla yerel Tor SOCKS uç noktasını sağlık kontrolü, gecikme ağırlıklı seçim,
+# proxy başına eşzamanlılık sınırı ve otomatik devre dışı bırakma ile yönetir
+
+import sys
+import os
+import time
+import random
+import asyncio
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Gecikmesi henüz ölçülmemiş proxy için varsayılan değer (saniye)
+DEFAULT_LATENCY = 1.0
+
+# Bir proxy kullanımının sonucu
+OUTCOME_OK = 'ok'
+OUTCOME_TARGET_ERROR = 'target_error'
+OUTCOME_PROXY_ERROR = 'proxy_error'
+
+
+class NoProxyAvailable(Exception):
+    pass
+
+
+class ProxyConnectionError(Exception):
+    """Proxy'nin kendisine ulaşılamadığını belirtir"""
+    pass
+
+
+class ProxyEndpoint:
+    def __init__(self, url, max_concurrency):
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.latency = None
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0
+        self.last_error = None
+
+    def is_ejected(self, now=None):
+        return (now if now is not None else time.time()) < self.ejected_until
+
+    def has_capacity(self):
+        return self.in_flight < self.max_concurrency
+
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'healthy': not self.is_ejected(),
+            'in_flight': self.in_flight,
+            'max_concurrency': self.max_concurrency,
+            'latency_ms': int(self.latency * 1000) if self.latency is not None else None,
+            'successes': self.successes,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'ejected_until': datetime.fromtimestamp(self.ejected_until).isoformat() if self.is_ejected() else None,
+            'last_error': self.last_error
+        }
+
+
+class ProxyPool:
+    def __init__(self, proxies, max_concurrency=2, eject_after=3, eject_seconds=300, latency_alpha=0.3):
+        """
+        proxies: socks5://host:port listesi
+        max_concurrency: proxy (Tor devresi) başına aynı anda kullanılabilecek bağlantı sayısı
+        eject_after: proxy'nin devre dışı bırakılması için art arda proxy hatası sayısı
+        eject_seconds: devre dışı kalma süresi; sonunda proxy tekrar denemeye açılır
+        """
+        if not proxies:
+            raise ValueError("Proxy havuzu boş olamaz")
+        self.endpoints = [ProxyEndpoint(url, max_concurrency) for url in proxies]
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.latency_alpha = latency_alpha
+        self._cond = threading.Condition()
+
+    def _pick(self):
+        """Uygun proxy'ler arasından gecikmeyle ters orantılı ağırlıkla seçim yapar"""
+        now = time.time()
+        candidates = [ep for ep in self.endpoints if not ep.is_ejected(now) and ep.has_capacity()]
+        if not candidates:
+            return None
+        weights = [1.0 / max(ep.latency if ep.latency is not None else DEFAULT_LATENCY, 0.05)
+                   for ep in candidates]
+        endpoint = random.choices(candidates, weights=weights)[0]
+        endpoint.in_flight += 1
+        return endpoint
+
+    def try_acquire(self):
+        """Boşta proxy varsa hemen döndürür, yoksa None"""
+        with self._cond:
+            return self._pick()
+
+    def acquire(self, timeout=None):
+        """Bir proxy boşalana kadar bekler"""
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._cond:
+            while True:
+                endpoint = self._pick()
+                if endpoint is not None:
+                    return endpoint
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise NoProxyAvailable("Uygun proxy bulunamadı")
+                # Devre dışı proxy'lerin süresi dolabileceği için periyodik olarak tekrar bakılır
+                self._cond.wait(min(remaining, 1.0) if remaining is not None else 1.0)
+
+    async def acquire_async(self, timeout=None, poll_interval=0.05):
+        """acquire'ın event loop'u bloklamayan karşılığı"""
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            endpoint = self.try_acquire()
+            if endpoint is not None:
+                return endpoint
+            if deadline is not None and time.time() >= deadline:
+                raise NoProxyAvailable("Uygun proxy bulunamadı")
+            await asyncio.sleep(poll_interval)
+
+    def release(self, endpoint, outcome=OUTCOME_OK, latency=None, error=None):
+        """
+        Proxy'yi havuza geri verir.
+        OUTCOME_PROXY_ERROR sadece proxy'nin kendisine ulaşılamadığında kullanılmalıdır;
+        hedef sitenin kapalı olması (OUTCOME_TARGET_ERROR) proxy'nin sağlığını etkilemez.
+        """
+        with self._cond:
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+            self._record(endpoint, outcome, latency, error)
+            self._cond.notify_all()
+
+    def _record(self, endpoint, outcome, latency=None, error=None):
+        if outcome == OUTCOME_TARGET_ERROR:
+            return
+
+        if outcome == OUTCOME_PROXY_ERROR:
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            endpoint.last_error = error
+            if endpoint.consecutive_failures >= self.eject_after and not endpoint.is_ejected():
+                endpoint.ejected_until = time.time() + self.eject_seconds
+                print(f"[{datetime.now()}] Proxy devre dışı bırakıldı: {endpoint.url} ({error})")
+            return
+
+        endpoint.successes += 1
+        endpoint.consecutive_failures = 0
+        if endpoint.is_ejected():
+            endpoint.ejected_until = 0
+            print(f"[{datetime.now()}] Proxy tekrar havuza alındı: {endpoint.url}")
+        if latency is not None:
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency += self.latency_alpha * (latency - endpoint.latency)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """
+        with pool.lease() as endpoint: ... şeklinde kullanım.
+        Blok içindeki hatalar hedef kaynaklı kabul edilir; proxy hatası için
+        ProxyConnectionError fırlatılmalıdır.
+        """
+        endpoint = self.acquire(timeout)
+        started = time.monotonic()
+        try:
+            yield endpoint
+        except ProxyConnectionError as e:
+            self.release(endpoint, OUTCOME_PROXY_ERROR, error=str(e))
+            raise
+        except BaseException:
+            self.release(endpoint, OUTCOME_TARGET_ERROR)
+            raise
+        else:
+            self.release(endpoint, OUTCOME_OK, latency=time.monotonic() - started)
+
+    def healthy_count(self):
+        now = time.time()
+        return sum(1 for ep in self.endpoints if not ep.is_ejected(now))
+
+    def total_capacity(self):
+        """Tüm proxy'lerin toplam eşzamanlılık kapasitesi"""
+        return sum(ep.max_concurrency for ep in self.endpoints)
+
+    def ensure_capacity(self, total):
+        """Toplam kapasite en az total olacak şekilde proxy başına sınırı yükseltir (düşürmez)"""
+        per_proxy = -(-total // len(self.endpoints))
+        with self._cond:
+            for endpoint in self.endpoints:
+                endpoint.max_concurrency = max(endpoint.max_concurrency, per_proxy)
+            self._cond.notify_all()
+
+    async def health_check(self, check_url, timeout=30):
+        """
+        Devre dışı olanlar dahil her proxy üzerinden check_url'e istek atar.
+        Başarılı proxy'ler hemen havuza geri alınır, gecikmeleri güncellenir.
+        """
+        from utils.onion_prober import probe_url
+
+        async def _check(endpoint):
+            result = await probe_url(check_url, endpoint.url, timeout)
+            latency = result['latency_ms'] / 1000 if result['latency_ms'] is not None else None
+            # Sağlık kontrolü adresi her zaman erişilebilir kabul edilir, her hata proxy'ye yazılır
+            outcome = OUTCOME_OK if result['up'] else OUTCOME_PROXY_ERROR
+            with self._cond:
+                self._record(endpoint, outcome, latency, result['error'])
+                self._cond.notify_all()
+            return result['up']
+
+        results = await asyncio.gather(*(_check(ep) for ep in self.endpoints))
+        return sum(results)
+
+    def run_health_check(self, check_url, timeout=30):
+        """health_check'in senkron sarmalayıcısı, sağlıklı proxy sayısını döndürür"""
+        healthy = asyncio.run(self.health_check(check_url, timeout))
+        print(f"[{datetime.now()}] Proxy sağlık kontrolü: {healthy}/{len(self.endpoints)} sağlıklı")
+        return healthy
+
+    def get_stats(self):
+        with self._cond:
+            return {
+                'healthy': self.healthy_count(),
+                'total': len(self.endpoints),
+                'capacity': self.total_capacity(),
+                'proxies': [ep.to_dict() for ep in self.endpoints]
+            }
+
+
+def parse_proxy_list(value):
+    """Virgülle ayrılmış proxy listesini ayrıştırır"""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
@@ -0,0 +1,394 @@
+# API Hız Sınırlama ve Yük Atma
+# İstekler yol önekine göre endpoint sınıflarına ayrılır (heavy, analytics, export, read...).
+# Her (istemci, sınıf) çifti için bir token bucket tutulur; istemci bilinen bir API key ise
+# key'e, değilse IP adresine göre sayılır. Bucket'lar süreç içinde veya (isteğe bağlı) Redis'te
+# tutulur. Ağır sınıfların eş zamanlı istek sayısı da sınırlıdır: worker'lar dolduğunda yeni
+# ağır istekler kuyrukta beklemek yerine hemen 503 + Retry-After ile reddedilir, böylece ucuz
+# dashboard okumaları thread bulmaya devam eder.
+
+import sys
+import os
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sınıf: (bucket kapasitesi, saniyede eklenen token)
+DEFAULT_CLASSES = {
+    'heavy': (5, 5 / 60),
+    'export': (10, 10 / 60),
+    'analytics': (30, 30 / 60),
+    'write': (30, 30 / 60),
+    'read': (300, 300 / 60),
+    'default': (120, 120 / 60),
+}
+
+# Yol öneki -> sınıf (ilk eşleşen kazanır, sıralama önemli)
+DEFAULT_ENDPOINT_CLASSES = [
+    ('/api/ml/train-', 'heavy'),
+    ('/api/database/optimize', 'heavy'),
+    ('/api/performance/auto-optimize', 'heavy'),
+    ('/api/performance/analyze', 'heavy'),
+    ('/api/performance/index-advisor', 'heavy'),
+    ('/api/force-update', 'heavy'),
+    ('/api/generate-report', 'heavy'),
+    ('/api/export/', 'export'),
+    ('/api/v1/export/', 'export'),
+    ('/api/analytics/', 'analytics'),
+    ('/api/v1/analytics/', 'analytics'),
+    ('/api/ml/', 'analytics'),
+    ('/api/filtered-attacks', 'analytics'),
+    ('/api/v1/search/', 'analytics'),
+    ('/api/integrations/', 'write'),
+    ('/api/cache/clear', 'write'),
+    ('/api/monitoring/clear-metrics', 'write'),
+    ('/api/dashboard-data', 'read'),
+    ('/api/realtime-status', 'read'),
+    ('/api/recent-attacks', 'read'),
+    ('/api/v1/dashboard/', 'read'),
+    ('/api/v1/charts/', 'read'),
+    ('/api/', 'default'),
+]
+
+# Sınıf başına süreç içi eş zamanlı istek sınırı (listede olmayan sınıflar sınırsız)
+DEFAULT_CONCURRENCY = {
+    'heavy': 2,
+    'export': 2,
+    'analytics': 4,
+}
+
+# Sınırlanmayan yollar (uzun süre açık kalan SSE akışı, sağlık kontrolleri)
+DEFAULT_EXEMPT_PATHS = ('/api/events', '/api/health', '/api/v1/health', '/api/monitoring/health')
+
+MAX_MEMORY_BUCKETS = 100000
+
+# Eş zamanlılık sınırına takılan isteklere önerilen bekleme (saniye)
+SHED_RETRY_AFTER = 5
+
+# Redis'te atomik token bucket: KEYS[1] bucket, ARGV = kapasite, hız, şimdi, maliyet
+REDIS_TOKEN_BUCKET = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class MemoryBucketStore:
+    """Süreç içi token bucket'lar (LRU ile sınırlı)"""
+
+    def __init__(self, max_buckets=MAX_MEMORY_BUCKETS):
+        self.max_buckets = max_buckets
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, cost=1):
+        """(izin verildi mi, kalan token)"""
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class RedisBucketStore:
+    """
+    Worker'lar ve sunucular arasında paylaşılan bucket'lar. Redis erişilemezse süreç içi
+    bucket'lara düşülür (istekler reddedilmez, sınır süreç başına uygulanır).
+    """
+
+    def __init__(self, url, prefix='ratelimit:'):
+        import redis
+        self.errors = redis.RedisError
+        self.client = redis.Redis.from_url(url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        self.script = self.client.register_script(REDIS_TOKEN_BUCKET)
+        self.prefix = prefix
+        self.fallback = MemoryBucketStore()
+        self.failed_at = None
+
+    def consume(self, key, capacity, rate, cost=1):
+        # Hata sonrası 30 saniye Redis denenmez; her istek bağlantı zaman aşımını beklemesin
+        if self.failed_at is not None and time.monotonic() - self.failed_at < 30:
+            return self.fallback.consume(key, capacity, rate, cost)
+        try:
+            allowed, tokens = self.script(keys=[self.prefix + key], args=[capacity, rate, time.time(), cost])
+            self.failed_at = None
+            return bool(allowed), float(tokens)
+        except self.errors as e:
+            if self.failed_at is None:
+                print(f"[{datetime.now()}] Rate limit Redis hatası, süreç içi sınıra geçildi: {e}")
+            self.failed_at = time.monotonic()
+            return self.fallback.consume(key, capacity, rate, cost)
+
+
+class RateLimiter:
+    def __init__(self, store=None, classes=None, endpoint_classes=None, concurrency=None,
+                 exempt_paths=DEFAULT_EXEMPT_PATHS, api_keys=(), queue_timeout=0.0):
+        """
+        classes: {sınıf: (kapasite, saniyede token)}
+        endpoint_classes: [(yol öneki, sınıf)]
+        concurrency: {sınıf: süreç içi en fazla eş zamanlı istek}
+        api_keys: bucket'ı IP yerine key'e bağlanan bilinen API key'leri
+        queue_timeout: dolu bir sınıfta boş yer için beklenecek en uzun süre (saniye)
+        """
+        self.store = store or MemoryBucketStore()
+        self.classes = dict(classes or DEFAULT_CLASSES)
+        self.endpoint_classes = list(endpoint_classes or DEFAULT_ENDPOINT_CLASSES)
+        self.exempt_paths = tuple(exempt_paths)
+        self.api_keys = set(api_keys)
+        self.queue_timeout = queue_timeout
+        self.semaphores = {}
+        self.concurrency = {}
+        self.set_concurrency(concurrency or DEFAULT_CONCURRENCY)
+        self.stats_lock = threading.Lock()
+        self.stats = {}
+
+    def set_concurrency(self, concurrency):
+        self.concurrency = dict(concurrency)
+        self.semaphores = {name: threading.BoundedSemaphore(limit) for name, limit in self.concurrency.items()}
+
+    # --- Sınıflandırma ---
+
+    def classify(self, path):
+        if not path.startswith('/api/') or path.startswith(self.exempt_paths):
+            return None
+        for prefix, name in self.endpoint_classes:
+            if path.startswith(prefix):
+                return name
+        return 'default'
+
+    def identity(self, api_key, remote_addr):
+        # Bilinmeyen key'ler kimlik sayılmaz: rastgele key'lerle yeni bucket açılmasın
+        if api_key and api_key in self.api_keys:
+            return f"key:{api_key}"
+        return f"ip:{remote_addr or 'unknown'}"
+
+    # --- Sınırlar ---
+
+    def check(self, identity, bucket_name, capacity, rate, cost=1):
+        """(izin, kalan token, Retry-After saniye)"""
+        allowed, tokens = self.store.consume(f"{identity}:{bucket_name}", capacity, rate, cost)
+        retry_after = 0 if allowed else max(1, math.ceil((cost - tokens) / rate))
+        return allowed, tokens, retry_after
+
+    def acquire_slot(self, class_name):
+        """Eş zamanlılık sınırı; sınıf sınırsızsa True, doluysa False"""
+        semaphore = self.semaphores.get(class_name)
+        if semaphore is None:
+            return True
+        if self.queue_timeout > 0:
+            return semaphore.acquire(timeout=self.queue_timeout)
+        return semaphore.acquire(blocking=False)
+
+    def release_slot(self, class_name):
+        semaphore = self.semaphores.get(class_name)
+        if semaphore is not None:
+            semaphore.release()
+
+    def record(self, class_name, outcome):
+        with self.stats_lock:
+            counters = self.stats.setdefault(class_name, {'allowed': 0, 'rate_limited': 0, 'shed': 0})
+            counters[outcome] += 1
+
+    def get_stats(self):
+        with self.stats_lock:
+            stats = {name: dict(counters) for name, counters in self.stats.items()}
+        return {
+            'backend': 'redis' if isinstance(self.store, RedisBucketStore) else 'memory',
+            'classes': {name: {'capacity': capacity, 'per_minute': round(rate * 60, 2),
+                               'max_concurrency': self.concurrency.get(name)}
+                        for name, (capacity, rate) in self.classes.items()},
+            'counters': stats
+        }
+
+
+limiter = RateLimiter()
+
+
+def _limit_response(message, status_code, retry_after, limit=None, remaining=None):
+    from flask import jsonify
+    response = jsonify({'success': False, 'error': message, 'retry_after': retry_after})
+    response.status_code = status_code
+    response.headers['Retry-After'] = str(retry_after)
+    if limit is not None:
+        response.headers['X-RateLimit-Limit'] = str(limit)
+        response.headers['X-RateLimit-Remaining'] = str(max(0, int(remaining)))
+    return response
+
+
+def _request_identity():
+    from flask import request
+    return limiter.identity(request.headers.get('X-API-Key'), request.remote_addr)
+
+
+def before_request():
+    """Sınıf bütçesi ve eş zamanlılık kontrolü; reddedilen istek view'a ulaşmaz"""
+    from flask import request, g, current_app
+
+    if not current_app.config.get('RATE_LIMIT_ENABLED', True):
+        return None
+    class_name = limiter.classify(request.path)
+    if class_name is None:
+        return None
+    # Önce eş zamanlılık: meşgulken reddedilen istek istemcinin bütçesinden düşmez
+    if not limiter.acquire_slot(class_name):
+        limiter.record(class_name, 'shed')
+        return _limit_response('Server busy, try again later', 503, SHED_RETRY_AFTER)
+    capacity, rate = limiter.classes.get(class_name, limiter.classes['default'])
+    allowed, tokens, retry_after = limiter.check(_request_identity(), class_name, capacity, rate)
+    if not allowed:
+        limiter.release_slot(class_name)
+        limiter.record(class_name, 'rate_limited')
+        return _limit_response('Rate limit exceeded', 429, retry_after, capacity, tokens)
+    g.rate_limit_slot = class_name
+    limiter.record(class_name, 'allowed')
+    return None
+
+
+def teardown_request(exc=None):
+    from flask import g
+    class_name = g.pop('rate_limit_slot', None)
+    if class_name is not None:
+        limiter.release_slot(class_name)
+
+
+def limit(max_requests, window):
+    """
+    Endpoint'e özel bütçe: pencere başına max_requests istek (token bucket; kapasite
+    max_requests, dolum max_requests / window). Sınıf bütçesine ek olarak uygulanır.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            from flask import current_app, request
+            if not current_app.config.get('RATE_LIMIT_ENABLED', True):
+                return view(*args, **kwargs)
+            rate = max_requests / window
+            allowed, tokens, retry_after = limiter.check(_request_identity(), f"endpoint:{request.endpoint}",
+                                                         max_requests, rate)
+            if not allowed:
+                limiter.record(f"endpoint:{request.endpoint}", 'rate_limited')
+                return _limit_response('Rate limit exceeded', 429, retry_after, max_requests, tokens)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    """Yapılandırmayı global limiter'a uygular ve istek hook'larını bağlar"""
+    if app.config.get('RATE_LIMIT_STORAGE', 'memory') == 'redis':
+        try:
+            limiter.store = RedisBucketStore(app.config.get('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/1'))
+        except ImportError:
+            print("redis paketi yüklü değil, rate limit süreç içinde tutuluyor")
+    limiter.classes.update(app.config.get('RATE_LIMIT_CLASSES', {}))
+    limiter.set_concurrency({**DEFAULT_CONCURRENCY, **app.config.get('RATE_LIMIT_CONCURRENCY', {})})
+    limiter.api_keys = set(app.config.get('RATE_LIMIT_API_KEYS', ()))
+    if app.config.get('API_KEY'):
+        limiter.api_keys.add(app.config['API_KEY'])
+    limiter.queue_timeout = app.config.get('RATE_LIMIT_QUEUE_TIMEOUT', 0.0)
+    app.before_request(before_request)
+    app.teardown_request(teardown_request)
+
+
+def _percentile(values, percent):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * percent / 100))] * 1000, 1)
+
+
+def run_load_test(app, heavy_path='/api/filtered-attacks?per_page=5000', probe_path='/api/dashboard-data',
+                  attackers=16, duration=20, probe_interval=0.2):
+    """
+    Gerçek bir HTTP sunucusu (çok thread'li werkzeug) üzerinde: attackers sayıda istemci ağır
+    endpoint'i durmadan çağırırken tek bir istemci ucuz dashboard okumasını ölçer.
+    Ağır istekler aynı IP'den geldiği için tek bir istemcinin bütçesini paylaşırlar.
+    """
+    import urllib.request
+    import urllib.error
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    stop = threading.Event()
+    statuses = {}
+    statuses_lock = threading.Lock()
+    probe_latencies = []
+
+    def fetch(path, headers=None):
+        request = urllib.request.Request(base + path, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+    def attacker():
+        while not stop.is_set():
+            status = fetch(heavy_path)
+            with statuses_lock:
+                statuses[status] = statuses.get(status, 0) + 1
+
+    def probe():
+        while not stop.is_set():
+            started = time.perf_counter()
+            fetch(probe_path)
+            probe_latencies.append(time.perf_counter() - started)
+            time.sleep(probe_interval)
+
+    fetch(probe_path)
+    threads = [threading.Thread(target=attacker, daemon=True) for _ in range(attackers)]
+    threads.append(threading.Thread(target=probe, daemon=True))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=120)
+    server.shutdown()
+    return {
+        'heavy_statuses': dict(sorted(statuses.items())),
+        'probe_requests': len(probe_latencies),
+        'probe_p50_ms': _percentile(probe_latencies, 50),
+        'probe_p95_ms': _percentile(probe_latencies, 95),
+        'probe_max_ms': _percentile(probe_latencies, 100)
+    }
+
+
+if __name__ == "__main__":
+    import json
+    from app import app
+
+    duration = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for enabled in (False, True):
+        app.config['RATE_LIMIT_ENABLED'] = enabled
+        limiter.store = MemoryBucketStore()
+        result = run_load_test(app, duration=duration)
+        print(json.dumps({'rate_limit': enabled, **result}, ensure_ascii=False))
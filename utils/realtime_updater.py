@@ -2,9 +2,12 @@ import threading
 import time
 from datetime import datetime, timedelta
 from models.DBModel import db, Post
+from sqlalchemy import text
+from utils.timestamps import window_start
 from utils.report_generator import ReportGenerator
 from utils.social_media_automation import SocialMediaAutomation
 from utils.data_analyzer import DataAnalyzer
+from utils.dashboard_snapshot import SnapshotWriter, current_data_versions
 import json
 import os
 
@@ -18,101 +21,141 @@ class RealtimeUpdater:
         self.social_automation = SocialMediaAutomation()
         self.data_analyzer = DataAnalyzer()
         self.update_thread = None
+        # Her start/stop yeni bir nesil açar; eski döngüler kendi nesilleri geçersizleşince çıkar
+        self.generation = 0
+        self.lock = threading.Lock()
+        # Liderlik seçimi açıksa start_realtime_updater atar; yan etkili adımlardan önce kontrol edilir
+        self.elector = None
+        # Dashboard snapshot'ı veri sürümü değiştikçe bu aralıkla yenilenir
+        self.snapshot_writer = SnapshotWriter()
+        self.snapshot_poll_interval = app.config.get('DASHBOARD_SNAPSHOT_POLL_SECONDS', 10) if app else 10
+        self.snapshot_versions = None
+        self.snapshot_written_at = 0
         
     def start(self):
-        """Real-time güncellemeleri başlatır"""
-        if self.is_running:
-            return
-        
-        self.is_running = True
-        self.update_thread = threading.Thread(target=self._update_loop)
-        self.update_thread.daemon = True
-        self.update_thread.start()
+        """
+        Real-time güncellemeleri başlatır. Lider seçildiğinde elector thread'inde çağrılır ve
+        beklemez: önceki döngü hâlâ çalışıyorsa eski nesilde kalır ve bir sonraki adımında çıkar.
+        """
+        with self.lock:
+            if self.is_running:
+                return
+            self.generation += 1
+            self.is_running = True
+            self.update_thread = threading.Thread(target=self._update_loop, args=(self.generation,))
+            self.update_thread.daemon = True
+            self.update_thread.start()
         print(f"[{datetime.now()}] Real-time güncellemeler başlatıldı (her {self.update_interval} saniyede bir)")
     
-    def stop(self):
-        """Real-time güncellemeleri durdurur"""
-        self.is_running = False
-        if self.update_thread:
-            self.update_thread.join()
+    def stop(self, wait=True):
+        """Real-time güncellemeleri durdurur (wait=False: döngüye sadece durma işareti verir)"""
+        with self.lock:
+            self.is_running = False
+            self.generation += 1
+            thread = self.update_thread
+        if wait and thread and thread is not threading.current_thread():
+            thread.join()
         print(f"[{datetime.now()}] Real-time güncellemeler durduruldu")
     
-    def _update_loop(self):
+    def _active(self, generation):
+        """Döngü hâlâ geçerli nesilde mi ve bu süreç lider mi (yan etkili her adımdan önce)"""
+        return (self.is_running and generation == self.generation
+                and (self.elector is None or self.elector.is_leader))
+    
+    def _update_loop(self, generation):
         """Güncelleme döngüsü"""
-        while self.is_running:
+        while self._active(generation):
             try:
-                self._perform_update()
+                self._perform_update(generation)
                 self.last_update = datetime.now()
-                time.sleep(self.update_interval)
+                wait = self.update_interval
             except Exception as e:
                 print(f"[{datetime.now()}] Güncelleme hatası: {e}")
-                time.sleep(60)  # Hata durumunda 1 dakika bekle
+                wait = 60  # Hata durumunda 1 dakika bekle
+            
+            # Bir sonraki tam güncellemeye kadar snapshot'ı yeni ingest'lerle güncel tut
+            deadline = time.time() + wait
+            while self._active(generation) and time.time() < deadline:
+                time.sleep(min(self.snapshot_poll_interval, max(0, deadline - time.time())))
+                if not self._active(generation):
+                    break
+                try:
+                    self._refresh_snapshot_if_changed()
+                except Exception as e:
+                    print(f"[{datetime.now()}] Snapshot yenileme hatası: {e}")
+    
+    def _refresh_snapshot_if_changed(self):
+        """Veri sürümleri değiştiyse veya snapshot güncelleme aralığından eskiyse yeniden yazar"""
+        with self.app.app_context():
+            versions = current_data_versions(db.engine.url.database)
+            if versions != self.snapshot_versions or time.time() - self.snapshot_written_at >= self.update_interval:
+                self._update_dashboard_cache()
     
-    def _perform_update(self):
-        """Güncelleme işlemlerini gerçekleştirir"""
+    def _perform_update(self, generation=None):
+        """
+        Güncelleme işlemlerini gerçekleştirir. Liderlik adımlar arasında kaybedilirse kalan
+        adımlar (uyarılar, sosyal medya içeriği, rapor) yeni lidere bırakılır.
+        """
+        if generation is None:
+            generation = self.generation
         with self.app.app_context():
             # Son güncelleme zamanını kontrol et
             if self.last_update:
                 # Son güncellemeden bu yana yeni veri var mı?
                 new_posts = Post.query.filter(
-                    Post.discovered > self.last_update
+                    Post.discovered_ts > int(self.last_update.timestamp())
                 ).count()
                 
                 if new_posts > 0:
                     print(f"[{datetime.now()}] {new_posts} yeni saldırı tespit edildi")
                     
-                    # Dashboard verilerini güncelle
-                    self._update_dashboard_cache()
-                    
-                    # Sosyal medya içeriği oluştur
-                    self._generate_social_content()
-                    
-                    # Kritik saldırıları kontrol et
-                    self._check_critical_attacks()
-                    
-                    # Günlük raporu güncelle
-                    self._update_daily_report()
+                    steps = (
+                        self._update_dashboard_cache,  # Dashboard verilerini güncelle
+                        lambda: self._generate_social_content(generation),  # Sosyal medya içeriği oluştur
+                        lambda: self._check_critical_attacks(generation),  # Kritik saldırıları kontrol et
+                        self._update_daily_report  # Günlük raporu güncelle
+                    )
+                    for step in steps:
+                        if not self._active(generation):
+                            print(f"[{datetime.now()}] Liderlik kaybedildi, güncelleme yarıda bırakıldı")
+                            return
+                        step()
                 else:
                     print(f"[{datetime.now()}] Yeni veri yok, güncelleme atlandı")
             else:
                 # İlk güncelleme
                 print(f"[{datetime.now()}] İlk güncelleme yapılıyor...")
+                if not self._active(generation):
+                    return
                 self._update_dashboard_cache()
                 self.last_update = datetime.now()
     
     def _update_dashboard_cache(self):
-        """Dashboard cache'ini günceller"""
+        """Dashboard snapshot'ını günceller (web süreçleri /api/dashboard-data'yı buradan sunar)"""
         try:
-            # Son 30 günlük verileri al
-            dashboard_data = self.data_analyzer.generate_dashboard_data(30)
+            from utils.simple_api import get_tactical_dashboard_data
             
-            # Cache dosyasına kaydet
-            cache_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache')
-            os.makedirs(cache_dir, exist_ok=True)
+            # Sürümler yüklerden önce okunur: arada gelen ingest bir sonraki turda yeniden yazdırır
+            versions = current_data_versions(db.engine.url.database)
+            payloads = {'dashboard-data': get_tactical_dashboard_data()}
             
-            cache_file = os.path.join(cache_dir, 'dashboard_data.json')
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'data': dashboard_data,
-                    'last_updated': datetime.now().isoformat()
-                }, f, ensure_ascii=False, indent=2)
+            version = self.snapshot_writer.write(payloads, versions)
+            self.snapshot_versions = versions
+            self.snapshot_written_at = time.time()
             
-            print(f"[{datetime.now()}] Dashboard cache güncellendi")
+            print(f"[{datetime.now()}] Dashboard snapshot güncellendi (sürüm {version})")
             
         except Exception as e:
             print(f"[{datetime.now()}] Dashboard cache güncelleme hatası: {e}")
     
-    def _generate_social_content(self):
+    def _generate_social_content(self, generation):
         """Sosyal medya içeriği oluşturur"""
         try:
-            # Son 24 saatteki verileri al
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=1)
-            
-            recent_posts = Post.query.filter(
-                Post.discovered >= start_date,
-                Post.discovered <= end_date
-            ).all()
+            # Son 24 saatteki verileri al (migrasyon sütunları da gerektiği için ham satırlar)
+            recent_posts = db.session.execute(text("""
+                SELECT * FROM posts WHERE discovered_ts >= :start_ts
+                ORDER BY discovered_ts DESC
+            """), {'start_ts': window_start(days=1)}).all()
             
             if recent_posts:
                 # En önemli saldırıyı bul
@@ -133,6 +176,8 @@ class RealtimeUpdater:
                     }
                     
                     social_posts = self.social_automation.generate_breaking_news_content(post_data)
+                    if not self._active(generation):
+                        return
                     
                     # Sosyal medya içeriklerini kaydet
                     self._save_social_content(social_posts)
@@ -142,18 +187,14 @@ class RealtimeUpdater:
         except Exception as e:
             print(f"[{datetime.now()}] Sosyal medya içerik oluşturma hatası: {e}")
     
-    def _check_critical_attacks(self):
+    def _check_critical_attacks(self, generation):
         """Kritik saldırıları kontrol eder"""
         try:
             # Son 1 saatteki kritik saldırıları kontrol et
-            end_date = datetime.now()
-            start_date = end_date - timedelta(hours=1)
-            
-            critical_attacks = Post.query.filter(
-                Post.discovered >= start_date,
-                Post.discovered <= end_date,
-                Post.impact_level == 'Kritik'
-            ).all()
+            critical_attacks = db.session.execute(text("""
+                SELECT * FROM posts WHERE discovered_ts >= :start_ts AND impact_level = 'Kritik'
+                ORDER BY discovered_ts DESC
+            """), {'start_ts': window_start(hours=1)}).all()
             
             if critical_attacks:
                 print(f"[{datetime.now()}] UYARI: {len(critical_attacks)} kritik saldırı tespit edildi!")
@@ -161,8 +202,9 @@ class RealtimeUpdater:
                 # Kritik saldırıları logla
                 self._log_critical_attacks(critical_attacks)
                 
-                # Acil bildirim gönder (Discord webhook)
-                self._send_critical_alert(critical_attacks)
+                # Acil bildirim gönder (Discord webhook); sadece hâlâ liderse
+                if self._active(generation):
+                    self._send_critical_alert(critical_attacks)
             
         except Exception as e:
             print(f"[{datetime.now()}] Kritik saldırı kontrolü hatası: {e}")
@@ -286,3 +328,31 @@ class RealtimeUpdater:
             print(f"[{datetime.now()}] Zorla güncelleme tamamlandı")
         else:
             print(f"[{datetime.now()}] Real-time güncellemeler çalışmıyor")
+
+
+def start_realtime_updater(app):
+    """
+    Uygulamaya bağlı tek bir RealtimeUpdater başlatır (force-update endpoint'i de bunu kullanır).
+    LEADER_ELECTION_ENABLED ise güncelleyici sadece 'realtime-updater' lease'ini tutan süreçte
+    çalışır; diğer süreçler boşta bekler ve lider ölürse devralır.
+    """
+    if not hasattr(app, 'realtime_updater'):
+        app.realtime_updater = RealtimeUpdater(app)
+    updater = app.realtime_updater
+    if not app.config.get('LEADER_ELECTION_ENABLED'):
+        updater.start()
+        return updater
+    if getattr(app, 'leader_elector', None) is None:
+        from utils.leader_election import create_elector
+        app.leader_elector = create_elector(
+            'realtime-updater',
+            backend=app.config.get('LEADER_ELECTION_BACKEND', 'sqlite'),
+            lease_seconds=app.config.get('LEADER_LEASE_SECONDS', 30),
+            redis_url=app.config.get('LEADER_REDIS_URL'),
+            on_elected=updater.start,
+            # Elector thread'i bloklanmaz; döngü bir sonraki kontrolde kendiliğinden çıkar
+            on_demoted=lambda: updater.stop(wait=False)
+        )
+    updater.elector = app.leader_elector
+    app.leader_elector.start()
+    return updater
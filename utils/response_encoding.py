@@ -0,0 +1,262 @@
+# Yanıt Kodlama
+# orjson tabanlı Flask JSON sağlayıcısı (datetime, numpy ve int anahtarları doğrudan
+# serileştirir) ve Accept-Encoding ile pazarlık edilen gzip/brotli yanıt sıkıştırması.
+# ETag'li yanıtların gövdesi ve sıkıştırılmış halleri süreç içinde saklanır; aynı sürümdeki
+# bir yük sadece bir kez serileştirilir ve her kodlama için bir kez sıkıştırılır.
+
+import sys
+import os
+import json
+import gzip
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript', 'text/xml'
+}
+
+# Bundan küçük gövdeler sıkıştırılmaz (başlık ve CPU maliyeti kazancı aşar)
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 5
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def json_default(obj):
+    """orjson ve json modülünün doğrudan serileştiremediği tipler"""
+    if isinstance(obj, (datetime, date)):
+        # pandas.Timestamp gibi datetime alt sınıfları
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj, indent=False, sort_keys=False):
+    """JSON'u UTF-8 byte olarak üretir; orjson yoksa standart json ile aynı çıktı biçimi"""
+    if orjson:
+        option = ORJSON_OPTIONS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=json_default, option=option)
+    return json.dumps(obj, default=json_default, ensure_ascii=False, sort_keys=sort_keys,
+                      indent=2 if indent else None,
+                      separators=None if indent else (',', ':')).encode('utf-8')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON sağlayıcısı. datetime değerleri ISO 8601 olarak yazılır (varsayılan
+    sağlayıcının HTTP tarih biçimi yerine); anahtarlar ekleme sırasında bırakılır.
+    """
+    sort_keys = False
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.keys() - {'indent', 'sort_keys'}:
+            kwargs.setdefault('default', json_default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            return json.dumps(obj, **kwargs)
+        return dumps_bytes(obj, indent=bool(kwargs.get('indent')),
+                           sort_keys=kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(dumps_bytes(obj, indent=indent, sort_keys=self.sort_keys) + b"\n",
+                                        mimetype=self.mimetype)
+
+
+class PayloadCache:
+    """
+    ETag -> gövde önbelleği (LRU, toplam byte sınırlı). 'identity' kodlaması serileştirilmiş
+    gövdeyi, 'gzip' / 'br' sıkıştırılmış hallerini tutar.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, etag, encoding='identity'):
+        with self.lock:
+            entry = self.entries.get((etag, encoding))
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end((etag, encoding))
+            self.hits += 1
+            return entry
+
+    def put(self, etag, encoding, body, mimetype=None):
+        if len(body) > self.max_bytes // 4:
+            return
+        with self.lock:
+            key = (etag, encoding)
+            if key in self.entries:
+                return
+            self.entries[key] = (body, mimetype)
+            self.size += len(body)
+            while self.size > self.max_bytes and self.entries:
+                _, (old_body, _) = self.entries.popitem(last=False)
+                self.size -= len(old_body)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def get_stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'size_mb': round(self.size / 1048576, 2),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0
+            }
+
+
+payload_cache = PayloadCache()
+
+
+def available_encodings():
+    return ['br', 'gzip'] if brotli else ['gzip']
+
+
+def compress(body, encoding, gzip_level=DEFAULT_GZIP_LEVEL, brotli_quality=DEFAULT_BROTLI_QUALITY):
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    # mtime=0: aynı gövde her zaman aynı byte'lara sıkışır
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def compress_response(response):
+    """after_request: gövde eşik üstündeyse istemcinin kabul ettiği en iyi kodlamayla sıkıştırır"""
+    from flask import request, current_app
+
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if not encoding:
+        return response
+    body = response.get_data()
+    if len(body) < current_app.config.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE):
+        return response
+
+    etag, _ = response.get_etag()
+    cached = payload_cache.get(etag, encoding) if etag else None
+    if cached is not None:
+        compressed = cached[0]
+    else:
+        compressed = compress(body, encoding,
+                              current_app.config.get('COMPRESSION_GZIP_LEVEL', DEFAULT_GZIP_LEVEL),
+                              current_app.config.get('COMPRESSION_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY))
+        if etag:
+            payload_cache.put(etag, encoding, compressed)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        # Sıkıştırılmış gövde farklı byte'lardır; If-None-Match zayıf karşılaştırmayla eşleşir
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    """JSON sağlayıcısını ve yanıt sıkıştırmasını uygulamaya bağlar"""
+    if app.config.get('JSON_PROVIDER', 'orjson') == 'orjson':
+        if orjson:
+            app.json = OrjsonProvider(app)
+        else:
+            print("orjson yüklü değil, varsayılan JSON sağlayıcısı kullanılıyor")
+    payload_cache.max_bytes = int(app.config.get('RESPONSE_CACHE_MB', 32) * 1024 * 1024)
+    if app.config.get('COMPRESSION_ENABLED', True):
+        app.after_request(compress_response)
+
+
+def run_benchmark(app, paths, repeat=20):
+    """
+    Gerçek endpoint yükleri üzerinde serileştirme süresi (standart json / orjson) ve
+    kablodan geçen byte (ham / gzip / brotli) karşılaştırması.
+    """
+    default_provider = DefaultJSONProvider(app)
+    client = app.test_client()
+    results = []
+    for path in paths:
+        response = client.get(path, headers={'Accept-Encoding': 'identity'})
+        if response.status_code != 200 or not response.is_json:
+            results.append({'path': path, 'status': response.status_code})
+            continue
+        payload = response.get_json()
+        row = {'path': path}
+        for name, dump in (('json', lambda: default_provider.dumps(payload, separators=(',', ':')).encode('utf-8')),
+                           ('orjson', lambda: dumps_bytes(payload, sort_keys=False))):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                body = dump()
+            row[f'{name}_ms'] = round((time.perf_counter() - started) / repeat * 1000, 3)
+        row['raw_bytes'] = len(body)
+        for encoding in available_encodings():
+            started = time.perf_counter()
+            row[f'{encoding}_bytes'] = len(compress(body, encoding))
+            row[f'{encoding}_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    from app import app
+
+    paths = sys.argv[1:] or [
+        '/api/dashboard-data',
+        '/api/filtered-attacks?per_page=5000',
+        '/api/advanced-charts?type=heatmap',
+        '/api/v1/dashboard/overview',
+        '/api/v1/dashboard/statistics',
+        '/api/v1/export/attacks?format=json&days=3650',
+        '/api/export/attacks?format=json'
+    ]
+    for row in run_benchmark(app, paths):
+        print(json.dumps(row, ensure_ascii=False))
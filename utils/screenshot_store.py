@@ -0,0 +1,208 @@
+# İçerik Adresli Ekran Görüntüsü Deposu
+# Ekran görüntülerini içerik hash'i ile saklar, WebP'ye çevirir ve küçük önizlemeler üretir
+
+import sys
+import os
+import io
+import time
+import hashlib
+import sqlite3
+from PIL import Image
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# WebP formatının desteklediği en büyük kenar uzunluğu
+WEBP_MAX_DIMENSION = 16383
+
+
+class ScreenshotStore:
+    # Katman adı -> (genişlik, kırpılacak üst bölge oranı, kalite)
+    TIERS = {
+        'full': (None, None, 80),
+        'preview': (960, 0.625, 75),
+        'thumb': (320, 0.625, 70)
+    }
+
+    def __init__(self, root_dir=None):
+        self.root_dir = root_dir or os.path.join(PROJECT_ROOT, 'screenshots', 'store')
+
+    @staticmethod
+    def is_valid_hash(content_hash):
+        """Hash değerinin sha256 hex formatında olup olmadığını kontrol eder"""
+        return (isinstance(content_hash, str) and len(content_hash) == 64 and
+                all(c in '0123456789abcdef' for c in content_hash))
+
+    def path_for(self, content_hash, tier='full'):
+        """Hash ve katman için dosya yolunu döndürür (iki seviyeli dizin dağıtımı)"""
+        return os.path.join(self.root_dir, tier, content_hash[:2], content_hash[2:4], content_hash + '.webp')
+
+    def exists(self, content_hash, tier='full'):
+        return os.path.exists(self.path_for(content_hash, tier))
+
+    def put(self, image_bytes):
+        """
+        Ham görüntüyü (PNG vb.) depoya ekler ve içerik hash'ini döndürür.
+        Aynı içerik daha önce kaydedildiyse tekrar yazılmaz.
+        """
+        content_hash = hashlib.sha256(image_bytes).hexdigest()
+        if all(self.exists(content_hash, tier) for tier in self.TIERS):
+            return content_hash
+
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            image = image.convert('RGB')
+            for tier, (width, crop_ratio, quality) in self.TIERS.items():
+                path = self.path_for(content_hash, tier)
+                if os.path.exists(path):
+                    continue
+                self._write_atomic(path, self._render_tier(image, width, crop_ratio), quality)
+        return content_hash
+
+    def _render_tier(self, image, width, crop_ratio):
+        """Katman için görüntüyü kırpar ve ölçekler"""
+        rendered = image
+        if width is not None:
+            # Önizlemeler sayfanın üst (ilk ekran) bölümünü gösterir
+            crop_height = min(image.height, int(image.width * crop_ratio))
+            rendered = image.crop((0, 0, image.width, crop_height))
+            if rendered.width > width:
+                height = max(1, int(rendered.height * width / rendered.width))
+                rendered = rendered.resize((width, height), Image.LANCZOS)
+
+        # Çok uzun tam sayfa görüntüler WebP sınırına sığacak şekilde küçültülür
+        if max(rendered.size) > WEBP_MAX_DIMENSION:
+            scale = WEBP_MAX_DIMENSION / max(rendered.size)
+            rendered = rendered.resize((max(1, int(rendered.width * scale)),
+                                        max(1, int(rendered.height * scale))), Image.LANCZOS)
+        return rendered
+
+    def _write_atomic(self, path, image, quality):
+        """Dosyayı geçici isimle yazıp atomik olarak yerine taşır"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        image.save(tmp_path, 'WEBP', quality=quality, method=4)
+        os.replace(tmp_path, path)
+
+    def iter_hashes(self, tier='full'):
+        """Katmandaki tüm içerik hash'lerini dolaşır"""
+        tier_dir = os.path.join(self.root_dir, tier)
+        if not os.path.exists(tier_dir):
+            return
+        for dirpath, _, filenames in os.walk(tier_dir):
+            for filename in filenames:
+                if filename.endswith('.webp'):
+                    yield filename[:-5], os.path.join(dirpath, filename)
+
+    def collect_garbage(self, referenced_hashes, grace_seconds=3600, dry_run=False):
+        """
+        Hiçbir post tarafından referans verilmeyen dosyaları siler.
+        Yeni yakalanıp henüz veritabanına yazılmamış görüntüleri korumak için
+        grace_seconds'tan genç dosyalara dokunulmaz.
+        """
+        referenced = set(referenced_hashes)
+        now = time.time()
+        removed_files = 0
+        freed_bytes = 0
+
+        for tier in self.TIERS:
+            for content_hash, path in list(self.iter_hashes(tier)):
+                if content_hash in referenced:
+                    continue
+                try:
+                    if now - os.path.getmtime(path) < grace_seconds:
+                        continue
+                    size = os.path.getsize(path)
+                    if not dry_run:
+                        os.remove(path)
+                    removed_files += 1
+                    freed_bytes += size
+                except OSError:
+                    continue
+
+        return {
+            'removed_files': removed_files,
+            'freed_bytes': freed_bytes,
+            'dry_run': dry_run
+        }
+
+    def get_stats(self):
+        """Katman bazında dosya sayısı ve disk kullanımı"""
+        stats = {}
+        for tier in self.TIERS:
+            count = 0
+            total_bytes = 0
+            for _, path in self.iter_hashes(tier):
+                count += 1
+                total_bytes += os.path.getsize(path)
+            stats[tier] = {'files': count, 'bytes': total_bytes}
+        return stats
+
+
+def referenced_hashes_from_db(db_path='instance/data.db'):
+    """posts ve sızıntı sitesi takip tablolarında referans verilen ekran görüntüsü hash'lerini döndürür"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT DISTINCT screenshot FROM posts WHERE screenshot IS NOT NULL").fetchall()
+        # Arşive taşınan postların ekran görüntüleri de referanslı sayılır
+        from utils.post_archive import attach_archive, ARCHIVE_SCHEMA
+        if attach_archive(conn, must_exist=True):
+            rows += conn.execute(
+                f"SELECT DISTINCT screenshot FROM {ARCHIVE_SCHEMA}.posts WHERE screenshot IS NOT NULL").fetchall()
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'leak_site_revisits' in tables:
+            rows += conn.execute("SELECT DISTINCT last_screenshot FROM leak_site_revisits").fetchall()
+        if 'leak_site_changes' in tables:
+            rows += conn.execute("""
+                SELECT previous_screenshot FROM leak_site_changes
+                UNION SELECT screenshot FROM leak_site_changes
+            """).fetchall()
+    finally:
+        conn.close()
+    return {row[0] for row in rows if ScreenshotStore.is_valid_hash(row[0])}
+
+
+def migrate_legacy_screenshots(store, db_path='instance/data.db', legacy_dir=None, remove_legacy=False):
+    """
+    Eski düz screenshots/<md5>.png dosyalarını depoya taşır ve
+    posts.screenshot değerlerini içerik hash'i ile günceller.
+    """
+    legacy_dir = legacy_dir or os.path.join(PROJECT_ROOT, 'screenshots')
+    conn = sqlite3.connect(db_path)
+    migrated = 0
+    try:
+        rows = conn.execute("SELECT DISTINCT screenshot FROM posts WHERE screenshot IS NOT NULL").fetchall()
+        for (name,) in rows:
+            if not name or ScreenshotStore.is_valid_hash(name):
+                continue
+            legacy_path = os.path.join(legacy_dir, os.path.basename(name) + '.png')
+            if not os.path.exists(legacy_path):
+                continue
+            with open(legacy_path, 'rb') as f:
+                content_hash = store.put(f.read())
+            conn.execute("UPDATE posts SET screenshot = ? WHERE screenshot = ?", (content_hash, name))
+            if remove_legacy:
+                os.remove(legacy_path)
+            migrated += 1
+        conn.commit()
+    finally:
+        conn.close()
+    return migrated
+
+
+# Global screenshot store instance
+screenshot_store = ScreenshotStore()
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'stats'
+
+    if command == 'migrate':
+        count = migrate_legacy_screenshots(screenshot_store, remove_legacy='--remove' in sys.argv)
+        print(f"✅ {count} eski ekran görüntüsü depoya taşındı")
+    elif command == 'gc':
+        result = screenshot_store.collect_garbage(referenced_hashes_from_db(), dry_run='--dry-run' in sys.argv)
+        print(f"🧹 {result['removed_files']} dosya silindi, {result['freed_bytes'] / 1024 / 1024:.1f} MB boşaltıldı")
+    else:
+        for tier, tier_stats in screenshot_store.get_stats().items():
+            print(f"📊 {tier}: {tier_stats['files']} dosya, {tier_stats['bytes'] / 1024 / 1024:.1f} MB")
@@ -5,6 +5,8 @@ import re
 import json
 from typing import Dict, List, Optional, Tuple
 
+from utils.domain_normalizer import domain_label
+
 class SectorDetector:
     def __init__(self):
         self.sector_keywords = {
@@ -162,17 +164,10 @@ class SectorDetector:
         # Yaygın kelimeleri temizle
         common_words = ['data', 'breach', 'hack', 'leak', 'sızıntı', 'veri', 'ihlal', 'saldırı']
         
-        # Website'den domain adını çıkar
-        if website and website != "None":
-            try:
-                from urllib.parse import urlparse
-                domain = urlparse(website).netloc
-                if domain:
-                    # www. ve .com gibi uzantıları temizle
-                    domain = domain.replace('www.', '').split('.')[0]
-                    return domain.title()
-            except:
-                pass
+        # Website'den kayıt edilebilir alan adının etiketini çıkar (shop.acme.com.tr -> Acme)
+        label = domain_label(website)
+        if label:
+            return label.title()
         
         # Başlıktan şirket adını çıkar
         title_clean = title
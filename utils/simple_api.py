@@ -28,6 +28,15 @@ def get_all_posts() -> List[Dict]:
     
     return posts
 
+def get_unique_victim_count():
+    """Get unique victim count from dedup clusters (None if not built yet)"""
+    from utils.victim_dedup import count_unique_victims
+    conn = sqlite3.connect('instance/data.db')
+    try:
+        return count_unique_victims(conn)
+    finally:
+        conn.close()
+
 def get_dashboard_data() -> Dict:
     """Get comprehensive dashboard data"""
     posts = get_all_posts()
@@ -55,7 +64,9 @@ def get_dashboard_data() -> Dict:
     
     # Basic stats
     total_attacks = len(posts)
-    total_companies = len(set([p.get('name') for p in posts if p.get('name')]))
+    total_companies = get_unique_victim_count()
+    if total_companies is None:
+        total_companies = len(set([p.get('title') for p in posts if p.get('title')]))
     total_countries = len(set([p.get('country') for p in posts if p.get('country')]))
     total_sectors = len(set([p.get('activity') for p in posts if p.get('activity')]))
     
@@ -101,84 +112,118 @@ def get_dashboard_data() -> Dict:
         'activities': activities
     }
 
+def get_tactical_dashboard_data() -> Dict:
+    """Dashboard data in the shape served by /api/dashboard-data (also precomputed into snapshots)"""
+    data = get_dashboard_data()
+    
+    # Additional data for tactical dashboard
+    overview = data['overview']
+    risk_dist = data['risk_distribution']
+    
+    return {
+        'overview': overview,
+        'risk_distribution': risk_dist,
+        'critical_threats': risk_dist.get('critical', 0),
+        'high_threats': risk_dist.get('high', 0),
+        'medium_threats': risk_dist.get('medium', 0),
+        'critical_detections': risk_dist.get('critical', 0),
+        'high_detections': risk_dist.get('high', 0),
+        'medium_detections': risk_dist.get('medium', 0),
+        'blocked_ransomware': overview.get('total_attacks', 0) // 3,
+        'blocked_breaches': overview.get('total_attacks', 0) // 2,
+        'blocked_phishing': overview.get('total_attacks', 0) // 4,
+        'total_threats': overview.get('total_attacks', 0),
+        'total_attacks': overview.get('total_attacks', 0),
+        'affected_companies': overview.get('total_companies', 0),
+        'total_countries': overview.get('total_countries', 0),
+        'top_countries': data['top_countries'],
+        'top_threat_actors': data['top_threat_actors'],
+            'geographic': {'top_countries': data['top_countries']},
+            'sector': {'sector_counts': data['real_sectors']},  # Real sectors
+            'attack_trends': {'attack_types': data['activities']},  # Attack types
+            'threat_actors': {'threat_actor_counts': data['top_threat_actors']},
+        'temporal': {},
+        'company_characteristics': {},
+        'time_range': {}
+    }
+
+def _connect_read_only():
+    """
+    Open the database for reads only. The epoch columns are created and backfilled by
+    the collector and DatabaseMigration; request handlers never write to the schema.
+    """
+    from utils.sql_instrumentation import connect
+    conn = connect('instance/data.db')
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+def _attack_filters(start_date=None, end_date=None, country=None, risk_level=None):
+    """Build the WHERE clause; date bounds become an index range scan on discovered_ts"""
+    from utils.timestamps import date_range_to_epoch
+    start_ts, end_ts = date_range_to_epoch(start_date, end_date)
+    clauses = ["name IS NOT NULL", "name != ''"]
+    params = []
+    if start_ts is not None:
+        clauses.append("discovered_ts >= ?")
+        params.append(start_ts)
+    if end_ts is not None:
+        clauses.append("discovered_ts < ?")
+        params.append(end_ts)
+    if country:
+        clauses.append("country = ?")
+        params.append(country)
+    if risk_level:
+        clauses.append("activity = ?")
+        params.append(risk_level)
+    return " AND ".join(clauses), params
+
+def _attack_from_row(row: sqlite3.Row) -> Dict:
+    post = dict(row)
+    return {
+        'company': post.get('name') or 'Unknown',
+        'sector': post.get('sector') or 'Unknown',
+        'country': post.get('country') or 'Unknown',
+        'threat_actor': post.get('name') or 'Unknown',
+        'risk_level': post.get('activity') or 'Medium',
+        'date': post.get('discovered') or 'Unknown'
+    }
+
 def get_filtered_attacks(start_date=None, end_date=None, country=None, risk_level=None) -> List[Dict]:
     """Get filtered attacks"""
-    posts = get_all_posts()
+    where, params = _attack_filters(start_date, end_date, country, risk_level)
+    conn = _connect_read_only()
+    try:
+        rows = conn.execute(f"""
+            SELECT * FROM posts
+            WHERE {where}
+            ORDER BY discovered_ts DESC
+        """, params).fetchall()
+    finally:
+        conn.close()
     
-    # Apply filters
-    filtered_posts = []
-    for post in posts:
-        if not post.get('name'):
-            continue
-            
-        # Date filter
-        if start_date and post.get('discovered', '') < start_date:
-            continue
-        if end_date and post.get('discovered', '') > end_date:
-            continue
-            
-        # Country filter
-        if country and post.get('country') != country:
-            continue
-            
-        # Risk level filter
-        if risk_level and post.get('activity') != risk_level:
-            continue
-            
-        filtered_posts.append(post)
-    
-    # Convert to API format
-    attacks = []
-    for post in filtered_posts:
-        attacks.append({
-            'company': post.get('name') or 'Unknown',
-            'sector': post.get('sector') or 'Unknown',
-            'country': post.get('country') or 'Unknown',
-            'threat_actor': post.get('name') or 'Unknown',
-            'risk_level': post.get('activity') or 'Medium',
-            'date': post.get('discovered') or 'Unknown'
-        })
-    
-    return attacks
+    return [_attack_from_row(row) for row in rows]
 
 def get_recent_attacks(page=1, per_page=10, start_date=None, end_date=None) -> Dict:
     """Get recent attacks with pagination"""
-    posts = get_all_posts()
+    where, params = _attack_filters(start_date, end_date)
+    conn = _connect_read_only()
+    try:
+        total = conn.execute(f"SELECT COUNT(*) FROM posts WHERE {where}", params).fetchone()[0]
+        rows = conn.execute(f"""
+            SELECT * FROM posts
+            WHERE {where}
+            ORDER BY discovered_ts DESC
+            LIMIT ? OFFSET ?
+        """, params + [per_page, (page - 1) * per_page]).fetchall()
+    finally:
+        conn.close()
     
-    # Apply date filters
-    filtered_posts = []
-    for post in posts:
-        if not post.get('name'):
-            continue
-            
-        if start_date and post.get('discovered', '') < start_date:
-            continue
-        if end_date and post.get('discovered', '') > end_date:
-            continue
-            
-        filtered_posts.append(post)
-    
-    # Sort by date
-    filtered_posts.sort(key=lambda x: x.get('discovered', ''), reverse=True)
-    
-    # Pagination
-    total = len(filtered_posts)
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    page_posts = filtered_posts[start_idx:end_idx]
-    
-    # Convert to API format
     attacks = []
-    for post in page_posts:
-        attacks.append({
-            'company': post.get('name') or 'Unknown',
-            'sector': post.get('sector') or 'Unknown',
-            'country': post.get('country') or 'Unknown',
-            'threat_actor': post.get('name') or 'Unknown',
-            'risk_level': post.get('activity') or 'Medium',
-            'date': post.get('discovered') or 'Unknown',
-            'is_threat_actor': False
-        })
+    for row in rows:
+        attack = _attack_from_row(row)
+        attack['is_threat_actor'] = False
+        attacks.append(attack)
     
     return {
         'attacks': attacks,
@@ -189,3 +234,32 @@ def get_recent_attacks(page=1, per_page=10, start_date=None, end_date=None) -> D
             'pages': (total + per_page - 1) // per_page
         }
     }
+
+def get_posts_by_domain(domain: str, limit: int = 100, include_archive: bool = False) -> List[Dict]:
+    """
+    Get posts of a victim by registrable domain (index lookup on victim_domain).
+    include_archive also searches posts moved to the archive partition.
+    """
+    from utils.domain_normalizer import registrable_domain
+    from utils.post_archive import attach_archive, ALL_POSTS_VIEW
+    victim_domain = registrable_domain(domain)
+    if not victim_domain:
+        return []
+    
+    conn = _connect_read_only()
+    try:
+        table = 'posts'
+        if include_archive and attach_archive(conn, must_exist=True):
+            table = ALL_POSTS_VIEW
+        rows = conn.execute(f"""
+            SELECT id, title, name, country, website, discovered, published, post_url, victim_domain, victim_tld
+            FROM {table} WHERE victim_domain = ?
+            ORDER BY discovered_ts DESC
+            LIMIT ?
+        """, (victim_domain, limit)).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+    
+    return [dict(row) for row in rows]
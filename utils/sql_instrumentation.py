@@ -0,0 +1,412 @@
+# SQL Enstrümantasyonu
+# sqlite3 bağlantı/cursor sarmalayıcısı ile hem ham sqlite3 yollarındaki hem de SQLAlchemy
+# motorunun ifadelerini ölçer: parmak izi bazında çağrı sayısı, gecikme histogramı, dönen satır
+# sayısı ve parametre + plan içeren en yavaş N örnek. Her ölçüm MonitoringSystem'e de iletilir.
+# Ölçülen süre execute süresidir (SQLite ilk satırı hazırlarken sıralama/gruplamayı bitirir);
+# uygulamanın satırları işlerken harcadığı zaman dahil edilmez. Yavaş örneklerin sorgu planı
+# istek sırasında değil, rapor okunurken ayrı bir bağlantıda alınır.
+
+import sys
+import os
+import re
+import heapq
+import sqlite3
+import threading
+import itertools
+from time import perf_counter
+from datetime import datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Histogram kova üst sınırları (ms); son kova sınırsızdır
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Bellekte tutulan en fazla parmak izi ve en yavaş örnek sayısı
+MAX_FINGERPRINTS = 1000
+SLOWEST_SAMPLES = 20
+
+# Örneklerde saklanan parametre sayısı ve SQL uzunluğu sınırı
+MAX_SAMPLE_PARAMS = 20
+MAX_SAMPLE_SQL = 2000
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+IN_LIST = re.compile(r"\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+
+def fingerprint(sql):
+    """
+    İfadeyi değerlerinden arındırır: literal'ler ve IN listeleri '?' olur, boşluklar
+    tekleştirilir. Aynı sorgunun farklı parametreli çağrıları tek parmak izinde toplanır.
+    """
+    text = COMMENT.sub(' ', sql)
+    text = STRING_LITERAL.sub('?', text)
+    text = NUMBER_LITERAL.sub('?', text)
+    text = IN_LIST.sub('IN (?)', text)
+    return WHITESPACE.sub(' ', text).strip().rstrip(';').lower()
+
+
+def is_capturable(sql):
+    """Kullanıcı tablolarını okuyan bir SELECT mi (plan alınabilen ve danışmanın topladığı ifadeler)"""
+    head = sql.lstrip()[:10].lower()
+    if not (head.startswith('select') or head.startswith('with')):
+        return False
+    lowered = sql.lower()
+    return 'sqlite_master' not in lowered and 'sqlite_schema' not in lowered and 'pragma' not in lowered
+
+
+def _bucket_label(index):
+    if index < len(LATENCY_BUCKETS_MS):
+        return f"<={LATENCY_BUCKETS_MS[index]}ms"
+    return f">{LATENCY_BUCKETS_MS[-1]}ms"
+
+
+def _percentile(histogram, total, fraction):
+    """Histogramdan yüzdelik tahmini: ilgili kovanın üst sınırı (ms)"""
+    target = total * fraction
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if count and seen >= target:
+            return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else None
+    return None
+
+
+def _sample_params(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: repr(value)[:200] for key, value in list(params.items())[:MAX_SAMPLE_PARAMS]}
+    try:
+        return [repr(value)[:200] for value in list(params)[:MAX_SAMPLE_PARAMS]]
+    except TypeError:
+        return repr(params)[:200]
+
+
+class QueryStats:
+    """Parmak izi bazında sayaçlar ve en yavaş ifade örnekleri"""
+
+    def __init__(self, max_fingerprints=MAX_FINGERPRINTS, slowest_samples=SLOWEST_SAMPLES):
+        self.max_fingerprints = max_fingerprints
+        self.slowest_samples = slowest_samples
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.enabled = True
+        self._monitoring = None
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.fingerprints = {}
+            self.slowest = []
+            self.dropped = 0
+            self.started_at = datetime.now().isoformat()
+        self._sequence = itertools.count()
+
+    def subscribe(self, callback):
+        """callback(sql, params, duration) her başarılı ifadeden sonra çağrılır"""
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+
+    def _monitoring_system(self):
+        # İlk ölçümde yüklenir; monitoring_system import edilirken log dizini oluşturur
+        if self._monitoring is None:
+            from utils.monitoring_system import monitoring_system
+            self._monitoring = monitoring_system
+        return self._monitoring
+
+    def observe(self, sql, params, duration, rows, success=True, db_path=None):
+        """
+        Tek bir ifadenin ölçümünü kaydeder; (parmak izi, yavaş örnek veya None) döndürür.
+        db_path, örneğin planı rapor okunurken alınacaksa ifadenin çalıştığı veritabanı dosyasıdır.
+        """
+        if not self.enabled:
+            return None, None
+        key = fingerprint(sql)
+        elapsed_ms = duration * 1000
+        bucket = next((i for i, limit in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= limit), len(LATENCY_BUCKETS_MS))
+        with self.lock:
+            entry = self.fingerprints.get(key)
+            if entry is None:
+                if len(self.fingerprints) >= self.max_fingerprints:
+                    self.dropped += 1
+                    entry = None
+                else:
+                    entry = self.fingerprints[key] = {
+                        'calls': 0, 'errors': 0, 'total_ms': 0.0, 'min_ms': None, 'max_ms': 0.0,
+                        'rows': 0, 'histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1), 'last_seen': None
+                    }
+            if entry is not None:
+                entry['calls'] += 1
+                entry['errors'] += 0 if success else 1
+                entry['total_ms'] += elapsed_ms
+                entry['min_ms'] = elapsed_ms if entry['min_ms'] is None else min(entry['min_ms'], elapsed_ms)
+                entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+                entry['rows'] += max(rows or 0, 0)
+                entry['histogram'][bucket] += 1
+                entry['last_seen'] = datetime.now().isoformat()
+            is_slow = len(self.slowest) < self.slowest_samples or elapsed_ms > self.slowest[0][0]
+
+        sample = None
+        if is_slow:
+            sample = self._keep_slow_sample(key, sql, params, elapsed_ms, rows, success, db_path)
+
+        try:
+            self._monitoring_system().track_database_query(sql, duration, success)
+        except Exception:
+            pass
+        if success:
+            for callback in self.subscribers:
+                callback(sql, params, duration)
+        return key, sample
+
+    def add_rows(self, key, rows, sample=None):
+        """Sonuç kümesi okundukça sayılan SELECT satırlarını parmak izine (ve örneğe) ekler"""
+        if not rows:
+            return
+        with self.lock:
+            entry = self.fingerprints.get(key)
+            if entry is not None:
+                entry['rows'] += rows
+            if sample is not None:
+                sample['rows'] = (sample['rows'] or 0) + rows
+
+    def _keep_slow_sample(self, key, sql, params, elapsed_ms, rows, success, db_path):
+        sample = {
+            'fingerprint': key,
+            'sql': sql[:MAX_SAMPLE_SQL],
+            'params': _sample_params(params),
+            'duration_ms': round(elapsed_ms, 3),
+            'rows': rows,
+            'success': success,
+            'plan': None,
+            'timestamp': datetime.now().isoformat()
+        }
+        # Plan için gereken ham bilgiler rapora girmez; plan alınınca bırakılır
+        plan_request = None
+        if db_path and success and is_capturable(sql):
+            plan_request = (db_path, sql, params)
+        with self.lock:
+            item = (elapsed_ms, next(self._sequence), sample, plan_request)
+            if len(self.slowest) < self.slowest_samples:
+                heapq.heappush(self.slowest, item)
+            elif elapsed_ms > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, item)
+            else:
+                return None
+        return sample
+
+    def _fill_plans(self, slowest):
+        """Planı henüz alınmamış yavaş örnekler için EXPLAIN QUERY PLAN (rapor okunurken)"""
+        connections = {}
+        try:
+            for index, (elapsed_ms, sequence, sample, plan_request) in enumerate(slowest):
+                if plan_request is None:
+                    continue
+                db_path, sql, params = plan_request
+                try:
+                    if db_path not in connections:
+                        connections[db_path] = _plan_connection(db_path)
+                    sample['plan'] = [row[3] for row in connections[db_path].execute(
+                        f"EXPLAIN QUERY PLAN {sql}", params or ())]
+                except sqlite3.Error:
+                    sample['plan'] = None
+                slowest[index] = (elapsed_ms, sequence, sample, None)
+        finally:
+            for conn in connections.values():
+                conn.close()
+
+    def get_report(self, limit=20, order='total'):
+        """
+        Parmak izleri order alanına göre (total, avg, calls, max, rows) sıralanır;
+        en yavaş örnekler süreye göre azalan sırada döner.
+        """
+        with self.lock:
+            items = [(key, dict(entry, histogram=list(entry['histogram']))) for key, entry in self.fingerprints.items()]
+            pending = [item for item in self.slowest if item[3] is not None]
+            dropped = self.dropped
+
+        if pending:
+            self._fill_plans(pending)
+            planned = {item[1] for item in pending}
+            with self.lock:
+                self.slowest = [(item[0], item[1], item[2], None) if item[1] in planned else item
+                                for item in self.slowest]
+                heapq.heapify(self.slowest)
+        with self.lock:
+            slowest = [(item[0], item[1], dict(item[2])) for item in sorted(self.slowest, reverse=True)]
+
+        fingerprints = []
+        for key, entry in items:
+            calls = entry['calls']
+            fingerprints.append({
+                'fingerprint': key,
+                'calls': calls,
+                'errors': entry['errors'],
+                'total_ms': round(entry['total_ms'], 3),
+                'avg_ms': round(entry['total_ms'] / calls, 3) if calls else 0,
+                'min_ms': round(entry['min_ms'] or 0, 3),
+                'max_ms': round(entry['max_ms'], 3),
+                'p50_ms': _percentile(entry['histogram'], calls, 0.5),
+                'p95_ms': _percentile(entry['histogram'], calls, 0.95),
+                'p99_ms': _percentile(entry['histogram'], calls, 0.99),
+                'rows': entry['rows'],
+                'avg_rows': round(entry['rows'] / calls, 1) if calls else 0,
+                'histogram': {_bucket_label(i): count for i, count in enumerate(entry['histogram']) if count},
+                'last_seen': entry['last_seen']
+            })
+
+        sort_keys = {'total': 'total_ms', 'avg': 'avg_ms', 'calls': 'calls', 'max': 'max_ms', 'rows': 'rows'}
+        fingerprints.sort(key=lambda f: f[sort_keys.get(order, 'total_ms')], reverse=True)
+        return {
+            'since': self.started_at,
+            'statements': sum(f['calls'] for f in fingerprints),
+            'distinct_fingerprints': len(fingerprints),
+            'untracked_statements': dropped,
+            'total_ms': round(sum(f['total_ms'] for f in fingerprints), 3),
+            'fingerprints': fingerprints[:limit],
+            'slowest': [sample for _, _, sample in slowest]
+        }
+
+
+def _plan_connection(db_path):
+    """EXPLAIN için ölçülmeyen, salt okunur bağlantı; arşiv varsa all_posts görünümü de kurulur"""
+    from utils.post_archive import attach_archive, ALL_POSTS_VIEW
+
+    if not os.path.exists(db_path):
+        raise sqlite3.OperationalError(f"no such database: {db_path}")
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=1)
+    try:
+        if not attach_archive(conn, must_exist=True):
+            conn.execute(f"CREATE TEMP VIEW IF NOT EXISTS {ALL_POSTS_VIEW} AS SELECT * FROM main.posts")
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+# Uygulama genelinde tek istatistik deposu
+query_stats = QueryStats()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Süreyi execute çağrısı boyunca ölçer ve ölçümü hemen kaydeder. SELECT için okunan satırlar
+    sonuç kümesi tükendiğinde, cursor kapandığında veya yeniden execute edildiğinde eklenir.
+    """
+    _pending_rows = None
+
+    def _flush_rows(self):
+        pending = self._pending_rows
+        if pending is None:
+            return
+        self._pending_rows = None
+        key, sample, rows = pending
+        query_stats.add_rows(key, rows, sample)
+
+    def execute(self, sql, parameters=()):
+        self._flush_rows()
+        started = perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except sqlite3.Error:
+            query_stats.observe(sql, parameters, perf_counter() - started, 0, success=False)
+            raise
+        duration = perf_counter() - started
+        is_select = self.description is not None
+        key, sample = query_stats.observe(sql, parameters, duration, 0 if is_select else self.rowcount,
+                                          db_path=getattr(self.connection, 'db_path', None))
+        if is_select and key is not None:
+            self._pending_rows = [key, sample, 0]
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._flush_rows()
+        started = perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        except sqlite3.Error:
+            query_stats.observe(sql, None, perf_counter() - started, 0, success=False)
+            raise
+        query_stats.observe(sql, None, perf_counter() - started, self.rowcount)
+        return self
+
+    def fetchone(self):
+        row = super().fetchone()
+        if self._pending_rows is not None:
+            if row is None:
+                self._flush_rows()
+            else:
+                self._pending_rows[2] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        if self._pending_rows is not None:
+            self._pending_rows[2] += len(rows)
+            if len(rows) < (self.arraysize if size is None else size):
+                self._flush_rows()
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        if self._pending_rows is not None:
+            self._pending_rows[2] += len(rows)
+            self._flush_rows()
+        return rows
+
+    def __next__(self):
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._flush_rows()
+            raise
+        if self._pending_rows is not None:
+            self._pending_rows[2] += 1
+        return row
+
+    def close(self):
+        self._flush_rows()
+        super().close()
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3.connect(..., factory=InstrumentedConnection); SQLAlchemy'ye connect_args ile verilir"""
+
+    def __init__(self, database, *args, **kwargs):
+        super().__init__(database, *args, **kwargs)
+        # Yavaş örneklerin planı rapor okunurken bu dosyaya açılan ayrı bağlantıda alınır
+        path = os.fsdecode(database) if isinstance(database, (str, bytes, os.PathLike)) else None
+        self.db_path = os.path.abspath(path) if path and path != ':memory:' and not path.startswith('file:') else None
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or InstrumentedCursor)
+
+    # Connection.execute* kısayolları C tarafında cursor() metodunu çağırmadığı için yeniden tanımlanır
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect(db_path='instance/data.db', **kwargs):
+    """Ölçülen sqlite3 bağlantısı; web tarafındaki ham sqlite3 okumaları bunu kullanır"""
+    return sqlite3.connect(db_path, factory=InstrumentedConnection, **kwargs)
+
+
+def instrument_engine_options(options=None):
+    """SQLALCHEMY_ENGINE_OPTIONS'a bağlantı fabrikasını ekler (sadece sqlite motorları için)"""
+    options = dict(options or {})
+    connect_args = dict(options.get('connect_args', {}))
+    connect_args.setdefault('factory', InstrumentedConnection)
+    options['connect_args'] = connect_args
+    return options
+
+
+def get_query_report(limit=20, order='total'):
+    """Endpoint için sorgu istatistikleri"""
+    return query_stats.get_report(limit, order)
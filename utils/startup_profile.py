@@ -0,0 +1,129 @@
+# Açılış Süresi Profili ve Bütçesi
+# Hedef modülü (varsayılan: app) temiz bir Python sürecinde `-X importtime` ile import eder,
+# en pahalı importları raporlar ve soğuk açılış bütçeyi aşarsa veya açılışta import
+# edilmemesi gereken ağır bir bağımlılık yüklenirse sıfırdan farklı çıkış koduyla biter.
+#
+#   python utils/startup_profile.py                     # rapor
+#   python utils/startup_profile.py --budget 1.5        # bütçe kontrolü (CI)
+#   python utils/startup_profile.py --target wsgi --target cti_manager
+
+import sys
+import os
+import json
+import subprocess
+import time
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET = 2.0
+
+# İlk kullanımda yüklenmesi gereken ağır paketler; açılışta görülürlerse bütçe ihlalidir
+DEFERRED_PACKAGES = ('pandas', 'sklearn', 'scipy', 'reportlab', 'joblib', 'openpyxl',
+                     'alembic', 'requests', 'redis', 'selenium', 'playwright', 'PIL')
+
+
+def parse_importtime(stderr):
+    """`-X importtime` çıktısı -> [(modül, kendi µs, kümülatif µs, derinlik)]"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue
+        name = parts[2]
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), self_us, cumulative_us, depth))
+    return modules
+
+
+def profile_imports(target='app', python=None, top=15):
+    """Hedefi ayrı bir süreçte import eder; duvar saati ve import ağacından rapor üretir"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [python or sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+        # Bağımsız ölçüm: bytecode önbelleği kullanılır, ortamdan gelen Flask CLI bayrağı kullanılmaz
+        env={key: value for key, value in os.environ.items() if key != 'FLASK_RUN_FROM_CLI'}
+    )
+    wall_seconds = time.perf_counter() - started
+    modules = parse_importtime(result.stderr)
+
+    roots = {}
+    for name, _, cumulative_us, _ in modules:
+        package = name.split('.')[0]
+        # Bir paketin en üst seviyedeki (ilk) import'u paketin toplam maliyetidir
+        roots[package] = max(roots.get(package, 0), cumulative_us)
+    project_packages = {'app', 'wsgi', 'cti_manager', 'config', 'utils', 'controllers', 'models', 'routes',
+                        'background_jobs', target.split('.')[0]}
+    project_modules = sorted(((name, cumulative_us) for name, _, cumulative_us, _ in modules
+                              if name.split('.')[0] in project_packages), key=lambda item: -item[1])
+    return {
+        'target': target,
+        'returncode': result.returncode,
+        'error': result.stderr.strip().splitlines()[-1] if result.returncode else None,
+        'wall_seconds': round(wall_seconds, 3),
+        'module_count': len(modules),
+        'top_packages': [{'package': package, 'ms': round(us / 1000, 1)}
+                         for package, us in sorted(roots.items(), key=lambda item: -item[1])[:top]],
+        'top_project_modules': [{'module': name, 'ms': round(us / 1000, 1)} for name, us in project_modules[:top]],
+        'deferred_packages_loaded': sorted(package for package in roots if package in DEFERRED_PACKAGES)
+    }
+
+
+def check_budget(report, budget=DEFAULT_BUDGET):
+    """Bütçe ihlallerinin listesi (boşsa geçti)"""
+    failures = []
+    if report['returncode']:
+        failures.append(f"{report['target']} import edilemedi: {report['error']}")
+    if report['wall_seconds'] > budget:
+        failures.append(f"{report['target']} soğuk açılış {report['wall_seconds']}s > bütçe {budget}s")
+    for package in report['deferred_packages_loaded']:
+        failures.append(f"{report['target']} açılışta {package} import ediyor (ilk kullanımda yüklenmeli)")
+    return failures
+
+
+def print_report(report):
+    print(f"\n{report['target']}: {report['wall_seconds']}s, {report['module_count']} modül")
+    print("  En pahalı paketler (kümülatif):")
+    for row in report['top_packages']:
+        print(f"    {row['ms']:>9.1f} ms  {row['package']}")
+    print("  En pahalı proje modülleri (kümülatif):")
+    for row in report['top_project_modules']:
+        print(f"    {row['ms']:>9.1f} ms  {row['module']}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Import süresi profili ve açılış bütçesi kontrolü')
+    parser.add_argument('--target', action='append', help='import edilecek modül (tekrarlanabilir, varsayılan: app)')
+    parser.add_argument('--budget', type=float, help='saniye; aşılırsa çıkış kodu 1')
+    parser.add_argument('--json', action='store_true', help='raporu JSON olarak yaz')
+    args = parser.parse_args()
+
+    failures = []
+    reports = []
+    for target in args.target or ['app']:
+        # İlk çalıştırma .pyc dosyalarını üretir; ölçülen ikinci çalıştırmadır
+        profile_imports(target)
+        report = profile_imports(target)
+        reports.append(report)
+        if args.budget is not None:
+            failures += check_budget(report, args.budget)
+
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+    else:
+        for report in reports:
+            print_report(report)
+    for failure in failures:
+        print(f"BÜTÇE AŞILDI: {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,139 @@
+# Zaman Damgası Normalizasyonu
+# posts.discovered / posts.published serbest metin alanlarını ingest sırasında bir kez
+# UTC epoch saniyesine çevirir; tarih aralığı sorguları bu tamsayı sütunları üzerinden
+# indeks aralık taraması ile çalışır
+
+import sys
+import os
+import sqlite3
+from datetime import datetime, timezone, timedelta
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DAY = 86400
+
+TIMESTAMP_COLUMNS = (('discovered', 'discovered_ts'), ('published', 'published_ts'))
+
+# Zaman aralıklı sorguların ihtiyaç duyduğu sütunları kapsayan indeksler.
+# Sütunları eksik olan (eski şemalı) tablolarda ilgili indeks atlanır.
+TIMESTAMP_INDEXES = {
+    'idx_posts_discovered_ts_cover': ('discovered_ts', 'country', 'impact_level'),
+    'idx_posts_discovered_ts_actor': ('discovered_ts', 'name', 'sector'),
+    'idx_posts_published_ts': ('published_ts',)
+}
+
+
+def parse_timestamp(value):
+    """
+    '2024-05-01', '2024-05-01 10:22:03.123456', '2024-05-01T10:22:03Z' gibi değerleri
+    UTC epoch saniyesine çevirir. Saat dilimi olmayan değerler UTC kabul edilir.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value).strip()
+        if not text or text == 'None':
+            return None
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def parse_timestamps(values):
+    """parse_timestamp'in pandas ile vektörize edilmiş karşılığı (geçmiş veri backfill'i için)"""
+    import pandas as pd
+
+    series = pd.Series(values, dtype='object').replace({'None': None, '': None})
+    parsed = pd.to_datetime(series, errors='coerce', utc=True, format='ISO8601')
+    epochs = (parsed - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    return [None if pd.isna(epoch) else int(epoch) for epoch in epochs]
+
+
+def date_range_to_epoch(start_date=None, end_date=None):
+    """
+    API'den gelen tarih filtrelerini [start_ts, end_ts) aralığına çevirir.
+    Sadece gün içeren bitiş tarihi o günün tamamını kapsar.
+    """
+    start_ts = parse_timestamp(start_date) if start_date else None
+    end_ts = parse_timestamp(end_date) if end_date else None
+    if end_ts is not None and len(str(end_date).strip()) <= 10:
+        end_ts += DAY
+    return start_ts, end_ts
+
+
+def window_start(days=None, hours=None, now=None):
+    """Son N gün/saatlik pencerenin başlangıç epoch değeri"""
+    now = now or datetime.now(timezone.utc)
+    return int((now - timedelta(days=days or 0, hours=hours or 0)).timestamp())
+
+
+def _columns(conn):
+    return {row[1] for row in conn.execute("PRAGMA table_info(posts)")}
+
+
+def create_timestamp_indexes(conn):
+    """Kapsayan indeksleri oluşturur (sütunları tabloda bulunanlar için)"""
+    existing = _columns(conn)
+    for name, columns in TIMESTAMP_INDEXES.items():
+        if set(columns) <= existing:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON posts({', '.join(columns)})")
+
+
+def ensure_timestamp_columns(conn, create_indexes=True):
+    """posts tablosuna discovered_ts / published_ts sütunlarını ve kapsayan indeksleri ekler"""
+    for _, column in TIMESTAMP_COLUMNS:
+        try:
+            conn.execute(f"ALTER TABLE posts ADD COLUMN {column} INTEGER")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" not in str(e):
+                raise
+    if create_indexes:
+        create_timestamp_indexes(conn)
+
+
+def backfill_timestamp_columns(conn, batch_size=50000):
+    """
+    Epoch sütunu boş olan postları parça parça, vektörize ayrıştırma ile doldurur.
+    İlk migrasyonda indeksler doldurma bittikten sonra kurulur; her UPDATE'te
+    indeks bakımı yapılmaz. Ayrıştırılamayan değerler NULL kalır ve sonraki
+    çalıştırmada tekrar denenir.
+    """
+    ensure_timestamp_columns(conn, create_indexes=False)
+    existing = _columns(conn)
+    updated = 0
+    for source, target in TIMESTAMP_COLUMNS:
+        if source not in existing:
+            continue
+        last_id = 0
+        while True:
+            rows = conn.execute(f"""
+                SELECT id, {source} FROM posts
+                WHERE {target} IS NULL AND {source} IS NOT NULL AND id > ?
+                ORDER BY id LIMIT ?
+            """, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            ids = [row[0] for row in rows]
+            epochs = parse_timestamps([row[1] for row in rows])
+            batch = [(epoch, post_id) for epoch, post_id in zip(epochs, ids) if epoch is not None]
+            conn.executemany(f"UPDATE posts SET {target} = ? WHERE id = ?", batch)
+            conn.commit()
+            updated += len(batch)
+            last_id = ids[-1]
+    create_timestamp_indexes(conn)
+    conn.commit()
+    return updated
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(sys.argv[1] if len(sys.argv) > 1 else 'instance/data.db')
+    count = backfill_timestamp_columns(conn)
+    print(f"✅ {count} tarih değeri epoch sütunlarına yazıldı")
+    conn.close()
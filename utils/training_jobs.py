@@ -0,0 +1,352 @@
+# Model Eğitim İşleri
+# /api/ml/train-* istekleri eğitimi HTTP isteği içinde çalıştırmaz: iş kaydı oluşturulur,
+# eğitim ayrı bir Python sürecinde (python utils/training_jobs.py run <id>) tüm çekirdeklerle
+# (n_jobs) yapılır ve istek hemen iş kimliğini döndürür. İş durumu, aşama, ilerleme ve
+# metrikler SQLite'taki training_jobs tablosunda tutulur; böylece işi gönderen gunicorn
+# worker'ı ile durumu soran worker farklı olabilir. Yeni model kayıt defterine atomik olarak
+# yayınlanır (utils/model_registry). Aynı model için bekleyen / çalışan bir iş varsa yeni
+# gönderim o işe bağlanır (coalescing). Aynı anda tek bir eğitim süreci çalışır; diğer
+# modellerin işleri kuyrukta (en fazla model sayısı kadar) bekler ve sırayla başlatılır.
+# Eğitim süreci düşük öncelikle (nice) ve bir çekirdeği web süreçlerine bırakarak çalışır.
+
+import sys
+import os
+import json
+import sqlite3
+import subprocess
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_JOBS_PATH = os.path.join(PROJECT_ROOT, 'cache', 'training_jobs.db')
+
+# Model adı -> MLModels eğitim metodu
+TRAINERS = {
+    'risk_classifier': 'train_risk_classifier',
+    'threat_classifier': 'train_threat_classifier',
+    'sector_classifier': 'train_sector_classifier'
+}
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+# Başlatılmak üzere seçilmiş ama süreci kaydedilememiş işler bu süreden sonra başarısız sayılır
+QUEUED_TIMEOUT = 60
+
+# Eğitim sürecinin nice değeri (gunicorn worker'ları ve toplayıcı önde kalır)
+TRAINING_NICE = 10
+
+JSON_FIELDS = ('params', 'result')
+
+
+def _json_default(value):
+    # numpy skalerleri (accuracy, cv_mean, feature_importance değerleri)
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def capped_n_jobs(n_jobs):
+    """n_jobs (-1 / None: tümü) en fazla çekirdek sayısının bir eksiği olacak şekilde sınırlanır"""
+    limit = max(1, (os.cpu_count() or 1) - 1)
+    if n_jobs is None or n_jobs <= 0:
+        return limit
+    return min(n_jobs, limit)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TrainingJobStore:
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_JOBS_PATH
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS training_jobs (
+                    id TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL NOT NULL DEFAULT 0,
+                    params TEXT,
+                    result TEXT,
+                    error TEXT,
+                    coalesced INTEGER NOT NULL DEFAULT 0,
+                    pid INTEGER,
+                    submitted_at REAL NOT NULL,
+                    launched_at REAL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            try:
+                conn.execute("ALTER TABLE training_jobs ADD COLUMN launched_at REAL")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name" not in str(e):
+                    raise
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_training_jobs_model_status ON training_jobs (model, status)")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def _to_dict(self, row, columns):
+        job = dict(zip(columns, row))
+        for field in JSON_FIELDS:
+            if job.get(field):
+                job[field] = json.loads(job[field])
+        for field in ('submitted_at', 'launched_at', 'started_at', 'finished_at'):
+            if job.get(field):
+                job[field] = datetime.fromtimestamp(job[field]).isoformat()
+        return job
+
+    def _select(self, conn, where='', params=(), suffix=''):
+        cursor = conn.execute(f"SELECT * FROM training_jobs {where} {suffix}", params)
+        columns = [c[0] for c in cursor.description]
+        return [self._to_dict(row, columns) for row in cursor.fetchall()]
+
+    def create_or_coalesce(self, model, params, is_stale=None):
+        """
+        Aynı model için aktif iş varsa onu döndürür (coalesced=True), yoksa yeni 'queued' iş
+        oluşturur. is_stale(job) True dönen aktif işler önce başarısız olarak kapatılır.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            active = self._select(conn, "WHERE model = ? AND status IN ('queued', 'running')", (model,),
+                                  "ORDER BY submitted_at DESC")
+            for job in active:
+                if is_stale is not None and is_stale(job):
+                    conn.execute("UPDATE training_jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                                 ('Eğitim süreci sonlandı', time.time(), job['id']))
+                    continue
+                conn.execute("UPDATE training_jobs SET coalesced = coalesced + 1 WHERE id = ?", (job['id'],))
+                conn.execute("COMMIT")
+                job['coalesced'] += 1
+                return job, True
+
+            job_id = uuid.uuid4().hex[:12]
+            conn.execute("""
+                INSERT INTO training_jobs (id, model, status, stage, progress, params, submitted_at)
+                VALUES (?, ?, 'queued', 'kuyrukta', 0, ?, ?)
+            """, (job_id, model, json.dumps(params), time.time()))
+            job = self._select(conn, "WHERE id = ?", (job_id,))[0]
+            conn.execute("COMMIT")
+            return job, False
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def claim_next(self, is_stale=None):
+        """
+        Başlatılmış (launched_at dolu) aktif iş yoksa kuyruktaki en eski işi başlatılmak üzere
+        işaretleyip döndürür; bir iş çalışıyorsa None. is_stale(job) True dönen işler kapatılır.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job in self._select(conn, "WHERE status IN ('queued', 'running') AND launched_at IS NOT NULL"):
+                if is_stale is not None and is_stale(job):
+                    conn.execute("UPDATE training_jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                                 ('Eğitim süreci sonlandı', time.time(), job['id']))
+                    continue
+                conn.execute("COMMIT")
+                return None
+
+            waiting = self._select(conn, "WHERE status = 'queued' AND launched_at IS NULL",
+                                   suffix="ORDER BY submitted_at LIMIT 1")
+            if not waiting:
+                conn.execute("COMMIT")
+                return None
+            conn.execute("UPDATE training_jobs SET launched_at = ? WHERE id = ?", (time.time(), waiting[0]['id']))
+            job = self._select(conn, "WHERE id = ?", (waiting[0]['id'],))[0]
+            conn.execute("COMMIT")
+            return job
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def update(self, job_id, **fields):
+        for field in JSON_FIELDS:
+            if field in fields and fields[field] is not None:
+                fields[field] = json.dumps(fields[field], ensure_ascii=False, default=_json_default)
+        assignments = ', '.join(f"{field} = ?" for field in fields)
+        conn = self._connect()
+        try:
+            conn.execute(f"UPDATE training_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+        finally:
+            conn.close()
+
+    def get(self, job_id):
+        conn = self._connect()
+        try:
+            jobs = self._select(conn, "WHERE id = ?", (job_id,))
+        finally:
+            conn.close()
+        return jobs[0] if jobs else None
+
+    def list(self, model=None, limit=20):
+        conn = self._connect()
+        try:
+            if model:
+                return self._select(conn, "WHERE model = ?", (model,), f"ORDER BY submitted_at DESC LIMIT {int(limit)}")
+            return self._select(conn, suffix=f"ORDER BY submitted_at DESC LIMIT {int(limit)}")
+        finally:
+            conn.close()
+
+
+class TrainingJobManager:
+    def __init__(self, store=None, python=None):
+        self._store = store
+        self.python = python or sys.executable
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        # Tablo ilk kullanımda oluşturulur (import sırasında diske dokunulmaz)
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = TrainingJobStore()
+        return self._store
+
+    def _is_stale(self, job):
+        """Aktif görünen ama süreci artık olmayan iş (sunucu yeniden başladı, süreç öldü)"""
+        if job['status'] == 'running':
+            return not job['pid'] or not _pid_alive(job['pid'])
+        if not job.get('launched_at'):
+            # Sırasını bekleyen iş; süreci yok ama canlı
+            return False
+        if job['pid']:
+            return not _pid_alive(job['pid'])
+        launched = datetime.fromisoformat(job['launched_at']).timestamp()
+        return time.time() - launched > QUEUED_TIMEOUT
+
+    def submit(self, model, days=90, n_jobs=-1, nice=TRAINING_NICE):
+        """
+        Eğitim işi gönderir: (iş, coalesced). Aynı model için aktif iş varsa o döner.
+        Başka bir eğitim çalışıyorsa iş kuyrukta kalır ve o bitince başlatılır.
+        """
+        if model not in TRAINERS:
+            raise ValueError(f"Bilinmeyen model: {model}")
+        job, coalesced = self.store.create_or_coalesce(model, {'days': days, 'n_jobs': n_jobs, 'nice': nice},
+                                                       is_stale=self._is_stale)
+        if not coalesced:
+            self.start_next()
+            job = self.store.get(job['id'])
+        return job, coalesced
+
+    def start_next(self):
+        """Çalışan eğitim yoksa kuyruktaki sıradaki işi başlatır"""
+        while True:
+            job = self.store.claim_next(is_stale=self._is_stale)
+            if job is None:
+                return None
+            try:
+                self._launch(job['id'])
+                return job
+            except OSError as e:
+                self.store.update(job['id'], status='failed', error=f'Eğitim süreci başlatılamadı: {e}',
+                                  finished_at=time.time())
+
+    def _launch(self, job_id):
+        process = subprocess.Popen([self.python, os.path.abspath(__file__), 'run', job_id], cwd=PROJECT_ROOT)
+        self.store.update(job_id, pid=process.pid)
+
+        def reap():
+            # Süreç beklenmedik şekilde biterse (OOM, kill) iş açık kalmasın
+            returncode = process.wait()
+            job = self.store.get(job_id)
+            if job and job['status'] in ACTIVE_STATUSES:
+                self.store.update(job_id, status='failed', error=f'Eğitim süreci {returncode} koduyla çıktı',
+                                  finished_at=time.time())
+            self.start_next()
+
+        threading.Thread(target=reap, name=f'training-{job_id}', daemon=True).start()
+
+    def get(self, job_id):
+        job = self.store.get(job_id)
+        if job and job['status'] in ACTIVE_STATUSES and self._is_stale(job):
+            self.store.update(job_id, status='failed', error='Eğitim süreci sonlandı', finished_at=time.time())
+            job = self.store.get(job_id)
+        if job and job['status'] == 'queued' and not job['launched_at']:
+            # İşi başlatan worker yeniden başlatıldıysa kuyruk durum sorgusuyla ilerler
+            if self.start_next():
+                job = self.store.get(job_id)
+        return job
+
+    def list(self, model=None, limit=20):
+        return self.store.list(model, limit)
+
+
+def run_job(job_id, store=None):
+    """Eğitim süreci: işi çalıştırır, ilerlemeyi ve sonucu iş kaydına yazar"""
+    store = store or TrainingJobStore()
+    job = store.get(job_id)
+    if job is None or job['status'] not in ACTIVE_STATUSES:
+        return None
+    store.update(job_id, status='running', stage='başlatılıyor', started_at=time.time(), pid=os.getpid())
+    print(f"[{datetime.now()}] Eğitim işi başladı: {job_id} ({job['model']})")
+
+    params = job['params'] or {}
+    nice = params.get('nice', TRAINING_NICE)
+    if nice and hasattr(os, 'nice'):
+        os.nice(nice)
+
+    def progress(stage, fraction):
+        store.update(job_id, stage=stage, progress=round(fraction, 3))
+
+    try:
+        from app import app
+        from utils.ml_models import ml_models
+
+        with app.app_context():
+            result = getattr(ml_models, TRAINERS[job['model']])(
+                params.get('days', 90), n_jobs=capped_n_jobs(params.get('n_jobs', -1)), progress=progress)
+    except Exception as e:
+        result = {'error': str(e)}
+
+    if 'error' in result:
+        store.update(job_id, status='failed', stage='başarısız', error=result['error'], finished_at=time.time())
+    else:
+        store.update(job_id, status='succeeded', stage='tamamlandı', progress=1.0, result=result,
+                     finished_at=time.time())
+    print(f"[{datetime.now()}] Eğitim işi bitti: {job_id} ({result.get('error') or result.get('model_version')})")
+    return result
+
+
+# Global eğitim işi yöneticisi
+training_jobs = TrainingJobManager()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+    if command == 'run':
+        result = run_job(sys.argv[2])
+        sys.exit(0 if result is not None and 'error' not in result else 1)
+    elif command == 'submit':
+        job, coalesced = training_jobs.submit(sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 90)
+        print(json.dumps(job, ensure_ascii=False, indent=2))
+    else:
+        print(json.dumps(training_jobs.list(), ensure_ascii=False, indent=2))
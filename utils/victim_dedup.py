@@ -0,0 +1,210 @@
+# Kurban Tekilleştirme Motoru
+# Farklı gruplar tarafından veya farklı başlıklarla tekrar yayınlanan aynı kurbanı
+# normalize edilmiş kimlik (kayıt edilebilir alan adı, şirket adı) üzerinden tek bir kümede toplar.
+# Alan adları farklı olan postlar aynı adı taşısa da birleştirilmez (entity_resolution ile aynı kural)
+
+import sys
+import os
+import re
+import sqlite3
+import unicodedata
+
+# Proje root'unu path'e ekle
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.domain_normalizer import registrable_domain, HOST_PATTERN
+from utils.sql_instrumentation import connect
+
+# Şirket adından atılan hukuki ekler
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'llp', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company',
+    'gmbh', 'ag', 'kg', 'sa', 'sas', 'sarl', 'srl', 'spa', 'bv', 'nv', 'plc', 'pty', 'oy', 'ab',
+    'as', 'sti', 'anonim', 'sirketi', 'sirket', 'san', 'sanayi', 'sanayii', 'tic', 'ticaret',
+    've', 'the'
+}
+
+TURKISH_CHARS = str.maketrans('ıİşŞğĞüÜöÖçÇ', 'iisSgGuUoOcC')
+
+
+def normalize_company_name(name):
+    """Şirket adını karşılaştırılabilir hale getirir: 'ACME Sanayi ve Ticaret A.Ş.' -> 'acme'"""
+    if not name or name == 'None':
+        return None
+    text = unicodedata.normalize('NFKD', str(name).translate(TURKISH_CHARS))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    # A.Ş., S.p.A. gibi noktalı kısaltmalar birleştirilir
+    text = re.sub(r'\b(\w)\.(?=\w\b)', r'\1', text)
+    words = [w for w in re.split(r'[^a-z0-9]+', text) if w]
+    while words and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return ' '.join(words) or None
+
+
+def victim_keys(title, website):
+    """Bir post için kimlik anahtarlarını döndürür (alan adı anahtarı önce)"""
+    keys = []
+    domain = registrable_domain(website) or registrable_domain(title)
+    if domain:
+        keys.append('d:' + domain)
+    # Başlık zaten bir URL/alan adıysa ad anahtarı üretilmez
+    title_text = str(title or '').strip().lower()
+    if '://' in title_text or HOST_PATTERN.fullmatch(title_text):
+        return keys
+    name = normalize_company_name(title)
+    if name:
+        keys.append('n:' + name)
+    return keys
+
+
+class VictimDeduplicator:
+    def __init__(self, conn):
+        """conn: posts tablosunu içeren sqlite3 bağlantısı (commit çağırana aittir)"""
+        self.conn = conn
+        self._key_index = None
+        self._domains = None
+        self.ensure_schema()
+
+    def ensure_schema(self):
+        """Kurban kümeleri, anahtar indeksi ve posts.victim_id sütununu oluşturur"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS victims (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                display_name TEXT NOT NULL,
+                primary_key TEXT NOT NULL,
+                post_count INTEGER NOT NULL DEFAULT 0,
+                first_discovered TEXT,
+                last_discovered TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Anahtar -> küme eşlemesi; her küme birden fazla anahtara (alan adı ve ad) sahip olabilir
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS victim_keys (
+                victim_key TEXT PRIMARY KEY,
+                victim_id INTEGER NOT NULL,
+                FOREIGN KEY (victim_id) REFERENCES victims (id)
+            ) WITHOUT ROWID
+        """)
+        try:
+            self.conn.execute("ALTER TABLE posts ADD COLUMN victim_id INTEGER")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" not in str(e):
+                raise
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_victim_id ON posts(victim_id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_victim_keys_victim_id ON victim_keys(victim_id)")
+
+    def _load_index(self):
+        """Anahtar indeksini belleğe alır; ingest sırasında eşleme tek bir dict araması olur"""
+        if self._key_index is None:
+            self._key_index = dict(self.conn.execute("SELECT victim_key, victim_id FROM victim_keys"))
+            self._domains = {}
+            for key, victim_id in self._key_index.items():
+                if key.startswith('d:'):
+                    self._domains.setdefault(victim_id, set()).add(key)
+        return self._key_index
+
+    def _conflicts(self, victim_id, domain_key):
+        """Postun ve kümenin alan adı var ve farklıysa True"""
+        if domain_key is None:
+            return False
+        domains = self._domains.get(victim_id)
+        return bool(domains) and domain_key not in domains
+
+    def link_post(self, post_id, title, website, discovered=None):
+        """Postu mevcut bir kurban kümesine bağlar veya yeni küme açar, victim_id döndürür"""
+        keys = victim_keys(title, website)
+        if not keys:
+            return None
+
+        index = self._load_index()
+        domain_key = keys[0] if keys[0].startswith('d:') else None
+        victim_id = next((index[key] for key in keys
+                          if key in index and not self._conflicts(index[key], domain_key)), None)
+        if victim_id is None:
+            cur = self.conn.execute("""
+                INSERT INTO victims (display_name, primary_key, post_count, first_discovered, last_discovered)
+                VALUES (?, ?, 0, ?, ?)
+            """, (str(title or keys[0][2:]).strip(), keys[0], discovered, discovered))
+            victim_id = cur.lastrowid
+
+        # Henüz hiçbir kümeye ait olmayan anahtarlar kümeye eklenir; sonraki postlar hangisiyle
+        # gelirse gelsin eşleşir. Başka kümenin anahtarı (ör. ortak ad) olduğu yerde kalır
+        for key in keys:
+            if key not in index:
+                self.conn.execute("INSERT OR IGNORE INTO victim_keys (victim_key, victim_id) VALUES (?, ?)",
+                                  (key, victim_id))
+                index[key] = victim_id
+                if key.startswith('d:'):
+                    self._domains.setdefault(victim_id, set()).add(key)
+
+        self.conn.execute("""
+            UPDATE victims SET
+                post_count = post_count + 1,
+                first_discovered = CASE WHEN first_discovered IS NULL OR ? < first_discovered THEN ? ELSE first_discovered END,
+                last_discovered = CASE WHEN last_discovered IS NULL OR ? > last_discovered THEN ? ELSE last_discovered END
+            WHERE id = ?
+        """, (discovered, discovered, discovered, discovered, victim_id))
+        self.conn.execute("UPDATE posts SET victim_id = ? WHERE id = ?", (victim_id, post_id))
+        return victim_id
+
+    def backfill(self, batch_size=1000):
+        """Henüz kümeye bağlanmamış tüm postları bağlar"""
+        linked = 0
+        rows = self.conn.execute("""
+            SELECT id, title, website, discovered FROM posts
+            WHERE victim_id IS NULL ORDER BY id
+        """).fetchall()
+        for i, (post_id, title, website, discovered) in enumerate(rows, 1):
+            if self.link_post(post_id, title, website, discovered) is not None:
+                linked += 1
+            if i % batch_size == 0:
+                self.conn.commit()
+        self.conn.commit()
+        return linked
+
+
+def count_unique_victims(conn):
+    """Tekil kurban sayısı; kümeler henüz oluşturulmamışsa None döner"""
+    try:
+        return conn.execute("SELECT COUNT(*) FROM victims").fetchone()[0] or None
+    except sqlite3.OperationalError:
+        return None
+
+
+def get_cross_group_victims(db_path='instance/data.db', limit=50):
+    """Birden fazla grup tarafından yayınlanan kurbanları döndürür"""
+    conn = connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT v.id, v.display_name, v.primary_key, v.post_count, v.first_discovered, v.last_discovered,
+                   COUNT(DISTINCT p.name) AS group_count, GROUP_CONCAT(DISTINCT p.name)
+            FROM victims v JOIN posts p ON p.victim_id = v.id
+            WHERE v.post_count > 1
+            GROUP BY v.id
+            HAVING group_count > 1
+            ORDER BY group_count DESC, v.last_discovered DESC
+            LIMIT ?
+        """, (limit,)).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    finally:
+        conn.close()
+
+    return [{
+        'victim_id': row[0],
+        'name': row[1],
+        'identity': row[2],
+        'post_count': row[3],
+        'first_discovered': row[4],
+        'last_discovered': row[5],
+        'group_count': row[6],
+        'groups': sorted((row[7] or '').split(','))
+    } for row in rows]
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(sys.argv[1] if len(sys.argv) > 1 else 'instance/data.db')
+    deduplicator = VictimDeduplicator(conn)
+    linked = deduplicator.backfill()
+    print(f"✅ {linked} post kurban kümelerine bağlandı, {count_unique_victims(conn)} tekil kurban")
+    conn.close()
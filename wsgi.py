@@ -0,0 +1,145 @@
+"""
+CTI-BOT WSGI entry point
+Production serving: gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is imported once in the gunicorn master (preload_app) so heavy modules are shared
+copy-on-write by the forked workers. Each worker warms its own caches before it accepts
+traffic, and only the elected leader worker runs the background services (RealtimeUpdater).
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime
+
+from app import app
+
+# Modules only reached lazily from request handlers; importing them before fork shares them
+PRELOAD_MODULES = (
+    'pandas',
+    'utils.ml_models',
+    'utils.advanced_analytics',
+    'utils.integration_manager',
+    'utils.advanced_charts',
+    'utils.realtime_updater',
+    'utils.event_stream',
+    'utils.dashboard_snapshot',
+)
+
+# Endpoints requested once per worker during warmup (payload cache, snapshot reader,
+# data-version reader and the ORM connection pool are filled before real traffic)
+WARMUP_PATHS = (
+    '/api/dashboard-data',
+    '/api/realtime-status',
+    '/api/recent-attacks',
+    '/api/v1/dashboard/overview',
+    '/api/v1/charts/heatmap',
+    '/api/advanced-charts?type=heatmap',
+)
+
+def preload():
+    """Master process, before fork: import request-time modules without touching the database"""
+    started = time.perf_counter()
+    for module in PRELOAD_MODULES:
+        try:
+            __import__(module)
+        except Exception as e:
+            print(f"[{datetime.now()}] Preload skipped {module}: {e}")
+    # Published model bundles are loaded once here and shared by the workers; each worker
+    # still picks up newer versions from the registry on its own
+    try:
+        from utils.ml_models import ml_models
+        loaded = ml_models.preload_models()
+    except Exception as e:
+        loaded = []
+        print(f"[{datetime.now()}] Model preload skipped: {e}")
+    print(f"[{datetime.now()}] Preloaded application modules and models {loaded} "
+          f"in {time.perf_counter() - started:.2f}s")
+
+
+def reset_after_fork():
+    """Worker process: drop database connections that may have been opened in the master"""
+    from models.DBModel import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def warmup(paths=WARMUP_PATHS):
+    """Worker process, before accepting traffic: request the hot endpoints once"""
+    started = time.perf_counter()
+    client = app.test_client()
+    results = {}
+    for path in paths:
+        try:
+            # Warmup requests do not count against a real client's rate limit bucket
+            response = client.get(path, environ_base={'REMOTE_ADDR': 'warmup'})
+            results[path] = response.status_code
+        except Exception as e:
+            results[path] = str(e)
+    return results, round(time.perf_counter() - started, 2)
+
+
+def start_background_services():
+    """
+    Every worker joins the leader election for RealtimeUpdater; only the lease holder runs
+    it and the others stay idle. When the leader exits (reload, crash, max_requests) its
+    lease is released or expires and another worker takes over within one lease period.
+    Returns True if this worker is the leader right away.
+    """
+    if not app.config.get('DASHBOARD_SNAPSHOT_WRITER'):
+        return False
+    from utils.realtime_updater import start_realtime_updater
+    start_realtime_updater(app)
+    elector = getattr(app, 'leader_elector', None)
+    return elector is None or elector.is_leader
+
+
+def stop_background_services():
+    """Worker exit: hand the lease over immediately instead of waiting for it to expire"""
+    elector = getattr(app, 'leader_elector', None)
+    if elector is not None:
+        elector.stop()
+
+
+if __name__ == '__main__':
+    # Throughput check: python wsgi.py http://127.0.0.1:5000 [clients] [seconds] [path ...]
+    import urllib.request
+    import urllib.error
+
+    base = sys.argv[1] if len(sys.argv) > 1 else 'http://127.0.0.1:5000'
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 15
+    paths = sys.argv[4:] or ['/api/dashboard-data', '/api/realtime-status', '/api/recent-attacks']
+
+    stop = threading.Event()
+    latencies = []
+    errors = []
+
+    def client(index):
+        n = index
+        while not stop.is_set():
+            path = paths[n % len(paths)]
+            n += 1
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(base + path, timeout=30) as response:
+                    response.read()
+                latencies.append(time.perf_counter() - started)
+            except (urllib.error.URLError, OSError) as e:
+                errors.append(str(e))
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=30)
+    latencies.sort()
+    print({
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': round(len(latencies) / duration, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None
+    })